@@ -1,4 +1,78 @@
+from pcc.AST.arithmetic_operators.multiplication import get_integer_constant
 from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.register_stack import SCALAR_REGISTERS, create_register_stack
+from pcc.compiler.assembler import ProcessorRegister, ShiftMode
+
+
+def get_division_magic(divisor):
+    """Get the magic number to divide by a constant with a multiplication.
+
+    For every 32 bit n, n / divisor is (n * magic) >> (32 + shift), plus 1
+    if n is negative (Granlund and Montgomery).
+
+    Args:
+        divisor (int): the divisor, more than 1 and no power of 2
+
+    Returns:
+        int: the magic number, less than 2^32
+        int: the shift
+    """
+    shift = 0
+    while True:
+        magic = 2 ** (32 + shift) // divisor + 1
+        # the rounding error of the magic number stays below 1 / divisor
+        if magic * divisor - 2 ** (32 + shift) <= 2 ** (shift + 1):
+            return magic, shift
+        shift += 1
+
+
+def divide_by_constant(divisor, register, scratch_register, assembler):
+    """Divide a register by a constant, rounding towards 0 like idiv.
+
+    Args:
+        divisor (int): the constant, not -1, 0 or 1
+        register (ProcessorRegister): the register to divide
+        scratch_register (ProcessorRegister): a register the division can
+            change
+        assembler (Assembler): the assembler to use
+
+    Returns:
+        bytearray: the machine code
+    """
+    value = bytearray()
+    magnitude = abs(divisor)
+    if magnitude & (magnitude - 1) == 0:
+        # add 2^k - 1 to a negative dividend before the shift
+        amount = magnitude.bit_length() - 1
+        value += assembler.copy_from_reg_to_reg(source=register,
+                                                destination=scratch_register)
+        if amount > 1:
+            value += assembler.shift(scratch_register,
+                                     ShiftMode.right_arithmetic, 31)
+        value += assembler.shift(scratch_register, ShiftMode.right_logical,
+                                 32 - amount)
+        value += assembler.add(source=scratch_register, destination=register)
+        value += assembler.shift(register, ShiftMode.right_arithmetic,
+                                 amount)
+    else:
+        magic, shift = get_division_magic(magnitude)
+        value += assembler.movsxd(source=register, destination=register)
+        # the 32 bit move of the magic number clears the upper half
+        if magic >= 2 ** 31:
+            magic -= 2 ** 32
+        value += assembler.copy_value_to_reg(magic, scratch_register)
+        value += assembler.mul(register, scratch_register, is_64_bit=True)
+        value += assembler.shift(register, ShiftMode.right_arithmetic,
+                                 32 + shift, is_64_bit=True)
+        # add 1 if the quotient is negative
+        value += assembler.copy_from_reg_to_reg(source=register,
+                                                destination=scratch_register)
+        value += assembler.shift(scratch_register, ShiftMode.right_logical,
+                                 31)
+        value += assembler.add(source=scratch_register, destination=register)
+    if divisor < 0:
+        value += assembler.neg(register)
+    return value
 
 
 class Division(BinaryOperator):
@@ -6,6 +80,111 @@ class Division(BinaryOperator):
         super(Division, self).__init__(depth, operand_1, operand_2)
         self.operator = '/'
 
+    def get_clobbered_registers(self, register):
+        """Get the registers the evaluation changes, besides the
+        destination.
+
+        Args:
+            register (ProcessorRegister): the destination register
+
+        Returns:
+            List[ProcessorRegister]: eax and edx for an integer division
+        """
+        if register in SCALAR_REGISTERS:
+            return []
+        return [ProcessorRegister.accumulator, ProcessorRegister.data]
+
+    def get_constant_divisor(self):
+        """Get the divisor of an integer division by a constant.
+
+        Returns:
+            int: the divisor, None if it is no integer constant or 0
+        """
+        divisor = get_integer_constant(self.operand_2)
+        if divisor == 0:
+            return None
+        return divisor
+
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator, a division by a
+                constant needs a scratch register besides the dividend
+        """
+        divisor = self.get_constant_divisor()
+        if divisor is None:
+            return super(Division, self).get_register_need()
+        if abs(divisor) == 1:
+            return self.operand_1.get_register_need()
+        return max(self.operand_1.get_register_need(), 2)
+
+    def load_quotient_to_reg(self, divisor, register, assembler,
+                             register_stack):
+        """Load the result of the division by a constant to the specified
+        register, without idiv.
+
+        Args:
+            divisor (int): the constant
+            register (ProcessorRegister): the register to load the result
+            assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
+
+        Returns:
+            bytearray: the compiled code to evaluate the expression
+            List[RelocationObject]: the required relocation objects
+        """
+        if register_stack is None:
+            register_stack = create_register_stack(register)
+        value, relocation_objects = self.operand_1.load_result_to_reg(
+            register, assembler, register_stack)
+        if divisor == -1:
+            value += assembler.neg(register)
+        elif divisor != 1:
+            scratch_register, compiled_code = register_stack.take(register,
+                                                                  assembler)
+            value += compiled_code
+            value += divide_by_constant(divisor, register, scratch_register,
+                                        assembler)
+            value += register_stack.give_back(assembler)
+        return value, relocation_objects
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
+        """Load the result of the division to the specified register
+
+        Args:
+            register (ProcessorRegister): the register to load the result
+            assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
+
+        Returns:
+            bytearray: the compiled code to evaluate the expression
+            List[RelocationObject]: the required relocation objects
+        """
+        divisor = self.get_constant_divisor()
+        if divisor is not None and register not in SCALAR_REGISTERS:
+            return self.load_quotient_to_reg(divisor, register, assembler,
+                                             register_stack)
+        if register != ProcessorRegister.data:
+            return super(Division, self).load_result_to_reg(
+                register, assembler, register_stack)
+        # the division needs edx, divide in a scratch register
+        if register_stack is None:
+            register_stack = create_register_stack(register)
+        scratch_register, value = register_stack.take(register, assembler)
+        compiled_code, relocation_objects = \
+            super(Division, self).load_result_to_reg(
+                scratch_register, assembler, register_stack)
+        for relocation_object in relocation_objects:
+            relocation_object.offset += len(value)
+        value += compiled_code
+        value += assembler.copy_from_reg_to_reg(source=scratch_register,
+                                                destination=register)
+        value += register_stack.give_back(assembler)
+        return value, relocation_objects
+
     def evaluate(self, source, destination, assembler):
         """Evaluate the operator, leaving the result in the destination reg.
 
@@ -1,4 +1,72 @@
 from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.register_stack import SCALAR_REGISTERS
+from pcc.compiler.assembler import ShiftMode
+
+# the factors lea computes as x + x * scale -> the scale
+LEA_FACTORS = {3: 2, 5: 4, 9: 8}
+
+
+def get_integer_constant(expression):
+    """Get the value of an integer constant operand.
+
+    Args:
+        expression (Expression): the operand
+
+    Returns:
+        int: the value, None if the operand is no 32 bit integer constant
+    """
+    if not isinstance(expression, ConstantExpression):
+        return None
+    value = expression.get_integer_value()
+    if value is None or not -2 ** 31 <= value < 2 ** 31:
+        return None
+    return value
+
+
+def split_factor(factor):
+    """Split a factor in a factor lea computes and a power of 2.
+
+    Args:
+        factor (int): the factor, more than 0
+
+    Returns:
+        int: the factor lea computes, 1 if there is none, None if the
+            factor can not be split
+        int: the exponent of the power of 2
+    """
+    amount = (factor & -factor).bit_length() - 1
+    odd_factor = factor >> amount
+    if odd_factor == 1 or odd_factor in LEA_FACTORS:
+        return odd_factor, amount
+    return None, amount
+
+
+def multiply_by_constant(factor, register, assembler):
+    """Multiply a register by a constant, with shifts and lea if possible.
+
+    Args:
+        factor (int): the constant
+        register (ProcessorRegister): the register to multiply
+        assembler (Assembler): the assembler to use
+
+    Returns:
+        bytearray: the machine code
+    """
+    value = bytearray()
+    if factor == -1:
+        value += assembler.neg(register)
+        return value
+    odd_factor, amount = split_factor(factor) if factor > 0 else (None, 0)
+    if odd_factor is None:
+        value += assembler.mul_value(factor, register, register)
+        return value
+    if odd_factor in LEA_FACTORS:
+        value += assembler.lea(register, register, LEA_FACTORS[odd_factor],
+                               register)
+    if amount:
+        value += assembler.shift(register, ShiftMode.left_arithmetic, amount)
+    return value
 
 
 class Multiplication(BinaryOperator):
@@ -6,6 +74,60 @@ class Multiplication(BinaryOperator):
         super(Multiplication, self).__init__(depth, operand_1, operand_2)
         self.operator = '*'
 
+    def get_constant_operand(self):
+        """Get the operands of a multiplication by an integer constant.
+
+        Returns:
+            Expression: the other operand, None if no operand is an
+                integer constant
+            int: the constant
+        """
+        factor = get_integer_constant(self.operand_2)
+        if factor is not None:
+            return self.operand_1, factor
+        factor = get_integer_constant(self.operand_1)
+        if factor is not None:
+            return self.operand_2, factor
+        return None, None
+
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator, the constant of a
+                multiplication by a constant is no operand in a register
+        """
+        operand, _ = self.get_constant_operand()
+        if operand is not None:
+            return operand.get_register_need()
+        return super(Multiplication, self).get_register_need()
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
+        """Load the result of the multiplication to the specified register
+
+        An integer multiplication by a constant is done in place, with
+        shifts and lea for the factors they compute and with an imul of the
+        constant for the others.
+
+        Args:
+            register (ProcessorRegister): the register to load the result
+            assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
+
+        Returns:
+            bytearray: the compiled code to evaluate the expression
+            List[RelocationObject]: the required relocation objects
+        """
+        operand, factor = self.get_constant_operand()
+        if operand is None or register in SCALAR_REGISTERS:
+            return super(Multiplication, self).load_result_to_reg(
+                register, assembler, register_stack)
+        value, relocation_objects = operand.load_result_to_reg(
+            register, assembler, register_stack)
+        value += multiply_by_constant(factor, register, assembler)
+        return value, relocation_objects
+
     def evaluate(self, source, destination, assembler):
         """Evaluate the operator, leaving the result in the destination reg.
 
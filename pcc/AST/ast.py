@@ -1,42 +1,21 @@
-import copy
-import re
-
-import pcc
 import pcc.utils.warning
-from pcc import utils
-from pcc.AST.arithmetic_operators.addition import Addition
 from pcc.AST.array_declaration import ArrayDeclaration
 from pcc.AST.variables.assignment import Assignment
 from pcc.AST.ast_node import AstNode
-from pcc.AST.bitwise_operators.bitwise_and import BitwiseAnd
-from pcc.AST.bitwise_operators.bitwise_not import BitwiseNot
-from pcc.AST.bitwise_operators.bitwise_or import BitwiseOr
-from pcc.AST.bitwise_operators.bitwise_xor import BitwiseXor
-from pcc.AST.comparisons.compare_equal import CompareEqual
-from pcc.AST.comparisons.compare_less import CompareLess
-from pcc.AST.comparisons.compare_less_or_equal import CompareLessOrEqual
-from pcc.AST.comparisons.compare_more import CompareMore
-from pcc.AST.comparisons.compare_more_or_equal import CompareMoreOrEqual
-from pcc.AST.comparisons.compare_not_equal import CompareNotEqual
 from pcc.AST.compound_statement import CompoundStatement
 from pcc.AST.constant_expression import ConstantExpression
-from pcc.AST.arithmetic_operators.division import Division
+from pcc.AST.expression_parser import ExpressionParser
 from pcc.AST.functions.function_argument import FunctionArgument
 from pcc.AST.functions.function_call import FunctionCall
 from pcc.AST.functions.function_declaration import FunctionDeclaration
 from pcc.AST.functions.function_definition import FunctionDefinition
 from pcc.AST.control_statements.if_statement import IfStatement
-from pcc.AST.logical_operators.logical_and import LogicalAnd
-from pcc.AST.logical_operators.logical_not import LogicalNot
-from pcc.AST.logical_operators.logical_or import LogicalOr
-from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.lexer import Lexer
 from pcc.AST.return_statement import ReturnStatement
-from pcc.AST.arithmetic_operators.subtraction import Subtraction
+from pcc.AST.symbol_table import SymbolTable
 from pcc.AST.variables.variable_declaration import VariableDeclaration
-from pcc.AST.variables.variable_reference import VariableReference
 from pcc.AST.control_statements.while_statement import WhileStatement
-from pcc.utils.stringListParsing import extract_closing_char
-from pcc.utils.stringParsing import extract_text_for_enclosed_parenthesis
+from pcc.preprocessor.tokenizer import PPTokenType
 
 
 class VariableType:
@@ -56,40 +35,26 @@ class Ast:
                VariableType('double', 8),
                VariableType('void', 0)]
 
-    @staticmethod
-    def find_first_semicolon_in_list(list_of_source_code):
-        line_number = 0
-        for line in list_of_source_code:
-            position = line.find(';')
-            if position != -1:
-                return line_number, position
-            else:
-                line_number += 1
-        # not found
-        return -1, -1
-
-    @staticmethod
-    def find_first_non_empty_in_list(list_of_source_code):
-        line_number = 0
-        for line in list_of_source_code:
-            if line == '' or line.isspace():
-                line_number += 1
-            else:
-                return line_number
-        # not found
-        return -1
-
     def __init__(self, source_code, file_name):
         self.source_code = source_code
         self.is_completed = False
         self.types = Ast.c_types
         self.root_node = AstNode(depth=1)
         self.current_node = self.root_node
-        self.source_code_list = []
+        # the depth of the statements added to the current node
+        self.current_depth = 1
+        self.lexer = None
+        # the line of the statement being parsed
         self.index = 0
         self.filename = file_name
-        self.declared_functions = []
-        self.tree_string = ''
+        self.symbol_table = SymbolTable()
+        # the compiler looks up the global symbols through the root node
+        self.root_node.symbol_table = self.symbol_table
+        self.statement_readers = {
+            'if': self.read_if_statement,
+            'while': self.read_while_statement,
+            'return': self.read_return_statement,
+        }
 
     def get_type_from_name(self, type_name):
         """Get the type from the type name.
@@ -110,26 +75,38 @@ class Ast:
                                   self.index, message)
 
     def ast_error(self, message):
-        pcc.utils.warning.warning(self.filename,
-                                  self.index, message)
+        pcc.utils.warning.error(self.filename,
+                                self.index, message)
 
     def get_depth_in_tree(self):
-        depth = 1
-        node = self.current_node
-        self.tree_string = self.__str__()
-        while node != self.root_node and node is not None:
-            node = node.parent_node
-            depth += 1
-        if node is None:
-            message = 'could not determine the depth of the tree for %s' % (
-                self.current_node)
-            self.ast_error(message)
-        return depth
+        """Get the depth in the tree of a statement added to the current node.
+
+        Returns:
+            int: the depth
+        """
+        return self.current_depth
+
+    def enter_node(self, node):
+        """Make a node that was just added to the current node the current
+        node.
+
+        Args:
+            node (AstNode): the node to add the next statements to
+        """
+        self.current_node = node
+        self.current_depth += 1
+
+    def leave_node(self):
+        """Make the parent of the current node the current node again."""
+        self.current_node = self.current_node.parent_node
+        self.current_depth -= 1
 
     def run_ast(self):
-        self.source_code_list = self.source_code.split('\n')
-        while self.index < len(self.source_code_list):
-            self.read_next_statement()
+        self.lexer = Lexer(self.source_code)
+        while not self.lexer.is_at_end():
+            start = self.lexer.position
+            if not self.read_external_declaration():
+                self.skip_statement(start)
 
         return 0
 
@@ -171,373 +148,279 @@ class Ast:
 
         return type_string
 
-    def _extract_arithmetic_expression(self, right_hand_value, depth):
-        """Extract the arithmetic expression from string
-
-        Args:
-            right_hand_value (str): the expression to parse
-            depth (int): the depth in the tree
+    def read_external_declaration(self):
+        """Read a declaration or a function definition outside a function.
 
         Returns:
-            Expression: the expression if parsed else None
+            bool: True if parsed, False if it is not a declaration
         """
-        # the initializer of a big double might use scientific notation
-        # e.g. 1e+3
-        # must match optional number and optional fraction with e or E
-        # and +- an
-        # exponent
-        exp_regex = re.compile(r"((-)?\d+(\.\d+)?)[Ee]([+\-])(\d+)")
-        regex_number_result = exp_regex.match(right_hand_value)
-
-        res_addition = re.match(r"(\S+)\+(\S+)", right_hand_value)
-        res_subtraction = re.match(r"(\S+)-(\S+)", right_hand_value)
-
-        res_division = re.match(r"(\S+)/(\S+)", right_hand_value)
-        res_multiplication = re.match(r"(\S+)\*(\S+)", right_hand_value)
-
-        if res_addition and not regex_number_result:
-
-            operand_1_str = res_addition.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_addition.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = Addition(depth, operand_1, operand_2)
-        elif res_subtraction and not regex_number_result:
-
-            operand_1_str = res_subtraction.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
+        token = self.lexer.peek()
+        self.index = token.line_number
+        if token.text != 'extern' and not self.get_type_from_name(token.text):
+            return False
+        return self.read_declaration()
 
-            operand_2_str = res_subtraction.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
+    def read_statement(self):
+        """Read the statement at the current token.
 
-            expression = Subtraction(depth, operand_1, operand_2)
-
-        elif res_division:
-            operand_1_str = res_division.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_division.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = Division(depth, operand_1, operand_2)
-        elif res_multiplication:
-            operand_1_str = res_multiplication.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_multiplication.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = Multiplication(depth, operand_1, operand_2)
+        The statement is added to the current node. A statement that is not
+        recognized is reported and skipped.
+        """
+        start = self.lexer.position
+        token = self.lexer.peek()
+        self.index = token.line_number
+        if token.token_type == PPTokenType.identifier:
+            if token.text in self.statement_readers:
+                parsed = self.statement_readers[token.text]()
+            elif token.text == 'extern' or \
+                    self.get_type_from_name(token.text):
+                parsed = self.read_declaration()
+            elif self.lexer.peek_text(1) == '=':
+                parsed = self.read_assignment()
+            else:
+                parsed = self.read_function_call()
+        elif token.is_punctuator('{'):
+            parsed = self.read_compound_statement()
+        elif token.is_punctuator(';'):
+            # the empty statement
+            self.lexer.next()
+            parsed = True
         else:
-            expression = None
+            parsed = False
+        if not parsed:
+            self.skip_statement(start)
 
-        return expression
+    def skip_statement(self, start):
+        """Report a statement that is not recognized and skip it.
 
-    def _extract_bitwise_expression(self, right_hand_value, depth):
-        """Extract the bitwise expression from string
+        The statement ends after the first semicolon or the first complete
+        block, or before the closing brace of the enclosing block.
 
         Args:
-            right_hand_value (str): the expression to parse
-            depth (int): the depth in the tree
-
-        Returns:
-            Expression: the expression if parsed else None
+            start (int): the position of the first token of the statement
         """
-        res_bitwise_and = re.match(r"(\S+)&(\S+)", right_hand_value)
-        res_bitwise_or = re.match(r"(\S+)\|(\S+)", right_hand_value)
-        res_bitwise_xor = re.match(r"(\S+)\^(\S+)", right_hand_value)
-        res_bitwise_not = re.match(r"~(\S+)", right_hand_value)
-        if res_bitwise_and:
-            operand_1_str = res_bitwise_and.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_bitwise_and.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = BitwiseAnd(depth, operand_1, operand_2)
-        elif res_bitwise_or:
-            operand_1_str = res_bitwise_or.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_bitwise_or.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = BitwiseOr(depth, operand_1, operand_2)
-        elif res_bitwise_xor:
-            operand_1_str = res_bitwise_xor.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_bitwise_xor.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = BitwiseXor(depth, operand_1, operand_2)
-        elif res_bitwise_not:
-            operand_1_str = res_bitwise_not.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            expression = BitwiseNot(depth, operand_1)
-        else:
-            expression = None
+        self.lexer.position = start
+        self.index = self.lexer.peek().line_number
+        skipped_tokens = []
+        nesting_level = 0
+        while not self.lexer.is_at_end():
+            token = self.lexer.peek()
+            if token.is_punctuator('}') and nesting_level == 0:
+                # the end of the enclosing block
+                break
+            skipped_tokens.append(self.lexer.next().text)
+            if token.is_punctuator('{'):
+                nesting_level += 1
+            elif token.is_punctuator('}'):
+                nesting_level -= 1
+                if nesting_level == 0:
+                    break
+            elif token.is_punctuator(';') and nesting_level == 0:
+                break
+        if not skipped_tokens:
+            # a closing brace without a block, skip at least one token
+            skipped_tokens.append(self.lexer.next().text)
+        message = 'following statement not recognized:"%s"' % \
+                  ' '.join(skipped_tokens)
+        self.ast_error(message)
 
-        return expression
+    def read_expression(self, depth, terminators):
+        """Read an expression up to one of the terminators.
 
-    def _extract_logical_expression(self, right_hand_value, depth):
-        """Extract the logical expression from string
+        The terminator is not consumed. An expression the parser does not
+        support is kept as a constant with the text of the expression.
 
         Args:
-            right_hand_value (str): the expression to parse
-            depth (int): the depth in the tree
+            depth (int): the depth in the tree of the expression
+            terminators (Tuple[str]): the punctuators that can follow the
+                expression
 
         Returns:
             Expression: the expression if parsed else None
         """
-        res_logical_and = re.match(r"(\S+)&&(\S+)", right_hand_value)
-        res_logical_or = re.match(r"(\S+)\|\|(\S+)", right_hand_value)
-        res_logical_not = re.match(r"!(\S+)", right_hand_value)
-
-        if res_logical_and:
-            operand_1_str = res_logical_and.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_logical_and.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
+        start = self.lexer.position
+        expression = ExpressionParser(self, self.lexer, depth).parse()
+        if expression is not None and \
+                self.lexer.peek_text() in terminators:
+            return expression
+
+        self.lexer.position = start
+        text = ''
+        nesting_level = 0
+        while not self.lexer.is_at_end():
+            token_text = self.lexer.peek_text()
+            if nesting_level == 0 and token_text in terminators:
+                break
+            if token_text in ('(', '['):
+                nesting_level += 1
+            elif token_text in (')', ']'):
+                nesting_level -= 1
+                if nesting_level < 0:
+                    break
+            elif token_text in (';', '{', '}'):
+                break
+            text += self.lexer.next().text
+        if not text:
+            return None
+        expression_type = self.get_type_of_expression(text)
+        return ConstantExpression(expression_type, text, depth)
 
-            expression = LogicalAnd(depth, operand_1, operand_2)
-        elif res_logical_or:
-            operand_1_str = res_logical_or.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
+    def read_declaration(self):
+        """Read a declaration of variables or of a function, or a function
+        definition.
 
-            operand_2_str = res_logical_or.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        is_extern = self.lexer.accept('extern')
+        token = self.lexer.next()
+        variable_type = self.get_type_from_name(token.text) if token else None
+        if variable_type is None:
+            return False
+        token = self.lexer.next()
+        if token is None or token.token_type != PPTokenType.identifier:
+            return False
+        if self.lexer.peek_text() == '(':
+            return self.read_function(variable_type, token.text)
+
+        while True:
+            statement = self.read_init_declarator(variable_type, token.text,
+                                                  is_extern)
+            if statement is None:
+                return False
+            self.add_declaration(statement)
+            if self.lexer.accept(';'):
+                return True
+            if not self.lexer.accept(','):
+                return False
+            token = self.lexer.next()
+            if token is None or token.token_type != PPTokenType.identifier:
+                return False
+
+    def add_declaration(self, declaration):
+        """Add a declaration to the current node and to the symbol table.
 
-            expression = LogicalOr(depth, operand_1, operand_2)
-        elif res_logical_not:
-            operand_1_str = res_logical_not.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
+        Args:
+            declaration (Statement): the declaration of a variable or a
+                function
+        """
+        self.current_node.add_statement(declaration)
+        self.symbol_table.add_symbol(declaration.name, declaration)
 
-            expression = LogicalNot(depth, operand_1)
-        else:
-            expression = None
+    def read_init_declarator(self, variable_type, name, is_extern):
+        """Read the array size and the initializer of a declared variable.
 
-        return expression
+        Args:
+            variable_type (VariableType): the type of the variable
+            name (str): the name of the variable
+            is_extern (bool): True if this is an external variable
 
-    def _extract_compare_expression(self, right_hand_value, depth):
-        """Extract the compare expression from string.
+        Returns:
+            Statement: the declaration if parsed else None
+        """
+        depth = self.get_depth_in_tree()
+        if self.lexer.accept('['):
+            return self.read_array_declaration(variable_type, name, depth)
+        initializer = None
+        if self.lexer.accept('='):
+            initializer = self.read_expression(depth, (',', ';'))
+            if initializer is None:
+                return None
+        return VariableDeclaration(variable_type, name, initializer, depth,
+                                   is_extern)
+
+    def read_array_declaration(self, variable_type, name, depth):
+        """Read the size and the initializer of an array.
 
         Args:
-            right_hand_value (str): the expression to parse
+            variable_type (VariableType): the type of the elements
+            name (str): the name of the array
             depth (int): the depth in the tree
 
         Returns:
-            Expression: the expression if parsed else None
+            ArrayDeclaration: the declaration if parsed else None
         """
-        res_compare_equal = re.match(r"([^=]+)==([^=]+)", right_hand_value)
-        res_compare_not_equal = re.match(r"([^=!]+)!=([^=!]+)",
-                                         right_hand_value)
-
-        res_compare_less = re.match(r"([^<]+)<([^<]+)", right_hand_value)
-        res_compare_more = re.match(r"([^>]+)>([^>]+)", right_hand_value)
-
-        res_compare_less_or_equal = re.match(r"([^<=]+)<=([^<=]+)",
-                                             right_hand_value)
-        res_compare_more_or_equal = re.match(r"([^>=]+)>=([^>=]+)",
-                                             right_hand_value)
-
-        if res_compare_equal:
-            operand_1_str = res_compare_equal.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_equal.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareEqual(depth, operand_1, operand_2)
-        elif res_compare_not_equal:
-            operand_1_str = res_compare_not_equal.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_not_equal.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareNotEqual(depth, operand_1, operand_2)
-
-        elif res_compare_more_or_equal:
-            operand_1_str = res_compare_more_or_equal.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_more_or_equal.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareMoreOrEqual(depth, operand_1, operand_2)
-        elif res_compare_less_or_equal:
-            operand_1_str = res_compare_less_or_equal.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_less_or_equal.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareLessOrEqual(depth, operand_1, operand_2)
-        elif res_compare_less:
-            operand_1_str = res_compare_less.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_less.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareLess(depth, operand_1, operand_2)
-        elif res_compare_more:
-            operand_1_str = res_compare_more.group(1)
-            operand_1 = self.get_right_hand_value(operand_1_str, depth)
-
-            operand_2_str = res_compare_more.group(2)
-            operand_2 = self.get_right_hand_value(operand_2_str, depth)
-
-            expression = CompareMore(depth, operand_1, operand_2)
-        else:
-            expression = None
+        array_size = None
+        array_size_type = None
+        if not self.lexer.accept(']'):
+            array_size = self.lexer.next().text
+            array_size_type = self.get_type_of_expression(array_size)
+            if not self.lexer.accept(']'):
+                return None
+        initializer = None
+        if self.lexer.accept('='):
+            token = self.lexer.next()
+            if token is None:
+                return None
+            initializer = token.text
+        initializer_type = self.get_type_of_expression(initializer)
+        return ArrayDeclaration(variable_type, name, initializer,
+                                initializer_type, array_size,
+                                array_size_type, depth)
+
+    def read_function(self, return_type, name):
+        """Read a function declaration or a function definition.
 
-        return expression
+        Args:
+            return_type (VariableType): the return type of the function
+            name (str): the name of the function
 
-    def get_right_hand_value(self, right_hand_value, depth):
-        """Extract the right hand value out the string
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        depth = self.get_depth_in_tree()
+        argument_list = self.read_parameter_list(depth)
+        if argument_list is None:
+            return False
+        if self.lexer.accept(';'):
+            function_declaration = FunctionDeclaration(return_type, name,
+                                                       argument_list, depth)
+            function_declaration.update_depth(depth)
+            self.add_declaration(function_declaration)
+            return True
+        if self.lexer.peek_text() == '{' and \
+                self.current_node == self.root_node:
+            self.read_function_definition(return_type, name, argument_list,
+                                          depth)
+            return True
+        return False
+
+    def read_parameter_list(self, depth):
+        """Read the parameters of a function, between parentheses.
 
         Args:
-            right_hand_value (str): the string representation
-            depth (int): depth in the tree
+            depth (int): the depth in the tree of the function declaration
 
         Returns:
-            Expression: the expression if correctly parsed else None
+            list: the arguments if parsed else None
         """
-        if not right_hand_value:
-            expression = None
-        else:
-            initializer_type = self.get_type_of_expression(right_hand_value)
-
-            arithmetic_exp = self._extract_arithmetic_expression(
-                right_hand_value, depth)
-            logical_exp = self._extract_logical_expression(right_hand_value,
-                                                           depth)
-            bitwise_exp = self._extract_bitwise_expression(right_hand_value,
-                                                           depth)
-            compare_exp = self._extract_compare_expression(right_hand_value,
-                                                           depth)
-
-            if arithmetic_exp:
-                expression = arithmetic_exp
-            elif logical_exp:
-                expression = logical_exp
-            elif self.get_variable_definition_from_id(right_hand_value):
-                expression = VariableReference(depth, right_hand_value.strip())
-                expression.parent_node = self.current_node
-            elif bitwise_exp:
-                expression = bitwise_exp
-            elif compare_exp:
-                expression = compare_exp
+        # skip the opening parenthesis
+        self.lexer.next()
+        argument_list = []
+        if self.lexer.accept(')'):
+            return argument_list
+        while True:
+            token = self.lexer.next()
+            if token is None:
+                return None
+            variable_type = self.get_type_from_name(token.text)
+            if variable_type is None:
+                return None
+            if variable_type.name == 'void' and \
+                    self.lexer.peek_text() == ')':
+                argument = FunctionArgument(None, None, 'void', depth)
             else:
-                function_call = self.parse_function_call(right_hand_value)
-                if function_call:
-                    expression = function_call
-                else:
-                    expression = ConstantExpression(initializer_type,
-                                                    right_hand_value.strip(),
-                                                    depth)
-
-        return expression
-
-    def extract_variable_declaration_from_string(self, statement):
-        list_of_tokens = statement.split()
-        result_list = []
-        is_extern = False
-        if list_of_tokens[0] == 'extern':
-            list_of_tokens.pop(0)
-            # remove the extern keyword from the statement and continue
-            statement = ' '.join(list_of_tokens)
-            is_extern = True
-        variable_type = self.get_type_from_name(list_of_tokens[0])
-        if variable_type:
-            declarations = statement.replace(variable_type.name + ' ', '')
-            list_of_declarations = declarations.split(',')
-            for declaration in list_of_declarations:
-                tmp_decl = declaration.split()
-                if len(tmp_decl) > 1:
-                    variable_type_tmp = self.get_type_from_name(tmp_decl[0])
-                    if variable_type_tmp and variable_type_tmp.name != 'void':
-                        variable_type = variable_type_tmp
-                        declaration = ''.join(tmp_decl[1:])
-                if '=' in declaration:
-                    parts = declaration.split('=')
-                    identifier = parts[0]
-                    # comparisons might still have equals signs inside, so
-                    # add them back to the initializer
-                    initializer = '='.join(parts[1:])
-                    # remove all whitespace chars from initializer
-                    initializer = ''.join(initializer.split())
-                else:
-                    identifier = declaration
-                    initializer = None
-                # remove all whitespace chars from identifier
-                identifier = ''.join(identifier.split())
-                if '(' in identifier:
-                    # there cannot be a parenthesis in the variable name,
-                    # this is probably a function
-                    return []
-                depth = self.get_depth_in_tree()
-                if '[' in identifier:
-                    statement = self.parse_array_declaration(depth, identifier,
-                                                             initializer,
-                                                             variable_type)
-                else:
-                    initializer_exp = self.get_right_hand_value(initializer,
-                                                                depth)
-                    statement = VariableDeclaration(variable_type,
-                                                    identifier,
-                                                    initializer_exp,
-                                                    depth,
-                                                    is_extern)
-                result_list.append(statement)
-        return result_list
-
-    def parse_array_declaration(self, depth, identifier, initializer,
-                                variable_type):
-        start_index = identifier.index('[')
-        end_index, _ = \
-            extract_closing_char(list(identifier),
-                                 open_char='[',
-                                 start_index=start_index,
-                                 start_line=0,
-                                 closing_char=']')
-        content = identifier[start_index + 1:end_index]
-        array_size = None
-        array_size_type = None
-        if content != '':
-            array_size = content
-            array_size_type = self.get_type_of_expression(
-                content)
-        initializer_type = self.get_type_of_expression(
-            initializer)
-        name = identifier[:start_index]
-        statement = ArrayDeclaration(variable_type,
-                                     name,
-                                     initializer,
-                                     initializer_type,
-                                     array_size,
-                                     array_size_type,
-                                     depth)
-        return statement
-
-    def read_variable(self, statements):
-        line_number, statement = self.join_lines_until_next_semicolon(
-            statements)
-        if line_number == -1:
-            return line_number
-        result_list = self.extract_variable_declaration_from_string(statement)
-        if not result_list:
-            # no variables in the statement
-            return -1
-        for stat in result_list:
-            self.current_node.add_statement(stat)
-        return line_number
+                token = self.lexer.next()
+                if token is None or \
+                        token.token_type != PPTokenType.identifier:
+                    return None
+                argument = VariableDeclaration(variable_type, token.text,
+                                               None, depth)
+            argument_list.append(argument)
+            if self.lexer.accept(')'):
+                return argument_list
+            if not self.lexer.accept(','):
+                return None
 
     def is_function_declared(self, function_name):
         """Check if the name corresponds to a known function.
@@ -550,151 +433,98 @@ class Ast:
                 declared function that corresponds to the function_name or None
                 if not found
         """
-        for function_declaration in self.declared_functions:
-            if function_declaration.name == function_name:
-                return function_declaration
+        symbol = self.symbol_table.lookup(function_name)
+        if isinstance(symbol, FunctionDeclaration):
+            return symbol
         return None
 
-    def parse_function_definition_statement(self, function_declaration,
-                                            statements):
-        depth = self.get_depth_in_tree()
+    def read_function_definition(self, return_type, name, argument_list,
+                                 depth):
+        """Read the body of a function definition.
+
+        Args:
+            return_type (VariableType): the return type of the function
+            name (str): the name of the function
+            argument_list (list): the arguments of the definition
+            depth (int): the depth in the tree
+        """
+        function_declaration = FunctionDeclaration(return_type, name,
+                                                   argument_list, depth + 1)
+        function_declaration.update_depth(depth + 1)
+        declared_function = self.is_function_declared(name)
+        if declared_function:
+            self.does_definition_and_declaration_match(function_declaration,
+                                                       declared_function)
+        else:
+            # the definition also declares the function
+            self.symbol_table.add_symbol(name, function_declaration)
+
         function_definition = FunctionDefinition(depth)
         self.current_node.add_statement(function_definition)
-        self.current_node = function_definition
-        decl = copy.deepcopy(function_declaration)
-        decl.update_depth(depth + 1)
-        self.current_node.add_statement(decl)
-
-        line_number = self.parse_line(statements)
-        if line_number == -1:
-            message = 'could not find the definition of function %s' % \
-                      function_declaration.name
-            self.ast_error(message)
-        else:
-            # the function definition is complete go back up to its parent
-            self.current_node = function_definition.parent_node
-        return line_number
-
-    def read_compound_statement(self, code_list):
-        line_number = -1
-        list_to_process = code_list
-        open_char = '{'
-        start_line = 0
-        start_index = 0
-        closing_char = '}'
-
-        text = ''.join(code_list).lstrip()
-        if len(text) > 0 and text[0] != open_char:
-            return line_number
-
-        returned_line, returned_index = \
-            extract_closing_char(list_to_process, open_char, start_line,
-                                 start_index, closing_char)
-        if returned_line != -1 and returned_index != -1:
-
-            depth = self.get_depth_in_tree()
-            compound_statement = CompoundStatement(depth)
-            self.current_node.add_statement(compound_statement)
-            self.current_node = compound_statement
-            next_statements = code_list[start_line + 1:returned_line]
-            while len(next_statements) > 0:
-                new_index = self.parse_line(next_statements)
-                next_statements = next_statements[new_index + 1:]
-            compound_statement.update_depth(depth)
-            line_number = returned_line
-            self.current_node = compound_statement.parent_node
-
-        return line_number
+        self.enter_node(function_definition)
+        self.current_node.add_statement(function_declaration)
+        # the arguments are only visible inside the function
+        self.symbol_table.enter_scope()
+        for argument in argument_list:
+            if isinstance(argument, VariableDeclaration):
+                self.symbol_table.add_symbol(argument.name, argument)
+        self.read_compound_statement()
+        self.symbol_table.leave_scope()
+        # the function definition is complete go back up to its parent
+        self.leave_node()
+
+    def read_compound_statement(self):
+        """Read the statements between braces.
 
-    @staticmethod
-    def are_arguments_compatible(list_a, list_b):
-
-        compatible = False
-        if len(list_a) != len(list_b):
-            # if the list sizes do no match, it is not compatible
-            return compatible
-        for i in range(len(list_a)):
-            argument_a = list_a[i]
-            argument_b = list_b[i]
-            if not argument_a.is_compatible_to(argument_b):
-                # argument_a is not compatible to argument_b
-                return compatible
-        # all checks passed, the lists are compatible
-        compatible = True
-        return compatible
+        Returns:
+            bool: True, a missing closing brace is reported
+        """
+        # skip the opening brace
+        self.lexer.next()
+        depth = self.get_depth_in_tree()
+        compound_statement = CompoundStatement(depth)
+        self.current_node.add_statement(compound_statement)
+        self.enter_node(compound_statement)
+        self.symbol_table.enter_scope()
+        while not self.lexer.accept('}'):
+            if self.lexer.is_at_end():
+                self.ast_error('expected \'}\' at the end of the input')
+                break
+            self.read_statement()
+        self.symbol_table.leave_scope()
+        self.leave_node()
+        return True
 
     def get_variable_definition_from_id(self, name_id):
-        node = self.current_node
-        while node:
-            for statement in node.statement_sequence:
-                if isinstance(statement, VariableDeclaration):
-                    if statement.name == name_id.strip():
-                        # found it
-                        return statement
-                elif isinstance(statement, FunctionDeclaration):
-                    for argument in statement.argument_list:
-                        if isinstance(argument, FunctionArgument) and \
-                                argument.identifier == name_id.strip():
-                            return argument
-                        elif isinstance(argument, VariableDeclaration) and \
-                                argument.name == name_id.strip():
-                            return statement
-
-            node = node.parent_node
-        # no match found
+        """Find the declaration of a variable that is visible here.
+
+        Args:
+            name_id (str): the name of the variable
+
+        Returns:
+            VariableDeclaration: the declaration of the variable or None if
+                not found
+        """
+        symbol = self.symbol_table.lookup(name_id.strip())
+        if isinstance(symbol, VariableDeclaration):
+            return symbol
         return None
 
-    def get_variables_from_ids(self, argument_string):
-        arg_list = argument_string.split(',')
-        variable_list = []
-        for arg in arg_list:
-            var_def = self.get_variable_definition_from_id(arg)
-            if var_def:
-                variable_list.append(var_def)
-        return variable_list
-
-    def parse_function_call(self, expression):
-        function_call = None
-        part = expression.split('(')[0].lstrip().rstrip()
-        function_declaration = self.is_function_declared(part)
-        if function_declaration:
-            function_name = part
-            start_index = expression.index('(')
-            arguments = extract_text_for_enclosed_parenthesis(expression,
-                                                              start_index)
-            if arguments == '' or arguments.isspace():
-                depth = self.get_depth_in_tree()
-                function_call = FunctionCall(depth, function_name)
-            else:
-                variables = self.get_variables_from_ids(arguments)
-                argument_list = function_declaration.argument_list
-                if self.are_arguments_compatible(variables, argument_list):
-                    expression_list = []
-                    depth = self.get_depth_in_tree() + 1
-                    for variable in variables:
-                        expression = VariableReference(depth,
-                                                       variable.name)
-                        expression_list.append(expression)
-                    function_call = FunctionCall(depth, function_name,
-                                                 expression_list)
-        return function_call
-
-    def read_function_call(self, code_list):
-        line_number, statement = self.join_lines_until_next_semicolon(
-            code_list)
-        if line_number == -1:
-            return line_number
-        if '(' not in statement:
-            # a function call always has an opening and closing bracket
-            return -1
-
-        function_call = self.parse_function_call(statement)
-        if function_call:
-            self.current_node.add_statement(function_call)
-        else:
-            line_number = -1
+    def read_function_call(self):
+        """Read a function call statement.
 
-        return line_number
+        Returns:
+            bool: True if parsed, False if it is not a function call
+        """
+        depth = self.get_depth_in_tree()
+        # the call is a statement, it is printed at the depth of the
+        # statement instead of one level deeper like an expression
+        expression = ExpressionParser(self, self.lexer, depth - 1).parse()
+        if not isinstance(expression, FunctionCall) or \
+                not self.lexer.accept(';'):
+            return False
+        self.current_node.add_statement(expression)
+        return True
 
     @staticmethod
     def check_function_argument(argument_a, argument_b,
@@ -725,405 +555,182 @@ class Ast:
 
         return message
 
-    def does_definition_and_declaration_match(self, statement,
+    def does_definition_and_declaration_match(self, function_definition,
                                               function_declaration):
-        start_index = statement.index('(')
-        arguments = extract_text_for_enclosed_parenthesis(statement,
-                                                          start_index)
-        args = self.extract_variable_declaration_from_string(arguments)
+        """Check the function definition against its declaration.
+
+        Args:
+            function_definition (FunctionDeclaration): the declaration part
+                of the definition
+            function_declaration (FunctionDeclaration): the earlier
+                declaration of the function
+
+        Returns:
+            bool: True if the definition matches the declaration
+        """
+        if function_definition.return_type != \
+                function_declaration.return_type:
+            message = 'the return type of function %s does not match the ' \
+                      'function declaration, got %s, expected %s' % \
+                      (function_declaration.name,
+                       function_definition.return_type.name,
+                       function_declaration.return_type.name)
+            self.ast_error(message)
+            return False
+        args = function_definition.argument_list
         if len(function_declaration.argument_list) != len(args):
             message = 'the number of arguments do not match the ' \
                       'function declaration, got %d, expected %d' % \
                       (len(args),
                        len(function_declaration.argument_list))
             self.ast_error(message)
-            return -1
+            return False
         for i in range(len(args)):
             argument_a = args[i]
             argument_b = function_declaration.argument_list[i]
-            if argument_a.is_compatible_to(argument_b):
+            if isinstance(argument_a, FunctionArgument):
+                compatible = isinstance(argument_b, FunctionArgument)
+            else:
+                compatible = argument_a.is_compatible_to(argument_b)
+            if compatible:
                 message = self.check_function_argument(argument_a, argument_b,
                                                        function_declaration)
                 if message:
                     self.ast_warning(message)
             else:
-                if hasattr(argument_b, 'identifier'):
-                    type_name = argument_b.identifier
-                elif hasattr(argument_b, 'variable_type'):
-                    type_name = argument_b.variable_type
-                else:
-                    type_name = None
                 message = 'the argument type does not match the ' \
                           'expected type, Expected %s, got %s' % (
-                              type_name,
-                              argument_a.variable_type)
+                              self.get_argument_type_name(argument_b),
+                              self.get_argument_type_name(argument_a))
                 self.ast_error(message)
-                return -1
+                return False
 
-        return 0
+        return True
 
-    def read_return_statement(self, code_list):
-        line_number, statement = self.join_lines_until_next_semicolon(
-            code_list)
-        if line_number == -1:
-            return line_number
-        splitted_statement = statement.split()
-        if 'return' == splitted_statement[0]:
-            depth = self.get_depth_in_tree()
-            if len(splitted_statement) == 2:
-                retval = splitted_statement[1]
-                if self.get_variable_definition_from_id(retval):
-                    expression = VariableReference(depth, retval)
-                    return_statement = ReturnStatement(depth, expression)
-                    expression.parent_node = self.current_node
-                    self.current_node.add_statement(return_statement)
-                else:
-                    # probably is a constant expression
-                    func_def = self.current_node.get_function_definition_node()
-                    if func_def:
-                        expression_type = self.get_type_of_expression(retval)
-                        expression_value = retval
-                        depth = self.get_depth_in_tree()
-                        expression = ConstantExpression(expression_type,
-                                                        expression_value,
-                                                        depth)
-                        return_statement = ReturnStatement(depth, expression)
-                        self.current_node.add_statement(return_statement)
-                    else:
-                        message = 'Could not find the function definition ' \
-                                  'of the return statement'
-                        self.ast_error(message)
-                        line_number = -1
-                        return line_number
+    @staticmethod
+    def get_argument_type_name(argument):
+        """Get the name of the type of a function argument.
 
-            else:
-                expression = None
-                return_statement = ReturnStatement(depth, expression)
-                self.current_node.add_statement(return_statement)
-        else:
-            line_number = -1
-        return line_number
-
-    def read_function_definition(self, statements):
-        found = False
-
-        line_number, statement = self.join_lines_until_next_non_empty_line(
-            statements)
-        if line_number == -1:
-            return line_number
-        list_of_tokens = statement.split()
-
-        for token in list_of_tokens:
-            if '(' in token:
-                token = token.split('(')[0]
-            function_declaration = self.is_function_declared(token)
-            if function_declaration:
-                if function_declaration.return_type.name != list_of_tokens[0]:
-                    # if the first part does not match the return type,
-                    # it is not a function definition
-                    return -1
-                result = self. \
-                    does_definition_and_declaration_match(statement,
-                                                          function_declaration)
-                if result == -1:
-                    return -1
-                next_statements = statements[line_number + 1:]
-                line_number += 1
-                line_number += self.parse_function_definition_statement(
-                    function_declaration, next_statements)
-                found = True
-                break
-        if found is False:
-            # this was not a function definition
-            line_number = -1
-        return line_number
-
-    def read_assignment(self, statements):
-        found = False
-
-        line_number, statement = self.join_lines_until_next_non_empty_line(
-            statements)
-        if line_number == -1:
-            return line_number
-        list_of_tokens = statement.split()
-
-        var_to_update = list_of_tokens[0]
-        if len(list_of_tokens) < 2:
-            return -1
-        initializer = ' '.join(list_of_tokens[2:])
-        if list_of_tokens[1] == '=':
-            found = True
-        if '=' in var_to_update:
-            tmp = var_to_update.split('=')
-            var_to_update = tmp[0]
-            initializer = ' '.join(tmp[1:]) + initializer
-            found = True
-
-        if found:
-            depth = self.get_depth_in_tree()
-            # remove all whitespace chars from initializer
-            initializer = ''.join(initializer.split())
-            initializer = initializer.split(';')[0]
-
-            expression = self.get_right_hand_value(initializer, depth)
-            assignment = Assignment(depth, var_to_update, expression)
-            self.current_node.add_statement(assignment)
-
-        if found is False:
-            # this was not an assignment
-            line_number = -1
-        return line_number
-
-    def read_if_statement(self, statements):
-
-        line_number, statement = self.join_lines_until_next_non_empty_line(
-            statements)
-        if line_number == -1:
-            return line_number
-
-        if statement.strip().startswith('if'):
-            depth = self.get_depth_in_tree()
-            start_index = statement.find('if') + len('if')
-            end_line, end_pos = utils.stringListParsing.extract_closing_char(
-                list_to_process=statements,
-                open_char='(',
-                start_line=0,
-                start_index=start_index,
-                closing_char=')')
-            if end_line == 0:
-                condition_str = statement[start_index+1:end_pos]
-            else:
-                condition_str = statement[start_index+1:]
-                condition_str += statements[1:end_line]
-                condition_str += statements[end_line][:end_pos]
-            # the condition is one deeper than the if condition
-            condition = None
-            if_branch = None
-            else_branch = None
-            if_statement = IfStatement(depth, condition,
-                                       if_branch, else_branch)
-            self.current_node.add_statement(if_statement)
-            self.current_node = if_statement
-            condition = self.get_right_hand_value(condition_str, depth)
-            if_statement.condition = condition
-            # found a correct if line
-            line_number += 1 + end_line
-            next_statements = statements[line_number:]
-            processed_lines = self.parse_line(next_statements)
-            if processed_lines == -1:
-                self.ast_error("could not process the if branch %s" %
-                               ''.join(next_statements))
-                return -1
-            if len(if_statement.statement_sequence) != 1:
-                self.ast_error("could not recognise the statements %s" %
-                               ''.join(next_statements))
-                return -1
-            # move the if statement inside the object instead of the list
-            if_statement.if_statement = if_statement.statement_sequence[0]
-            if_statement.statement_sequence.pop()
-
-            next_statements = next_statements[processed_lines + 1:]
-            # update the number of processed lines
-            line_number += processed_lines
-
-            # check if there is an else branch
-            line_number_else, statement = \
-                self.join_lines_until_next_non_empty_line(
-                    next_statements)
-            match_obj = re.match(r"\s+else(\S?)", statement)
-            if match_obj:
-                else_str = match_obj.group(1)
-                next_statements = next_statements[line_number_else + 1:]
-                if else_str:
-                    next_statements.insert(else_str, 0)
-                processed_lines = self.parse_line(next_statements)
-                if processed_lines == -1:
-                    self.ast_error("could not process the else branch %s" %
-                                   ''.join(next_statements))
-                    return -1
-                if len(if_statement.statement_sequence) != 1:
-                    self.ast_error("could not recognise the statements %s" %
-                                   ''.join(next_statements))
-                    return -1
-                # move the else statement inside the object instead of the list
-                if_statement.else_statement = \
-                    if_statement.statement_sequence[0]
-                if_statement.statement_sequence.pop()
-
-                line_number += (line_number_else + 1)
-                line_number += (processed_lines + 1)
-
-            # set the current node back tot he parent of the if statement
-            self.current_node = if_statement.parent_node
+        Args:
+            argument (Union[FunctionArgument, VariableDeclaration]): the
+                argument
 
-        else:
-            # this was not an if statement
-            line_number = -1
-        return line_number
-
-    def read_while_statement(self, statements):
-
-        line_number, statement = self.join_lines_until_next_non_empty_line(
-            statements)
-        if line_number == -1:
-            return line_number
-
-        while_stat = re.match(r"\s+while\((\S+)\)", statement)
-
-        if while_stat:
-            depth = self.get_depth_in_tree()
-            condition_str = while_stat.group(1)
-            # the condition is one deeper than the if condition
-            condition = self.get_right_hand_value(condition_str, depth)
-            body = None
-            while_statement = WhileStatement(depth, condition, body)
-            self.current_node.add_statement(while_statement)
-            self.current_node = while_statement
-            # found a correct condition line
-            line_number += 1
-            next_statements = statements[line_number:]
-            processed_lines = self.parse_line(next_statements)
-            if processed_lines == -1:
-                self.ast_error("could not process the body of the while %s" %
-                               ''.join(next_statements))
-                return -1
-            if len(while_statement.statement_sequence) != 1:
-                self.ast_error("could not recognise the statements %s" %
-                               ''.join(next_statements))
-                return -1
-            # move the body statement inside the object instead of the list
-            while_statement.body_statement = \
-                while_statement.statement_sequence[0]
-            while_statement.statement_sequence.pop()
-
-            # update the number of processed lines
-            line_number += processed_lines
-
-            # set the current node back tot he parent of the while statement
-            self.current_node = while_statement.parent_node
+        Returns:
+            str: the name of the type
+        """
+        if isinstance(argument, FunctionArgument):
+            return argument.identifier
+        return argument.variable_type.name
 
-        else:
-            # this was not a while statement
-            line_number = -1
-        return line_number
-
-    def join_lines_until_next_semicolon(self, statements):
-        line_number, position = self.find_first_semicolon_in_list(statements)
-        if line_number == -1:
-            return line_number, None
-        statement = statements[:line_number]
-        statement.append(statements[line_number][:position])
-        statement = ''.join(statement)
-        return line_number, statement
-
-    def join_lines_until_next_non_empty_line(self, statements):
-        line_number = self.find_first_non_empty_in_list(statements)
-        if line_number == -1:
-            return line_number, None
-        statement = statements[:line_number + 1]
-        statement = ''.join(statement)
-        return line_number, statement
-
-    def read_function_declaration(self, statements):
-        line_number, statement = \
-            self.join_lines_until_next_semicolon(statements)
-        if line_number == -1:
-            return line_number
-        list_of_tokens = statement.split()
-        variable_type = self.get_type_from_name(list_of_tokens[0])
-        if variable_type:
-            return_type = variable_type
-            name_start = statement.index(list_of_tokens[1])
-            if '(' not in statement:
-                # not a function declaration
-                return -1
-            if '{' in statement:
-                # a '{' cannot be part of the function declaration statement
-                return -1
-            arg_list_start = statement.index('(')
-            function_name = statement[name_start: arg_list_start]
-            argument_list = \
-                extract_text_for_enclosed_parenthesis(statement,
-                                                      arg_list_start)
-            list_of_args = argument_list.split(',')
-            function_arguments = []
-            for arg in list_of_args:
-                parts = arg.split()
-                arg_type = parts[0]
-                if arg_type == 'void':
-                    depth = self.get_depth_in_tree()
-                    arg_name = parts[0]
-                    arg_type = None
-                    function_argument = FunctionArgument(arg_type, None,
-                                                         arg_name, depth)
-                    function_arguments.append(function_argument)
-                else:
-                    res = self.extract_variable_declaration_from_string(arg)
-                    if len(res) == 1:
-                        depth = self.get_depth_in_tree()
-                        variable_declaration = res[0]
-                        variable_declaration.update_depth(depth + 3)
-                        function_arguments.append(variable_declaration)
-
-            depth = self.get_depth_in_tree()
-            function_declaration = \
-                FunctionDeclaration(return_type, function_name,
-                                    function_arguments, depth)
-            self.current_node.add_statement(function_declaration)
-            self.declared_functions.append(function_declaration)
-            function_declaration.update_depth(depth)
-            self.index += 1
-        else:
-            # not a function declaration
-            line_number = -1
-        return line_number
-
-    def read_next_statement(self):
-        lines = self.source_code_list[self.index:]
-        processed_line_count = self.parse_line(lines)
-        if processed_line_count == -1:
-            self.index += 1
-        else:
-            # point to the line after the one(s) processed
-            self.index += processed_line_count + 1
+    def read_return_statement(self):
+        """Read a return statement.
+
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        # skip the return keyword
+        self.lexer.next()
+        depth = self.get_depth_in_tree()
+        expression = None
+        if not self.lexer.accept(';'):
+            expression = self.read_expression(depth, (';',))
+            if expression is None or not self.lexer.accept(';'):
+                return False
+        return_statement = ReturnStatement(depth, expression)
+        self.current_node.add_statement(return_statement)
+        return True
+
+    def read_assignment(self):
+        """Read an assignment to a variable.
+
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        var_to_update = self.lexer.next().text
+        # skip the equals sign
+        self.lexer.next()
+        depth = self.get_depth_in_tree()
+        expression = self.read_expression(depth, (';',))
+        if expression is None or not self.lexer.accept(';'):
+            return False
+        assignment = Assignment(depth, var_to_update, expression)
+        self.current_node.add_statement(assignment)
+        return True
+
+    def read_condition(self):
+        """Read the condition of an if or a while statement.
 
-    def parse_line(self, lines):
-        """Parse the lines of code.
+        Returns:
+            Expression: the condition if parsed else None
+        """
+        # skip the keyword
+        self.lexer.next()
+        if not self.lexer.accept('('):
+            return None
+        depth = self.get_depth_in_tree()
+        condition = self.read_expression(depth, (')',))
+        if condition is None or not self.lexer.accept(')'):
+            return None
+        return condition
+
+    def read_branch(self, statement):
+        """Read the statement that is a branch of a control statement.
 
         Args:
-            lines ([str]): the lines of code
+            statement (Statement): the if or while statement, it is the
+                current node
 
         Returns:
-            int: the number of processed lines or -1 in case of error
+            Statement: the branch, None if it could not be parsed
         """
-        processed_line_count = -1
-
-        # if there is nothing left, consider the line parsed
-        if len(lines) == 1 and not lines[0]:
-            return 1
-
-        list_of_parsing_methods = [
-            self.read_variable,
-            self.read_function_declaration,
-            self.read_function_definition,
-            self.read_compound_statement,
-            self.read_function_call,
-            self.read_return_statement,
-            self.read_assignment,
-            self.read_if_statement,
-            self.read_while_statement,
-        ]
-        for method in list_of_parsing_methods:
-            processed_line_count = method(list(lines))
-            if processed_line_count > -1:
-                # the lines have been parsed correctly
-                return processed_line_count
-
-        message = ''
-        for line in lines:
-            if line != '' and not line.isspace():
-                message += 'following line not recognized:\"%s\"\n' % line
-        return processed_line_count
+        if self.lexer.is_at_end():
+            self.ast_error('expected a statement at the end of the input')
+            return None
+        self.read_statement()
+        # move the statement inside the object instead of the list
+        statements = statement.statement_sequence
+        statement.statement_sequence = []
+        if len(statements) != 1:
+            return None
+        return statements[0]
+
+    def read_if_statement(self):
+        """Read an if statement, with its optional else branch.
+
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        depth = self.get_depth_in_tree()
+        condition = self.read_condition()
+        if condition is None:
+            return False
+        if_statement = IfStatement(depth, condition, None, None)
+        self.current_node.add_statement(if_statement)
+        self.enter_node(if_statement)
+        if_statement.if_statement = self.read_branch(if_statement)
+        if self.lexer.accept('else'):
+            if_statement.else_statement = self.read_branch(if_statement)
+        # set the current node back to the parent of the if statement
+        self.leave_node()
+        return True
+
+    def read_while_statement(self):
+        """Read a while statement.
+
+        Returns:
+            bool: True if parsed, False in case of error
+        """
+        depth = self.get_depth_in_tree()
+        condition = self.read_condition()
+        if condition is None:
+            return False
+        while_statement = WhileStatement(depth, condition, None)
+        self.current_node.add_statement(while_statement)
+        self.enter_node(while_statement)
+        while_statement.body_statement = self.read_branch(while_statement)
+        # set the current node back to the parent of the while statement
+        self.leave_node()
+        return True
 
     def __str__(self):
         string = 'FileAST: \n'
@@ -31,6 +31,8 @@ class AstNode:
         self.statement_sequence = []
         self.parent_node = None
         self._depth = depth
+        # only set on the root node of the tree
+        self.symbol_table = None
 
     def __str__(self):
         string = ''
@@ -66,15 +68,9 @@ class AstNode:
             AstNode: the node to look up if exists
         """
         if self.parent_node is None:
-            for node in self.statement_sequence:
-                try:
-                    if node.name == identifier:
-                        return node
-                except AttributeError:
-                    # not having the attribute, continuing
-                    pass
-            else:
+            if self.symbol_table is None:
                 return None
+            return self.symbol_table.get_global_symbol(identifier)
         else:
             return self.parent_node.get_global_symbol(identifier)
 
@@ -1,5 +1,6 @@
 from pcc.AST.expression import Expression
-from pcc.compiler.assembler import ProcessorRegister
+from pcc.AST.register_stack import create_register_stack
+from pcc.compiler.instruction_buffer import InstructionBuffer
 
 
 class BinaryOperator(Expression):
@@ -19,8 +20,8 @@ class BinaryOperator(Expression):
 
     def __str__(self):
         string = (self._depth + 1) * '  ' + 'BinaryOp: %s\n' % self.operator
-        string += '  ' + '%s\n' % self.operand_1
-        string += '  ' + '%s' % self.operand_2
+        string += '%s\n' % self.operand_1
+        string += '%s' % self.operand_2
         return string
 
     def evaluate(self, source, destination, assembler):
@@ -39,50 +40,83 @@ class BinaryOperator(Expression):
         """
         raise NotImplementedError
 
-    def load_result_to_reg(self, register, assembler):
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator
+        """
+        need_1 = self.operand_1.get_register_need()
+        need_2 = self.operand_2.get_register_need()
+        if need_1 == need_2:
+            return need_1 + 1
+        return max(need_1, need_2)
+
+    def get_clobbered_registers(self, register):
+        """Get the registers the evaluation changes, besides the
+        destination.
+
+        Args:
+            register (ProcessorRegister): the destination register
+
+        Returns:
+            List[ProcessorRegister]: the changed registers
+        """
+        return []
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the expression to the specified register
 
+        The operand that needs the most registers is evaluated first, the
+        other operand is evaluated in a scratch register.
+
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
 
         Returns:
             bytearray: the compiled code to evaluate the expression
             List[RelocationObject]: the required relocation objects
 
         """
-        compiled_code = bytearray()
-        relocation_objects = []
-        if register == ProcessorRegister.single_scalar_0:
-            register_1 = ProcessorRegister.single_scalar_0
-            register_2 = ProcessorRegister.single_scalar_1
-        elif register == ProcessorRegister.double_scalar_0:
-            register_1 = ProcessorRegister.double_scalar_0
-            register_2 = ProcessorRegister.double_scalar_1
+        if register_stack is None:
+            register_stack = create_register_stack(register)
+        instructions = InstructionBuffer(assembler)
+        if self.operand_1.get_register_need() >= \
+                self.operand_2.get_register_need():
+            instructions.append(*self.operand_1.load_result_to_reg(
+                register, assembler, register_stack))
+            source, compiled_code = register_stack.take(register, assembler)
+            instructions.append(compiled_code)
+            instructions.append(*self.operand_2.load_result_to_reg(
+                source, assembler, register_stack))
         else:
-            register_1 = ProcessorRegister.accumulator
-            register_2 = ProcessorRegister.counter
-        value, objects = self.operand_1.load_result_to_reg(register_1,
-                                                           assembler)
-        compiled_code += value
-        relocation_objects += objects
-        value, objects = self.operand_2.load_result_to_reg(register_2,
-                                                           assembler)
-        # update the offsets
-        for obj in objects:
-            additional_offset = len(compiled_code)
-            obj.offset += additional_offset
-            relocation_objects.append(obj)
-        compiled_code += value
-
-        compiled_code += self.evaluate(source=register_2,
-                                       destination=register_1,
-                                       assembler=assembler)
-
-        # the result is in register_1, make sure
-        # that is the specified register
-        if register != register_1:
-            compiled_code += assembler.copy_from_reg_to_reg(register_1,
-                                                            register)
-
-        return compiled_code, relocation_objects
+            source, compiled_code = register_stack.take(register, assembler)
+            instructions.append(compiled_code)
+            # the destination holds no value yet, the second operand can use
+            # it
+            register_stack.release(register)
+            instructions.append(*self.operand_2.load_result_to_reg(
+                source, assembler, register_stack))
+            register_stack.use(register)
+            instructions.append(*self.operand_1.load_result_to_reg(
+                register, assembler, register_stack))
+
+        # save the registers in use that the evaluation changes
+        saved_registers = [
+            clobbered_register
+            for clobbered_register in self.get_clobbered_registers(register)
+            if register_stack.is_used(clobbered_register) and
+            clobbered_register not in (register, source)]
+        for saved_register in saved_registers:
+            instructions.append(assembler.push_to_stack(saved_register))
+        instructions.append(self.evaluate(source=source,
+                                          destination=register,
+                                          assembler=assembler))
+        for saved_register in reversed(saved_registers):
+            instructions.append(assembler.pop_from_stack(saved_register))
+        instructions.append(register_stack.give_back(assembler))
+
+        return instructions.resolve()
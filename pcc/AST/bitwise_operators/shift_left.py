@@ -0,0 +1,60 @@
+from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.register_stack import SCALAR_REGISTERS
+from pcc.compiler.assembler import ShiftMode
+
+
+class ShiftLeft(BinaryOperator):
+    def __init__(self, depth, operand_1, amount):
+        """Create a shift to the left by a constant amount.
+
+        The parser does not create this operator, the constant folding
+        replaces a multiplication by a power of 2 with it.
+
+        Args:
+            depth (int): the depth in the tree
+            operand_1 (Expression): the operand to shift
+            amount (int): the number of bits to shift
+        """
+        super(ShiftLeft, self).__init__(
+            depth, operand_1, ConstantExpression('int', str(amount), depth))
+        self.operator = '<<'
+        self.amount = amount
+
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the shift, the amount is no
+                operand in a register
+        """
+        return self.operand_1.get_register_need()
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
+        """Load the result of the shift to the specified register
+
+        Args:
+            register (ProcessorRegister): the register to load the result
+            assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
+
+        Returns:
+            bytearray: the compiled code to evaluate the expression
+            List[RelocationObject]: the required relocation objects
+
+        """
+        if register in SCALAR_REGISTERS:
+            # a floating point value can not be shifted, multiply it
+            multiplication = Multiplication(
+                self._depth, self.operand_1,
+                ConstantExpression('int', str(1 << self.amount),
+                                   self._depth))
+            return multiplication.load_result_to_reg(register, assembler,
+                                                     register_stack)
+        value, relocation_objects = self.operand_1.load_result_to_reg(
+            register, assembler, register_stack)
+        value += assembler.shift(register, ShiftMode.left_arithmetic,
+                                 self.amount)
+        return value, relocation_objects
@@ -1,5 +1,21 @@
 from pcc.AST.expression import Expression
-from pcc.compiler.assembler import ProcessorRegister
+from pcc.AST.register_stack import SCALAR_REGISTERS
+
+
+def get_character_value(constant):
+    """Get the value of a character constant.
+
+    Args:
+        constant (str): the character constant, with its quotes
+
+    Returns:
+        int: the value of the character
+    """
+    char = constant[1:]
+    char = char[:len(char)-1]
+    if char == '\\n':
+        return ord('\n')
+    return ord(char)
 
 
 class ConstantExpression(Expression):
@@ -13,36 +29,40 @@ class ConstantExpression(Expression):
                  'Constant: %s, %s' % (self.exp_type, self.exp_value)
         return string
 
-    def load_result_to_reg(self, register, assembler):
+    def get_integer_value(self):
+        """Get the value of an integer or a character constant.
+
+        Returns:
+            int: the value, None if the constant is no integer
+        """
+        try:
+            if self.exp_type == 'int':
+                return int(self.exp_value, 0)
+            if self.exp_type == 'char':
+                return get_character_value(self.exp_value)
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the expression to the specified register
 
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, not used
 
         Returns:
             bytearray: the compiled code to evaluate the expression
             List[RelocationObject]: the required relocation objects
         """
-        if register == ProcessorRegister.double_scalar_0 or \
-                register == ProcessorRegister.double_scalar_1:
-            val = float(self.exp_value)
-        elif register == ProcessorRegister.single_scalar_0 or \
-                register == ProcessorRegister.single_scalar_1:
+        if register in SCALAR_REGISTERS:
             val = float(self.exp_value)
-        elif register == ProcessorRegister.accumulator:
-            try:
-                val = int(self.exp_value)
-            except ValueError:
-                char = self.exp_value[1:]
-                char = char[:len(char)-1]
-                if char == '\\n':
-                    val = ord('\n')
-                else:
-                    val = ord(char)
         else:
             # all other types interpreted as int
-            val = int(self.exp_value)
+            val = self.get_integer_value()
+            if val is None:
+                val = int(self.exp_value)
 
         value = assembler.copy_value_to_reg(val, register)
         # no relocation objects
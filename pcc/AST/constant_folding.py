@@ -0,0 +1,408 @@
+import operator
+
+from pcc.AST.arithmetic_operators.addition import Addition
+from pcc.AST.arithmetic_operators.division import Division
+from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.arithmetic_operators.subtraction import Subtraction
+from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.bitwise_operators.bitwise_and import BitwiseAnd
+from pcc.AST.bitwise_operators.bitwise_not import BitwiseNot
+from pcc.AST.bitwise_operators.bitwise_or import BitwiseOr
+from pcc.AST.bitwise_operators.bitwise_xor import BitwiseXor
+from pcc.AST.bitwise_operators.shift_left import ShiftLeft
+from pcc.AST.comparisons.compare_equal import CompareEqual
+from pcc.AST.comparisons.compare_less import CompareLess
+from pcc.AST.comparisons.compare_less_or_equal import CompareLessOrEqual
+from pcc.AST.comparisons.compare_more import CompareMore
+from pcc.AST.comparisons.compare_more_or_equal import CompareMoreOrEqual
+from pcc.AST.comparisons.compare_not_equal import CompareNotEqual
+from pcc.AST.compound_statement import CompoundStatement
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.control_statements.if_statement import IfStatement
+from pcc.AST.control_statements.while_statement import WhileStatement
+from pcc.AST.functions.function_call import FunctionCall
+from pcc.AST.functions.function_definition import FunctionDefinition
+from pcc.AST.logical_operators.logical_and import LogicalAnd
+from pcc.AST.logical_operators.logical_not import LogicalNot
+from pcc.AST.logical_operators.logical_or import LogicalOr
+from pcc.AST.return_statement import ReturnStatement
+from pcc.AST.unary_operator import UnaryOperator
+from pcc.AST.variables.assignment import Assignment
+from pcc.AST.variables.variable_declaration import VariableDeclaration
+
+INT_MIN = -2 ** 31
+# the largest shift that replaces a multiplication by an int constant
+MAX_SHIFT_AMOUNT = 30
+
+
+def to_int(value):
+    """Wrap a value around like the 32 bit int arithmetic of the code.
+
+    Args:
+        value (int): the value
+
+    Returns:
+        int: the value as a signed 32 bit int
+    """
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def divide(dividend, divisor):
+    """Divide like C, rounding toward 0.
+
+    Args:
+        dividend (int): the dividend
+        divisor (int): the divisor
+
+    Returns:
+        int: the quotient, None if the division traps at run time
+    """
+    if divisor == 0 or (dividend == INT_MIN and divisor == -1):
+        return None
+    quotient = abs(dividend) // abs(divisor)
+    if (dividend < 0) != (divisor < 0):
+        return -quotient
+    return quotient
+
+
+# operator class -> the function to evaluate it on constants
+BINARY_OPERATIONS = {
+    Addition: operator.add,
+    Subtraction: operator.sub,
+    Multiplication: operator.mul,
+    Division: divide,
+    BitwiseAnd: operator.and_,
+    BitwiseOr: operator.or_,
+    BitwiseXor: operator.xor,
+    CompareEqual: lambda a, b: int(a == b),
+    CompareNotEqual: lambda a, b: int(a != b),
+    CompareLess: lambda a, b: int(a < b),
+    CompareLessOrEqual: lambda a, b: int(a <= b),
+    CompareMore: lambda a, b: int(a > b),
+    CompareMoreOrEqual: lambda a, b: int(a >= b),
+    LogicalAnd: lambda a, b: int(bool(a) and bool(b)),
+    LogicalOr: lambda a, b: int(bool(a) or bool(b)),
+}
+
+UNARY_OPERATIONS = {
+    BitwiseNot: operator.invert,
+    LogicalNot: lambda a: int(not a),
+}
+
+
+def get_integer_value(expression):
+    """Get the value of an expression if it is an integer constant.
+
+    Args:
+        expression (Expression): the expression
+
+    Returns:
+        int: the value, None if the expression is no integer constant
+    """
+    if isinstance(expression, ConstantExpression):
+        return expression.get_integer_value()
+    return None
+
+
+def get_power_of_two(value):
+    """Get the exponent of a power of 2.
+
+    Args:
+        value (int): the value
+
+    Returns:
+        int: the exponent, None if the value is no power of 2 above 1 that
+            fits in an int
+    """
+    if value is None or value < 2 or value & (value - 1):
+        return None
+    exponent = value.bit_length() - 1
+    if exponent > MAX_SHIFT_AMOUNT:
+        return None
+    return exponent
+
+
+def create_constant(value, expression):
+    """Create an integer constant to replace an expression.
+
+    Args:
+        value (int): the value of the constant
+        expression (Expression): the replaced expression
+
+    Returns:
+        ConstantExpression: the constant
+    """
+    constant = ConstantExpression('int', str(to_int(value)),
+                                  expression._depth)
+    constant.parent_node = expression.parent_node
+    return constant
+
+
+def simplify_binary_operator(expression):
+    """Apply the algebraic identities to an operator with a constant operand.
+
+    Args:
+        expression (BinaryOperator): the operator, with folded operands
+
+    Returns:
+        Expression: the simplified expression, the operator itself if no
+            identity applies
+    """
+    value_1 = get_integer_value(expression.operand_1)
+    value_2 = get_integer_value(expression.operand_2)
+    operator_type = type(expression)
+    if operator_type in (Addition, BitwiseOr, BitwiseXor):
+        # x + 0, 0 + x
+        if value_2 == 0:
+            return expression.operand_1
+        if value_1 == 0:
+            return expression.operand_2
+    elif operator_type == Subtraction:
+        if value_2 == 0:
+            return expression.operand_1
+    elif operator_type == Multiplication:
+        # x * 1, 1 * x, x * 2^k, 2^k * x
+        if value_2 == 1:
+            return expression.operand_1
+        if value_1 == 1:
+            return expression.operand_2
+        for operand, value in [(expression.operand_1, value_2),
+                               (expression.operand_2, value_1)]:
+            amount = get_power_of_two(value)
+            if amount is not None:
+                shift = ShiftLeft(expression._depth, operand, amount)
+                shift.parent_node = expression.parent_node
+                return shift
+    elif operator_type == Division:
+        if value_2 == 1:
+            return expression.operand_1
+    elif operator_type == LogicalAnd:
+        # the second operand is not evaluated
+        if value_1 == 0:
+            return create_constant(0, expression)
+    elif operator_type == LogicalOr:
+        if value_1 is not None and value_1 != 0:
+            return create_constant(1, expression)
+    return expression
+
+
+def fold_expression(expression):
+    """Fold the constant parts of an expression.
+
+    Args:
+        expression (Expression): the expression
+
+    Returns:
+        Expression: the folded expression
+    """
+    if isinstance(expression, BinaryOperator):
+        expression.operand_1 = fold_expression(expression.operand_1)
+        expression.operand_2 = fold_expression(expression.operand_2)
+        operation = BINARY_OPERATIONS.get(type(expression))
+        value_1 = get_integer_value(expression.operand_1)
+        value_2 = get_integer_value(expression.operand_2)
+        if operation and value_1 is not None and value_2 is not None:
+            value = operation(value_1, value_2)
+            if value is not None:
+                return create_constant(value, expression)
+        return simplify_binary_operator(expression)
+    if isinstance(expression, UnaryOperator):
+        expression.operand = fold_expression(expression.operand)
+        operation = UNARY_OPERATIONS.get(type(expression))
+        value = get_integer_value(expression.operand)
+        if operation and value is not None:
+            return create_constant(operation(value), expression)
+        return expression
+    if isinstance(expression, FunctionCall):
+        fold_function_call(expression)
+    return expression
+
+
+def fold_function_call(function_call):
+    """Fold the arguments of a function call.
+
+    Args:
+        function_call (FunctionCall): the function call
+
+    Returns:
+        FunctionCall: the function call
+    """
+    function_call.expression_list = [
+        fold_expression(expression)
+        for expression in function_call.expression_list]
+    function_call.update_parent()
+    return function_call
+
+
+def fold_sequence(node):
+    """Fold the statements of a node, dropping the ones that are removed.
+
+    Args:
+        node (AstNode): the node with a statement sequence
+    """
+    statement_sequence = []
+    for statement in node.statement_sequence:
+        statement = fold_statement(statement)
+        if statement is not None:
+            statement.parent_node = node
+            statement_sequence.append(statement)
+    node.statement_sequence = statement_sequence
+
+
+def fold_body(statement, body):
+    """Fold the body of a control statement.
+
+    Args:
+        statement (Statement): the control statement
+        body (Statement): the body
+
+    Returns:
+        Statement: the folded body, an empty compound statement if the body
+            is removed
+    """
+    folded_body = fold_statement(body)
+    if folded_body is None:
+        folded_body = CompoundStatement(body._depth)
+    folded_body.parent_node = statement
+    return folded_body
+
+
+def fold_compound_statement(statement):
+    """Fold the statements of a compound statement.
+
+    Args:
+        statement (CompoundStatement): the statement
+
+    Returns:
+        Statement: the statement
+    """
+    fold_sequence(statement)
+    return statement
+
+
+def fold_if_statement(statement):
+    """Fold an if statement, keeping only the branch that is taken
+    if the condition is constant.
+
+    Args:
+        statement (IfStatement): the statement
+
+    Returns:
+        Statement: the statement, None if it is removed
+    """
+    statement.condition = fold_expression(statement.condition)
+    condition = get_integer_value(statement.condition)
+    if condition is not None:
+        # only the branch that is taken is left
+        branch = statement.if_statement if condition else \
+            statement.else_statement
+        if branch is None:
+            return None
+        return fold_statement(branch)
+    statement.if_statement = fold_body(statement, statement.if_statement)
+    if statement.else_statement:
+        statement.else_statement = fold_body(statement,
+                                             statement.else_statement)
+    return statement
+
+
+def fold_while_statement(statement):
+    """Fold a while statement, removing it if the condition is
+    always false.
+
+    Args:
+        statement (WhileStatement): the statement
+
+    Returns:
+        Statement: the statement, None if it is removed
+    """
+    statement.condition = fold_expression(statement.condition)
+    if get_integer_value(statement.condition) == 0:
+        # the body is never executed
+        return None
+    statement.body_statement = fold_body(statement, statement.body_statement)
+    return statement
+
+
+def fold_return_statement(statement):
+    """Fold the expression of a return statement.
+
+    Args:
+        statement (ReturnStatement): the statement
+
+    Returns:
+        Statement: the statement
+    """
+    if statement.expression:
+        statement.expression = fold_expression(statement.expression)
+    return statement
+
+
+def fold_assignment(statement):
+    """Fold the right hand value of an assignment.
+
+    Args:
+        statement (Assignment): the statement
+
+    Returns:
+        Statement: the statement
+    """
+    statement.initializer_exp = fold_expression(statement.initializer_exp)
+    statement.initializer_exp.parent_node = statement
+    return statement
+
+
+def fold_variable_declaration(statement):
+    """Fold the initializer of a variable declaration.
+
+    Args:
+        statement (VariableDeclaration): the statement
+
+    Returns:
+        Statement: the statement
+    """
+    if statement.initializer:
+        statement.initializer = fold_expression(statement.initializer)
+    return statement
+
+
+# statement class -> the function to fold the statement
+STATEMENT_FOLDS = {
+    CompoundStatement: fold_compound_statement,
+    FunctionDefinition: fold_compound_statement,
+    IfStatement: fold_if_statement,
+    WhileStatement: fold_while_statement,
+    ReturnStatement: fold_return_statement,
+    Assignment: fold_assignment,
+    VariableDeclaration: fold_variable_declaration,
+    FunctionCall: fold_function_call,
+}
+
+
+def fold_statement(statement):
+    """Fold the constant expressions of a statement.
+
+    Args:
+        statement (Statement): the statement
+
+    Returns:
+        Statement: the folded statement, None if it is removed
+    """
+    fold = STATEMENT_FOLDS.get(type(statement))
+    if fold is None:
+        return statement
+    return fold(statement)
+
+
+def fold_constants(root_node):
+    """Fold the constant expressions of the whole tree.
+
+    Constant sub expressions are computed at compile time, the operators
+    with a neutral operand are removed, a multiplication by a power of 2
+    becomes a shift and the branches of if and while statements that can
+    not be taken are removed.
+
+    Args:
+        root_node (AstNode): the root node of the ast
+    """
+    fold_sequence(root_node)
@@ -1,6 +1,7 @@
 from pcc.AST.compiled_object import CompiledObjectType, CompiledObject
 from pcc.AST.statement import Statement
 from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.instruction_buffer import InstructionBuffer
 
 
 class IfStatement(Statement):
@@ -38,48 +39,39 @@ class IfStatement(Statement):
         Returns:
             CompiledObject: the compiled version of this statement
         """
-        value = bytearray()
-
-        if_part = self.if_statement.compile(assembler)
+        instructions = InstructionBuffer(assembler)
+        else_label = instructions.create_label('else')
+        end_label = instructions.create_label('end if')
 
         # compare the value from the condition, to 0. If not equal,
         # go to the if part, else to the else part if present.
         condition_reg = ProcessorRegister.accumulator
         condition_code, relocation_objects = \
             self.condition.load_result_to_reg(condition_reg, assembler)
-        value += condition_code
+        instructions.append(condition_code, relocation_objects)
 
         compare_register = ProcessorRegister.counter
         value_to_load = 0
-        value += assembler.copy_value_to_reg(value_to_load, compare_register)
-
-        value += assembler.cmp(condition_reg, compare_register)
+        instructions.append(assembler.copy_value_to_reg(value_to_load,
+                                                        compare_register))
+        instructions.append(assembler.cmp(condition_reg, compare_register))
+        instructions.je(else_label)
 
-        jump_distance = len(if_part.value)
+        if_part = self.if_statement.compile(assembler)
+        instructions.append(if_part.value, if_part.relocation_objects)
         if self.else_statement:
-            else_part = self.else_statement.compile(assembler)
-            jump_distance_else = len(else_part.value)
-            # if there if an else part, the last instruction of the if part
-            # is the jump over the else part.
-            jump_distance += len(assembler.jmp(jump_distance_else))
-
-        value += assembler.je(jump_distance)
-        for relocation_object in if_part.relocation_objects:
-            additional_offset = len(value)
-            relocation_object.offset += additional_offset
-            relocation_objects.append(relocation_object)
-        value += if_part.value
+            # the last instruction of the if part is the jump over the else
+            # part
+            instructions.jmp(end_label)
+        instructions.place_label(else_label)
 
         if self.else_statement:
-            # jump over the else part (for the if part)
-            value += assembler.jmp(jump_distance_else)
-            for relocation_object in else_part.relocation_objects:
-                additional_offset = len(value)
-                relocation_object.offset += additional_offset
-                relocation_objects.append(relocation_object)
-            # the actual else part
-            value += else_part.value
+            else_part = self.else_statement.compile(assembler)
+            instructions.append(else_part.value,
+                                else_part.relocation_objects)
+        instructions.place_label(end_label)
 
+        value, relocation_objects = instructions.resolve()
         size = len(value)
         compiled_object = CompiledObject('if', size,
                                          value, CompiledObjectType.code,
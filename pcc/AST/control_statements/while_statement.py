@@ -1,6 +1,7 @@
 from pcc.AST.compiled_object import CompiledObjectType, CompiledObject
 from pcc.AST.statement import Statement
 from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.instruction_buffer import InstructionBuffer
 
 
 class WhileStatement(Statement):
@@ -17,6 +18,9 @@ class WhileStatement(Statement):
         super(WhileStatement, self).__init__(depth)
         self.condition = condition
         self.body_statement = body_statement
+        # True to test the condition after the body, set by the loop
+        # optimization
+        self.is_rotated = False
 
     def __str__(self):
         string = self._depth * '  ' + 'While: \n'
@@ -33,42 +37,67 @@ class WhileStatement(Statement):
         Returns:
             CompiledObject: the compiled version of this statement
         """
-        value = bytearray()
+        instructions = InstructionBuffer(assembler)
+        if self.is_rotated:
+            self.compile_rotated(instructions, assembler)
+        else:
+            condition_label = instructions.create_label('while condition')
+            end_label = instructions.create_label('end while')
+
+            # compare the value from the condition to 0, if equal jump over
+            # the body
+            instructions.place_label(condition_label)
+            self.compile_condition(instructions, assembler)
+            instructions.je(end_label)
+
+            body_part = self.body_statement.compile(assembler)
+            instructions.append(body_part.value,
+                                body_part.relocation_objects)
+            # evaluate the condition again after the body
+            instructions.jmp(condition_label)
+            instructions.place_label(end_label)
+
+        value, relocation_objects = instructions.resolve()
+        size = len(value)
+        compiled_object = CompiledObject('if', size,
+                                         value, CompiledObjectType.code,
+                                         relocation_objects)
+        return compiled_object
 
-        body_part = self.body_statement.compile(assembler)
+    def compile_condition(self, instructions, assembler):
+        """Compile the compare of the condition to 0.
 
-        # compare the value from the condition, to 0. If not equal,
-        # go to the if part, else to the else part if present.
+        Args:
+            instructions (InstructionBuffer): the buffer to add the code to
+            assembler (Assembler): the assembler to use
+        """
         condition_reg = ProcessorRegister.accumulator
         condition_code, relocation_objects = \
             self.condition.load_result_to_reg(condition_reg, assembler)
-        value += condition_code
+        instructions.append(condition_code, relocation_objects)
+        instructions.append(assembler.cmp_against_const(condition_reg,
+                                                        const=0))
 
-        body_len = len(body_part.value)
+    def compile_rotated(self, instructions, assembler):
+        """Compile the loop with the condition after the body.
 
-        # the distance over the body is the length of the body as well as the
-        # jump back at the end. Just encode a random length to calc this length
-        jump_over_body = body_len + len(assembler.jmp(body_len))
+        The first iteration jumps to the condition, every other one only
+        runs the conditional jump back to the body.
 
-        value += assembler.cmp_against_const(condition_reg, const=0)
-        value += assembler.je(jump_over_body)
-
-        len_condition = len(value)
-
-        value += body_part.value
-        # the distance to jump back, is the relative distance after the jump
-        # instruction. So the complete distance is the length of the body,
-        # the length of the condition and this jump (use the length of a
-        # random jump to know the length)
-        jump_back_dist = -len_condition - body_len - \
-            len(assembler.jmp(0))
-        value += assembler.jmp(jump_back_dist)
+        Args:
+            instructions (InstructionBuffer): the buffer to add the code to
+            assembler (Assembler): the assembler to use
+        """
+        body_label = instructions.create_label('while body')
+        condition_label = instructions.create_label('while condition')
 
-        size = len(value)
-        compiled_object = CompiledObject('if', size,
-                                         value, CompiledObjectType.code,
-                                         relocation_objects)
-        return compiled_object
+        instructions.jmp(condition_label)
+        instructions.place_label(body_label)
+        body_part = self.body_statement.compile(assembler)
+        instructions.append(body_part.value, body_part.relocation_objects)
+        instructions.place_label(condition_label)
+        self.compile_condition(instructions, assembler)
+        instructions.jne(body_label)
 
     def get_stack_variable(self, variable_name):
         """Get the stack variable by name.
@@ -80,3 +109,11 @@ class WhileStatement(Statement):
             StackVariable: the stack variable if found, else None
         """
         return self.parent_node.get_stack_variable(variable_name)
+
+    def add_stack_variable(self, current_list):
+        """Add all stack variable to the list
+
+        Args:
+            current_list(list[StackVariable]): the current list
+        """
+        self.body_statement.add_stack_variable(current_list)
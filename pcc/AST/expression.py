@@ -9,12 +9,25 @@ class Expression(AstNode):
         string = self._depth * '  ' + 'This is an expression\n'
         return string
 
-    def load_result_to_reg(self, register, assembler):
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        This is the Sethi-Ullman number of the expression, an operand that
+        needs more registers is evaluated first.
+
+        Returns:
+            int: the number of registers
+        """
+        return 1
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the expression to the specified register
 
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
 
         Returns:
             bytearray: the compiled code to evaluate the expression # noqa I202
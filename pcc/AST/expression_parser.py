@@ -0,0 +1,273 @@
+from pcc.AST.arithmetic_operators.addition import Addition
+from pcc.AST.arithmetic_operators.division import Division
+from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.arithmetic_operators.subtraction import Subtraction
+from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.bitwise_operators.bitwise_and import BitwiseAnd
+from pcc.AST.bitwise_operators.bitwise_not import BitwiseNot
+from pcc.AST.bitwise_operators.bitwise_or import BitwiseOr
+from pcc.AST.bitwise_operators.bitwise_xor import BitwiseXor
+from pcc.AST.comparisons.compare_equal import CompareEqual
+from pcc.AST.comparisons.compare_less import CompareLess
+from pcc.AST.comparisons.compare_less_or_equal import CompareLessOrEqual
+from pcc.AST.comparisons.compare_more import CompareMore
+from pcc.AST.comparisons.compare_more_or_equal import CompareMoreOrEqual
+from pcc.AST.comparisons.compare_not_equal import CompareNotEqual
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.functions.function_call import FunctionCall
+from pcc.AST.logical_operators.logical_and import LogicalAnd
+from pcc.AST.logical_operators.logical_not import LogicalNot
+from pcc.AST.logical_operators.logical_or import LogicalOr
+from pcc.AST.unary_operator import UnaryOperator
+from pcc.AST.variables.variable_reference import VariableReference
+from pcc.preprocessor.tokenizer import PPTokenType
+
+# K&R A 7, the binding power of the binary operators, a higher binding
+# power binds tighter, all of them are left associative
+BINARY_OPERATORS = {
+    '||': (1, LogicalOr),
+    '&&': (2, LogicalAnd),
+    '|': (3, BitwiseOr),
+    '^': (4, BitwiseXor),
+    '&': (5, BitwiseAnd),
+    '==': (6, CompareEqual),
+    '!=': (6, CompareNotEqual),
+    '<': (7, CompareLess),
+    '>': (7, CompareMore),
+    '<=': (7, CompareLessOrEqual),
+    '>=': (7, CompareMoreOrEqual),
+    '+': (8, Addition),
+    '-': (8, Subtraction),
+    '*': (9, Multiplication),
+    '/': (9, Division),
+}
+
+UNARY_OPERATORS = {
+    '!': LogicalNot,
+    '~': BitwiseNot,
+}
+
+CONSTANT_TOKEN_TYPES = (PPTokenType.number,
+                        PPTokenType.character_constant,
+                        PPTokenType.string_literal)
+
+
+class ExpressionParser:
+
+    def __init__(self, ast, lexer, depth):
+        """Create a precedence climbing parser for expressions.
+
+        Args:
+            ast (pcc.AST.ast.Ast): the tree the expression is part of, used
+                to look up the variables and the functions
+            lexer (pcc.AST.lexer.Lexer): the tokens to parse
+            depth (int): the depth in the tree of the expression
+        """
+        self.ast = ast
+        self.lexer = lexer
+        self.depth = depth
+
+    def parse(self):
+        """Parse the expression at the current token.
+
+        Returns:
+            Expression: the expression if parsed else None
+        """
+        expression = self.parse_expression()
+        if expression is not None:
+            update_expression_depth(expression, self.depth)
+        return expression
+
+    def parse_expression(self, minimum_binding_power=0):
+        """Parse an expression, up to the first operator that binds weaker.
+
+        Args:
+            minimum_binding_power (int): the binding power of the operator
+                on the left of the expression
+
+        Returns:
+            Expression: the expression if parsed else None
+        """
+        expression = self.parse_unary_expression()
+        while expression is not None:
+            token = self.lexer.peek()
+            if token is None or \
+                    token.token_type != PPTokenType.punctuator or \
+                    token.text not in BINARY_OPERATORS:
+                break
+            binding_power, operator_class = BINARY_OPERATORS[token.text]
+            if binding_power <= minimum_binding_power:
+                break
+            self.lexer.next()
+            operand_2 = self.parse_expression(binding_power)
+            if operand_2 is None:
+                return None
+            expression = operator_class(self.depth, expression, operand_2)
+        return expression
+
+    def parse_unary_expression(self):
+        """Parse a primary expression with its prefix operators.
+
+        Returns:
+            Expression: the expression if parsed else None
+        """
+        token = self.lexer.peek()
+        if token is None:
+            return None
+        if token.text in UNARY_OPERATORS:
+            self.lexer.next()
+            operand = self.parse_unary_expression()
+            if operand is None:
+                return None
+            return UNARY_OPERATORS[token.text](self.depth, operand)
+        if token.text in ('-', '+'):
+            # only a signed number is supported, it is part of the constant
+            next_token = self.lexer.peek(1)
+            if next_token is None or \
+                    next_token.token_type != PPTokenType.number:
+                return None
+            self.lexer.next()
+            self.lexer.next()
+            value = next_token.text
+            if token.text == '-':
+                value = '-' + value
+            return self.create_constant(value)
+        return self.parse_primary_expression()
+
+    def parse_primary_expression(self):
+        """Parse a constant, an identifier, a function call or an expression
+        between parentheses.
+
+        Returns:
+            Expression: the expression if parsed else None
+        """
+        token = self.lexer.next()
+        if token is None:
+            return None
+        if token.token_type in CONSTANT_TOKEN_TYPES:
+            return self.create_constant(token.text)
+        if token.token_type == PPTokenType.identifier:
+            if self.lexer.peek_text() == '(':
+                return self.parse_function_call(token.text)
+            if self.ast.get_variable_definition_from_id(token.text):
+                expression = VariableReference(self.depth, token.text)
+                expression.parent_node = self.ast.current_node
+                return expression
+            # an unknown identifier is kept as is
+            return self.create_constant(token.text)
+        if token.is_punctuator('('):
+            expression = self.parse_expression()
+            if expression is None or not self.lexer.accept(')'):
+                return None
+            return expression
+        return None
+
+    def parse_function_call(self, function_name):
+        """Parse the arguments of a call to a declared function.
+
+        Args:
+            function_name (str): the name of the called function, the
+                lexer is at the opening parenthesis
+
+        Returns:
+            FunctionCall: the function call if parsed else None
+        """
+        function_declaration = self.ast.is_function_declared(function_name)
+        if function_declaration is None:
+            return None
+        self.lexer.next()
+        expression_list = []
+        if self.lexer.accept(')'):
+            return self.create_function_call(function_name, expression_list)
+
+        while True:
+            argument = self.parse_expression()
+            if argument is None:
+                return None
+            expression_list.append(argument)
+            if self.lexer.accept(')'):
+                break
+            if not self.lexer.accept(','):
+                return None
+
+        if not self.are_arguments_compatible(
+                expression_list, function_declaration.argument_list):
+            return None
+        return self.create_function_call(function_name, expression_list)
+
+    def create_function_call(self, function_name, expression_list):
+        """Create a function call.
+
+        Args:
+            function_name (str): the name of the called function
+            expression_list (List[Expression]): the arguments
+
+        Returns:
+            FunctionCall: the function call, in the current node until it
+                is added to a statement
+        """
+        function_call = FunctionCall(self.depth, function_name,
+                                     expression_list)
+        function_call.parent_node = self.ast.current_node
+        return function_call
+
+    def are_arguments_compatible(self, expression_list, argument_list):
+        """Check the arguments of a call against the function declaration.
+
+        Only the variables passed as argument can be checked, the type of
+        the other expressions is not known yet.
+
+        Args:
+            expression_list (List[Expression]): the arguments of the call
+            argument_list (list): the arguments of the declaration
+
+        Returns:
+            bool: True if the call matches the declaration
+        """
+        if len(expression_list) != len(argument_list):
+            return False
+        for expression, argument in zip(expression_list, argument_list):
+            if isinstance(expression, VariableReference):
+                variable = self.ast.get_variable_definition_from_id(
+                    expression.name)
+                if not variable.is_compatible_to(argument):
+                    return False
+        return True
+
+    def create_constant(self, value):
+        """Create a constant expression.
+
+        Args:
+            value (str): the text of the constant
+
+        Returns:
+            ConstantExpression: the constant
+        """
+        constant_type = self.ast.get_type_of_expression(value)
+        return ConstantExpression(constant_type, value, self.depth)
+
+
+def update_expression_depth(expression, depth):
+    """Set the depth of an expression and of all its operands.
+
+    The depth of an operand is only known once the whole expression is
+    parsed, so it is set afterwards in a single pass over the expression.
+
+    Args:
+        expression (Expression): the expression to update
+        depth (int): the depth in the tree of the expression
+    """
+    if isinstance(expression, BinaryOperator):
+        operands = [expression.operand_1, expression.operand_2]
+    elif isinstance(expression, UnaryOperator):
+        operands = [expression.operand]
+    elif isinstance(expression, FunctionCall):
+        # a function call is printed at its own depth, unlike the other
+        # expressions which are printed one level deeper
+        depth += 1
+        operands = expression.expression_list
+    else:
+        operands = []
+    expression.update_depth(depth)
+    for operand in operands:
+        update_expression_depth(operand, depth + 1)
@@ -1,7 +1,9 @@
 from pcc.AST.compiled_object import CompiledObjectType, CompiledObject
 from pcc.AST.expression import Expression
+from pcc.AST.register_stack import INTEGER_REGISTERS, RegisterStack
 from pcc.AST.statement import Statement
 from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.instruction_buffer import InstructionBuffer
 from pcc.compiler.relocation_object import RelocationObject
 
 
@@ -39,47 +41,71 @@ class FunctionCall(Statement, Expression):
         """
         return self.parent_node.get_stack_variable(variable_name)
 
-    def load_result_to_reg(self, register, assembler):
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: more than the scratch registers, a call changes all of
+                them, so it is evaluated before the other operand
+        """
+        return len(INTEGER_REGISTERS) + 1
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the expression to the specified register
 
+        The registers in use are saved on the stack during the call.
+
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None if
+                no register is in use
 
         Returns:
             bytearray: the compiled code to evaluate the expression
             List[RelocationObject]: the required relocation objects
 
         """
-        compiled_object = self.compile(assembler)
-        relocation_objects = compiled_object.relocation_objects
-        value = compiled_object.value
+        saved_registers = []
+        pushed_registers = 0
+        if register_stack is not None:
+            saved_registers = register_stack.get_saved_registers(register)
+            pushed_registers = register_stack.pushed_registers
+        instructions = InstructionBuffer(assembler)
+        for saved_register in saved_registers:
+            instructions.append(assembler.push_to_stack(saved_register))
+        compiled_object = self.compile(
+            assembler, pushed_registers + len(saved_registers))
+        instructions.append(compiled_object.value,
+                            compiled_object.relocation_objects)
         # the result is stored in the accumulator register for a function call
         if ProcessorRegister.accumulator != register:
-            value += assembler.copy_from_reg_to_reg(
+            instructions.append(assembler.copy_from_reg_to_reg(
                 source=ProcessorRegister.accumulator,
-                destination=register)
-        value += assembler.copy_value_to_reg(imm_value=6,
-                                             destination=register)
-        return value, relocation_objects
+                destination=register))
+        for saved_register in reversed(saved_registers):
+            instructions.append(assembler.pop_from_stack(saved_register))
+        return instructions.resolve()
 
     def update_parent(self):
         for expression in self.expression_list:
             expression.parent_node = self
 
-    def _copy_argmuments_to_registers(self, assembler):
+    def _copy_argmuments_to_registers(self, assembler, pushed_registers):
         """Copy all the arguments of this function to their registers.
 
         Args:
             assembler (Assembler): the assembler to use
+            pushed_registers (int): the number of registers pushed on the
+                stack since the stack pointer was aligned
 
         Returns:
             bytearray: the compiled machine code
             list[RelocationObject]: the used relocation objects
 
         """
-        compiled_code = bytearray()
-        relocation_objects = []
+        instructions = InstructionBuffer(assembler)
+        register_stack = RegisterStack(INTEGER_REGISTERS, pushed_registers)
         available_integer_registers = [
             ProcessorRegister.integer_argument_0,
             ProcessorRegister.integer_argument_1,
@@ -88,56 +114,54 @@ class FunctionCall(Statement, Expression):
             ProcessorRegister.integer_argument_4,
             ProcessorRegister.integer_argument_5]
         for expression in self.expression_list:
+            # the arguments that are loaded already are in use
             register = available_integer_registers.pop(0)
-            tmp_reg = ProcessorRegister.accumulator
-            if tmp_reg == register:
-                tmp_reg = ProcessorRegister.counter
-            compiled, rela_objs = \
-                expression.load_result_to_reg(assembler=assembler,
-                                              register=tmp_reg)
-            # update the offsets
-            for obj in rela_objs:
-                additional_offset = len(compiled_code)
-                obj.offset += additional_offset
-                relocation_objects.append(obj)
-            compiled_code += compiled
-            compiled_code += \
-                assembler.copy_from_reg_to_reg(source=tmp_reg,
-                                               destination=register)
-
-        return compiled_code, relocation_objects
-
-    def compile(self, assembler):
+            register_stack.use(register)
+            instructions.append(*expression.load_result_to_reg(
+                register, assembler, register_stack))
+
+        return instructions.resolve()
+
+    def compile(self, assembler, pushed_registers=0):
         """Compile this statement
 
         Args:
             assembler (Assembler): the assembler to use
+            pushed_registers (int): the number of registers pushed on the
+                stack since the stack pointer was aligned
 
         Returns:
             CompiledObject: the compiled version of this statement
         """
-        pass
-        value = bytearray()
-        relocation_objects = []
+        instructions = InstructionBuffer(assembler)
+
+        # the stack pointer has to be aligned to 16 bytes for the call
+        is_aligned = pushed_registers % 2 == 0
+        if not is_aligned:
+            instructions.append(assembler.sub_value_from_reg(
+                8, ProcessorRegister.frame_pointer))
+            pushed_registers += 1
 
         # load all variables in the registers
-        compiled_code, rela_objs = \
-            self._copy_argmuments_to_registers(assembler)
-        relocation_objects += rela_objs
-        value += compiled_code
+        instructions.append(*self._copy_argmuments_to_registers(
+            assembler, pushed_registers))
 
-        node = self.get_global_symbol(self.id)
         compiled_code, displacement_offset = \
             assembler.call(displacement=0)
-        offset = len(value) + displacement_offset
-        value += compiled_code
         # the offset in the symbol is 4
         addend = -4
-        relocation_object = RelocationObject(node.name, offset,
+        # the call is relocated by the name of the callee, which is also
+        # known for a call of the function that is being defined
+        relocation_object = RelocationObject(self.id, displacement_offset,
                                              CompiledObjectType.code,
                                              addend)
-        relocation_objects.append(relocation_object)
+        instructions.append(compiled_code, [relocation_object])
+
+        if not is_aligned:
+            instructions.append(assembler.add_value_to_reg(
+                8, ProcessorRegister.frame_pointer))
 
+        value, relocation_objects = instructions.resolve()
         size = len(value)
         compiled_object = CompiledObject(self.id, size,
                                          value, CompiledObjectType.code,
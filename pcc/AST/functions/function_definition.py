@@ -6,12 +6,26 @@ from pcc.AST.statement import Statement
 from pcc.AST.variables.variable_declaration import VariableDeclaration
 from pcc.compiler.assembler import ProcessorRegister
 
+# the registers a function has to restore before it returns
+CALLEE_SAVED_REGISTERS = [
+    ProcessorRegister.base,
+    ProcessorRegister.general_purpose_12,
+    ProcessorRegister.general_purpose_13,
+    ProcessorRegister.general_purpose_14,
+    ProcessorRegister.general_purpose_15,
+]
+
 
 class FunctionDefinition(Statement):
 
     def __init__(self, depth):
         super(FunctionDefinition, self).__init__(depth)
         self.stack_variable_list = []
+        # the name of a variable -> the register it is kept in, filled in
+        # by the register allocator
+        self.register_assignment = {}
+        # the callee saved registers that are pushed before the base pointer
+        self.saved_registers = []
 
     def __str__(self):
         string = self._depth * '  ' + 'FuncDef: \n'
@@ -62,6 +76,47 @@ class FunctionDefinition(Statement):
 
         return stack_variable
 
+    def get_argument_names(self):
+        """Get the names of the arguments of this function.
+
+        Returns:
+            List[str]: the names of the arguments
+        """
+        argument_list = self.statement_sequence[0].argument_list
+        return [argument.name for argument in argument_list
+                if isinstance(argument, VariableDeclaration)]
+
+    def get_saved_registers(self):
+        """Get the callee saved registers that the variables are kept in.
+
+        Returns:
+            List[ProcessorRegister]: the registers to save
+        """
+        used_registers = self.register_assignment.values()
+        return [register for register in CALLEE_SAVED_REGISTERS
+                if register in used_registers]
+
+    def _clear_register_variables(self, assembler):
+        """Set the local variables that are kept in a register and have no
+        initializer to 0, like the ones on stack.
+
+        Args:
+            assembler (Assembler): the assembler to use
+
+        Returns:
+            bytearray: the compiled machine code
+        """
+        compiled_code = bytearray()
+        argument_names = self.get_argument_names()
+        for stack_var in self.stack_variable_list:
+            if stack_var.register is None or \
+                    stack_var.initializer_byte_array or \
+                    stack_var.name in argument_names:
+                continue
+            compiled_code += assembler.copy_value_to_reg(
+                imm_value=0, destination=stack_var.register)
+        return compiled_code
+
     def _copy_argmuments_to_stack(self, assembler):
         """Copy all the arguments of this function to their stack variables.
 
@@ -91,6 +146,11 @@ class FunctionDefinition(Statement):
             stack_offset = stack_var.stack_offset
             if stack_var.type_name not in ['float', 'double']:
                 register = available_integer_registers.pop(0)
+            if stack_var.register is not None:
+                compiled_code += \
+                    assembler.copy_from_reg_to_reg(
+                        destination=stack_var.register, source=register)
+                continue
             compiled_code += \
                 assembler.copy_reg_to_stack(register=register,
                                             stack_offset=stack_offset)
@@ -108,6 +168,11 @@ class FunctionDefinition(Statement):
         """
         value = bytearray()
 
+        # save the callee saved registers the variables are kept in
+        self.saved_registers = self.get_saved_registers()
+        for register in self.saved_registers:
+            value += assembler.push_to_stack(register)
+
         # save the frame pointer on stack
         ret = assembler.push_to_stack(ProcessorRegister.base_pointer)
         value.extend(ret)
@@ -124,6 +189,10 @@ class FunctionDefinition(Statement):
         # first the frame pointer has been saved to stack
         stack_offset = 0
         for stack_var in current_list:
+            stack_var.register = self.register_assignment.get(stack_var.name)
+            if stack_var.register is not None:
+                # a variable in a register does not need a place on stack
+                continue
             stack_var.stack_start = stack_offset
             value_array = stack_var.initializer_byte_array
             value, stack_offset = push_variable_on_stack(assembler,
@@ -134,11 +203,16 @@ class FunctionDefinition(Statement):
 
         self.stack_variable_list = current_list
 
-        reg = ProcessorRegister.counter
+        # the arguments are still in their registers, the counter register
+        # holds the 4th one, the accumulator is free
+        reg = ProcessorRegister.accumulator
         # allign the stack to a multiple of 16
         # stack_offset is a negative number that is rounded to a multiple
         # of 16, stack_offset=12 -> allinged_stack_size=16
         allinged_stack_size = 16*((-stack_offset)//16 + 1)
+        # every saved register moved the stack pointer by 8
+        if len(self.saved_registers) % 2:
+            allinged_stack_size += 8
         value += assembler.copy_value_to_reg(imm_value=allinged_stack_size,
                                              destination=reg)
         value += assembler.sub(source=reg,
@@ -149,6 +223,7 @@ class FunctionDefinition(Statement):
         value.extend(ret)
 
         value += self._copy_argmuments_to_stack(assembler)
+        value += self._clear_register_variables(assembler)
 
         relocation_objects = []
         for statement in self.statement_sequence:
@@ -0,0 +1,82 @@
+from pcc.preprocessor.tokenizer import PPTokenType, tokenize
+
+
+class Lexer:
+
+    def __init__(self, source, line_number=1):
+        """Create a lexer for the source code.
+
+        The whitespace and the comments are dropped, the lexer only
+        returns the tokens that matter to the parser.
+
+        Args:
+            source (str): the source code to split in tokens
+            line_number (int): the line number of the first character
+        """
+        self.tokens = [token for token in tokenize(source, line_number)
+                       if not token.is_whitespace()]
+        self.position = 0
+
+    def peek(self, offset=0):
+        """Look at a token without consuming it.
+
+        Args:
+            offset (int): the number of tokens to look ahead
+
+        Returns:
+            PPToken: the token, None after the last token
+        """
+        position = self.position + offset
+        if position < len(self.tokens):
+            return self.tokens[position]
+        return None
+
+    def peek_text(self, offset=0):
+        """Look at the text of a token without consuming it.
+
+        Args:
+            offset (int): the number of tokens to look ahead
+
+        Returns:
+            str: the text of the token, None after the last token
+        """
+        token = self.peek(offset)
+        if token is None:
+            return None
+        return token.text
+
+    def next(self):
+        """Consume the current token.
+
+        Returns:
+            PPToken: the consumed token, None after the last token
+        """
+        token = self.peek()
+        if token is not None:
+            self.position += 1
+        return token
+
+    def accept(self, text):
+        """Consume the current token if it has the expected text.
+
+        Args:
+            text (str): the expected punctuator or keyword
+
+        Returns:
+            bool: True if the token was consumed
+        """
+        token = self.peek()
+        if token is not None and token.text == text and \
+                token.token_type in (PPTokenType.punctuator,
+                                     PPTokenType.identifier):
+            self.position += 1
+            return True
+        return False
+
+    def is_at_end(self):
+        """Check if all the tokens are consumed.
+
+        Returns:
+            bool: True if there are no tokens left
+        """
+        return self.position >= len(self.tokens)
@@ -1,5 +1,6 @@
+from pcc.AST.register_stack import create_register_stack
 from pcc.AST.unary_operator import UnaryOperator
-from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.instruction_buffer import InstructionBuffer
 
 
 class LogicalNot(UnaryOperator):
@@ -27,38 +28,42 @@ class LogicalNot(UnaryOperator):
         value += assembler.logical_not(destination)
         return value
 
-    def load_result_to_reg(self, register, assembler):
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator, the operand is
+                evaluated in an other register than the result
+        """
+        return self.operand.get_register_need() + 1
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the logical not to the specified register
 
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
 
         Returns:
             bytearray: the compiled code to evaluate the expression
             List[RelocationObject]: the required relocation objects
         """
-        value = bytearray()
-        if register != ProcessorRegister.accumulator:
-            register_1 = ProcessorRegister.accumulator
-        else:
-            register_1 = ProcessorRegister.counter
-        clear_result = assembler.copy_value_to_reg(0, register)
-        set_result = assembler.copy_value_to_reg(1, register)
-        if_instructions, relocation_objects = \
-            self.operand.load_result_to_reg(register_1, assembler)
-        if_instructions += assembler.cmp_against_const(register_1, 0)
-
-        jump_amount = len(set_result)
-        if_instructions += assembler.jne(jump_amount)
-
-        value += clear_result
-
-        for rela_obj in relocation_objects:
-            additional_offset = len(clear_result)
-            rela_obj.offset += additional_offset
-
-        value += if_instructions
-        value += set_result
+        if register_stack is None:
+            register_stack = create_register_stack(register)
+        instructions = InstructionBuffer(assembler)
+        end_label = instructions.create_label('end not')
+        operand_register, compiled_code = register_stack.take(register,
+                                                              assembler)
+        instructions.append(compiled_code)
+        instructions.append(assembler.copy_value_to_reg(0, register))
+        instructions.append(*self.operand.load_result_to_reg(
+            operand_register, assembler, register_stack))
+        instructions.append(assembler.cmp_against_const(operand_register, 0))
+        instructions.jne(end_label)
+        instructions.append(assembler.copy_value_to_reg(1, register))
+        instructions.place_label(end_label)
+        instructions.append(register_stack.give_back(assembler))
 
-        return value, relocation_objects
+        return instructions.resolve()
@@ -1,5 +1,6 @@
 from pcc.AST.binary_operator import BinaryOperator
-from pcc.compiler.assembler import ProcessorRegister
+from pcc.AST.register_stack import create_register_stack
+from pcc.compiler.instruction_buffer import InstructionBuffer
 
 
 class LogicalOr(BinaryOperator):
@@ -22,50 +23,46 @@ class LogicalOr(BinaryOperator):
         value += assembler.logical_or(source, destination)
         return value
 
-    def load_result_to_reg(self, register, assembler):
-        """Load the result of the logical and to the specified register
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator, the operands are
+                evaluated in an other register than the result
+        """
+        return max(self.operand_1.get_register_need(),
+                   self.operand_2.get_register_need()) + 1
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
+        """Load the result of the logical or to the specified register
 
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, None to
+                use all of them
 
         Returns:
             bytearray: the compiled code to evaluate the expression
             List[RelocationObject]: the required relocation objects
 
         """
-        value = bytearray()
-        relocation_objects = []
-        if register != ProcessorRegister.accumulator:
-            register_1 = ProcessorRegister.accumulator
-        else:
-            register_1 = ProcessorRegister.counter
-        clear_result = assembler.copy_value_to_reg(0, register)
-        set_result = assembler.copy_value_to_reg(1, register)
-        if_instructions, rela_objects_if = \
-            self.operand_1.load_result_to_reg(register_1, assembler)
-        for rela_obj in rela_objects_if:
-            additional_offset = len(set_result)
-            rela_obj.offset += additional_offset
-            relocation_objects.append(rela_obj)
-        if_instructions += assembler.cmp_against_const(register_1, 0)
-
-        else_instructions, rela_objects_else = \
-            self.operand_2.load_result_to_reg(register_1, assembler)
-        for rela_obj in rela_objects_else:
-            additional_offset = len(set_result + if_instructions)
-            rela_obj.offset += additional_offset
-            relocation_objects.append(rela_obj)
-        else_instructions += assembler.cmp_against_const(register_1, 0)
-        jump_amount = len(clear_result)
-        else_instructions += assembler.jne(jump_amount)
-
-        jump_amount = len(else_instructions) + len(clear_result)
-        if_instructions += assembler.jne(jump_amount)
-
-        value += set_result
-        value += if_instructions
-        value += else_instructions
-        value += clear_result
+        if register_stack is None:
+            register_stack = create_register_stack(register)
+        instructions = InstructionBuffer(assembler)
+        end_label = instructions.create_label('end or')
+        operand_register, compiled_code = register_stack.take(register,
+                                                              assembler)
+        instructions.append(compiled_code)
+        instructions.append(assembler.copy_value_to_reg(1, register))
+        for operand in [self.operand_1, self.operand_2]:
+            instructions.append(*operand.load_result_to_reg(
+                operand_register, assembler, register_stack))
+            instructions.append(
+                assembler.cmp_against_const(operand_register, 0))
+            instructions.jne(end_label)
+        instructions.append(assembler.copy_value_to_reg(0, register))
+        instructions.place_label(end_label)
+        instructions.append(register_stack.give_back(assembler))
 
-        return value, relocation_objects
+        return instructions.resolve()
@@ -0,0 +1,186 @@
+from pcc.compiler.assembler import ProcessorRegister
+
+# the registers to evaluate integer expressions in, edx is left out for the
+# division and the registers of the local variables are not used
+INTEGER_REGISTERS = [
+    ProcessorRegister.accumulator,
+    ProcessorRegister.counter,
+    ProcessorRegister.integer_argument_1,
+    ProcessorRegister.integer_argument_0,
+    ProcessorRegister.integer_argument_4,
+    ProcessorRegister.integer_argument_5,
+]
+SINGLE_SCALAR_REGISTERS = [
+    ProcessorRegister.single_scalar_0,
+    ProcessorRegister.single_scalar_1,
+    ProcessorRegister.single_scalar_2,
+    ProcessorRegister.single_scalar_3,
+    ProcessorRegister.single_scalar_4,
+    ProcessorRegister.single_scalar_5,
+    ProcessorRegister.single_scalar_6,
+    ProcessorRegister.single_scalar_7,
+]
+DOUBLE_SCALAR_REGISTERS = [
+    ProcessorRegister.double_scalar_0,
+    ProcessorRegister.double_scalar_1,
+    ProcessorRegister.double_scalar_2,
+    ProcessorRegister.double_scalar_3,
+    ProcessorRegister.double_scalar_4,
+    ProcessorRegister.double_scalar_5,
+    ProcessorRegister.double_scalar_6,
+    ProcessorRegister.double_scalar_7,
+]
+SCALAR_REGISTERS = SINGLE_SCALAR_REGISTERS + DOUBLE_SCALAR_REGISTERS
+
+
+def get_scratch_registers(register):
+    """Get the registers to evaluate an expression of the type of a
+    register in.
+
+    Args:
+        register (ProcessorRegister): the register of the result
+
+    Returns:
+        List[ProcessorRegister]: the scratch registers
+    """
+    if register in SINGLE_SCALAR_REGISTERS:
+        return SINGLE_SCALAR_REGISTERS
+    if register in DOUBLE_SCALAR_REGISTERS:
+        return DOUBLE_SCALAR_REGISTERS
+    return INTEGER_REGISTERS
+
+
+def create_register_stack(register, pushed_registers=0):
+    """Create the register stack to evaluate an expression into a register.
+
+    Args:
+        register (ProcessorRegister): the register of the result
+        pushed_registers (int): the number of registers pushed on the stack
+            since the stack pointer was aligned
+
+    Returns:
+        RegisterStack: the register stack, with the register in use
+    """
+    register_stack = RegisterStack(get_scratch_registers(register),
+                                   pushed_registers)
+    register_stack.use(register)
+    return register_stack
+
+
+class RegisterStack:
+
+    def __init__(self, registers, pushed_registers=0):
+        """Create the scratch registers of an expression.
+
+        The registers are given out in order, if none is free the value of
+        one in use is pushed on the stack and popped when it is given back.
+
+        Args:
+            registers (List[ProcessorRegister]): the scratch registers
+            pushed_registers (int): the number of registers pushed on the
+                stack since the stack pointer was aligned
+        """
+        self.registers = registers
+        self.free_registers = list(registers)
+        # the registers that hold a value, in the order they were taken
+        self.used_registers = []
+        # (register, True if it was pushed) for every taken register
+        self.taken_registers = []
+        self.pushed_registers = pushed_registers
+
+    def use(self, register):
+        """Mark a register as holding a value.
+
+        Args:
+            register (ProcessorRegister): the register, it does not have to
+                be a scratch register
+        """
+        if register in self.free_registers:
+            self.free_registers.remove(register)
+        if register not in self.used_registers:
+            self.used_registers.append(register)
+
+    def release(self, register):
+        """Mark a register as holding no value.
+
+        Args:
+            register (ProcessorRegister): the register
+        """
+        self.used_registers.remove(register)
+        if register in self.registers:
+            self.free_registers.append(register)
+            self.free_registers.sort(key=self.registers.index)
+
+    def is_used(self, register):
+        """Check if a register holds a value.
+
+        Args:
+            register (ProcessorRegister): the register
+
+        Returns:
+            bool: True if the register is in use
+        """
+        return register in self.used_registers
+
+    def get_saved_registers(self, register):
+        """Get the registers in use that a call changes.
+
+        Args:
+            register (ProcessorRegister): the register of the result of the
+                call
+
+        Returns:
+            List[ProcessorRegister]: the general purpose registers in use,
+                the scalar registers are not saved
+        """
+        return [used_register for used_register in self.used_registers
+                if used_register != register and
+                used_register not in SCALAR_REGISTERS]
+
+    def take(self, register, assembler):
+        """Take a scratch register, pushing the value of one in use if none
+        is free.
+
+        Args:
+            register (ProcessorRegister): the register that is not taken,
+                the destination of the operator
+            assembler (Assembler): the assembler to use
+
+        Returns:
+            ProcessorRegister: the register
+            bytearray: the machine code to save the value of the register
+
+        Raises:
+            NotImplementedError: if a scalar register has to be pushed
+        """
+        if self.free_registers:
+            scratch_register = self.free_registers.pop(0)
+            self.used_registers.append(scratch_register)
+            self.taken_registers.append((scratch_register, False))
+            return scratch_register, bytearray()
+        scratch_register = next(used_register
+                                for used_register in self.used_registers
+                                if used_register in self.registers and
+                                used_register != register)
+        if scratch_register in SCALAR_REGISTERS:
+            raise NotImplementedError('the expression needs too many '
+                                      'floating point registers')
+        self.taken_registers.append((scratch_register, True))
+        self.pushed_registers += 1
+        return scratch_register, assembler.push_to_stack(scratch_register)
+
+    def give_back(self, assembler):
+        """Give back the register that was taken last.
+
+        Args:
+            assembler (Assembler): the assembler to use
+
+        Returns:
+            bytearray: the machine code to restore the value of the register
+        """
+        scratch_register, is_pushed = self.taken_registers.pop()
+        if is_pushed:
+            self.pushed_registers -= 1
+            return assembler.pop_from_stack(scratch_register)
+        self.release(scratch_register)
+        return bytearray()
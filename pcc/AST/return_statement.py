@@ -66,6 +66,11 @@ class ReturnStatement(Statement):
         ret = assembler.pop_from_stack(ProcessorRegister.base_pointer)
         value.extend(ret)
 
+        # restore the registers the variables were kept in
+        function_definition = self.get_function_definition_node()
+        for register in reversed(function_definition.saved_registers):
+            value += assembler.pop_from_stack(register)
+
         # return to the called function
         ret = assembler.return_to_caller()
         value.extend(ret)
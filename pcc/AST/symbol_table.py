@@ -0,0 +1,56 @@
+class SymbolTable:
+
+    def __init__(self):
+        """Create a symbol table with only the global scope.
+
+        Every scope maps the name of a variable or a function to the node
+        that declares it. The innermost scope is the last one.
+        """
+        self.scopes = [{}]
+
+    def enter_scope(self):
+        """Start a new scope, for a function or a compound statement."""
+        self.scopes.append({})
+
+    def leave_scope(self):
+        """Drop the innermost scope and all the symbols declared in it."""
+        self.scopes.pop()
+
+    def add_symbol(self, name, node):
+        """Declare a symbol in the innermost scope.
+
+        A symbol that is declared again in the same scope keeps its first
+        declaration, like an external variable that is defined later.
+
+        Args:
+            name (str): the name of the symbol
+            node (AstNode): the declaration of the symbol
+        """
+        self.scopes[-1].setdefault(name, node)
+
+    def lookup(self, name):
+        """Find the declaration of a symbol, from the innermost scope out.
+
+        Args:
+            name (str): the name of the symbol
+
+        Returns:
+            AstNode: the declaration, None if the symbol is not declared
+        """
+        for scope in reversed(self.scopes):
+            node = scope.get(name)
+            if node is not None:
+                return node
+        return None
+
+    def get_global_symbol(self, name):
+        """Find the declaration of a symbol in the global scope.
+
+        Args:
+            name (str): the name of the symbol
+
+        Returns:
+            AstNode: the declaration, None if there is no global symbol with
+                     this name
+        """
+        return self.scopes[0].get(name)
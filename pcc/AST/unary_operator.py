@@ -1,5 +1,4 @@
 from pcc.AST.expression import Expression
-from pcc.compiler.assembler import ProcessorRegister
 
 
 class UnaryOperator(Expression):
@@ -17,7 +16,7 @@ class UnaryOperator(Expression):
 
     def __str__(self):
         string = (self._depth + 1) * '  ' + 'UnaryOp: %s\n' % self.operator
-        string += '  ' + '%s' % self.operand
+        string += '%s' % self.operand
         return string
 
     def evaluate(self, destination, assembler):
@@ -35,32 +34,31 @@ class UnaryOperator(Expression):
         """
         raise NotImplementedError
 
-    def load_result_to_reg(self, register, assembler):
+    def get_register_need(self):
+        """Get the number of registers needed to evaluate the expression.
+
+        Returns:
+            int: the Sethi-Ullman number of the operator
+        """
+        return self.operand.get_register_need()
+
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the unary operator to the specified register
 
             Args:
                 register (ProcessorRegister): the register to load the result
                 assembler (Assembler): the assembler to use
+                register_stack (RegisterStack): the scratch registers, None
+                    to use all of them
 
             Returns:
                 bytearray: the compiled code to evaluate the expression
                 List[RelocationObject]: the required relocation objects
 
         """
-        if register == ProcessorRegister.single_scalar_0:
-            register_1 = ProcessorRegister.single_scalar_0
-        elif register == ProcessorRegister.double_scalar_0:
-            register_1 = ProcessorRegister.double_scalar_0
-        else:
-            register_1 = ProcessorRegister.accumulator
-        value, relocation_objects = \
-            self.operand.load_result_to_reg(register_1, assembler)
-
-        value += self.evaluate(destination=register_1, assembler=assembler)
-
-        # the result is in register_1, make sure
-        # that is the specified register
-        if register != register_1:
-            value += assembler.copy_from_reg_to_reg(register_1, register)
+        value, relocation_objects = self.operand.load_result_to_reg(
+            register, assembler, register_stack)
+
+        value += self.evaluate(destination=register, assembler=assembler)
 
         return value, relocation_objects
@@ -74,7 +74,11 @@ class Assignment(Statement):
             additional_offset = len(value)
             relocation_object.offset += additional_offset
         value += compiled_code
-        value += assembler.copy_reg_to_stack(stack_offset, register)
+        if stack_variable.register is not None:
+            value += assembler.copy_from_reg_to_reg(
+                destination=stack_variable.register, source=register)
+        else:
+            value += assembler.copy_reg_to_stack(stack_offset, register)
         compiled_object = CompiledObject(self.id, size,
                                          value, CompiledObjectType.code,
                                          relocation_objects)
@@ -15,6 +15,8 @@ class StackVariable:
         self.stack_offset = 0
         self.stack_start = 0
         self.type_name = type_name
+        # the register the variable is kept in, None if it is on the stack
+        self.register = None
 
     def __str__(self):
         string = 'Stack variable: '
@@ -106,7 +106,13 @@ class VariableDeclaration(Statement):
                 compiled_code, relocation_objects = \
                     self.initializer.load_result_to_reg(register, assembler)
                 value += compiled_code
-                value += assembler.copy_reg_to_stack(stack_offset, register)
+                if stack_variable.register is not None:
+                    value += assembler.copy_from_reg_to_reg(
+                        destination=stack_variable.register,
+                        source=register)
+                else:
+                    value += assembler.copy_reg_to_stack(stack_offset,
+                                                         register)
                 compiled_object = CompiledObject(self.name, size, value,
                                                  CompiledObjectType.data,
                                                  relocation_objects)
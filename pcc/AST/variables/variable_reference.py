@@ -19,12 +19,13 @@ class VariableReference(Expression):
         string = (self._depth + 1) * '  ' + 'ID: %s' % self.name
         return string
 
-    def load_result_to_reg(self, register, assembler):
+    def load_result_to_reg(self, register, assembler, register_stack=None):
         """Load the result of the expression to the specified register
 
         Args:
             register (ProcessorRegister): the register to load the result
             assembler (Assembler): the assembler to use
+            register_stack (RegisterStack): the scratch registers, not used
 
         Returns:
             bytearray: the compiled code to evaluate the expression
@@ -35,7 +36,10 @@ class VariableReference(Expression):
         identifier = self.name
         stack_variable = parent.get_stack_variable(identifier)
         relocation_objects = []
-        if stack_variable is not None:
+        if stack_variable is not None and stack_variable.register is not None:
+            value += assembler.copy_from_reg_to_reg(
+                destination=register, source=stack_variable.register)
+        elif stack_variable is not None:
             stack_offset = stack_variable.stack_offset
             value += assembler.copy_stack_to_reg(stack_offset, register)
         else:
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Thin client for the compile server.
+
+The client only imports the standard library, so it starts a lot faster
+than pcc itself. It sends its command-line arguments to a server started
+with pcc --server and prints the output of the compilation.
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# the environment variable with the path of the socket of the server
+SERVER_SOCKET_VARIABLE = 'PCC_SERVER_SOCKET'
+
+
+def get_default_socket_path():
+    """Get the path of the socket used when no path is given.
+
+    Returns:
+        str: the path from the PCC_SERVER_SOCKET environment variable, else
+            a path in the temporary directory, one per user
+    """
+    socket_path = os.environ.get(SERVER_SOCKET_VARIABLE)
+    if socket_path:
+        return socket_path
+    return os.path.join(tempfile.gettempdir(), 'pcc-%d.sock' % os.getuid())
+
+
+def send_request(socket_path, argv, working_directory):
+    """Let the server compile, as if pcc was called with argv.
+
+    Args:
+        socket_path (str): the path of the socket of the server
+        argv ([str]): command-line arguments, including the program name
+        working_directory (str): the directory the relative paths in argv
+            are relative to
+
+    Returns:
+        dict: the error code in 'result', the standard output in 'stdout'
+            and the standard error in 'stderr'
+
+    Raises:
+        OSError: the server can not be reached
+    """
+    request = {'argv': argv, 'cwd': working_directory}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as response_file:
+            response = response_file.readline()
+    if not response:
+        raise ConnectionError('the server closed the connection')
+    return json.loads(response.decode('utf-8'))
+
+
+def main(argv):
+    """Compile on the server.
+
+    Args:
+        argv ([str]): command-line arguments, the same as for pcc
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    socket_path = get_default_socket_path()
+    try:
+        response = send_request(socket_path, argv, os.getcwd())
+    except OSError as exception:
+        print('%s: can not reach the server at %s: %s' %
+              (argv[0], socket_path, exception), file=sys.stderr)
+        return 1
+    print(response['stdout'], end='')
+    print(response['stderr'], end='', file=sys.stderr)
+    return response['result']
+
+
+def entry_point():
+    """Zero-argument entry point for use with setuptools/distribute.
+
+    Raises:
+        SystemExit: setting the error code
+    """
+    raise SystemExit(main(sys.argv))
+
+
+if __name__ == '__main__':
+    entry_point()
@@ -20,11 +20,43 @@ class ProcessorRegister(enum.Enum):
     integer_argument_3 = 12
     integer_argument_4 = 13
     integer_argument_5 = 14
+    base = 15
+    general_purpose_8 = 16
+    general_purpose_9 = 17
+    general_purpose_10 = 18
+    general_purpose_11 = 19
+    general_purpose_12 = 20
+    general_purpose_13 = 21
+    general_purpose_14 = 22
+    general_purpose_15 = 23
+    single_scalar_2 = 24
+    single_scalar_3 = 25
+    single_scalar_4 = 26
+    single_scalar_5 = 27
+    single_scalar_6 = 28
+    single_scalar_7 = 29
+    double_scalar_2 = 30
+    double_scalar_3 = 31
+    double_scalar_4 = 32
+    double_scalar_5 = 33
+    double_scalar_6 = 34
+    double_scalar_7 = 35
 
 
 class ShiftMode(enum.Enum):
     right_arithmetic = 0
     left_arithmetic = 1
+    right_logical = 2
+
+
+class JumpCondition(enum.Enum):
+    always = 0
+    equal = 1
+    not_equal = 2
+    less = 3
+    less_or_equal = 4
+    greater = 5
+    greater_or_equal = 6
 
 
 class Assembler:
@@ -200,13 +232,59 @@ class Assembler:
         """
         raise NotImplementedError
 
-    def mul(self, destination, source):
+    def exchange(self, register_1, register_2):
+        """Exchange the values of 2 registers.
+
+        Args:
+            register_1 (ProcessorRegister): the first register
+            register_2 (ProcessorRegister): the second register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def add_value_to_reg(self, imm_value, destination):
+        """Add a value to a register.
+
+        Args:
+            imm_value (int): the value to add
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def sub_value_from_reg(self, imm_value, destination):
+        """Subtract a value from a register.
+
+        Args:
+            imm_value (int): the value to subtract
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def mul(self, destination, source, is_64_bit=False):
         """Multiply the value of the source by the destination.
 
         destination = source * destination
         Args:
             source (ProcessorRegister): the source register
             destination (ProcessorRegister): the source register
+            is_64_bit (bool): True to multiply the 64 bit registers
 
         Returns:
             bytearray: the machine code #noqa I202
@@ -216,13 +294,63 @@ class Assembler:
         """
         raise NotImplementedError
 
-    def shift(self, register, mode, amount):
+    def mul_value(self, imm_value, source, destination):
+        """Multiply the value of the source by a value.
+
+        destination = source * imm_value
+        Args:
+            imm_value (int): the value to multiply by
+            source (ProcessorRegister): the source register
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def lea(self, base, index, scale, destination):
+        """Load the address computed from 2 registers.
+
+        destination = base + index * scale
+        Args:
+            base (ProcessorRegister): the base register
+            index (ProcessorRegister): the index register
+            scale (int): the scale of the index, 1, 2, 4 or 8
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def neg(self, destination):
+        """Negate the value of a register.
+
+        Args:
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
+    def shift(self, register, mode, amount, is_64_bit=False):
         """Shift the register.
 
         Args:
             register (ProcessorRegister): the register to shift
             mode (ShiftMode): the mode to shift
             amount (int): the shift amount
+            is_64_bit (bool): True to shift the 64 bit register
 
         Returns:
             bytearray: the machine code #noqa I202
@@ -359,6 +487,23 @@ class Assembler:
         """
         raise NotImplementedError
 
+    def jump(self, condition, jump_distance, is_short):
+        """Jump if the condition holds, with a short or a near distance.
+
+        Args:
+            condition (JumpCondition): the condition of the flags to jump
+            jump_distance (int): the distance to jump in bytes, from the end
+                of the jump instruction
+            is_short (bool): True to encode the distance in a single byte
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
     def bitwise_and(self, source, destination):
         """Bitwise and the value of the source to the destination.
 
@@ -495,6 +640,21 @@ class Assembler:
         """
         raise NotImplementedError
 
+    def movsxd(self, source, destination):
+        """Sign extend the 32 bit source to the 64 bit destination.
+
+        Args:
+            source (ProcessorRegister): the source register
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
+
     def call(self, displacement):
         """call the symbol with the specified displacement
 
@@ -510,3 +670,15 @@ class Assembler:
             NotImplementedError: if not implemented in a subclasss
         """
         raise NotImplementedError
+
+    def syscall(self):
+        """Call the operating system, the number of the call is in the
+        accumulator.
+
+        Returns:
+            bytearray: the machine code #noqa I202
+
+        Raises:
+            NotImplementedError: if not implemented in a subclasss
+        """
+        raise NotImplementedError
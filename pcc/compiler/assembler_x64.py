@@ -3,7 +3,55 @@
 
 import struct
 
-from pcc.compiler.assembler import Assembler, ProcessorRegister, ShiftMode
+from pcc.compiler.assembler import Assembler, JumpCondition, \
+    ProcessorRegister, ShiftMode
+
+
+# the registers r8 to r15, which need a REX prefix
+EXTENDED_REGISTERS = {
+    ProcessorRegister.general_purpose_8: 8,
+    ProcessorRegister.general_purpose_9: 9,
+    ProcessorRegister.general_purpose_10: 10,
+    ProcessorRegister.general_purpose_11: 11,
+    ProcessorRegister.general_purpose_12: 12,
+    ProcessorRegister.general_purpose_13: 13,
+    ProcessorRegister.general_purpose_14: 14,
+    ProcessorRegister.general_purpose_15: 15,
+}
+
+# the registers xmm0 to xmm7, used for single and double precision
+SINGLE_SCALAR_REGISTERS = {
+    ProcessorRegister.single_scalar_0: 0,
+    ProcessorRegister.single_scalar_1: 1,
+    ProcessorRegister.single_scalar_2: 2,
+    ProcessorRegister.single_scalar_3: 3,
+    ProcessorRegister.single_scalar_4: 4,
+    ProcessorRegister.single_scalar_5: 5,
+    ProcessorRegister.single_scalar_6: 6,
+    ProcessorRegister.single_scalar_7: 7,
+}
+DOUBLE_SCALAR_REGISTERS = {
+    ProcessorRegister.double_scalar_0: 0,
+    ProcessorRegister.double_scalar_1: 1,
+    ProcessorRegister.double_scalar_2: 2,
+    ProcessorRegister.double_scalar_3: 3,
+    ProcessorRegister.double_scalar_4: 4,
+    ProcessorRegister.double_scalar_5: 5,
+    ProcessorRegister.double_scalar_6: 6,
+    ProcessorRegister.double_scalar_7: 7,
+}
+
+# the REX prefix is 0100WRXB
+REX = 0x40
+# 64 bit operands
+REX_W = 0x08
+# the extension of the reg field of the ModR/M byte
+REX_R = 0x04
+# the extension of the index field of the SIB byte
+REX_X = 0x02
+# the extension of the rm field of the ModR/M byte or of the register in
+# the opcode
+REX_B = 0x01
 
 
 # http://ref.x86asm.net/coder64.html
@@ -22,6 +70,10 @@ def get_register_encoding(register):
         return 1
     elif register == ProcessorRegister.data:
         return 2
+    elif register == ProcessorRegister.base:
+        return 3
+    elif register in EXTENDED_REGISTERS:
+        return EXTENDED_REGISTERS[register]
     else:
         encoding = process_input_regs(register)
         if encoding >= 0:
@@ -41,23 +93,69 @@ def process_input_regs(register):
         return 2
     elif register == ProcessorRegister.integer_argument_3:
         return 1
+    elif register == ProcessorRegister.integer_argument_4:
+        return 8
+    elif register == ProcessorRegister.integer_argument_5:
+        return 9
     else:
         return -1
 
 
 def process_floating_regs(register):
-    if register == ProcessorRegister.single_scalar_0:
-        return 0
-    elif register == ProcessorRegister.single_scalar_1:
-        return 1
-    elif register == ProcessorRegister.double_scalar_0:
-        return 0
-    elif register == ProcessorRegister.double_scalar_1:
-        return 1
+    if register in SINGLE_SCALAR_REGISTERS:
+        return SINGLE_SCALAR_REGISTERS[register]
+    elif register in DOUBLE_SCALAR_REGISTERS:
+        return DOUBLE_SCALAR_REGISTERS[register]
     else:
         return -1
 
 
+def get_rex_prefix(reg=0, rm=0, is_64_bit=False, is_byte_register=False,
+                   index=0):
+    """Get the REX prefix of an instruction, if it needs one.
+
+    Args:
+        reg (int): the encoding of the register in the reg field
+        rm (int): the encoding of the register in the rm field, in the base
+            field of the SIB byte or in the opcode
+        is_64_bit (bool): True for 64 bit operands
+        is_byte_register (bool): True if rm is used as a byte register,
+            spl, bpl, sil and dil need a REX prefix to not be ah to bh
+        index (int): the encoding of the register in the index field of
+            the SIB byte
+
+    Returns:
+        bytearray: the prefix, empty if none is needed
+    """
+    rex = 0
+    if is_64_bit:
+        rex |= REX_W
+    if reg >= 8:
+        rex |= REX_R
+    if index >= 8:
+        rex |= REX_X
+    if rm >= 8:
+        rex |= REX_B
+    if rex or (is_byte_register and 4 <= rm <= 7):
+        return bytearray([REX + rex])
+    return bytearray()
+
+
+def get_modrm_byte(mod, reg, rm):
+    """Get the ModR/M byte, the REX prefix holds the 4th bit of the
+    registers.
+
+    Args:
+        mod (int): the addressing mode
+        reg (int): the encoding of the register in the reg field
+        rm (int): the encoding of the register in the rm field
+
+    Returns:
+        int: the ModR/M byte
+    """
+    return (mod << 6) + ((reg & 0b111) << 3) + (rm & 0b111)
+
+
 def is_single_scalar_reg(register):
     """Check if the register is a single scalar register
 
@@ -67,11 +165,7 @@ def is_single_scalar_reg(register):
     Returns:
         bool: True if the register is a single scalar register, else False
     """
-    if register in [ProcessorRegister.single_scalar_0,
-                    ProcessorRegister.single_scalar_1]:
-        return True
-    else:
-        return False
+    return register in SINGLE_SCALAR_REGISTERS
 
 
 def is_double_scalar_reg(register):
@@ -83,11 +177,30 @@ def is_double_scalar_reg(register):
     Returns:
         bool: True if the register is a double scalar register, else False
     """
-    if register in [ProcessorRegister.double_scalar_0,
-                    ProcessorRegister.double_scalar_1]:
-        return True
-    else:
-        return False
+    return register in DOUBLE_SCALAR_REGISTERS
+
+
+# the scale of the index of the SIB byte -> the encoding of the scale
+SIB_SCALES = {1: 0b00, 2: 0b01, 4: 0b10, 8: 0b11}
+
+# the mode of a shift -> the extension of the opcode in the reg field of
+# the ModR/M byte, C1 /x ib
+SHIFT_EXTENSIONS = {
+    ShiftMode.left_arithmetic: 4,
+    ShiftMode.right_logical: 5,
+    ShiftMode.right_arithmetic: 7,
+}
+
+# the condition codes of the Jcc instructions, added to 0x70 for rel8 and to
+# 0x0F 0x80 for rel32
+CONDITION_CODES = {
+    JumpCondition.equal: 0x4,
+    JumpCondition.not_equal: 0x5,
+    JumpCondition.less: 0xC,
+    JumpCondition.greater_or_equal: 0xD,
+    JumpCondition.less_or_equal: 0xE,
+    JumpCondition.greater: 0xF,
+}
 
 
 class X64Assembler(Assembler):
@@ -107,7 +220,8 @@ class X64Assembler(Assembler):
 
         value = bytearray()
         register_encoding = get_register_encoding(register)
-        value.append(0x50 + register_encoding)
+        value += get_rex_prefix(rm=register_encoding)
+        value.append(0x50 + (register_encoding & 0b111))
         # 0x50 == push instruction,
         # the register to push is encoded and added
 
@@ -124,7 +238,8 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
         register_encoding = get_register_encoding(register)
-        value.append(0x58 + register_encoding)
+        value += get_rex_prefix(rm=register_encoding)
+        value.append(0x58 + (register_encoding & 0b111))
         # (0x58 == pop) + the register to pop to
         return value
 
@@ -140,16 +255,28 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        # 0x48 REX prefix with W flag set (64 bit operands)
+        mod = 0b11
+        if is_single_scalar_reg(destination) or \
+                is_double_scalar_reg(destination):
+            # movd / movq xmm, r/m
+            reg = get_register_encoding(destination)
+            rm = get_register_encoding(source)
+            value.append(0x66)
+            value += get_rex_prefix(
+                rm=rm, is_64_bit=is_double_scalar_reg(destination))
+            value.extend([0x0f, 0x6e, get_modrm_byte(mod, reg, rm)])
+            return value
+
+        # REX prefix with W flag set (64 bit operands)
         # 0x89 MOV instruction
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
-        mod = 0b11
         reg = get_register_encoding(source)
         rm = get_register_encoding(destination)
 
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
-        value.extend([0x48, 0x89, modr_byte])
+        modr_byte = get_modrm_byte(mod, reg, rm)
+        value += get_rex_prefix(reg, rm, is_64_bit=True)
+        value.extend([0x89, modr_byte])
 
         return value
 
@@ -184,7 +311,8 @@ class X64Assembler(Assembler):
             value += bytearray([0xc0 + (register_encoding << 3)])
         else:
             register_encoding = get_register_encoding(destination)
-            value.append(0xb8 + register_encoding)
+            value += get_rex_prefix(rm=register_encoding)
+            value.append(0xb8 + (register_encoding & 0b111))
             # (0xb8 == mov imm) + the register to move to
             value += bytearray(struct.pack("i", imm_value))
 
@@ -235,7 +363,7 @@ class X64Assembler(Assembler):
         destination = ProcessorRegister.base_pointer
         rm = get_register_encoding(destination)
         reg = 0  # don't care
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         encoded_offset = struct.pack("b", stack_offset)
@@ -260,19 +388,20 @@ class X64Assembler(Assembler):
             bytearray: the machine code
         """
         value = bytearray()
+        reg = get_register_encoding(register)
         if is_single_scalar_reg(register):
             value.extend([0xF3, 0x0F, 0x10])  # movss
         elif is_double_scalar_reg(register):
             value.extend([0xF2, 0x0F, 0x10])  # movsd
         else:
+            value += get_rex_prefix(reg=reg)
             value.append(0x8b)  # mov
         # Table 2-2.  32-Bit Addressing Forms with the ModR/M Byte
         # indirect addressing with byte displacement
         mod = 0b01
         destination = ProcessorRegister.base_pointer
         rm = get_register_encoding(destination)
-        reg = get_register_encoding(register)
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         encoded_offset = struct.pack("b", stack_offset)
@@ -291,19 +420,20 @@ class X64Assembler(Assembler):
             bytearray: the machine code
         """
         value = bytearray()
+        reg = get_register_encoding(register)
         if is_single_scalar_reg(register):
             value.extend([0xF3, 0x0F, 0x11])  # movss
         elif is_double_scalar_reg(register):
             value.extend([0xF2, 0x0F, 0x11])  # movsd
         else:
+            value += get_rex_prefix(reg=reg)
             value.append(0x89)  # mov
         # Table 2-2.  32-Bit Addressing Forms with the ModR/M Byte
         # indirect addressing with byte displacement
         mod = 0b01
         destination = ProcessorRegister.base_pointer
         rm = get_register_encoding(destination)
-        reg = get_register_encoding(register)
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         encoded_offset = struct.pack("b", stack_offset)
@@ -331,13 +461,14 @@ class X64Assembler(Assembler):
             rm = get_register_encoding(source)
             reg = get_register_encoding(destination)
         else:
-            value.append(0x01)  # ADD
             rm = get_register_encoding(destination)
             reg = get_register_encoding(source)
+            value += get_rex_prefix(reg, rm)
+            value.append(0x01)  # ADD
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -362,14 +493,15 @@ class X64Assembler(Assembler):
             rm = get_register_encoding(source)
             reg = get_register_encoding(destination)
         else:
-            value.extend([0x48, 0x29])  # sub
             rm = get_register_encoding(destination)
             reg = get_register_encoding(source)
+            value += get_rex_prefix(reg, rm, is_64_bit=True)
+            value.append(0x29)  # sub
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
         mod = 0b11
 
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -377,7 +509,8 @@ class X64Assembler(Assembler):
     def div(self, source, destination):
         """Divide the value of the source by the destination.
 
-        Store the result in the  dividend register.
+        Store the result in the  dividend register. An integer division
+        changes eax and edx, the destination can not be edx.
 
         Args:
             source (ProcessorRegister): the source register
@@ -396,71 +529,113 @@ class X64Assembler(Assembler):
             mod = 0b11
             rm = get_register_encoding(divider)
             reg = get_register_encoding(dividend)
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
         elif is_double_scalar_reg(divider):
             value.extend([0xF2, 0x0F, 0x5E])  # divsd
             mod = 0b11
             rm = get_register_encoding(divider)
             reg = get_register_encoding(dividend)
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
         else:
-            # idiv eax = edx:eax / divider
+            # idiv eax = edx:eax / divider, the dividend can not be in edx
             if divider == ProcessorRegister.accumulator:
-                tmp_reg = ProcessorRegister.data
-                value += self.copy_from_reg_to_reg(destination=divider,
-                                                   source=tmp_reg)
-                divider = tmp_reg
-                # so dividend is no accumulator
-                tmp_reg = ProcessorRegister.accumulator
-                value += self.copy_from_reg_to_reg(destination=dividend,
-                                                   source=tmp_reg)
-
-                tmp_reg = ProcessorRegister.counter
-                value += self.copy_from_reg_to_reg(destination=divider,
-                                                   source=tmp_reg)
-                divider = tmp_reg
-
-            src = ProcessorRegister.accumulator
-            value += self.copy_from_reg_to_reg(destination=dividend,
-                                               source=src)
-
-            # mov eax -> edx
-            src = ProcessorRegister.accumulator
-            dest = ProcessorRegister.data
-            value += self.copy_from_reg_to_reg(destination=dest,
-                                               source=src)
-
-            # shift edx by 31 -> contains the highest bits of the dividend,
-            # eax the lowest 31 bits
-            value += self.shift(ProcessorRegister.data,
-                                ShiftMode.right_arithmetic,
-                                amount=31)
+                # swap the divider and the dividend, so the dividend is in
+                # eax
+                value += self.exchange(divider, dividend)
+                divider = dividend
+            elif dividend != ProcessorRegister.accumulator:
+                value += self.copy_from_reg_to_reg(
+                    source=dividend, destination=ProcessorRegister.accumulator)
 
-            value.append(0xf7)  # idiv
+            # cdq, sign extend eax into edx
+            value.append(0x99)
 
             mod = 0b11
             rm = get_register_encoding(divider)
             reg = 7  # F7 /7 -> 7 in the reg field
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            value += get_rex_prefix(rm=rm)
+            value.append(0xf7)  # idiv
+
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
 
             # the result is stored in the acc register, so copy it to the
             # correct result register if needed
-            if destination != ProcessorRegister.accumulator:
+            if dividend != ProcessorRegister.accumulator:
                 register = ProcessorRegister.accumulator
                 value += self.copy_from_reg_to_reg(register, dividend)
 
         return value
 
-    def mul(self, destination, source):
+    def exchange(self, register_1, register_2):
+        """Exchange the values of 2 registers.
+
+        Args:
+            register_1 (ProcessorRegister): the first register
+            register_2 (ProcessorRegister): the second register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        reg = get_register_encoding(register_1)
+        rm = get_register_encoding(register_2)
+        value += get_rex_prefix(reg, rm, is_64_bit=True)
+        value.append(0x87)  # xchg
+        mod = 0b11
+        value.append(get_modrm_byte(mod, reg, rm))
+        return value
+
+    def add_value_to_reg(self, imm_value, destination):
+        """Add a value to a register.
+
+        Args:
+            imm_value (int): the value to add
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        rm = get_register_encoding(destination)
+        reg = 0  # 81 /0 -> add r/m64, imm32
+        value += get_rex_prefix(rm=rm, is_64_bit=True)
+        value.append(0x81)
+        mod = 0b11
+        value.append(get_modrm_byte(mod, reg, rm))
+        value += struct.pack("i", imm_value)
+        return value
+
+    def sub_value_from_reg(self, imm_value, destination):
+        """Subtract a value from a register.
+
+        Args:
+            imm_value (int): the value to subtract
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        rm = get_register_encoding(destination)
+        reg = 5  # 81 /5 -> sub r/m64, imm32
+        value += get_rex_prefix(rm=rm, is_64_bit=True)
+        value.append(0x81)
+        mod = 0b11
+        value.append(get_modrm_byte(mod, reg, rm))
+        value += struct.pack("i", imm_value)
+        return value
+
+    def mul(self, destination, source, is_64_bit=False):
         """Multiply the value of the source by the destination.
 
         destination = source * destination
         Args:
             source (ProcessorRegister): the source register
             destination (ProcessorRegister): the source register
+            is_64_bit (bool): True to multiply the 64 bit registers
 
         Returns:
             bytearray: the machine code
@@ -472,33 +647,107 @@ class X64Assembler(Assembler):
             mod = 0b11
             reg = get_register_encoding(destination)
             rm = get_register_encoding(source)
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
         elif is_double_scalar_reg(destination):
             value.extend([0xF2, 0x0F, 0x59])  # mulsd
             mod = 0b11
             reg = get_register_encoding(destination)
             rm = get_register_encoding(source)
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
         else:
-            value.extend([0x0F, 0xAF])  # imul
-
             mod = 0b11
             reg = get_register_encoding(destination)
             rm = get_register_encoding(source)
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+            value += get_rex_prefix(reg, rm, is_64_bit=is_64_bit)
+            value.extend([0x0F, 0xAF])  # imul
+
+            modr_byte = get_modrm_byte(mod, reg, rm)
             value.append(modr_byte)
 
         return value
 
-    def shift(self, register, mode, amount):
+    def mul_value(self, imm_value, source, destination):
+        """Multiply the value of the source by a value.
+
+        destination = source * imm_value
+        Args:
+            imm_value (int): the value to multiply by
+            source (ProcessorRegister): the source register
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        mod = 0b11
+        reg = get_register_encoding(destination)
+        rm = get_register_encoding(source)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x69)  # imul r32, r/m32, imm32
+        value.append(get_modrm_byte(mod, reg, rm))
+        value += struct.pack("i", imm_value)
+        return value
+
+    def lea(self, base, index, scale, destination):
+        """Load the address computed from 2 registers.
+
+        destination = base + index * scale
+        Args:
+            base (ProcessorRegister): the base register
+            index (ProcessorRegister): the index register, not esp
+            scale (int): the scale of the index, 1, 2, 4 or 8
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        reg = get_register_encoding(destination)
+        base_encoding = get_register_encoding(base)
+        index_encoding = get_register_encoding(index)
+        value += get_rex_prefix(reg, base_encoding, index=index_encoding)
+        value.append(0x8D)  # lea r32, m
+        # rm 100 -> a SIB byte follows, a base of ebp or r13 needs a
+        # displacement
+        rm = 0b100
+        if base_encoding & 0b111 == 5:
+            value.append(get_modrm_byte(0b01, reg, rm))
+        else:
+            value.append(get_modrm_byte(0b00, reg, rm))
+        value.append((SIB_SCALES[scale] << 6) + ((index_encoding & 0b111) << 3)
+                     + (base_encoding & 0b111))
+        if base_encoding & 0b111 == 5:
+            value.append(0)  # disp8
+        return value
+
+    def neg(self, destination):
+        """Negate the value of a register.
+
+        Args:
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        mod = 0b11
+        rm = get_register_encoding(destination)
+        reg = 3  # F7 /3 -> neg r/m32
+        value += get_rex_prefix(rm=rm)
+        value.append(0xF7)
+        value.append(get_modrm_byte(mod, reg, rm))
+        return value
+
+    def shift(self, register, mode, amount, is_64_bit=False):
         """Shift the register.
 
         Args:
             register (ProcessorRegister): the register to shift
             mode (ShiftMode): the mode to shift
             amount (int): the shift amount
+            is_64_bit (bool): True to shift the 64 bit register
 
         Returns:
             bytearray: the machine code
@@ -508,30 +757,19 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        if mode == ShiftMode.right_arithmetic:
-            # SAR r/m32, imm8
-            value.append(0xC1)
-            mod = 0b11
-            rm = get_register_encoding(register)
-            reg = 7  # C1 /7 ib -> 7 in reg field
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
-            value.append(modr_byte)
-
-            encoded_amount = struct.pack("b", amount)
-            value += encoded_amount
-        elif mode == ShiftMode.left_arithmetic:
-            # SAL r/m32, imm8
-            value.append(0xC1)
-            mod = 0b11
-            rm = get_register_encoding(register)
-            reg = 4  # C1 /4 ib -> 4 in reg field
-            modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
-            value.append(modr_byte)
-
-            encoded_amount = struct.pack("b", amount)
-            value += encoded_amount
-        else:
+        if mode not in SHIFT_EXTENSIONS:
             raise NotImplementedError
+        # SAL, SHR or SAR r/m32, imm8
+        mod = 0b11
+        rm = get_register_encoding(register)
+        reg = SHIFT_EXTENSIONS[mode]
+        value += get_rex_prefix(rm=rm, is_64_bit=is_64_bit)
+        value.append(0xC1)
+        modr_byte = get_modrm_byte(mod, reg, rm)
+        value.append(modr_byte)
+
+        encoded_amount = struct.pack("b", amount)
+        value += encoded_amount
 
         return value
 
@@ -548,11 +786,12 @@ class X64Assembler(Assembler):
         value = bytearray()
 
         # CMP r/m32, r32
-        value.append(0x39)
         mod = 0b11
         rm = get_register_encoding(register_1)
         reg = get_register_encoding(register_2)
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x39)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -570,11 +809,12 @@ class X64Assembler(Assembler):
         value = bytearray()
 
         # CMP r/m32, imm32
-        value.append(0x81)
         mod = 0b11
         rm = get_register_encoding(register)
         reg = 7
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        value += get_rex_prefix(rm=rm)
+        value.append(0x81)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         encoded_const = struct.pack("i", const)
@@ -591,14 +831,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # JE rel8
-        value.append(0x74)
-        encoded_amount = struct.pack("b", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.equal, jump_distance,
+                         is_short=True)
 
     def jne(self, jump_distance):
         """Jump if the equals flag is not set.
@@ -609,14 +843,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # 0F 85 cd 	JNE rel32
-        value.extend([0x0F, 0x85])
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.not_equal, jump_distance,
+                         is_short=False)
 
     def jge(self, jump_distance):
         """Jump if the greater or equal flags are set.
@@ -627,14 +855,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # 0F 8D cd 	JGE rel32
-        value.extend([0x0F, 0x8D])
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.greater_or_equal, jump_distance,
+                         is_short=False)
 
     def jle(self, jump_distance):
         """Jump if the less or equal flags are set.
@@ -645,14 +867,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # 0F 8E cw 	JLE rel32
-        value.extend([0x0F, 0x8E])
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.less_or_equal, jump_distance,
+                         is_short=False)
 
     def jg(self, jump_distance):
         """Jump if the greater flags are set.
@@ -663,14 +879,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # 0F 8F cd 	JG rel32
-        value.extend([0x0F, 0x8F])
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.greater, jump_distance,
+                         is_short=False)
 
     def jl(self, jump_distance):
         """Jump if the less flags are set.
@@ -681,14 +891,8 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code
         """
-        value = bytearray()
-
-        # 0F 8C cd 	JL rel32
-        value.extend([0x0F, 0x8C])
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
-
-        return value
+        return self.jump(JumpCondition.less, jump_distance,
+                         is_short=False)
 
     def jmp(self, jump_distance):
         """Jump.
@@ -699,12 +903,41 @@ class X64Assembler(Assembler):
         Returns:
             bytearray: the machine code #noqa I202
         """
+        return self.jump(JumpCondition.always, jump_distance,
+                         is_short=False)
+
+    def jump(self, condition, jump_distance, is_short):
+        """Jump if the condition holds, with a short or a near distance.
+
+        Args:
+            condition (JumpCondition): the condition of the flags to jump
+            jump_distance (int): the distance to jump in bytes, from the end
+                of the jump instruction
+            is_short (bool): True to encode the distance in a single byte
+
+        Returns:
+            bytearray: the machine code
+        """
         value = bytearray()
 
-        # JMP rel32
-        value.append(0xe9)
-        encoded_amount = struct.pack("i", jump_distance)
-        value += encoded_amount
+        if condition == JumpCondition.always:
+            if is_short:
+                # EB cb  JMP rel8
+                value.append(0xEB)
+            else:
+                # E9 cd  JMP rel32
+                value.append(0xE9)
+        elif is_short:
+            # 7x cb  Jcc rel8
+            value.append(0x70 + CONDITION_CODES[condition])
+        else:
+            # 0F 8x cd  Jcc rel32
+            value.extend([0x0F, 0x80 + CONDITION_CODES[condition]])
+
+        if is_short:
+            value += struct.pack("b", jump_distance)
+        else:
+            value += struct.pack("i", jump_distance)
 
         return value
 
@@ -721,14 +954,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.append(0x21)  # AND r/m32, r32
         rm = get_register_encoding(destination)
         reg = get_register_encoding(source)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x21)  # AND r/m32, r32
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -746,14 +980,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.append(0x09)  # OR r/m32, r32
         rm = get_register_encoding(destination)
         reg = get_register_encoding(source)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x09)  # OR r/m32, r32
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -771,14 +1006,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.append(0x31)  # XOR r/m32, r32
         rm = get_register_encoding(destination)
         reg = get_register_encoding(source)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x31)  # XOR r/m32, r32
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -795,14 +1031,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.append(0xf7)  # F7 /2 	NOT r/m32
         rm = get_register_encoding(destination)
         reg = 2  # F7 /2 	NOT r/m32
+        value += get_rex_prefix(rm=rm)
+        value.append(0xf7)  # F7 /2 	NOT r/m32
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -820,14 +1057,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.append(0x85)  # TEST r/m32, r32
         rm = get_register_encoding(destination)
         reg = get_register_encoding(source)
+        value += get_rex_prefix(reg, rm)
+        value.append(0x85)  # TEST r/m32, r32
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         # clean the destination register, and only if the zero flag is set
@@ -851,14 +1089,15 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.extend([0x0F, 0x95])  # SETNZ r/m8
         rm = get_register_encoding(destination)
         reg = 0  # don't care
+        value += get_rex_prefix(rm=rm, is_byte_register=True)
+        value.extend([0x0F, 0x95])  # SETNZ r/m8
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
@@ -876,12 +1115,13 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
         # 89 /r 	MOV r/m32,r32
-        value.append(0x89)
-
         rm = 5  # disp32
         reg = get_register_encoding(register)
+        value += get_rex_prefix(reg=reg)
+        value.append(0x89)
+
         mod = 0b00
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
         displacement_offset = len(value)
         encoded_displacement = struct.pack("i", displacement)
@@ -903,12 +1143,13 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
         # 8B /r 	MOV r32,r/m32
-        value.append(0x8b)
-
         rm = 5  # disp32
         reg = get_register_encoding(register)
+        value += get_rex_prefix(reg=reg)
+        value.append(0x8b)
+
         mod = 0b00
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
         displacement_offset = len(value)
         encoded_displacement = struct.pack("i", displacement)
@@ -928,18 +1169,38 @@ class X64Assembler(Assembler):
         """
         value = bytearray()
 
-        value.extend([0x0F, 0xB6])  # MOVZX r32, r/m8
         rm = get_register_encoding(source)
         reg = get_register_encoding(destination)
+        value += get_rex_prefix(reg, rm, is_byte_register=True)
+        value.extend([0x0F, 0xB6])  # MOVZX r32, r/m8
         # ModR_byte encoded operands ( ModR/M Byte) MOD 11, RM source and
         # REG destination
 
         mod = 0b11
-        modr_byte = (mod << 6) + (reg << 3) + (rm << 0)
+        modr_byte = get_modrm_byte(mod, reg, rm)
         value.append(modr_byte)
 
         return value
 
+    def movsxd(self, source, destination):
+        """Sign extend the 32 bit source to the 64 bit destination.
+
+        Args:
+            source (ProcessorRegister): the source register
+            destination (ProcessorRegister): the destination register
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        mod = 0b11
+        rm = get_register_encoding(source)
+        reg = get_register_encoding(destination)
+        value += get_rex_prefix(reg, rm, is_64_bit=True)
+        value.append(0x63)  # MOVSXD r64, r/m32
+        value.append(get_modrm_byte(mod, reg, rm))
+        return value
+
     def call(self, displacement):
         """call the symbol with the specified displacement
 
@@ -960,3 +1221,15 @@ class X64Assembler(Assembler):
         encoded_displacement = struct.pack("i", displacement)
         value += encoded_displacement
         return value, displacement_offset
+
+    def syscall(self):
+        """Call the operating system, the number of the call is in the
+        accumulator.
+
+        Returns:
+            bytearray: the machine code
+        """
+        value = bytearray()
+        # 0F 05 	SYSCALL
+        value.extend([0x0f, 0x05])
+        return value
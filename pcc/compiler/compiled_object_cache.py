@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import copy
+import hashlib
+import json
+import threading
+
+from pcc.AST.array_declaration import ArrayDeclaration
+from pcc.AST.functions.function_declaration import FunctionDeclaration
+from pcc.AST.functions.function_definition import FunctionDefinition
+from pcc.AST.variables.variable_declaration import VariableDeclaration
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def get_declaration_signature(statement):
+    """Get the part of a top level statement that other statements use.
+
+    The code of a function depends on the types of the global variables
+    and the functions it uses, not on their initializers or bodies.
+
+    Args:
+        statement (Statement): a statement of the root node
+
+    Returns:
+        str: the signature, None if the statement declares nothing
+    """
+    if isinstance(statement, FunctionDefinition):
+        return str(statement.statement_sequence[0])
+    if isinstance(statement, FunctionDeclaration):
+        return str(statement)
+    if isinstance(statement, VariableDeclaration):
+        return '%s %s %s' % (statement.name, statement.variable_type.name,
+                             statement.is_extern)
+    if isinstance(statement, ArrayDeclaration):
+        return '%s %s[%s]' % (statement.name, statement.variable_type.name,
+                              statement.array_size)
+    return None
+
+
+def is_cacheable(statement):
+    """Check if the compiled version of a statement can be cached.
+
+    Args:
+        statement (Statement): a statement of the root node
+
+    Returns:
+        bool: True for function definitions and global variables
+    """
+    return isinstance(statement, (FunctionDefinition, VariableDeclaration))
+
+
+class CompiledObjectCache:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        """Create a cache for the compiled top level statements.
+
+        A function definition or a global variable is compiled again only
+        if it changed, or if the declarations it might use changed. The
+        least recently used entries are dropped when the cache is full.
+
+        Args:
+            max_entries (int): the maximum number of cached statements
+        """
+        self.max_entries = max_entries
+        # fingerprint -> compiled object, the least recently used first
+        self.entries = collections.OrderedDict()
+        # the compile server compiles in several threads
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_context_fingerprint(root_node, options):
+        """Get the fingerprint of what all the top level statements share.
+
+        Args:
+            root_node (AstNode): the root node of the ast
+            options (dict): the command-line options that change the
+                generated code
+
+        Returns:
+            str: the fingerprint
+        """
+        signatures = [get_declaration_signature(statement)
+                      for statement in root_node.statement_sequence]
+        context = [sorted(options.items()),
+                   [signature for signature in signatures
+                    if signature is not None]]
+        return hashlib.sha256(json.dumps(context).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_fingerprint(statement, context_fingerprint):
+        """Get the fingerprint of a top level statement.
+
+        Args:
+            statement (Statement): the statement
+            context_fingerprint (str): the fingerprint of the declarations
+                and the options, from get_context_fingerprint
+
+        Returns:
+            str: the fingerprint
+        """
+        digest = hashlib.sha256(context_fingerprint.encode('utf-8'))
+        digest.update(str(statement).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, fingerprint):
+        """Get a compiled statement.
+
+        Args:
+            fingerprint (str): the fingerprint of the statement
+
+        Returns:
+            CompiledObject: a copy of the compiled statement, None if it is
+                not cached
+        """
+        with self.lock:
+            compiled_object = self.entries.get(fingerprint)
+            if compiled_object is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(fingerprint)
+            self.hits += 1
+        # the relocation objects are updated by the users of the object
+        return copy.deepcopy(compiled_object)
+
+    def put(self, fingerprint, compiled_object):
+        """Cache a compiled statement.
+
+        Args:
+            fingerprint (str): the fingerprint of the statement
+            compiled_object (CompiledObject): the compiled statement
+        """
+        compiled_object = copy.deepcopy(compiled_object)
+        with self.lock:
+            self.entries[fingerprint] = compiled_object
+            self.entries.move_to_end(fingerprint)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+_compiled_object_cache = None
+
+
+def get_compiled_object_cache():
+    """Get the cache of the compiled statements shared by the whole process.
+
+    Returns:
+        CompiledObjectCache: the shared cache
+    """
+    global _compiled_object_cache
+    if _compiled_object_cache is None:
+        _compiled_object_cache = CompiledObjectCache()
+    return _compiled_object_cache
@@ -3,22 +3,36 @@
 
 
 from pcc.AST.ast_node import AstNode
+from pcc.AST.compiled_object import CompiledObjectType
 from pcc.compiler.assembler_x64 import X64Assembler
+from pcc.compiler.compiled_object_cache import get_compiled_object_cache, \
+    is_cacheable
 from pcc.compiler.objectFile import ObjectFile, Symbol
+from pcc.compiler.peephole import optimize
 
 
 class Compiler:
 
-    def __init__(self, input_file_name, ast_root_node):
+    def __init__(self, input_file_name, ast_root_node, options=None,
+                 compiled_object_cache=None):
         """Create a compiler object.
 
         Args:
             input_file_name (str): the file name as string
             ast_root_node (AstNode): the root node of the ast
+            options (dict, optional): the command-line options that change
+                the generated code
+            compiled_object_cache (CompiledObjectCache, optional): the cache
+                of the compiled top level statements, by default the cache
+                shared by the whole process
         """
 
         self.input_file_name = input_file_name
         self.ast_root_node = ast_root_node
+        self.options = options or {}
+        if compiled_object_cache is None:
+            compiled_object_cache = get_compiled_object_cache()
+        self.compiled_object_cache = compiled_object_cache
         self.object_file = ObjectFile(self.input_file_name)
         self.assembler = X64Assembler()
 
@@ -28,14 +42,63 @@ class Compiler:
         """
         if not isinstance(self.ast_root_node, AstNode):
             return
+        context_fingerprint = \
+            self.compiled_object_cache.get_context_fingerprint(
+                self.ast_root_node, self.options)
         for statement in self.ast_root_node.statement_sequence:
-            compiled_object = statement.compile(self.assembler)
+            compiled_object = self.compile_statement(statement,
+                                                     context_fingerprint)
             if compiled_object:
                 symbol = Symbol(compiled_object.name, compiled_object.value,
                                 compiled_object.size, compiled_object.type,
                                 compiled_object.relocation_objects)
                 self.object_file.add_symbol(symbol)
 
+    def compile_statement(self, statement, context_fingerprint):
+        """Compile a top level statement, unless it is cached.
+
+        Args:
+            statement (Statement): the statement to compile
+            context_fingerprint (str): the fingerprint of the declarations
+                and the options
+
+        Returns:
+            CompiledObject: the compiled statement, None if it has no code
+                or data
+        """
+        if not is_cacheable(statement):
+            return self.compile_and_optimize(statement)
+        fingerprint = self.compiled_object_cache.get_fingerprint(
+            statement, context_fingerprint)
+        compiled_object = self.compiled_object_cache.get(fingerprint)
+        if compiled_object is None:
+            compiled_object = self.compile_and_optimize(statement)
+            if compiled_object:
+                self.compiled_object_cache.put(fingerprint, compiled_object)
+        return compiled_object
+
+    def compile_and_optimize(self, statement):
+        """Compile a top level statement, with the optimizations of the
+        optimization level.
+
+        Args:
+            statement (Statement): the statement to compile
+
+        Returns:
+            CompiledObject: the compiled statement, None if it has no code
+                or data
+        """
+        compiled_object = statement.compile(self.assembler)
+        if compiled_object and \
+                compiled_object.type == CompiledObjectType.code and \
+                self.options.get('optimization_level', 0) >= 1:
+            compiled_object.value, compiled_object.relocation_objects = \
+                optimize(compiled_object.value,
+                         compiled_object.relocation_objects,
+                         self.assembler)
+            compiled_object.size = len(compiled_object.value)
+        return compiled_object
+
     def write_object_file_to_file(self, file_name):
         """Write the object file to a binary file.
 
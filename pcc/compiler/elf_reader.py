@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import mmap
+import struct
+
+from pcc.compiler.objectFile import ELF_HEADER, ElfHeader, \
+    RelocationTableEntry, SECTION_HEADER, Section, SectionType, \
+    SymbolTableEntry
+
+# the symbol and the relocation table entries are 3 words, they are read as
+# words to create the entries of the object file model
+ENTRY_WORDS = struct.Struct('<QQQ')
+# a relocation table entry without addend
+RELOCATION_WORDS = struct.Struct('<QQ')
+
+ELF_MAGIC = b'\x7fELF'
+
+
+class ElfReader:
+
+    def __init__(self, data, mapped_file=None):
+        """Create a reader of an elf file in a buffer.
+
+        Nothing is decoded up front, the sections, the symbols and the
+        relocations are read from the buffer when they are asked for.
+
+        Args:
+            data (bytes): the content of the elf file, any object that
+                supports the buffer protocol and find
+            mapped_file (mmap.mmap, optional): the mapping the data is
+                from, closed with the reader
+
+        Raises:
+            ValueError: if the data is no 64 bit elf file
+        """
+        self.buffer = data
+        self.data = memoryview(data)
+        self.mapped_file = mapped_file
+        if len(self.data) < ELF_HEADER.size or \
+                self.data[:len(ELF_MAGIC)] != ELF_MAGIC:
+            self.close()
+            raise ValueError('no elf file')
+        self.header = self.read_elf_header()
+        self._sections = None
+        self._section_indexes = None
+
+    @staticmethod
+    def open(file_name):
+        """Create a reader of an elf file, mapped in memory.
+
+        Args:
+            file_name (str): the name of the file
+
+        Returns:
+            ElfReader: the reader, to close when done
+
+        Raises:
+            ValueError: if the file is no 64 bit elf file
+        """
+        with open(file_name, 'rb') as file:
+            try:
+                mapped_file = mmap.mmap(file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file can not be mapped
+                raise ValueError('no elf file')
+        return ElfReader(mapped_file, mapped_file)
+
+    def close(self):
+        """Release the buffer and close the mapping of the file.
+
+        The views returned by get_section_data have to be released first.
+        """
+        self.data.release()
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def read_elf_header(self):
+        """Read the elf header.
+
+        Returns:
+            ElfHeader: the header
+        """
+        header = ElfHeader(obj_type=None)
+        identification, header.e_type, header.e_machine, header.e_version, \
+            header.e_entry, header.e_phoff, header.e_shoff, \
+            header.e_flags, header.e_ehsize, header.e_phentsize, \
+            header.e_phnum, header.e_shentsize, header.e_shnum, \
+            header.e_shstrndx = ELF_HEADER.unpack_from(self.data)
+        header.e_ident = list(identification)
+        return header
+
+    def read_section_header(self, index):
+        """Read a section header, the content of the section is not read.
+
+        Args:
+            index (int): the index of the section
+
+        Returns:
+            Section: the section, without name
+        """
+        offset = self.header.e_shoff + index * self.header.e_shentsize
+        name_offset, section_type, flags, address, section_offset, size, \
+            link, info, alignment, entry_size = \
+            SECTION_HEADER.unpack_from(self.data, offset)
+        section = Section('', name_offset, section_type, [flags])
+        section.address = address
+        section.offset = section_offset
+        section.size = size
+        section.link = link
+        section.info = info
+        section.alignment = alignment
+        section.entry_size = entry_size
+        return section
+
+    @property
+    def sections(self):
+        """The sections, with their names, read the first time they are
+        used.
+
+        Returns:
+            List[Section]: the sections
+        """
+        if self._sections is None:
+            sections = [self.read_section_header(index)
+                        for index in range(self.header.e_shnum)]
+            if self.header.e_shstrndx < len(sections):
+                names = sections[self.header.e_shstrndx]
+                for section in sections:
+                    section.name = self.get_string(names,
+                                                   section.name_offset)
+            self._sections = sections
+        return self._sections
+
+    def get_section_index(self, name):
+        """Get the section index from the name.
+
+        Args:
+            name (str): the section name
+
+        Returns:
+            int: the index of the first section with the name, -1 if there
+                is none
+        """
+        if self._section_indexes is None:
+            self._section_indexes = {}
+            for index, section in enumerate(self.sections):
+                self._section_indexes.setdefault(section.name, index)
+        return self._section_indexes.get(name, -1)
+
+    def get_section(self, name):
+        """Get the section from the name.
+
+        Args:
+            name (str): the section name
+
+        Returns:
+            Section: the requested section if found, else None
+        """
+        index = self.get_section_index(name)
+        if index == -1:
+            return None
+        return self.sections[index]
+
+    def get_section_data(self, section):
+        """Get the content of a section, without copying it.
+
+        Args:
+            section (Section): the section
+
+        Returns:
+            memoryview: the content, empty for a section without content in
+                the file
+        """
+        if section.section_type == SectionType.SHT_NOBITS:
+            return self.data[0:0]
+        return self.data[section.offset:section.offset + section.size]
+
+    def get_string(self, string_table, offset):
+        """Get a string of a string table.
+
+        Args:
+            string_table (Section): the string table
+            offset (int): the offset of the string in the table
+
+        Returns:
+            str: the string up to the closing null character
+        """
+        start = string_table.offset + offset
+        end = self.buffer.find(b'\0', start,
+                               string_table.offset + string_table.size)
+        if end == -1:
+            end = string_table.offset + string_table.size
+        return str(self.data[start:end], 'utf-8')
+
+    def iter_entries(self, section, entry_class):
+        """Read the entries of a symbol or relocation table one by one.
+
+        Args:
+            section (Section): the table
+            entry_class (type): the class of the entries
+
+        Returns:
+            Iterator[object]: the entries
+        """
+        with self.get_section_data(section) as section_data:
+            for words in ENTRY_WORDS.iter_unpack(section_data):
+                yield entry_class.from_words(*words)
+
+    def iter_symbols(self, section=None):
+        """Read the entries of a symbol table one by one.
+
+        Args:
+            section (Section, optional): the symbol table, the .symtab
+                section if not given
+
+        Returns:
+            Iterator[SymbolTableEntry]: the entries
+        """
+        if section is None:
+            section = self.get_section('.symtab')
+        return self.iter_entries(section, SymbolTableEntry)
+
+    def get_symbol_name(self, symbol_table, symbol):
+        """Get the name of a symbol.
+
+        Args:
+            symbol_table (Section): the symbol table of the symbol
+            symbol (SymbolTableEntry): the symbol
+
+        Returns:
+            str: the name
+        """
+        return self.get_string(self.sections[symbol_table.link],
+                               symbol.st_name)
+
+    def iter_relocations(self, section):
+        """Read the entries of a relocation table one by one.
+
+        Args:
+            section (Section): the relocation table
+
+        Returns:
+            Iterator[RelocationTableEntry]: the entries, with addend 0 for
+                a table without addends
+        """
+        if section.section_type != SectionType.SHT_REL:
+            return self.iter_entries(section, RelocationTableEntry)
+        return self.iter_relocations_without_addend(section)
+
+    def iter_relocations_without_addend(self, section):
+        with self.get_section_data(section) as section_data:
+            for offset, info in RELOCATION_WORDS.iter_unpack(section_data):
+                yield RelocationTableEntry(offset, info, 0)
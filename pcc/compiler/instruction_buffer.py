@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from pcc.compiler.assembler import JumpCondition
+
+
+class Label:
+
+    def __init__(self, name):
+        """Create a label, a position in the code to jump to.
+
+        Args:
+            name (str): the name of the label, only used in errors
+        """
+        self.name = name
+        # the index of the fragment that starts at the label
+        self.fragment_index = None
+
+
+class CodeFragment:
+
+    def __init__(self, code, relocation_objects):
+        """Create a fragment of machine code.
+
+        Args:
+            code (bytearray): the machine code
+            relocation_objects (List[RelocationObject]): the relocation
+                objects, with an offset relative to the start of the code
+        """
+        self.code = code
+        self.relocation_objects = relocation_objects
+
+
+class JumpFragment:
+
+    def __init__(self, condition, label):
+        """Create a jump to a label.
+
+        A jump starts with the short encoding, it only gets the near
+        encoding if the label is too far away.
+
+        Args:
+            condition (JumpCondition): the condition to jump
+            label (Label): the label to jump to
+        """
+        self.condition = condition
+        self.label = label
+        self.is_short = True
+
+
+class InstructionBuffer:
+
+    def __init__(self, assembler):
+        """Create a buffer for machine code with jumps to labels.
+
+        The distance of a jump is only known once all the code up to its
+        label is added, so the jumps are encoded when the code is resolved.
+
+        Args:
+            assembler (Assembler): the assembler to encode the jumps
+        """
+        self.assembler = assembler
+        self.fragments = []
+        # (condition, is_short) -> the size of the jump instruction
+        self.jump_sizes = {}
+
+    def create_label(self, name):
+        """Create a label, to place in the code later.
+
+        Args:
+            name (str): the name of the label
+
+        Returns:
+            Label: the label
+        """
+        return Label(name)
+
+    def place_label(self, label):
+        """Place a label at the end of the code added so far.
+
+        Args:
+            label (Label): the label to place
+        """
+        label.fragment_index = len(self.fragments)
+
+    def append(self, code, relocation_objects=None):
+        """Add machine code.
+
+        Args:
+            code (bytearray): the machine code
+            relocation_objects (List[RelocationObject], optional): the
+                relocation objects of the code, with an offset relative to
+                the start of the code
+        """
+        self.fragments.append(CodeFragment(code, relocation_objects or []))
+
+    def jump(self, condition, label):
+        """Add a jump to a label.
+
+        Args:
+            condition (JumpCondition): the condition to jump
+            label (Label): the label to jump to
+        """
+        self.fragments.append(JumpFragment(condition, label))
+
+    def je(self, label):
+        """Jump to a label if the equals flag is set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.equal, label)
+
+    def jne(self, label):
+        """Jump to a label if the equals flag is not set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.not_equal, label)
+
+    def jl(self, label):
+        """Jump to a label if the less flags are set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.less, label)
+
+    def jle(self, label):
+        """Jump to a label if the less or equal flags are set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.less_or_equal, label)
+
+    def jg(self, label):
+        """Jump to a label if the greater flags are set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.greater, label)
+
+    def jge(self, label):
+        """Jump to a label if the greater or equal flags are set.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.greater_or_equal, label)
+
+    def jmp(self, label):
+        """Jump to a label.
+
+        Args:
+            label (Label): the label to jump to
+        """
+        self.jump(JumpCondition.always, label)
+
+    def get_size(self, fragment):
+        """Get the size of a fragment with its current encoding.
+
+        Args:
+            fragment (Union[CodeFragment, JumpFragment]): the fragment
+
+        Returns:
+            int: the size in bytes
+        """
+        if isinstance(fragment, CodeFragment):
+            return len(fragment.code)
+        key = (fragment.condition, fragment.is_short)
+        if key not in self.jump_sizes:
+            self.jump_sizes[key] = len(self.assembler.jump(
+                fragment.condition, 0, fragment.is_short))
+        return self.jump_sizes[key]
+
+    def get_offsets(self):
+        """Get the offset of every fragment with the current encodings.
+
+        Returns:
+            List[int]: the offsets, with the size of the code at the end
+        """
+        offsets = [0]
+        for fragment in self.fragments:
+            offsets.append(offsets[-1] + self.get_size(fragment))
+        return offsets
+
+    def get_jump_distance(self, index, offsets):
+        """Get the distance of a jump, from the end of the jump.
+
+        Args:
+            index (int): the index of the jump fragment
+            offsets (List[int]): the offsets of the fragments
+
+        Returns:
+            int: the distance in bytes
+
+        Raises:
+            ValueError: if the label of the jump is not placed
+        """
+        label = self.fragments[index].label
+        if label.fragment_index is None:
+            raise ValueError('label %s is not placed' % label.name)
+        return offsets[label.fragment_index] - offsets[index + 1]
+
+    def relax_jumps(self):
+        """Choose the encoding of every jump.
+
+        All the jumps start short. A jump that can not reach its label
+        becomes near, which moves the code after it, so the distances are
+        checked again until no jump changes. Jumps only grow, so this ends.
+
+        Returns:
+            List[int]: the offsets of the fragments with the final encodings
+        """
+        while True:
+            offsets = self.get_offsets()
+            is_changed = False
+            for index, fragment in enumerate(self.fragments):
+                if not isinstance(fragment, JumpFragment) or \
+                        not fragment.is_short:
+                    continue
+                distance = self.get_jump_distance(index, offsets)
+                if not -128 <= distance <= 127:
+                    fragment.is_short = False
+                    is_changed = True
+            if not is_changed:
+                return offsets
+
+    def resolve(self):
+        """Encode the jumps and join all the code.
+
+        Returns:
+            bytearray: the machine code
+            List[RelocationObject]: the relocation objects, with an offset
+                relative to the start of the code
+        """
+        offsets = self.relax_jumps()
+        value = bytearray()
+        relocation_objects = []
+        for index, fragment in enumerate(self.fragments):
+            if isinstance(fragment, CodeFragment):
+                for relocation_object in fragment.relocation_objects:
+                    relocation_object.offset += len(value)
+                    relocation_objects.append(relocation_object)
+                value += fragment.code
+            else:
+                distance = self.get_jump_distance(index, offsets)
+                value += self.assembler.jump(fragment.condition, distance,
+                                             fragment.is_short)
+        return value, relocation_objects
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import os
+import struct
+
+import pcc
+from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.assembler_x64 import X64Assembler
+from pcc.compiler.elf_reader import ElfReader
+from pcc.compiler.objectFile import ELF_HEADER, ElfHeader, \
+    ObjectFileType, PROGRAM_HEADER, ProgramHeader, RelocationType, \
+    SECTION_HEADER, Section, SectionFlags, SectionType, SegmentFlags, \
+    SegmentType, SpecialSymbolIndex, StringTable, SymbolBinding
+
+# the address the executable is loaded at, the one of the gnu linker
+BASE_ADDRESS = 0x400000
+PAGE_SIZE = 0x1000
+TEXT_ALIGNMENT = 16
+
+ENTRY_POINT_NAME = '_start'
+MAIN_NAME = 'main'
+# the linux system call that ends the process
+EXIT_SYSTEM_CALL = 60
+
+# the field a relocation writes and if it is relative to its address
+RELOCATION_FIELDS = {
+    RelocationType.R_X86_64_64: (struct.Struct('<Q'), False),
+    RelocationType.R_X86_64_PC32: (struct.Struct('<i'), True),
+    RelocationType.R_X86_64_PLT32: (struct.Struct('<i'), True),
+    RelocationType.R_X86_64_32: (struct.Struct('<I'), False),
+    RelocationType.R_X86_64_32S: (struct.Struct('<i'), False),
+}
+
+
+def align(value, alignment):
+    """Round a value up to a multiple of the alignment.
+
+    Args:
+        value (int): the value
+        alignment (int): the alignment, 0 or 1 for none
+
+    Returns:
+        int: the aligned value
+    """
+    if alignment > 1:
+        value += -value % alignment
+    return value
+
+
+def get_entry_point_code(assembler):
+    """Get the code that runs main and exits with its result.
+
+    Args:
+        assembler (Assembler): the assembler to use
+
+    Returns:
+        bytearray: the machine code
+        int: the offset of the displacement of the call of main
+    """
+    # the stack is 16 byte aligned at the entry point, the call leaves it
+    # as a function expects it
+    value, displacement_offset = assembler.call(0)
+    value += assembler.copy_from_reg_to_reg(
+        source=ProcessorRegister.accumulator,
+        destination=ProcessorRegister.integer_argument_0)
+    value += assembler.copy_value_to_reg(EXIT_SYSTEM_CALL,
+                                         ProcessorRegister.accumulator)
+    value += assembler.syscall()
+    return value, displacement_offset
+
+
+class InputObjectFile:
+
+    def __init__(self, file_name, reader):
+        """Create an object file that is linked.
+
+        Args:
+            file_name (str): the name of the file
+            reader (ElfReader): the reader of the file
+        """
+        self.file_name = file_name
+        self.reader = reader
+        self.symbol_table = reader.get_section('.symtab')
+        self.symbols = []
+        if self.symbol_table is not None:
+            self.symbols = list(reader.iter_symbols(self.symbol_table))
+        # the output section and the offset in it of the input sections
+        # that are loaded, by index
+        self.section_placements = {}
+
+    def get_symbol_name(self, symbol):
+        return self.reader.get_symbol_name(self.symbol_table, symbol)
+
+
+class Linker:
+
+    def __init__(self):
+        """Create a static linker of relocatable object files to an
+        executable file.
+        """
+        self.input_object_files = []
+        self.assembler = X64Assembler()
+        entry_point_code, self.main_call_offset = \
+            get_entry_point_code(self.assembler)
+
+        no_flags = [SectionFlags.SHF_NONE]
+        ax_flags = [SectionFlags.SHF_ALLOC, SectionFlags.SHF_EXECINSTR]
+        wa_flags = [SectionFlags.SHF_ALLOC, SectionFlags.SHF_WRITE]
+        self.section_string_table = StringTable()
+        self.sections = [
+            Section('none', self.section_string_table.add(''),
+                    SectionType.SHT_NULL, no_flags),
+            Section('.text', self.section_string_table.add('.text'),
+                    SectionType.SHT_PROGBITS, ax_flags),
+            Section('.data', self.section_string_table.add('.data'),
+                    SectionType.SHT_PROGBITS, wa_flags),
+            Section('.bss', self.section_string_table.add('.bss'),
+                    SectionType.SHT_NOBITS, wa_flags),
+            Section('.shstrtab', self.section_string_table.add('.shstrtab'),
+                    SectionType.SHT_STRTAB, no_flags),
+        ]
+        self.sections[0].clear()
+        self.text, self.data, self.bss = self.sections[1:4]
+        self.text.alignment = TEXT_ALIGNMENT
+        self.text.fill(entry_point_code)
+        self.bss.size = 0
+
+        # the address and the binding of the defined global symbols
+        self.global_symbols = {}
+        self.program_headers = []
+        self.error_count = 0
+
+    def error(self, file_name, message):
+        pcc.utils.warning.error(file_name, line_number=-1, message=message)
+        self.error_count += 1
+
+    def get_output_section(self, section):
+        """Get the output section for the content of an input section.
+
+        Args:
+            section (Section): the input section
+
+        Returns:
+            Section: the output section, None if the input section is not
+                loaded
+        """
+        flags = section.flags[0]
+        if not flags & SectionFlags.SHF_ALLOC:
+            return None
+        if section.section_type == SectionType.SHT_NOBITS:
+            return self.bss
+        if flags & SectionFlags.SHF_WRITE:
+            return self.data
+        return self.text
+
+    def add_object_file(self, file_name, reader):
+        """Add the loaded sections of an object file to the output sections.
+
+        Args:
+            file_name (str): the name of the object file
+            reader (ElfReader): the reader of the object file
+        """
+        object_file = InputObjectFile(file_name, reader)
+        for index, section in enumerate(reader.sections):
+            output_section = self.get_output_section(section)
+            if output_section is None:
+                continue
+            output_section.alignment = max(output_section.alignment,
+                                           section.alignment)
+            if output_section is self.bss:
+                offset = align(self.bss.size, section.alignment)
+                self.bss.size = offset + section.size
+            else:
+                content = output_section.section_content
+                offset = align(len(content), section.alignment)
+                content.extend(bytes(offset - len(content)))
+                with reader.get_section_data(section) as section_data:
+                    content += section_data
+            object_file.section_placements[index] = output_section, offset
+        self.input_object_files.append(object_file)
+
+    def place_segments(self):
+        """Place the output sections in the file and in memory, the code in
+        a read only segment with the headers, the data and the bss after it
+        in a writable one.
+        """
+        text_segment = ProgramHeader(SegmentType.PT_LOAD,
+                                     [SegmentFlags.PF_R, SegmentFlags.PF_X])
+        self.program_headers = [text_segment]
+        data_segment = None
+        data_size = len(self.data.section_content)
+        if data_size or self.bss.size:
+            data_segment = ProgramHeader(
+                SegmentType.PT_LOAD, [SegmentFlags.PF_R, SegmentFlags.PF_W])
+            self.program_headers.append(data_segment)
+
+        headers_size = ELF_HEADER.size + \
+            len(self.program_headers) * PROGRAM_HEADER.size
+        self.text.offset = align(headers_size, self.text.alignment)
+        self.text.address = BASE_ADDRESS + self.text.offset
+        text_segment.address = BASE_ADDRESS
+        text_segment.file_size = text_segment.memory_size = \
+            self.text.offset + len(self.text.section_content)
+        text_segment.alignment = PAGE_SIZE
+
+        self.data.offset = text_segment.file_size
+        if data_segment is not None:
+            # the writable data starts on a page of its own
+            self.data.offset = align(self.data.offset, PAGE_SIZE)
+        self.data.address = BASE_ADDRESS + self.data.offset
+        self.bss.offset = self.data.offset + data_size
+        self.bss.address = align(self.data.address + data_size,
+                                 self.bss.alignment)
+        if data_segment is not None:
+            data_segment.offset = self.data.offset
+            data_segment.address = self.data.address
+            data_segment.file_size = data_size
+            data_segment.memory_size = \
+                self.bss.address + self.bss.size - self.data.address
+            data_segment.alignment = PAGE_SIZE
+
+    def get_symbol_address(self, object_file, symbol):
+        """Get the address of a symbol defined in an object file.
+
+        Args:
+            object_file (InputObjectFile): the object file
+            symbol (SymbolTableEntry): the symbol
+
+        Returns:
+            int: the address, None if the symbol is not defined in a loaded
+                section
+        """
+        if symbol.st_shndx == SpecialSymbolIndex.SHN_ABS:
+            return symbol.st_value
+        placement = object_file.section_placements.get(symbol.st_shndx)
+        if placement is None:
+            return None
+        output_section, offset = placement
+        return output_section.address + offset + symbol.st_value
+
+    def define_global_symbols(self):
+        """Collect the global symbols defined by the object files, a global
+        symbol overrides a weak one.
+        """
+        for object_file in self.input_object_files:
+            for symbol in object_file.symbols:
+                binding = symbol.st_info >> 4
+                if binding == SymbolBinding.STB_LOCAL or \
+                        symbol.st_shndx == SpecialSymbolIndex.SHN_UNDEF:
+                    continue
+                name = object_file.get_symbol_name(symbol)
+                address = self.get_symbol_address(object_file, symbol)
+                if address is None:
+                    self.error(object_file.file_name,
+                               f'symbol {name} is not in a loaded section')
+                    continue
+                defined = self.global_symbols.get(name)
+                if defined is None or defined[1] == SymbolBinding.STB_WEAK:
+                    self.global_symbols[name] = address, binding
+                elif binding != SymbolBinding.STB_WEAK:
+                    self.error(object_file.file_name,
+                               f'multiple definition of {name}')
+
+    def resolve_symbol(self, object_file, symbol_index):
+        """Get the address of a symbol a relocation refers to.
+
+        Args:
+            object_file (InputObjectFile): the object file of the relocation
+            symbol_index (int): the index of the symbol in its symbol table
+
+        Returns:
+            int: the address, None if the symbol is not defined
+        """
+        symbol = object_file.symbols[symbol_index]
+        binding = symbol.st_info >> 4
+        name = object_file.get_symbol_name(symbol)
+        if binding == SymbolBinding.STB_LOCAL:
+            address = self.get_symbol_address(object_file, symbol)
+            if address is None:
+                self.error(object_file.file_name,
+                           f'symbol {name} is not in a loaded section')
+            return address
+        defined = self.global_symbols.get(name)
+        if defined is not None:
+            return defined[0]
+        if binding == SymbolBinding.STB_WEAK:
+            # an undefined weak symbol is 0
+            return 0
+        self.error(object_file.file_name, f'undefined reference to {name}')
+        return None
+
+    def write_field(self, file_name, relocation_type, place, value):
+        """Write the value of a relocation in the output section.
+
+        Args:
+            file_name (str): the object file of the relocation
+            relocation_type (int): the type of the relocation
+            place (Tuple[Section, int]): the output section and the offset
+                of the field in it
+            value (int): the value, S + A
+        """
+        field, is_relative = RELOCATION_FIELDS[relocation_type]
+        output_section, offset = place
+        if is_relative:
+            value -= output_section.address + offset
+        if relocation_type == RelocationType.R_X86_64_64:
+            value &= 0xffffffffffffffff
+        try:
+            field.pack_into(output_section.section_content, offset, value)
+        except struct.error:
+            self.error(file_name, f'relocation of type {relocation_type} '
+                                  f'at offset {offset:#x} overflows')
+
+    def relocate(self, object_file):
+        """Apply the relocations of an object file to the output sections.
+
+        Args:
+            object_file (InputObjectFile): the object file
+        """
+        reader = object_file.reader
+        for section in reader.sections:
+            if section.section_type not in (SectionType.SHT_RELA,
+                                            SectionType.SHT_REL):
+                continue
+            placement = object_file.section_placements.get(section.info)
+            if placement is None:
+                continue
+            output_section, section_offset = placement
+            for entry in reader.iter_relocations(section):
+                relocation_type = entry.info & 0xffffffff
+                if relocation_type == RelocationType.R_X86_64_NONE:
+                    continue
+                if relocation_type not in RELOCATION_FIELDS:
+                    self.error(object_file.file_name,
+                               f'relocation type {relocation_type} is not '
+                               f'supported')
+                    continue
+                address = self.resolve_symbol(object_file, entry.info >> 32)
+                if address is None:
+                    continue
+                self.write_field(object_file.file_name, relocation_type,
+                                 (output_section,
+                                  section_offset + entry.offset),
+                                 address + entry.addend)
+
+    def link(self):
+        """Place the sections and resolve the symbols and the relocations.
+
+        Returns:
+            int: error code, 0 if successful
+        """
+        self.place_segments()
+        self.define_global_symbols()
+        for object_file in self.input_object_files:
+            self.relocate(object_file)
+        main_function = self.global_symbols.get(MAIN_NAME)
+        if main_function is None:
+            self.error(ENTRY_POINT_NAME, f'undefined reference to '
+                                         f'{MAIN_NAME}')
+        else:
+            # the call is relative to the end of its displacement
+            self.write_field(ENTRY_POINT_NAME, RelocationType.R_X86_64_PLT32,
+                             (self.text, self.main_call_offset),
+                             main_function[0] - 4)
+        return 1 if self.error_count else 0
+
+    def to_binary_array(self):
+        """Get the byte array representation of the executable file.
+
+        Returns:
+            bytearray: the binary representation
+        """
+        string_table = self.sections[-1]
+        string_table.fill(self.section_string_table.table)
+        string_table.offset = self.bss.offset
+        section_header_offset = align(
+            string_table.offset + len(string_table.section_content), 8)
+
+        elf_header = ElfHeader(ObjectFileType.EXECUTABLE_FILE)
+        elf_header.e_entry = self.text.address
+        elf_header.set_program_header_table(ELF_HEADER.size,
+                                            len(self.program_headers))
+        elf_header.set_section_offset(section_header_offset)
+        elf_header.set_number_of_sections(len(self.sections))
+        elf_header.set_section_string_index(len(self.sections) - 1)
+
+        byte_array = bytearray(section_header_offset +
+                               len(self.sections) * SECTION_HEADER.size)
+        elf_header.pack_into(byte_array, 0)
+        for i, program_header in enumerate(self.program_headers):
+            program_header.pack_into(byte_array, ELF_HEADER.size +
+                                     i * PROGRAM_HEADER.size)
+        for i, section in enumerate(self.sections):
+            content = section.section_content
+            byte_array[section.offset:section.offset + len(content)] = content
+            section.pack_into(byte_array, section_header_offset +
+                              i * SECTION_HEADER.size)
+        return byte_array
+
+
+def write_executable_file(file_name, byte_array):
+    """Write an executable file, with the permissions of the umask.
+
+    Args:
+        file_name (str): the name of the file
+        byte_array (bytearray): the content of the file
+    """
+    if os.path.lexists(file_name):
+        os.remove(file_name)
+    file_descriptor = os.open(file_name, os.O_WRONLY | os.O_CREAT, 0o777)
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write(byte_array)
+
+
+def link(object_file_names, output_file_name):
+    """Link relocatable object files to a static executable file.
+
+    The code of the object files is loaded after an entry point that calls
+    main and exits the process with its result, no library is linked.
+
+    Args:
+        object_file_names (List[str]): the object files
+        output_file_name (str): the name of the executable file
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    linker = Linker()
+    with contextlib.ExitStack() as stack:
+        for file_name in object_file_names:
+            try:
+                reader = stack.enter_context(ElfReader.open(file_name))
+            except ValueError:
+                linker.error(file_name, 'not an elf object file')
+                continue
+            except OSError as error:
+                linker.error(file_name, error.strerror)
+                continue
+            linker.add_object_file(file_name, reader)
+        if linker.error_count:
+            return 1
+        result = linker.link()
+    if result != 0:
+        return result
+    write_executable_file(output_file_name, linker.to_binary_array())
+    return 0
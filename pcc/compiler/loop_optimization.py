@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from pcc.AST.arithmetic_operators.division import Division
+from pcc.AST.ast import VariableType
+from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.compound_statement import CompoundStatement
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.control_statements.if_statement import IfStatement
+from pcc.AST.control_statements.while_statement import WhileStatement
+from pcc.AST.functions.function_definition import FunctionDefinition
+from pcc.AST.unary_operator import UnaryOperator
+from pcc.AST.variables.assignment import Assignment
+from pcc.AST.variables.variable_declaration import VariableDeclaration
+from pcc.AST.variables.variable_reference import VariableReference
+from pcc.compiler.register_allocator import get_function_variables, \
+    get_integer_variables
+
+# the name of the variable that holds a hoisted expression, the space keeps
+# it apart from the C identifiers
+INVARIANT_NAME = 'loop invariant %d'
+INVARIANT_TYPE = VariableType('int', 4)
+
+
+def get_changed_variables(statement, names):
+    """Get the variables a statement assigns or declares.
+
+    Args:
+        statement (Statement): the statement
+        names (set): the set to add the names of the variables to
+    """
+    if isinstance(statement, Assignment):
+        names.add(statement.id)
+    elif isinstance(statement, VariableDeclaration):
+        names.add(statement.name)
+    elif isinstance(statement, CompoundStatement):
+        for inner_statement in statement.statement_sequence:
+            get_changed_variables(inner_statement, names)
+    elif isinstance(statement, IfStatement):
+        get_changed_variables(statement.if_statement, names)
+        if statement.else_statement:
+            get_changed_variables(statement.else_statement, names)
+    elif isinstance(statement, WhileStatement):
+        get_changed_variables(statement.body_statement, names)
+
+
+class LoopOptimizer:
+
+    def __init__(self, integer_variables):
+        """Create the optimizer of the loops of a function.
+
+        Args:
+            integer_variables (List[str]): the variables an integer
+                expression can be hoisted with, the ones that can be told
+                apart by their name
+        """
+        self.integer_variables = set(integer_variables)
+        self.invariant_count = 0
+        self.statement_visitors = {
+            CompoundStatement: self.visit_compound_statement,
+            IfStatement: self.visit_if_statement,
+            WhileStatement: self.visit_while_statement,
+        }
+
+    def visit_statement(self, statement):
+        visitor = self.statement_visitors.get(type(statement))
+        if visitor is not None:
+            visitor(statement)
+
+    def visit_compound_statement(self, statement):
+        # the declarations of the hoisted expressions are added to the
+        # statement sequence
+        for inner_statement in list(statement.statement_sequence):
+            self.visit_statement(inner_statement)
+
+    def visit_if_statement(self, statement):
+        self.visit_statement(statement.if_statement)
+        if statement.else_statement:
+            self.visit_statement(statement.else_statement)
+
+    def visit_while_statement(self, statement):
+        # the inner loops first, what they hoist might be invariant in this
+        # loop too
+        self.visit_statement(statement.body_statement)
+        statement.is_rotated = True
+        if isinstance(statement.parent_node, CompoundStatement):
+            LoopInvariantHoister(self, statement).hoist()
+
+    def create_invariant(self, expression, loop):
+        """Move an expression to a new variable before a loop.
+
+        Args:
+            expression (Expression): the expression
+            loop (WhileStatement): the loop, in a compound statement
+
+        Returns:
+            VariableReference: the reference to the variable that replaces
+                the expression
+        """
+        name = INVARIANT_NAME % self.invariant_count
+        self.invariant_count += 1
+        self.integer_variables.add(name)
+        parent = loop.parent_node
+        declaration = VariableDeclaration(INVARIANT_TYPE, name, expression,
+                                          loop._depth)
+        declaration.parent_node = parent
+        parent.statement_sequence.insert(
+            parent.statement_sequence.index(loop), declaration)
+        reference = VariableReference(expression._depth, name)
+        reference.parent_node = parent
+        return reference
+
+
+class LoopInvariantHoister:
+
+    def __init__(self, loop_optimizer, loop):
+        """Create the hoister of the invariant expressions of a loop.
+
+        Args:
+            loop_optimizer (LoopOptimizer): the optimizer of the function
+            loop (WhileStatement): the loop
+        """
+        self.loop_optimizer = loop_optimizer
+        self.loop = loop
+        self.changed_variables = set()
+        get_changed_variables(loop, self.changed_variables)
+        self.statement_hoists = {
+            CompoundStatement: self.hoist_compound_statement,
+            IfStatement: self.hoist_if_statement,
+            WhileStatement: self.hoist_while_statement,
+            Assignment: self.hoist_assignment,
+            VariableDeclaration: self.hoist_variable_declaration,
+        }
+
+    def is_invariant(self, expression):
+        """Check if an expression has the same value in every iteration and
+        can be evaluated before the loop.
+
+        Args:
+            expression (Expression): the expression
+
+        Returns:
+            bool: True for an integer expression of constants and variables
+                the loop does not change, that can not trap
+        """
+        if isinstance(expression, ConstantExpression):
+            return expression.get_integer_value() is not None
+        if isinstance(expression, VariableReference):
+            return expression.name in self.loop_optimizer.integer_variables \
+                and expression.name not in self.changed_variables
+        if isinstance(expression, UnaryOperator):
+            return self.is_invariant(expression.operand)
+        if isinstance(expression, BinaryOperator):
+            # a division by a variable might divide by 0
+            if isinstance(expression, Division) and \
+                    expression.get_constant_divisor() is None:
+                return False
+            return self.is_invariant(expression.operand_1) and \
+                self.is_invariant(expression.operand_2)
+        return False
+
+    def hoist_expression(self, expression):
+        """Replace the largest invariant operators of an expression by a
+        variable set before the loop.
+
+        Args:
+            expression (Expression): the expression
+
+        Returns:
+            Expression: the expression with the invariant operators replaced
+        """
+        if isinstance(expression, (BinaryOperator, UnaryOperator)) and \
+                self.is_invariant(expression):
+            return self.loop_optimizer.create_invariant(expression,
+                                                        self.loop)
+        if isinstance(expression, BinaryOperator):
+            expression.operand_1 = self.hoist_expression(expression.operand_1)
+            expression.operand_2 = self.hoist_expression(expression.operand_2)
+        elif isinstance(expression, UnaryOperator):
+            expression.operand = self.hoist_expression(expression.operand)
+        return expression
+
+    def hoist_statement(self, statement):
+        hoist = self.statement_hoists.get(type(statement))
+        if hoist is not None:
+            hoist(statement)
+
+    def hoist_compound_statement(self, statement):
+        for inner_statement in statement.statement_sequence:
+            self.hoist_statement(inner_statement)
+
+    def hoist_if_statement(self, statement):
+        statement.condition = self.hoist_expression(statement.condition)
+        self.hoist_statement(statement.if_statement)
+        if statement.else_statement:
+            self.hoist_statement(statement.else_statement)
+
+    def hoist_while_statement(self, statement):
+        statement.condition = self.hoist_expression(statement.condition)
+        self.hoist_statement(statement.body_statement)
+
+    def hoist_assignment(self, statement):
+        # only the integer expressions are hoisted
+        if statement.id in self.loop_optimizer.integer_variables:
+            statement.initializer_exp = self.hoist_expression(
+                statement.initializer_exp)
+
+    def hoist_variable_declaration(self, statement):
+        if statement.initializer and \
+                statement.name in self.loop_optimizer.integer_variables:
+            statement.initializer = self.hoist_expression(
+                statement.initializer)
+
+    def hoist(self):
+        """Hoist the invariant expressions of the condition and the body of
+        the loop.
+        """
+        self.hoist_while_statement(self.loop)
+
+
+def optimize_loops(root_node):
+    """Optimize the while loops of all the functions.
+
+    The condition of a loop is moved after the body, so an iteration only
+    runs one conditional jump, and the integer expressions that do not
+    change in the loop are evaluated once before it.
+
+    Args:
+        root_node (AstNode): the root node of the ast
+    """
+    for statement in root_node.statement_sequence:
+        if isinstance(statement, FunctionDefinition) and \
+                len(statement.statement_sequence) > 1:
+            integer_variables = get_integer_variables(
+                get_function_variables(statement))
+            loop_optimizer = LoopOptimizer(
+                [name for name, _ in integer_variables])
+            loop_optimizer.visit_statement(statement.statement_sequence[1])
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import array
 import enum
 import os
+import struct
+import sys
 
 # https://www.uclibc.org/docs/elf-64-gen.pdf
 # https://0x00sec.org/t/dissecting-and-exploiting-elf-files/7267
@@ -18,22 +21,12 @@ Elf64_Xword = 8
 Elf64_Sxword = 8
 
 
-def number_to_bytearray(number, size):
-    """Convert a number to a bytearray
-
-    Args:
-        number (int): the number to convert
-        size (int): the size of the bytearray of the result
-
-    Returns:
-        bytearray: the resulting byte array
-    """
-    array = bytearray()
-    for i in range(size):
-        num = number >> (i * 8)
-        num = num & 0xff
-        array.append(num)
-    return array
+# the little endian layouts of the elf structures
+ELF_HEADER = struct.Struct('<16sHHIQQQIHHHHHH')
+SECTION_HEADER = struct.Struct('<IIQQQQIIQQ')
+PROGRAM_HEADER = struct.Struct('<IIQQQQQQ')
+SYMBOL_TABLE_ENTRY = struct.Struct('<IBBHQQ')
+RELOCATION_TABLE_ENTRY = struct.Struct('<QQq')
 
 
 class ObjectFileType(enum.Enum):
@@ -77,15 +70,15 @@ class ElfHeader:
     ELFOSABI_STANDALONE = 256
 
     # Object File Types
-    ET_NONE = [0, 0]
-    ET_REL = [1, 0]
-    ET_EXEC = [2, 0]
-    ET_DYN = [3, 0]
-    ET_CORE = [4, 0]
-    ET_LOOS = [0xfe, 0]
-    ET_HIOS = [0xfe, 0xff]
-    ET_LOPROC = [0xff, 0]
-    ET_HIPROC = [0xff, 0xff]
+    ET_NONE = 0
+    ET_REL = 1
+    ET_EXEC = 2
+    ET_DYN = 3
+    ET_CORE = 4
+    ET_LOOS = 0xfe00
+    ET_HIOS = 0xfeff
+    ET_LOPROC = 0xff00
+    ET_HIPROC = 0xffff
 
     def __init__(self, obj_type):
         """Create an object file object
@@ -99,45 +92,44 @@ class ElfHeader:
         self.e_ident = [0] * ElfHeader.EI_NIDEN
 
         # e_type: identifies the object file type.
-        self.e_type = [0] * Elf64_Half
+        self.e_type = ElfHeader.ET_NONE
         self.obj_type = obj_type
         # e_machine: identifies the target architecture.
-        self.e_machine = [0] * Elf64_Half
+        self.e_machine = 0
 
         # E-version: identifies the version of the object file format.
         # Currently, this field has the value EV_CURRENT ,
         # which is defined with the value 1
-        self.e_version = [0] * Elf64_Word
-        self.e_version[0] = 1
+        self.e_version = ElfHeader.EV_CURRENT
 
         # e_entry contains the virtual address of the program entry point.
         # If there is no entry point, this field contains zero.
-        self.e_entry = [0] * Elf64_Addr
+        self.e_entry = 0
         # e_phoff: contains the file offset, in bytes,
         # of the program header table.
-        self.e_phoff = [0] * Elf64_Off
+        self.e_phoff = 0
         # e_shoff: contains the file offset, in bytes,
         # of the section header table.
-        self.e_shoff = [0] * Elf64_Off
+        self.e_shoff = 0
         # e_flags: contains processor-specific flags.
-        self.e_flags = [0] * Elf64_Word
+        self.e_flags = 0
         # e_ehsize: contains the size, in bytes, of the ELF header.
-        self.e_ehsize = [0] * Elf64_Half
+        self.e_ehsize = 0
         # e_phentsize: contains the size, in bytes,
         # of a program header table entry.
-        self.e_phentsize = [0] * Elf64_Half
+        self.e_phentsize = 0
         # e_phnum :contains the number of entries in the program header table.
-        self.e_phnum = [0] * Elf64_Half
+        self.e_phnum = 0
         # e_shentsize: contains the size, in bytes,
         # of a section header table entry.
-        self.e_shentsize = [0] * Elf64_Half
+        self.e_shentsize = 0
         # e_shnum: contains the number of entries in the section header table.
-        self.e_shnum = [0] * Elf64_Half
+        self.e_shnum = 0
         # e_shstrndx: contains the section header table index of the section
         # containing the section name string table.
         # If there is no section name string table,
         # this field has the value SHN_UNDEF .
-        self.e_shstrndx = [0] * Elf64_Half
+        self.e_shstrndx = 0
 
         self.elf_header_size = 0x40
 
@@ -147,14 +139,21 @@ class ElfHeader:
         Args:
             offset (int): the offset from the start of the file in bytes
         """
-        self.e_shoff[0] = offset & 0xff
-        self.e_shoff[1] = (offset >> 8) & 0xff
-        self.e_shoff[2] = (offset >> 16) & 0xff
-        self.e_shoff[3] = (offset >> 24) & 0xff
+        self.e_shoff = offset
+
+    def set_program_header_table(self, offset, num_program_headers):
+        """Specify the program header table.
+
+        Args:
+            offset (int): the offset from the start of the file in bytes
+            num_program_headers (int): the number of program headers
+        """
+        self.e_phoff = offset
+        self.e_phentsize = PROGRAM_HEADER.size
+        self.e_phnum = num_program_headers
 
     def set_section_string_index(self, str_sections_index):
-        self.e_shstrndx = [str_sections_index & 0xff,
-                           (str_sections_index >> 8) & 0xff]
+        self.e_shstrndx = str_sections_index
 
     def set_number_of_sections(self, num_sections):
         """Specify the number of sections
@@ -162,20 +161,17 @@ class ElfHeader:
         Args:
             num_sections (int): the number of sections
         """
-        self.e_shnum = [num_sections & 0xff,
-                        (num_sections >> 8) & 0xff]
+        self.e_shnum = num_sections
 
     def _fill_in_shentsize(self):
-        section_entry_size = 0x40
-        self.e_shentsize = [section_entry_size & 0xff,
-                            (section_entry_size >> 8) & 0xff]
+        self.e_shentsize = SECTION_HEADER.size
 
     def _fill_in_ehsize(self):
-        self.e_ehsize = [0x40, 0]  # default size
+        self.e_ehsize = ELF_HEADER.size
 
     def _fill_in_machine(self):
         # http://www.sco.com/developers/gabi/latest/ch4.eheader.html
-        em_x86_64 = [62, 0]  # AMD x86-64  architecture
+        em_x86_64 = 62  # AMD x86-64  architecture
         self.e_machine = em_x86_64
 
     def _fill_in_type(self, obj_type):
@@ -195,32 +191,32 @@ class ElfHeader:
         self.e_ident[ElfHeader.EI_OSABI] = ElfHeader.ELFOSABI_SYSV
         self.e_ident[ElfHeader.EI_ABIVERSION] = 0
 
-    def to_binary_array(self):
-        """Get the binary representation of the elf header
+    def pack_into(self, buffer, offset):
+        """Write the binary representation of the elf header to a buffer.
 
-        Returns:
-            bytearray: the binary representation
+        Args:
+            buffer (bytearray): the buffer
+            offset (int): the offset of the header in the buffer
         """
         self._fill_in_ident()
         self._fill_in_type(self.obj_type)
         self._fill_in_machine()
         self._fill_in_ehsize()
         self._fill_in_shentsize()
-        byte_array = bytearray()
-        byte_array.extend(self.e_ident)
-        byte_array.extend(self.e_type)
-        byte_array.extend(self.e_machine)
-        byte_array.extend(self.e_version)
-        byte_array.extend(self.e_entry)
-        byte_array.extend(self.e_phoff)
-        byte_array.extend(self.e_shoff)
-        byte_array.extend(self.e_flags)
-        byte_array.extend(self.e_ehsize)
-        byte_array.extend(self.e_phentsize)
-        byte_array.extend(self.e_phnum)
-        byte_array.extend(self.e_shentsize)
-        byte_array.extend(self.e_shnum)
-        byte_array.extend(self.e_shstrndx)
+        ELF_HEADER.pack_into(buffer, offset, bytes(self.e_ident), self.e_type,
+                             self.e_machine, self.e_version, self.e_entry,
+                             self.e_phoff, self.e_shoff, self.e_flags,
+                             self.e_ehsize, self.e_phentsize, self.e_phnum,
+                             self.e_shentsize, self.e_shnum, self.e_shstrndx)
+
+    def to_binary_array(self):
+        """Get the binary representation of the elf header
+
+        Returns:
+            bytearray: the binary representation
+        """
+        byte_array = bytearray(ELF_HEADER.size)
+        self.pack_into(byte_array, 0)
         return byte_array
 
 
@@ -310,28 +306,30 @@ class Section:
         self.alignment = 0
         self.entry_size = 0
 
+    def pack_into(self, buffer, offset):
+        """Write the binary representation of the section header to a
+        buffer.
+
+        Args:
+            buffer (bytearray): the buffer
+            offset (int): the offset of the header in the buffer
+        """
+        if self.section_content:
+            self.size = len(self.section_content)
+        SECTION_HEADER.pack_into(buffer, offset, self.name_offset,
+                                 self.section_type, sum(self.flags),
+                                 self.address, self.offset, self.size,
+                                 self.link, self.info, self.alignment,
+                                 self.entry_size)
+
     def to_binary_array(self):
         """Get the binary representation of the section
 
         Returns:
             bytearray: the binary representation
         """
-        byte_array = bytearray()
-        flags = 0
-        for flag in self.flags:
-            flags += flag
-        if self.section_content:
-            self.size = len(self.section_content)
-        byte_array += number_to_bytearray(self.name_offset, 4)
-        byte_array += number_to_bytearray(self.section_type, 4)
-        byte_array += number_to_bytearray(flags, 8)
-        byte_array += number_to_bytearray(self.address, 8)
-        byte_array += number_to_bytearray(self.offset, 8)
-        byte_array += number_to_bytearray(self.size, 8)
-        byte_array += number_to_bytearray(self.link, 4)
-        byte_array += number_to_bytearray(self.info, 4)
-        byte_array += number_to_bytearray(self.alignment, 8)
-        byte_array += number_to_bytearray(self.entry_size, 8)
+        byte_array = bytearray(SECTION_HEADER.size)
+        self.pack_into(byte_array, 0)
         return byte_array
 
     def fill(self, data):
@@ -344,6 +342,52 @@ class Section:
         self.size = len(self.section_content)
 
 
+class SegmentType(enum.IntEnum):
+    PT_NULL = 0
+    PT_LOAD = 1
+    PT_DYNAMIC = 2
+    PT_INTERP = 3
+    PT_NOTE = 4
+    PT_SHLIB = 5
+    PT_PHDR = 6
+
+
+class SegmentFlags(enum.IntEnum):
+    PF_X = 0x1
+    PF_W = 0x2
+    PF_R = 0x4
+
+
+class ProgramHeader:
+    def __init__(self, segment_type, flags):
+        """Create a program header, a segment of an executable file.
+
+        Args:
+            segment_type (SegmentType): the type of the segment
+            flags (list[SegmentFlags]): the access flags of the segment
+        """
+        self.segment_type = segment_type
+        self.flags = flags
+        self.offset = 0
+        self.address = 0
+        self.file_size = 0
+        self.memory_size = 0
+        self.alignment = 1
+
+    def pack_into(self, buffer, offset):
+        """Write the binary representation of the program header to a
+        buffer.
+
+        Args:
+            buffer (bytearray): the buffer
+            offset (int): the offset of the header in the buffer
+        """
+        PROGRAM_HEADER.pack_into(buffer, offset, self.segment_type,
+                                 sum(self.flags), self.offset, self.address,
+                                 self.address, self.file_size,
+                                 self.memory_size, self.alignment)
+
+
 class SymbolType(enum.IntEnum):
     STT_NOTYPE = 0
     STT_OBJECT = 1
@@ -401,6 +445,15 @@ class Symbol:
         self.relocation_objects = relocation_objects
 
 
+class RelocationType(enum.IntEnum):
+    R_X86_64_NONE = 0
+    R_X86_64_64 = 1
+    R_X86_64_PC32 = 2
+    R_X86_64_PLT32 = 4
+    R_X86_64_32 = 10
+    R_X86_64_32S = 11
+
+
 class RelocationTableEntry:
     def __init__(self, offset, info, addend):
         """Create a relocation table entry
@@ -414,17 +467,71 @@ class RelocationTableEntry:
         self.addend = addend
         self.info = info
 
+    def pack_into(self, buffer, offset):
+        """Write the binary representation of the relocation table entry to
+        a buffer.
+
+        Args:
+            buffer (bytearray): the buffer
+            offset (int): the offset of the entry in the buffer
+        """
+        RELOCATION_TABLE_ENTRY.pack_into(buffer, offset, self.offset,
+                                         self.info, self.addend)
+
+    def to_words(self):
+        """Get the entry as the 3 64 bit words of its binary representation.
+
+        Returns:
+            tuple: the offset, the info and the addend in two's complement
+        """
+        return self.offset, self.info, self.addend & 0xffffffffffffffff
+
+    @staticmethod
+    def for_symbol(offset, symbol_index, relocation_type, addend):
+        """Create a relocation table entry of a symbol.
+
+        Args:
+            offset (int): offset into the section
+            symbol_index (int): the index of the symbol in the symbol table
+            relocation_type (RelocationType): the type of the relocation
+            addend (int): the addend
+
+        Returns:
+            RelocationTableEntry: the entry
+
+        Raises:
+            ValueError: if the symbol index does not fit in the info
+        """
+        if not 0 <= symbol_index <= 0xffffffff:
+            raise ValueError(f'invalid symbol index {symbol_index}')
+        info = (symbol_index << 32) + relocation_type
+        return RelocationTableEntry(offset, info, addend)
+
+    @staticmethod
+    def from_words(offset, info, addend):
+        """Create a relocation table entry from the words of its binary
+        representation.
+
+        Args:
+            offset (int): the first word, the offset
+            info (int): the second word, the info
+            addend (int): the third word, the addend in two's complement
+
+        Returns:
+            RelocationTableEntry: the entry
+        """
+        if addend >> 63:
+            addend -= 1 << 64
+        return RelocationTableEntry(offset, info, addend)
+
     def to_binary_array(self):
         """Get the byte array representation of the relocation table entry
 
         Returns:
             bytearray: the binary representation
         """
-        byte_array = bytearray()
-        byte_array += number_to_bytearray(self.offset, 8)
-        byte_array += number_to_bytearray(self.info, 8)
-        byte_array += number_to_bytearray(self.addend, 8)
-
+        byte_array = bytearray(RELOCATION_TABLE_ENTRY.size)
+        self.pack_into(byte_array, 0)
         return byte_array
 
 
@@ -457,20 +564,57 @@ class SymbolTableEntry:
         """
         self.st_info = symbol_type + (binding << 4)
 
+    def pack_into(self, buffer, offset):
+        """Write the binary representation of the symbol table entry to a
+        buffer.
+
+        Args:
+            buffer (bytearray): the buffer
+            offset (int): the offset of the entry in the buffer
+        """
+        SYMBOL_TABLE_ENTRY.pack_into(buffer, offset, self.st_name,
+                                     self.st_info, self.st_other,
+                                     self.st_shndx, self.st_value,
+                                     self.st_size)
+
+    def to_words(self):
+        """Get the entry as the 3 64 bit words of its binary representation.
+
+        Returns:
+            tuple: the name, info, other and section index fields in one
+                word, the value and the size
+        """
+        return self.st_name | self.st_info << 32 | self.st_other << 40 | \
+            self.st_shndx << 48, self.st_value, self.st_size
+
+    @staticmethod
+    def from_words(fields, value, size):
+        """Create a symbol table entry from the words of its binary
+        representation.
+
+        Args:
+            fields (int): the first word, the name, info, other and section
+                index fields
+            value (int): the second word, the value
+            size (int): the third word, the size
+
+        Returns:
+            SymbolTableEntry: the entry
+        """
+        entry = SymbolTableEntry(fields & 0xffffffff, (fields >> 32) & 0xf,
+                                 (fields >> 36) & 0xf, fields >> 48, size,
+                                 value)
+        entry.st_other = (fields >> 40) & 0xff
+        return entry
+
     def to_binary_array(self):
         """Get the byte array representation of the symbol table entry
 
         Returns:
             bytearray: the binary representation
         """
-        byte_array = bytearray()
-        byte_array += number_to_bytearray(self.st_name, 4)
-        byte_array += number_to_bytearray(self.st_info, 1)
-        byte_array += number_to_bytearray(self.st_other, 1)
-        byte_array += number_to_bytearray(self.st_shndx, 2)
-        byte_array += number_to_bytearray(self.st_value, 8)
-        byte_array += number_to_bytearray(self.st_size, 8)
-
+        byte_array = bytearray(SYMBOL_TABLE_ENTRY.size)
+        self.pack_into(byte_array, 0)
         return byte_array
 
     def __str__(self):
@@ -485,22 +629,96 @@ class SymbolTableEntry:
         return string
 
 
-def add_to_table(name, table):
-    """Add a string to the table
+class EntryTable:
 
-    Args:
-        name (str): the same to add to the table
-        table (bytearray): the table to add to
+    def __init__(self, entry_class, entries=()):
+        """Create a table of elf entries of 3 64 bit words, that stores the
+        entries in one array in the layout of the file.
 
-    Returns:
-        int: the start index of the name in the table
-    """
-    start_point = len(table)
-    for character in name:
-        table.append(ord(character))
-    # closing \0' character
-    table.append(0)
-    return start_point
+        Args:
+            entry_class (type): the class of the entries, with to_words and
+                from_words methods
+            entries (list, optional): the first entries of the table
+        """
+        self.entry_class = entry_class
+        self.words = array.array('Q')
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return len(self.words) // 3
+
+    def __getitem__(self, index):
+        """Get a copy of an entry, a change to it is stored in the table by
+        setting the entry again.
+
+        Args:
+            index (int): the index of the entry
+
+        Returns:
+            object: the entry
+        """
+        start = range(len(self))[index] * 3
+        return self.entry_class.from_words(*self.words[start:start + 3])
+
+    def __setitem__(self, index, entry):
+        start = range(len(self))[index] * 3
+        self.words[start:start + 3] = array.array('Q', entry.to_words())
+
+    def append(self, entry):
+        """Add an entry at the end of the table.
+
+        Args:
+            entry (object): the entry
+        """
+        self.words.extend(entry.to_words())
+
+    def tobytes(self):
+        """Get the binary representation of the table.
+
+        Returns:
+            bytes: the little endian words of all entries
+        """
+        if sys.byteorder == 'little':
+            return self.words.tobytes()
+        words = array.array('Q', self.words)
+        words.byteswap()
+        return words.tobytes()
+
+
+class StringTable:
+
+    def __init__(self):
+        """Create a string table that stores every string once.
+
+        A string that is the end of a string already in the table is not
+        added again, it starts in the middle of that string.
+        """
+        self.table = bytearray()
+        # the offsets of all encoded strings and their suffixes in the table
+        self.offsets = {}
+
+    def add(self, name):
+        """Add a string to the table
+
+        Args:
+            name (str): the string to add to the table
+
+        Returns:
+            int: the start index of the name in the table
+        """
+        # the offsets are in bytes, a character might take several
+        encoded_name = name.encode()
+        offset = self.offsets.get(encoded_name)
+        if offset is not None:
+            return offset
+        start_point = len(self.table)
+        self.table += encoded_name
+        # closing \0' character
+        self.table.append(0)
+        for i in range(len(encoded_name) + 1):
+            self.offsets.setdefault(encoded_name[i:], start_point + i)
+        return start_point
 
 
 class ObjectFile:
@@ -513,16 +731,19 @@ class ObjectFile:
                                    to this object file
         """
         self.input_file_name = input_file_name
-        self.section_string_table = bytearray()
-        self.string_table = bytearray()
+        self.section_string_table = StringTable()
+        self.string_table = StringTable()
         self.dot_data_content = bytearray()
-        self.text_rela_table = []
+        self.dot_bss_size = 0
+        self.text_rela_table = EntryTable(RelocationTableEntry)
+        # the index in the symbol table of the added symbols by name
+        self.symbol_indexes = {}
 
-        none = add_to_table('', self.string_table)
+        none = self.string_table.add('')
         # only add the base name of the file to the object file
         name = os.path.basename(self.input_file_name)
-        file_name = add_to_table(name, self.string_table)
-        self.symbol_table = [
+        file_name = self.string_table.add(name)
+        self.symbol_table = EntryTable(SymbolTableEntry, [
             SymbolTableEntry(none, SymbolType.STT_NOTYPE,
                              SymbolBinding.STB_LOCAL, section_index=0,
                              symbol_size=0),
@@ -547,8 +768,7 @@ class ObjectFile:
             SymbolTableEntry(none, SymbolType.STT_SECTION,
                              SymbolBinding.STB_LOCAL, section_index=6,
                              symbol_size=0),
-
-        ]
+        ])
 
         self.elf_header = ElfHeader(ObjectFileType.RELOCATABLE_OBJECT_FILE)
         no_flags = [SectionFlags.SHF_NONE]
@@ -557,17 +777,16 @@ class ObjectFile:
         ms_flags = [SectionFlags.SHF_MERGE, SectionFlags.SHF_STRINGS]
         link_flags = [SectionFlags.SHF_INFO_LINK]
 
-        none = add_to_table('', self.section_string_table)
-        dot_symtab = add_to_table('.symtab', self.section_string_table)
-        dot_strtab = add_to_table('.strtab', self.section_string_table)
-        dot_shstrtab = add_to_table('.shstrtab', self.section_string_table)
-        dot_text = add_to_table('.text', self.section_string_table)
-        dot_data = add_to_table('.data', self.section_string_table)
-        dot_bss = add_to_table('.bss', self.section_string_table)
-        dot_rela_text = add_to_table('.text.rela', self.section_string_table)
-        dot_comment = add_to_table('.comment', self.section_string_table)
-        dot_note_gnu_stack = add_to_table('.note.GNU-stack',
-                                          self.section_string_table)
+        none = self.section_string_table.add('')
+        dot_symtab = self.section_string_table.add('.symtab')
+        dot_strtab = self.section_string_table.add('.strtab')
+        dot_shstrtab = self.section_string_table.add('.shstrtab')
+        dot_text = self.section_string_table.add('.text')
+        dot_data = self.section_string_table.add('.data')
+        dot_bss = self.section_string_table.add('.bss')
+        dot_rela_text = self.section_string_table.add('.text.rela')
+        dot_comment = self.section_string_table.add('.comment')
+        dot_note_gnu_stack = self.section_string_table.add('.note.GNU-stack')
 
         self.sections = [
             # the first section header is all zero
@@ -589,8 +808,7 @@ class ObjectFile:
         # first section needs to be all 0's
         self.get_section('none').clear()
 
-        # the symbol table entry size is 0x18
-        self.get_section('.symtab').entry_size = 0x18
+        self.get_section('.symtab').entry_size = SYMBOL_TABLE_ENTRY.size
         # make the link from the symbol table to the string table
         self.get_section('.symtab').link = self.get_section_index('.strtab')
         self.get_section('.symtab').info = self.get_section_index('.strtab')
@@ -602,10 +820,8 @@ class ObjectFile:
         self.get_section('.text.rela').link = self.get_section_index('.symtab')
         self.get_section('.text.rela').info = self.get_section_index('.text')
         self.get_section('.text.rela').alignment = 8
-        # create a dummpy entry to calculate the size of the entry
-        dummy_entry = RelocationTableEntry(0, 0, 0)
         self.get_section('.text.rela').entry_size = \
-            len(dummy_entry.to_binary_array())
+            RELOCATION_TABLE_ENTRY.size
 
         str_index = self.get_section_index('.shstrtab')
         self.elf_header.set_section_string_index(str_index)
@@ -617,7 +833,7 @@ class ObjectFile:
         content.append(0)
         self.get_section('.comment').fill(content)
 
-        self.get_section('.strtab').fill(self.string_table)
+        self.get_section('.strtab').fill(self.string_table.table)
 
         self.program_headers = []
 
@@ -627,12 +843,9 @@ class ObjectFile:
         Args:
             symbol (Symbol): the symbol to add
         """
-        for sym in self.symbol_table:
-            name = self.get_name_at_offset_of_string_table(sym.st_name)
-            if name == symbol.name:
-                # name = self.symbol_table.index(sym)
-                self.update_symbol(sym, symbol)
-                return
+        index = self.symbol_indexes.get(symbol.name)
+        if index is not None:
+            self.update_symbol(index, symbol)
         else:
             self.add_new_symbol(symbol)
 
@@ -652,14 +865,17 @@ class ObjectFile:
                 section_index = self.get_section_index('none')
                 section_content = self.get_section('none').section_content
                 original_section_size = len(section_content)
+                # an undefined function has to be defined by another object
+                # file, like an undefined variable
                 symbol_type = SymbolType.STT_NOTYPE
-                symbol_binding = SymbolBinding.STB_WEAK
 
         elif symbol.type == CompiledObjectType.data:
             if size == 0:
                 size = symbol.size
                 if size != 0:
                     section_index = self.get_section_index('.bss')
+                    original_section_size = self.dot_bss_size
+                    self.dot_bss_size += size
                 else:
                     # undefined section
                     section_index = 0
@@ -683,20 +899,22 @@ class ObjectFile:
         return symbol_type, symbol_binding, \
             section_index, size, original_section_size
 
-    def update_symbol(self, original_symbol, updated_symbol):
+    def update_symbol(self, index, updated_symbol):
         """Update the symbol in the symbol table.
 
         Args:
-            original_symbol(SymbolTableEntry): the entry to update
+            index (int): the index of the entry to update
             updated_symbol (Symbol): the updated symbol
         """
         symbol_type, symbol_binding, \
             section_index, size, original_section_size = \
             self.handle_symbol(updated_symbol)
+        original_symbol = self.symbol_table[index]
         original_symbol.update_info(symbol_type, symbol_binding)
         original_symbol.st_shndx = section_index
         original_symbol.st_size = size
         original_symbol.st_value = original_section_size
+        self.symbol_table[index] = original_symbol
 
     def add_new_symbol(self, symbol):
         """Add a new symbol.
@@ -705,7 +923,14 @@ class ObjectFile:
             symbol (Symbol): the symbol to add
 
         """
-        name = add_to_table(symbol.name, self.string_table)
+        name = self.string_table.add(symbol.name)
+        # the index is known before the relocations are handled, a function
+        # that calls itself references its own entry
+        index = len(self.symbol_table)
+        self.symbol_indexes[symbol.name] = index
+        self.symbol_table.append(SymbolTableEntry(name, SymbolType.STT_NOTYPE,
+                                                  SymbolBinding.STB_GLOBAL,
+                                                  0, 0))
         symbol_type, symbol_binding, \
             section_index, size, original_section_size = \
             self.handle_symbol(symbol)
@@ -716,8 +941,7 @@ class ObjectFile:
                                  section_index=section_index,
                                  symbol_size=size,
                                  offset_in_section=original_section_size)
-
-        self.symbol_table.append(entry)
+        self.symbol_table[index] = entry
 
     def handle_relocation_objects(self, original_section_size, symbol):
         """Handle the relocation objects
@@ -733,40 +957,49 @@ class ObjectFile:
             offset = rela_object.offset
             offset += original_section_size
             # info is the encoding of the type of the relocated object and
-            # the index of the symbol in the symbol table, which after
-            # addition will be the length before addition
+            # the index of the symbol in the symbol table
             if rela_object.type == CompiledObjectType.data:
-                info = 2
+                relocation_type = RelocationType.R_X86_64_PC32
             elif rela_object.type == CompiledObjectType.code:
-                info = 4
+                relocation_type = RelocationType.R_X86_64_PLT32
             else:
                 raise NotImplementedError
-            index = -1
-            for sym in self.symbol_table:
-                name = self.get_name_at_offset_of_string_table(sym.st_name)
-                if name == rela_object.name:
-                    index = self.symbol_table.index(sym)
-                    break
-            if index == -1:
+            index = self.symbol_indexes.get(rela_object.name)
+            if index is None:
                 message = f'Could not find the referenced symbol ' \
-                          f'{sym.st_name}'
+                          f'{rela_object.name}, the reference is not ' \
+                          f'relocated'
+                pcc.utils.warning.error(self.input_file_name,
+                                        line_number=-1,
+                                        message=message)
+                continue
+            try:
+                obj = RelocationTableEntry.for_symbol(offset, index,
+                                                      relocation_type,
+                                                      rela_object.addend)
+            except ValueError as error:
+                message = f'Could not relocate the reference to ' \
+                          f'{rela_object.name}, {error}'
                 pcc.utils.warning.error(self.input_file_name,
                                         line_number=-1,
                                         message=message)
-            info += index << 32
-            obj = RelocationTableEntry(offset, info, rela_object.addend)
+                continue
             self.text_rela_table.append(obj)
 
     def get_name_at_offset_of_string_table(self, offset):
-        name = ''
+        """Get the string that starts at an offset of the string table.
 
-        working_offset = offset
-        while working_offset < len(self.string_table) and \
-                self.string_table[working_offset] != 0:
-            name += chr(self.string_table[working_offset])
-            working_offset += 1
+        Args:
+            offset (int): the offset in the string table
 
-        return name
+        Returns:
+            str: the string up to the closing null character
+        """
+        table = self.string_table.table
+        end = table.find(0, offset)
+        if end == -1:
+            end = len(table)
+        return table[offset:end].decode()
 
     def get_section(self, name):
         """Get the section from the name.
@@ -796,56 +1029,49 @@ class ObjectFile:
                 return i
         return -1
 
-    def to_binary_array(self):
-        """Get the byte array representation.
+    def set_section_offsets(self):
+        """Place the sections after the elf header, at their alignment.
 
         Returns:
-            bytearray: the binary representation
+            int: the offset of the section header table
         """
-
-        self.get_section('.shstrtab').fill(self.section_string_table)
-        self.get_section('.data').fill(self.dot_data_content)
-
-        text_rela_content = bytearray()
-        for rela in self.text_rela_table:
-            text_rela_content += rela.to_binary_array()
-        self.get_section('.text.rela').fill(text_rela_content)
-
-        byte_array = bytearray()
-        for i in range(len(self.symbol_table)):
-            byte_array += self.symbol_table[i].to_binary_array()
-
-        self.get_section('.symtab').fill(byte_array)
-
         offset = self.elf_header.elf_header_size
-        self.elf_header.set_number_of_sections(len(self.sections))
-
-        section_content = bytearray()
         for section in self.sections:
             if section.alignment:
-                padding = offset % section.alignment
-                if padding != 0:
-                    additional = section.alignment - padding
-                    offset += additional
-                    for _ in range(additional):
-                        section_content.append(0)
+                offset += -offset % section.alignment
             if section.name != 'none':
                 section.set_offset(offset)
             offset += len(section.section_content)
-            section_content += section.section_content
 
         # align the section headers on a 8 byte boundary
-        padding = offset % 8
-        padding = (8 - padding)
-        offset += padding
-        for _ in range(padding):
-            section_content.append(0)
-        self.elf_header.set_section_offset(offset)
-        byte_array = self.elf_header.to_binary_array()
-        byte_array += section_content
+        offset += 8 - offset % 8
+        return offset
 
-        for i in range(len(self.sections)):
-            section = self.sections[i]
-            tmp = section.to_binary_array()
-            byte_array += tmp
+    def to_binary_array(self):
+        """Get the byte array representation.
+
+        The layout of the whole file is computed first, every part is then
+        written in place in one buffer.
+
+        Returns:
+            bytearray: the binary representation
+        """
+        self.get_section('.shstrtab').fill(self.section_string_table.table)
+        self.get_section('.data').fill(self.dot_data_content)
+        self.get_section('.bss').size = self.dot_bss_size
+        self.get_section('.text.rela').fill(self.text_rela_table.tobytes())
+        self.get_section('.symtab').fill(self.symbol_table.tobytes())
+
+        section_header_offset = self.set_section_offsets()
+        self.elf_header.set_number_of_sections(len(self.sections))
+        self.elf_header.set_section_offset(section_header_offset)
+
+        byte_array = bytearray(section_header_offset +
+                               len(self.sections) * SECTION_HEADER.size)
+        self.elf_header.pack_into(byte_array, 0)
+        for i, section in enumerate(self.sections):
+            content = section.section_content
+            byte_array[section.offset:section.offset + len(content)] = content
+            section.pack_into(byte_array, section_header_offset +
+                              i * SECTION_HEADER.size)
         return byte_array
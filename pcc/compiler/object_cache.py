@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import fcntl
+import hashlib
+import json
+import os
+
+import pcc
+from pcc import metadata
+from pcc.utils.atomic_file import atomic_write
+
+# the environment variable with the directory of the object cache
+OBJECT_CACHE_DIR_VARIABLE = 'PCC_OBJECT_CACHE_DIR'
+# the environment variable with the maximum size of the cache in bytes
+OBJECT_CACHE_SIZE_VARIABLE = 'PCC_OBJECT_CACHE_SIZE'
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+ENTRY_EXTENSION = '.o'
+STATISTICS_FILE_NAME = 'stats.json'
+LOCK_FILE_NAME = 'stats.lock'
+
+_compiler_version = None
+
+
+def get_compiler_version():
+    """Get a version that changes with every change of the compiler.
+
+    The version of the metadata is not changed for every change of the
+    sources, so the modification times and the sizes of the sources are
+    part of the version.
+
+    Returns:
+        str: the version
+    """
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256(metadata.version.encode('utf-8'))
+        package_directory = os.path.dirname(pcc.__file__)
+        for directory, directory_names, file_names in \
+                os.walk(package_directory):
+            directory_names.sort()
+            for file_name in sorted(file_names):
+                if not file_name.endswith('.py'):
+                    continue
+                stat_result = os.stat(os.path.join(directory, file_name))
+                digest.update(('%s %d %d\n' % (
+                    os.path.join(directory, file_name),
+                    stat_result.st_mtime_ns,
+                    stat_result.st_size)).encode('utf-8'))
+        _compiler_version = digest.hexdigest()
+    return _compiler_version
+
+
+class ObjectCache:
+
+    def __init__(self, cache_directory, max_size=DEFAULT_MAX_SIZE):
+        """Create a cache for the object files of translation units.
+
+        An object file is cached under a hash of the preprocessed source,
+        so it is found again as long as the source and the included files
+        do not change. The least recently used object files are removed
+        when the cache grows over its maximum size.
+
+        Args:
+            cache_directory (str): the directory to store the cache
+            max_size (int): the maximum size of the cached object files in
+                bytes
+        """
+        self.cache_directory = cache_directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(processed_file, input_file_name, options):
+        """Get the key of an object file.
+
+        Args:
+            processed_file (str): the preprocessed source
+            input_file_name (str): the name of the source file, it is
+                stored in the object file
+            options (dict): the command-line options that change the
+                generated code
+
+        Returns:
+            str: the key
+        """
+        digest = hashlib.sha256()
+        header = [get_compiler_version(), os.path.basename(input_file_name),
+                  sorted(options.items())]
+        digest.update(json.dumps(header).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(processed_file.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_entry_path(self, key):
+        """Get the location of a cached object file.
+
+        Args:
+            key (str): the key of the object file
+
+        Returns:
+            str: the path of the entry
+        """
+        return os.path.join(self.cache_directory, key + ENTRY_EXTENSION)
+
+    def load(self, key):
+        """Load a cached object file.
+
+        Args:
+            key (str): the key of the object file
+
+        Returns:
+            Tuple[bytes, str, str]: the object file and the standard output
+                and the standard error of its compilation, None if the
+                object file is not cached
+        """
+        path = self.get_entry_path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                diagnostics = json.loads(entry_file.readline().decode('utf-8'))
+                object_file = entry_file.read()
+            # the modification time is the last use of the entry
+            os.utime(path)
+        except (OSError, ValueError):
+            self.record_lookup(False)
+            return None
+        self.record_lookup(True)
+        return object_file, diagnostics['stdout'], diagnostics['stderr']
+
+    def store(self, key, object_file, stdout, stderr):
+        """Store an object file in the cache.
+
+        A failure to write the cache is not an error, the translation unit
+        is compiled again next time.
+
+        Args:
+            key (str): the key of the object file
+            object_file (bytes): the object file
+            stdout (str): the standard output of the compilation
+            stderr (str): the standard error of the compilation
+        """
+        path = self.get_entry_path(key)
+        diagnostics = json.dumps({'stdout': stdout, 'stderr': stderr})
+        try:
+            with atomic_write(path, 'wb') as entry_file:
+                entry_file.write(diagnostics.encode('utf-8') + b'\n')
+                entry_file.write(object_file)
+        except OSError:
+            return
+        self.evict()
+
+    def get_entries(self):
+        """Get the cached object files.
+
+        Returns:
+            List[os.DirEntry]: the entries, the least recently used first
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.cache_directory)
+                       if entry.name.endswith(ENTRY_EXTENSION)]
+        except OSError:
+            return []
+        existing_entries = []
+        for entry in entries:
+            try:
+                # the result is kept by the entry for the later calls
+                entry.stat()
+            except OSError:
+                # removed by another process at the same time
+                continue
+            existing_entries.append(entry)
+        return sorted(existing_entries,
+                      key=lambda entry: entry.stat().st_mtime_ns)
+
+    def evict(self):
+        """Remove the least recently used object files until the cache is
+        not larger than its maximum size.
+        """
+        entries = self.get_entries()
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(entry.path)
+            except OSError:
+                # removed by another process at the same time
+                pass
+            size -= entry.stat().st_size
+
+    def record_lookup(self, is_hit):
+        """Count a lookup, in this cache and in the statistics on disk.
+
+        Args:
+            is_hit (bool): True if the object file was cached
+        """
+        if is_hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            lock_path = os.path.join(self.cache_directory, LOCK_FILE_NAME)
+            with open(lock_path, 'w') as lock_file:
+                # other processes update the statistics at the same time
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                statistics = self.load_statistics()
+                statistics['hits' if is_hit else 'misses'] += 1
+                statistics_path = os.path.join(self.cache_directory,
+                                               STATISTICS_FILE_NAME)
+                with open(statistics_path, 'w') as statistics_file:
+                    json.dump(statistics, statistics_file)
+        except OSError:
+            pass
+
+    def load_statistics(self):
+        """Load the number of hits and misses of all the runs.
+
+        Returns:
+            dict: the number of 'hits' and 'misses'
+        """
+        statistics = {'hits': 0, 'misses': 0}
+        statistics_path = os.path.join(self.cache_directory,
+                                       STATISTICS_FILE_NAME)
+        try:
+            with open(statistics_path, 'r') as statistics_file:
+                statistics.update(json.load(statistics_file))
+        except (OSError, ValueError):
+            pass
+        return statistics
+
+    def get_statistics(self):
+        """Get the statistics of the cache.
+
+        Returns:
+            dict: the number of 'hits' and 'misses' of all the runs, the
+                number of cached object files in 'entries' and their total
+                size in bytes in 'size'
+        """
+        statistics = self.load_statistics()
+        entries = self.get_entries()
+        statistics['entries'] = len(entries)
+        statistics['size'] = sum(entry.stat().st_size for entry in entries)
+        return statistics
+
+
+_object_cache = None
+
+
+def get_object_cache():
+    """Get the object cache shared by the whole process.
+
+    The cache is only used if the PCC_OBJECT_CACHE_DIR environment variable
+    is set. Its maximum size is PCC_OBJECT_CACHE_SIZE bytes.
+
+    Returns:
+        ObjectCache: the shared cache, None if the cache is not used
+    """
+    global _object_cache
+    cache_directory = os.environ.get(OBJECT_CACHE_DIR_VARIABLE)
+    if not cache_directory:
+        return None
+    try:
+        max_size = int(os.environ.get(OBJECT_CACHE_SIZE_VARIABLE,
+                                      DEFAULT_MAX_SIZE))
+    except ValueError:
+        max_size = DEFAULT_MAX_SIZE
+    if _object_cache is None or \
+            _object_cache.cache_directory != cache_directory or \
+            _object_cache.max_size != max_size:
+        _object_cache = ObjectCache(cache_directory, max_size)
+    return _object_cache
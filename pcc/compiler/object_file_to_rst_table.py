@@ -1,7 +1,8 @@
 import argparse
 import sys
 import string
-import ctypes
+
+from pcc.compiler.elf_reader import ElfReader
 
 horizonal_line = '+----------+------+------+------+------+-------+------+' \
                  '---------+-------+------------+------+------+------' \
@@ -47,74 +48,37 @@ section_flags = {
 }
 
 
-def get_word(data, index, length, signed=False):
-    word = data[index]
-    if length > 1:
-        word += data[index + 1] * 0x100
-    if length > 2:
-        word += data[index + 2] * 0x10000
-    if length > 3:
-        word += data[index + 3] * 0x1000000
-    if length > 4:
-        upper_part = get_word(data, index + 4, length - 4)
-        word += upper_part * 0x100000000
-    if signed:
-        word = ctypes.c_long(word).value
-    return word
-
-
-def get_string(data, index):
-    string = ''
-    while data[index] != 0:
-        string += chr(data[index])
-        index += 1
-
-    return string
-
-
 def parse(input_file_name):
-    with open(input_file_name, 'rb') as file:
-        data = file.read()
-        data = list(data)
-
-    print(f'data length {len(data)}')
-
-    # MAG0 is data[0]
-    # MAG1 is data[1]
-    # MAG2 is data[2]
-    # MAG3 is data[3]
-    # CLASS is data[4]
-    # DATA is data[5]
-    # VERSION is data[6]
-    # OSABI is data[7]
-    # ABIVERSION is data[8]
-
-    print_elf_header(data)
-
-    shoff = data[0x28] + data[0x29] * 256
-    shentsize = data[0x3a] + data[0x3b] * 256
-    shnum = data[0x3c] + data[0x3d] * 256
-    shstrndx = data[0x3e] + data[0x3f] * 256
-    print(f'shoff {shoff}, shentsize {shentsize}, shnum {shnum}, '
-          f'shstrndx {shstrndx}')
-
-    string_table_start_index = shoff + (shentsize * shstrndx) + 0x18
-    string_table_offset = get_word(data, string_table_start_index, length=8)
-
-    string_table_size_start_index = shoff + (shentsize * shstrndx) + 0x20
-    string_table_size = get_word(data, string_table_size_start_index, length=8)
-
-    string_table = data[string_table_offset:
-                        string_table_offset + string_table_size]
-    for section in range(shnum):
-        start_address = shoff + shentsize * section
-        section_data = data[start_address:start_address + shentsize]
-        print_section(section_data, start_address, shentsize, string_table,
-                      data, shoff, shentsize, section)
-
-
-def print_section(data, address, section_size, string_table, object_file,
-                  shoff, shentsize, section_index):
+    with ElfReader.open(input_file_name) as reader:
+        print(f'data length {len(reader.data)}')
+
+        # MAG0 is data[0]
+        # MAG1 is data[1]
+        # MAG2 is data[2]
+        # MAG3 is data[3]
+        # CLASS is data[4]
+        # DATA is data[5]
+        # VERSION is data[6]
+        # OSABI is data[7]
+        # ABIVERSION is data[8]
+
+        print_elf_header(list(reader.data[:reader.header.e_ehsize]))
+
+        shoff = reader.header.e_shoff
+        shentsize = reader.header.e_shentsize
+        shnum = reader.header.e_shnum
+        shstrndx = reader.header.e_shstrndx
+        print(f'shoff {shoff}, shentsize {shentsize}, shnum {shnum}, '
+              f'shstrndx {shstrndx}')
+
+        for section in range(shnum):
+            print_section(reader, section)
+
+
+def print_section(reader, section_index):
+    section_size = reader.header.e_shentsize
+    address = reader.header.e_shoff + section_size * section_index
+    data = list(reader.data[address:address + section_size])
     off = address % 16
     padded = [None] * off + data + [None] * (32 - off)
     lines = int(section_size / 16)
@@ -168,23 +132,17 @@ def print_section(data, address, section_size, string_table, object_file,
             fifth_line
         ]
 
-    name_offset = get_word(data, 0, length=4)
-    section_offset = get_word(data, 0x18, length=8)
-    section_size = get_word(data, 0x20, length=8)
-    section_entry_size = get_word(data, 0x38, length=8)
-    section_link = get_word(data, 0x28, length=4)
-    section_type = get_word(data, 0x4, length=4)
-    section_type = section_types[section_type]
-    section_flag = get_word(data, 0x8, length=8)
-
-    section_data = object_file[section_offset: section_offset + section_size]
+    section = reader.sections[section_index]
+    section_link = section.link
+    section_type = section_types[section.section_type]
+    section_flag = section.flags[0]
 
     flags = ''
     for key in section_flags:
         if key & section_flag:
             flags += section_flags[key] + ','
 
-    section_name = get_string(string_table, name_offset)
+    section_name = section.name
     print(f'\nthis section index: {section_index} section_name {section_name}'
           f', type {section_type}, flags [{flags}]'
           f', linked to section: {section_link}\n')
@@ -200,31 +158,20 @@ def print_section(data, address, section_size, string_table, object_file,
         print(horizonal_line)
 
     if section_name == '.symtab':
-        start_address = shoff + shentsize * section_link
-        linked_section_data = object_file[
-                              start_address:start_address + shentsize]
-        symbol_names_offset = get_word(linked_section_data, 0x18, length=8)
-        symbol_names_size = get_word(linked_section_data, 0x20, length=8)
-        symbol_names = object_file[symbol_names_offset:
-                                   symbol_names_offset + symbol_names_size]
-        print_symbol_table(section_data, section_entry_size,
-                           section_offset, symbol_names)
+        print_symbol_table(reader, section)
 
     if section_name == '.text.rela':
-        print_relocatable_text(section_data, section_entry_size,
-                               section_offset, section_type, section_link)
+        print_relocatable_text(reader, section, section_type)
 
 
-def print_relocatable_text(section_data, entry_size,
-                           address, relocatable_type, section_link):
-    print_section_data(section_data, address)
+def print_relocatable_text(reader, section, relocatable_type):
+    print_section_data(list(reader.get_section_data(section)),
+                       section.offset)
 
-    number_of_entries = len(section_data) // entry_size
-    print(f'entries for to linked section{section_link}, ')
-    for i in range(number_of_entries):
-        line = section_data[i * entry_size:(i + 1) * entry_size]
-        offset = get_word(line, index=0, length=8)
-        info = get_word(line, index=8, length=8)
+    print(f'entries for to linked section{section.link}, ')
+    for entry in reader.iter_relocations(section):
+        offset = entry.offset
+        info = entry.info
         entry_symbol = info >> 32
         entry_type = info & 0xffffffff
         if relocatable_type == 'SHT_REL':
@@ -232,7 +179,7 @@ def print_relocatable_text(section_data, entry_size,
                   f'with info {info:#X} (symbol {entry_symbol}, '
                   f'type {entry_type})')
         elif relocatable_type == 'SHT_RELA':
-            addend = get_word(line, index=16, length=8, signed=True)
+            addend = entry.addend
             print(f'relocatable entry at offset {offset}, '
                   f'with info {info:#X} (symbol {entry_symbol}, '
                   f'type {entry_type})'
@@ -257,9 +204,10 @@ def print_section_data(section_data, address):
         print(horizonal_line)
 
 
-def print_symbol_table(table, entry_size, start_address, string_table):
+def print_symbol_table(reader, section):
+    entry_size = section.entry_size
+    start_address = section.offset
     off = start_address % 16
-    number_of_entries = int(len(table) / entry_size)
     alligned = True if off == 0 else False
     start_address -= off
 
@@ -286,20 +234,20 @@ def print_symbol_table(table, entry_size, start_address, string_table):
     print('')
     print('')
 
-    for i in range(number_of_entries):
+    for i, symbol in enumerate(reader.iter_symbols(section)):
         print(header)
-        data = table[i * entry_size: (i + 1) * entry_size]
+        entry_address = section.offset + i * entry_size
+        data = list(reader.data[entry_address:entry_address + entry_size])
 
-        name = get_word(data, index=0, length=4)
-        name = get_string(string_table, name)
-        info = get_word(data, index=4, length=1)
-        other = get_word(data, index=5, length=1)
-        shndx = get_word(data, index=6, length=2)
+        name = reader.get_symbol_name(section, symbol)
+        info = symbol.st_info
+        other = symbol.st_other
+        shndx = symbol.st_shndx
         if shndx == 0xfff1:
             shndx = 'SHN_ABS'
 
-        value = get_word(data, 8, length=8)
-        size = get_word(data, 16, length=8)
+        value = symbol.st_value
+        size = symbol.st_size
 
         if alligned:
             data = data + [None] * 8
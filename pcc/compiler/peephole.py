@@ -0,0 +1,738 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import struct
+
+from pcc.compiler.assembler_x64 import CONDITION_CODES, REX, REX_B, REX_R, \
+    REX_W, REX_X
+from pcc.compiler.assembler import JumpCondition
+from pcc.compiler.instruction_buffer import InstructionBuffer
+
+# the prefixes of the instructions of the X64Assembler, before the REX prefix
+PREFIXES = (0x66, 0xF2, 0xF3)
+TWO_BYTE_OPCODE = 0x0F00
+
+# the general purpose registers, by their encoding
+RAX = 0
+RCX = 1
+RDX = 2
+RBX = 3
+RSP = 4
+RBP = 5
+RSI = 6
+RDI = 7
+ALL_REGISTERS = frozenset(range(16))
+# the registers a call reads, the integer argument registers
+CALL_READS = frozenset([RDI, RSI, RDX, RCX, 8, 9, RSP])
+# the registers a call does not preserve
+CALL_WRITES = frozenset([RAX, RCX, RDX, RSI, RDI, 8, 9, 10, 11])
+# the registers a return gives back to the caller, the result and the
+# registers the caller expects to be preserved
+RETURN_READS = frozenset([RAX, RBX, RSP, RBP, 12, 13, 14, 15])
+
+# opcode -> (has a ModR/M byte, size of the immediate or the jump distance)
+ONE_BYTE_OPCODES = {
+    0x01: (True, 0),  # add
+    0x09: (True, 0),  # or
+    0x21: (True, 0),  # and
+    0x29: (True, 0),  # sub
+    0x31: (True, 0),  # xor
+    0x39: (True, 0),  # cmp
+    0x63: (True, 0),  # movsxd
+    0x69: (True, 4),  # imul imm32
+    0x81: (True, 4),  # add, sub, cmp imm32
+    0x85: (True, 0),  # test
+    0x87: (True, 0),  # xchg
+    0x89: (True, 0),  # mov r/m, r
+    0x8B: (True, 0),  # mov r, r/m
+    0x8D: (True, 0),  # lea
+    0x90: (False, 0),  # nop
+    0x99: (False, 0),  # cdq
+    0xC1: (True, 1),  # shift imm8
+    0xC3: (False, 0),  # ret
+    0xC7: (True, 4),  # mov r/m, imm32
+    0xE8: (False, 4),  # call rel32
+    0xE9: (False, 4),  # jmp rel32
+    0xEB: (False, 1),  # jmp rel8
+    0xF7: (True, 0),  # not, neg, idiv
+}
+for _register in range(8):
+    ONE_BYTE_OPCODES[0x50 + _register] = (False, 0)  # push
+    ONE_BYTE_OPCODES[0x58 + _register] = (False, 0)  # pop
+    ONE_BYTE_OPCODES[0xB8 + _register] = (False, 4)  # mov r, imm32
+for _condition_code in range(16):
+    ONE_BYTE_OPCODES[0x70 + _condition_code] = (False, 1)  # jcc rel8
+
+TWO_BYTE_OPCODES = {
+    0x10: (True, 0),  # movss, movsd load
+    0x11: (True, 0),  # movss, movsd store
+    0x58: (True, 0),  # addss, addsd
+    0x59: (True, 0),  # mulss, mulsd
+    0x5C: (True, 0),  # subss, subsd
+    0x5E: (True, 0),  # divss, divsd
+    0x6E: (True, 0),  # movd, movq
+    0x95: (True, 0),  # setnz
+    0xAF: (True, 0),  # imul
+    0xB6: (True, 0),  # movzx
+}
+for _condition_code in range(16):
+    TWO_BYTE_OPCODES[0x80 + _condition_code] = (False, 4)  # jcc rel32
+
+JUMP_CONDITIONS = {code: condition
+                   for condition, code in CONDITION_CODES.items()}
+
+# the opcode of a store to the stack -> the opcode of the load
+STORE_TO_LOAD = {
+    0x89: 0x8B,
+    TWO_BYTE_OPCODE + 0x11: TWO_BYTE_OPCODE + 0x10,
+}
+
+
+class DecodeError(Exception):
+    pass
+
+
+def is_rex_prefix(prefix):
+    """Check if a byte is a REX prefix.
+
+    Args:
+        prefix (int): the byte
+
+    Returns:
+        bool: True for 0x40 to 0x4F
+    """
+    return prefix & 0xF0 == REX
+
+
+class Instruction:
+
+    def __init__(self, code, prefixes, opcode, modrm, immediate, sib=None):
+        """Create a decoded instruction.
+
+        Args:
+            code (bytearray): the machine code of the instruction
+            prefixes (bytes): the prefixes
+            opcode (int): the opcode, 0x0F00 is added to two byte opcodes
+            modrm (int): the ModR/M byte, None if there is none
+            immediate (int): the immediate or the jump distance, None if
+                there is none
+            sib (int): the SIB byte, None if there is none
+        """
+        self.code = code
+        self.prefixes = prefixes
+        self.opcode = opcode
+        self.modrm = modrm
+        self.immediate = immediate
+        self.sib = sib
+        self.relocation_objects = []
+        # the instruction jumped to, None if this is no jump
+        self.target = None
+        self.condition = None
+
+    @property
+    def rex(self):
+        if self.prefixes and is_rex_prefix(self.prefixes[-1]):
+            return self.prefixes[-1]
+        return 0
+
+    @property
+    def mod(self):
+        return self.modrm >> 6
+
+    @property
+    def reg(self):
+        return (self.modrm >> 3) & 0b111 | (8 if self.rex & REX_R else 0)
+
+    @property
+    def rm(self):
+        return self.modrm & 0b111 | (8 if self.rex & REX_B else 0)
+
+    @property
+    def base(self):
+        return self.sib & 0b111 | (8 if self.rex & REX_B else 0)
+
+    @property
+    def index(self):
+        return (self.sib >> 3) & 0b111 | (8 if self.rex & REX_X else 0)
+
+    def get_opcode_register(self, base_opcode):
+        """Get the register encoded in the opcode.
+
+        Args:
+            base_opcode (int): the opcode for the first register
+
+        Returns:
+            int: the encoding of the register
+        """
+        return self.opcode - base_opcode | (8 if self.rex & REX_B else 0)
+
+    def is_jump(self):
+        """Check if this is a jump.
+
+        Returns:
+            bool: True for a conditional or unconditional jump
+        """
+        return self.condition is not None
+
+    def is_register_operation(self):
+        """Check if both operands of the ModR/M byte are registers.
+
+        Returns:
+            bool: True for a register to register instruction
+        """
+        return self.modrm is not None and self.mod == 0b11
+
+    def is_stack_access(self):
+        """Check if the memory operand is a variable on the stack.
+
+        Returns:
+            bool: True for [rbp + disp8]
+        """
+        return self.modrm is not None and self.mod == 0b01 and \
+            self.rm == RBP
+
+
+# the end of the code, the target of a jump to the end
+END = Instruction(bytearray(), b'', None, None, None)
+
+
+def decode(code, relocation_objects):
+    """Split machine code of the X64Assembler into instructions.
+
+    Args:
+        code (bytearray): the machine code
+        relocation_objects (List[RelocationObject]): the relocation objects
+            of the code
+
+    Returns:
+        List[Instruction]: the instructions, the jumps refer to the
+            instruction they jump to
+
+    Raises:
+        DecodeError: if the code contains an unknown instruction, a jump
+            into an instruction or a relocation object in a jump
+    """
+    instructions = []
+    offsets = {}
+    position = 0
+    while position < len(code):
+        start = position
+        while code[position] in PREFIXES:
+            position += 1
+            if position >= len(code):
+                raise DecodeError('prefix at the end of the code')
+        rex = 0
+        if is_rex_prefix(code[position]):
+            # the REX prefix comes right before the opcode
+            rex = code[position]
+            position += 1
+            if position >= len(code):
+                raise DecodeError('prefix at the end of the code')
+        prefixes = bytes(code[start:position])
+        opcode = code[position]
+        position += 1
+        if opcode == 0x0F:
+            if position >= len(code):
+                raise DecodeError('opcode escape at the end of the code')
+            opcode = TWO_BYTE_OPCODE + code[position]
+            position += 1
+            opcode_table, table_opcode = TWO_BYTE_OPCODES, opcode & 0xFF
+        else:
+            opcode_table, table_opcode = ONE_BYTE_OPCODES, opcode
+        if table_opcode not in opcode_table:
+            raise DecodeError('unknown opcode %x' % opcode)
+        has_modrm, immediate_size = opcode_table[table_opcode]
+        if 0xB8 <= opcode <= 0xBF and rex & REX_W:
+            immediate_size = 8
+
+        modrm = None
+        sib = None
+        if has_modrm:
+            if position >= len(code):
+                raise DecodeError('ModR/M byte past the end of the code')
+            modrm = code[position]
+            position += 1
+            mod = modrm >> 6
+            rm = modrm & 0b111
+            if mod != 0b11 and rm == RSP:
+                if position >= len(code):
+                    raise DecodeError('SIB byte past the end of the code')
+                sib = code[position]
+                position += 1
+                if mod == 0b00 and sib & 0b111 == RBP:
+                    raise DecodeError('SIB byte without a base')
+            if mod == 0b01:
+                position += 1
+            elif mod == 0b10 or (mod == 0b00 and rm == RBP):
+                position += 4
+
+        if position + immediate_size > len(code):
+            raise DecodeError('instruction past the end of the code')
+        immediate = None
+        if immediate_size:
+            immediate_format = {1: 'b', 4: 'i', 8: 'q'}[immediate_size]
+            immediate = struct.unpack_from(immediate_format, code, position)[0]
+            position += immediate_size
+
+        instruction = Instruction(code[start:position], prefixes, opcode,
+                                  modrm, immediate, sib)
+        set_jump_condition(instruction)
+        offsets[start] = len(instructions)
+        instructions.append(instruction)
+
+    # the end of the code is a valid jump target
+    offsets[position] = len(instructions)
+    starts = sorted(offsets)
+    for index, instruction in enumerate(instructions):
+        if instruction.is_jump():
+            target_offset = starts[index + 1] + instruction.immediate
+            if target_offset not in offsets:
+                raise DecodeError('jump into an instruction')
+            target_index = offsets[target_offset]
+            instruction.target = instructions[target_index] \
+                if target_index < len(instructions) else END
+
+    for relocation_object in relocation_objects:
+        index = bisect.bisect_right(starts, relocation_object.offset) - 1
+        if not 0 <= index < len(instructions) or \
+                instructions[index].is_jump():
+            raise DecodeError('relocation object outside an instruction')
+        instructions[index].relocation_objects.append(
+            (relocation_object, relocation_object.offset - starts[index]))
+    return instructions
+
+
+def set_jump_condition(instruction):
+    """Set the condition of a jump instruction.
+
+    Args:
+        instruction (Instruction): the instruction, unchanged if it is no
+            jump
+
+    Raises:
+        DecodeError: for a jump with a condition the assembler does not use
+    """
+    opcode = instruction.opcode
+    if opcode in (0xEB, 0xE9):
+        instruction.condition = JumpCondition.always
+    elif 0x70 <= opcode <= 0x7F or \
+            TWO_BYTE_OPCODE + 0x80 <= opcode <= TWO_BYTE_OPCODE + 0x8F:
+        condition_code = opcode & 0x0F
+        if condition_code not in JUMP_CONDITIONS:
+            raise DecodeError('unknown jump condition %x' % condition_code)
+        instruction.condition = JUMP_CONDITIONS[condition_code]
+
+
+def get_register_effects(instruction):
+    """Get the general purpose registers an instruction reads and writes.
+
+    Args:
+        instruction (Instruction): the instruction
+
+    Returns:
+        frozenset: the registers that are read, all of them if unknown
+        frozenset: the registers that are written
+    """
+    opcode = instruction.opcode
+    if 0x50 <= opcode <= 0x57:
+        return frozenset([instruction.get_opcode_register(0x50), RSP]), \
+            frozenset([RSP])
+    if 0x58 <= opcode <= 0x5F:
+        return frozenset([RSP]), \
+            frozenset([instruction.get_opcode_register(0x58), RSP])
+    if 0xB8 <= opcode <= 0xBF:
+        return frozenset(), frozenset([instruction.get_opcode_register(0xB8)])
+    if opcode == 0xC3:
+        return RETURN_READS, frozenset([RSP])
+    if opcode == 0xE8:
+        return CALL_READS, CALL_WRITES
+    if opcode == 0x90 or instruction.is_jump():
+        return frozenset(), frozenset()
+    if opcode == 0x99:
+        return frozenset([RAX]), frozenset([RDX])
+    if instruction.modrm is None:
+        return ALL_REGISTERS, ALL_REGISTERS
+    if opcode == 0x8D and instruction.sib is not None:
+        # lea r, [base + index * scale], an index of esp means none
+        reads = {instruction.base}
+        if instruction.index != RSP:
+            reads.add(instruction.index)
+        return frozenset(reads), frozenset([instruction.reg])
+
+    if instruction.is_register_operation():
+        reg, rm = instruction.reg, instruction.rm
+    elif instruction.is_stack_access():
+        reg, rm = instruction.reg, None
+    elif instruction.mod == 0b00 and instruction.modrm & 0b111 == RBP:
+        # rip relative
+        reg, rm = instruction.reg, None
+    else:
+        return ALL_REGISTERS, ALL_REGISTERS
+    memory_reads = frozenset([RBP]) if instruction.is_stack_access() \
+        else frozenset()
+
+    def registers(*encodings):
+        return frozenset(encoding for encoding in encodings
+                         if encoding is not None)
+
+    is_scalar = any(prefix in instruction.prefixes for prefix in (0xF2, 0xF3))
+    if is_scalar:
+        # only the xmm registers are used
+        return memory_reads, frozenset()
+    if opcode == TWO_BYTE_OPCODE + 0x6E:
+        # movd xmm, r/m
+        return memory_reads | registers(rm), frozenset()
+    if opcode in (0x01, 0x09, 0x21, 0x29, 0x31):
+        return memory_reads | registers(reg, rm), registers(rm)
+    if opcode in (0x39, 0x85):
+        return memory_reads | registers(reg, rm), frozenset()
+    if opcode == 0x81:
+        if reg == 7:
+            # cmp
+            return memory_reads | registers(rm), frozenset()
+        return memory_reads | registers(rm), registers(rm)
+    if opcode == 0x87:
+        return memory_reads | registers(reg, rm), registers(reg, rm)
+    if opcode == 0x89:
+        return memory_reads | registers(reg), registers(rm)
+    if opcode in (0x63, 0x69, 0x8B):
+        return memory_reads | registers(rm), registers(reg)
+    if opcode == 0xC7:
+        return memory_reads, registers(rm)
+    if opcode == 0xC1 or opcode == TWO_BYTE_OPCODE + 0x95:
+        return memory_reads | registers(rm), registers(rm)
+    if opcode == 0xF7:
+        if reg == 7:
+            # idiv, edx:eax / r/m
+            return memory_reads | registers(rm, RAX, RDX), \
+                registers(RAX, RDX)
+        return memory_reads | registers(rm), registers(rm)
+    if opcode == TWO_BYTE_OPCODE + 0xAF:
+        return memory_reads | registers(reg, rm), registers(reg)
+    if opcode == TWO_BYTE_OPCODE + 0xB6:
+        return memory_reads | registers(rm), registers(reg)
+    return ALL_REGISTERS, ALL_REGISTERS
+
+
+def get_successors(instructions, indices, index):
+    """Get the instructions that can run after an instruction.
+
+    Args:
+        instructions (List[Instruction]): the instructions
+        indices (dict): the id of every instruction -> its index, the end
+            of the code is at the length of the instructions
+        index (int): the index of the instruction
+
+    Returns:
+        List[int]: the indices of the next instructions, the length of the
+            list of instructions for the end of the code
+    """
+    instruction = instructions[index]
+    if instruction.opcode == 0xC3:
+        return []
+    successors = []
+    if instruction.is_jump():
+        successors.append(indices[id(instruction.target)])
+        if instruction.condition == JumpCondition.always:
+            return successors
+    successors.append(index + 1)
+    return successors
+
+
+def is_register_dead(instructions, index, register):
+    """Check if a register is written before it is read, on every path.
+
+    Args:
+        instructions (List[Instruction]): the instructions
+        index (int): the index of the first instruction to check
+        register (int): the encoding of the register
+
+    Returns:
+        bool: True if the value of the register is not used anymore
+    """
+    indices = {id(instruction): index
+               for index, instruction in enumerate(instructions)}
+    indices[id(END)] = len(instructions)
+    to_visit = [index]
+    visited = set()
+    while to_visit:
+        index = to_visit.pop()
+        if index in visited:
+            continue
+        visited.add(index)
+        if index >= len(instructions):
+            # the caller of the function might use the register
+            return False
+        reads, writes = get_register_effects(instructions[index])
+        if register in reads:
+            return False
+        if register in writes:
+            continue
+        to_visit.extend(get_successors(instructions, indices, index))
+    return True
+
+
+def create_test(register):
+    """Create an instruction to test if a register is 0.
+
+    Args:
+        register (int): the encoding of the register
+
+    Returns:
+        Instruction: test r32, r32
+    """
+    modrm = (0b11 << 6) + (register << 3) + register
+    return Instruction(bytearray([0x85, modrm]), b'', 0x85, modrm, None)
+
+
+class PeepholeOptimizer:
+
+    def __init__(self, instructions):
+        """Create an optimizer for the instructions of a function.
+
+        Args:
+            instructions (List[Instruction]): the decoded instructions
+        """
+        self.instructions = instructions
+
+    def is_jump_target(self, instruction):
+        """Check if an instruction is jumped to.
+
+        Args:
+            instruction (Instruction): the instruction
+
+        Returns:
+            bool: True if a jump goes to the instruction
+        """
+        return any(other.target is instruction
+                   for other in self.instructions)
+
+    def remove(self, index):
+        """Remove an instruction, the jumps to it go to the next one.
+
+        Args:
+            index (int): the index of the instruction
+        """
+        instruction = self.instructions.pop(index)
+        next_instruction = self.instructions[index] \
+            if index < len(self.instructions) else END
+        for other in self.instructions:
+            if other.target is instruction:
+                other.target = next_instruction
+
+    def is_removable(self, instruction):
+        """Check if an instruction can be removed.
+
+        Args:
+            instruction (Instruction): the instruction
+
+        Returns:
+            bool: True if it has no relocation objects
+        """
+        return not instruction.relocation_objects
+
+    def remove_nop(self, index):
+        """Remove a nop.
+
+        Args:
+            index (int): the index of the instruction
+
+        Returns:
+            bool: True if the instructions changed
+        """
+        instruction = self.instructions[index]
+        if instruction.opcode == 0x90 and not instruction.prefixes:
+            self.remove(index)
+            return True
+        return False
+
+    def remove_self_move(self, index):
+        """Remove a 64 bit move of a register to itself.
+
+        Args:
+            index (int): the index of the instruction
+
+        Returns:
+            bool: True if the instructions changed
+        """
+        instruction = self.instructions[index]
+        # a 32 bit move clears the upper half, only the 64 bit one does
+        # nothing
+        if instruction.opcode == 0x89 and \
+                len(instruction.prefixes) == 1 and \
+                instruction.rex & REX_W and \
+                instruction.is_register_operation() and \
+                instruction.reg == instruction.rm:
+            self.remove(index)
+            return True
+        return False
+
+    def remove_reload(self, index):
+        """Remove a load of a stack slot that was just stored to.
+
+        Args:
+            index (int): the index of the instruction
+
+        Returns:
+            bool: True if the instructions changed
+        """
+        if index + 1 >= len(self.instructions):
+            return False
+        store = self.instructions[index]
+        load = self.instructions[index + 1]
+        if STORE_TO_LOAD.get(store.opcode) != load.opcode or \
+                store.prefixes != load.prefixes or \
+                not store.is_stack_access() or \
+                store.code[-2:] != load.code[-2:] or \
+                store.reg != load.reg:
+            return False
+        if self.is_jump_target(load) or not self.is_removable(load):
+            return False
+        # the value loaded from the stack is still in the register
+        self.remove(index + 1)
+        return True
+
+    def replace(self, index, instruction):
+        """Replace an instruction, the jumps to it go to the new one.
+
+        Args:
+            index (int): the index of the instruction
+            instruction (Instruction): the new instruction
+        """
+        old_instruction = self.instructions[index]
+        self.instructions[index] = instruction
+        for other in self.instructions:
+            if other.target is old_instruction:
+                other.target = instruction
+
+    def compare_zero_to_test(self, index):
+        """Replace a compare of a register to 0 by a test.
+
+        Args:
+            index (int): the index of the instruction
+
+        Returns:
+            bool: True if the instructions changed
+        """
+        compare = self.instructions[index]
+        if compare.opcode != 0x81 or compare.prefixes or \
+                not compare.is_register_operation() or \
+                compare.reg != 7 or compare.immediate != 0:
+            return False
+        # cmp r/m, 0 and test r/m, r/m set the same flags
+        self.replace(index, create_test(compare.rm))
+        return True
+
+    def compare_to_test(self, index):
+        """Replace a compare to a register that was just set to 0 by a
+        test, and remove the move if the register is not used after it.
+
+        Args:
+            index (int): the index of the instruction
+
+        Returns:
+            bool: True if the instructions changed
+        """
+        if index + 1 >= len(self.instructions):
+            return False
+        move = self.instructions[index]
+        compare = self.instructions[index + 1]
+        if not 0xB8 <= move.opcode <= 0xBF or move.prefixes or \
+                move.immediate != 0:
+            return False
+        zero_register = move.opcode - 0xB8
+        if compare.opcode != 0x39 or compare.prefixes or \
+                not compare.is_register_operation() or \
+                compare.reg != zero_register or \
+                compare.rm == zero_register or \
+                self.is_jump_target(compare):
+            return False
+        # the register is 0, so the compare is a compare to 0
+        self.replace(index + 1, create_test(compare.rm))
+        if self.is_removable(move) and \
+                is_register_dead(self.instructions, index + 2,
+                                 zero_register):
+            self.remove(index)
+        return True
+
+    def optimize(self):
+        """Apply the rewrites until none of them matches.
+
+        Returns:
+            List[Instruction]: the optimized instructions
+        """
+        rewrites = [self.remove_nop, self.remove_self_move,
+                    self.remove_reload, self.compare_to_test,
+                    self.compare_zero_to_test]
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            index = 0
+            while index < len(self.instructions):
+                if any(rewrite(index) for rewrite in rewrites):
+                    is_changed = True
+                else:
+                    index += 1
+        return self.instructions
+
+
+def encode(instructions, assembler):
+    """Join the instructions to machine code again.
+
+    Args:
+        instructions (List[Instruction]): the instructions
+        assembler (Assembler): the assembler to encode the jumps
+
+    Returns:
+        bytearray: the machine code
+        List[RelocationObject]: the relocation objects
+    """
+    buffer = InstructionBuffer(assembler)
+    labels = {}
+
+    def get_label(instruction):
+        if id(instruction) not in labels:
+            labels[id(instruction)] = buffer.create_label('peephole')
+        return labels[id(instruction)]
+
+    for instruction in instructions:
+        if instruction.is_jump():
+            get_label(instruction.target)
+    for instruction in instructions:
+        if id(instruction) in labels:
+            buffer.place_label(labels[id(instruction)])
+        if instruction.is_jump():
+            buffer.jump(instruction.condition, get_label(instruction.target))
+            continue
+        relocation_objects = []
+        for relocation_object, offset in instruction.relocation_objects:
+            relocation_object.offset = offset
+            relocation_objects.append(relocation_object)
+        buffer.append(instruction.code, relocation_objects)
+    if id(END) in labels:
+        buffer.place_label(labels[id(END)])
+    return buffer.resolve()
+
+
+def optimize(code, relocation_objects, assembler):
+    """Run the peephole optimizer on the machine code of a function.
+
+    Code with instructions the optimizer does not know is not changed.
+
+    Args:
+        code (bytearray): the machine code
+        relocation_objects (List[RelocationObject]): the relocation objects
+            of the code
+        assembler (Assembler): the assembler to encode the jumps
+
+    Returns:
+        bytearray: the optimized machine code
+        List[RelocationObject]: the relocation objects of the optimized code
+    """
+    try:
+        instructions = decode(code, relocation_objects)
+    except DecodeError:
+        return code, relocation_objects
+    instructions = PeepholeOptimizer(instructions).optimize()
+    return encode(instructions, assembler)
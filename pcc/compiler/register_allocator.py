@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from pcc.AST.binary_operator import BinaryOperator
+from pcc.AST.compound_statement import CompoundStatement
+from pcc.AST.control_statements.if_statement import IfStatement
+from pcc.AST.control_statements.while_statement import WhileStatement
+from pcc.AST.functions.function_argument import FunctionArgument
+from pcc.AST.functions.function_call import FunctionCall
+from pcc.AST.functions.function_definition import CALLEE_SAVED_REGISTERS, \
+    FunctionDefinition
+from pcc.AST.return_statement import ReturnStatement
+from pcc.AST.unary_operator import UnaryOperator
+from pcc.AST.variables.assignment import Assignment
+from pcc.AST.variables.variable_declaration import VariableDeclaration
+from pcc.AST.variables.variable_reference import VariableReference
+from pcc.compiler.assembler import ProcessorRegister
+
+# the registers a call might change, that are not used to evaluate
+# expressions or to pass arguments
+CALLER_SAVED_REGISTERS = [
+    ProcessorRegister.general_purpose_10,
+    ProcessorRegister.general_purpose_11,
+]
+# the caller saved registers first, they do not have to be saved
+ALLOCATABLE_REGISTERS = CALLER_SAVED_REGISTERS + CALLEE_SAVED_REGISTERS
+
+# the types of the variables that fit in a general purpose register
+REGISTER_TYPES = ('int', 'char')
+# a use in a loop counts this many times more than a use outside of it
+LOOP_WEIGHT = 10
+# the deepest loop that still adds weight
+MAX_LOOP_DEPTH = 4
+
+
+class LiveInterval:
+
+    def __init__(self, name, start):
+        """Create the range of the code in which a variable is used.
+
+        Args:
+            name (str): the name of the variable
+            start (int): the position of the first use or definition
+        """
+        self.name = name
+        self.start = start
+        self.end = start
+        # the number of uses, weighted by the loops they are in
+        self.weight = 0
+        self.crosses_call = False
+        self.register = None
+
+    def can_use(self, register):
+        """Check if the variable can be kept in a register.
+
+        Args:
+            register (ProcessorRegister): the register
+
+        Returns:
+            bool: True if the register keeps its value long enough
+        """
+        return register in CALLEE_SAVED_REGISTERS or not self.crosses_call
+
+
+class LiveIntervalBuilder:
+
+    def __init__(self, names):
+        """Create a builder for the live intervals of the variables of a
+        function.
+
+        Every use and definition of a variable gets a position, in the
+        order of the code.
+
+        Args:
+            names (List[str]): the variables that can be kept in a register,
+                the ones that have a value when the function starts
+        """
+        self.position = 0
+        self.loop_depth = 0
+        # (position of the start, position of the end) of every loop
+        self.loops = []
+        # the positions of the calls
+        self.calls = []
+        # the variables read in an expression with a call
+        self.read_with_call = set()
+        self.intervals = {name: LiveInterval(name, 0) for name in names}
+        self.candidates = set(names)
+        self.statement_visitors = {
+            CompoundStatement: self.visit_compound_statement,
+            IfStatement: self.visit_if_statement,
+            WhileStatement: self.visit_while_statement,
+            ReturnStatement: self.visit_return_statement,
+            Assignment: self.visit_assignment,
+            VariableDeclaration: self.visit_variable_declaration,
+            FunctionCall: self.visit_expression,
+        }
+
+    def add_candidate(self, name):
+        """Add a variable that gets its first value in the code.
+
+        Args:
+            name (str): the name of the variable
+        """
+        self.candidates.add(name)
+
+    def next_position(self):
+        self.position += 1
+        return self.position
+
+    def add_access(self, name):
+        """Add a use or a definition of a variable.
+
+        Args:
+            name (str): the name of the variable
+        """
+        if name not in self.candidates:
+            return
+        position = self.next_position()
+        interval = self.intervals.get(name)
+        if interval is None:
+            interval = LiveInterval(name, position)
+            self.intervals[name] = interval
+        interval.end = position
+        interval.weight += LOOP_WEIGHT ** min(self.loop_depth,
+                                              MAX_LOOP_DEPTH)
+
+    def visit_statement(self, statement):
+        visitor = self.statement_visitors.get(type(statement))
+        if visitor is not None:
+            visitor(statement)
+        elif not isinstance(statement, VariableDeclaration):
+            self.visit_expression(statement)
+
+    def visit_compound_statement(self, statement):
+        for inner_statement in statement.statement_sequence:
+            self.visit_statement(inner_statement)
+
+    def visit_if_statement(self, statement):
+        self.visit_expression(statement.condition)
+        self.visit_statement(statement.if_statement)
+        if statement.else_statement:
+            self.visit_statement(statement.else_statement)
+
+    def visit_while_statement(self, statement):
+        start = self.next_position()
+        self.loop_depth += 1
+        self.visit_expression(statement.condition)
+        self.visit_statement(statement.body_statement)
+        self.loop_depth -= 1
+        self.loops.append((start, self.next_position()))
+
+    def visit_return_statement(self, statement):
+        self.visit_expression(statement.expression)
+
+    def visit_assignment(self, statement):
+        self.visit_expression(statement.initializer_exp)
+        self.add_access(statement.id)
+
+    def visit_variable_declaration(self, statement):
+        if statement.initializer:
+            self.visit_expression(statement.initializer)
+            self.add_access(statement.name)
+
+    def visit_expression(self, expression):
+        number_of_calls = len(self.calls)
+        names = []
+        self.visit_operand(expression, names)
+        if len(self.calls) > number_of_calls:
+            # the operands are not evaluated in the order of the code, a
+            # variable read before a call in the code might be read after it
+            self.read_with_call.update(names)
+
+    def visit_operand(self, expression, names):
+        """Add the accesses and the calls of an expression.
+
+        Args:
+            expression (Expression): the expression
+            names (List[str]): the list to add the names of the read
+                variables to
+        """
+        if isinstance(expression, VariableReference):
+            self.add_access(expression.name)
+            names.append(expression.name)
+        elif isinstance(expression, BinaryOperator):
+            self.visit_operand(expression.operand_1, names)
+            self.visit_operand(expression.operand_2, names)
+        elif isinstance(expression, UnaryOperator):
+            self.visit_operand(expression.operand, names)
+        elif isinstance(expression, FunctionCall):
+            for argument in expression.expression_list:
+                self.visit_operand(argument, names)
+            self.calls.append(self.next_position())
+
+    def extend_over_loops(self):
+        """Extend the intervals that enter a loop to the end of the loop.
+
+        The value of a variable that is set before a loop might be used in
+        the next iteration, so it is live in the whole loop.
+        """
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for interval in self.intervals.values():
+                for start, end in self.loops:
+                    if interval.start < start <= interval.end < end:
+                        interval.end = end
+                        is_changed = True
+
+    def build(self, body):
+        """Get the live intervals of the body of a function.
+
+        Args:
+            body (Statement): the body of the function
+
+        Returns:
+            List[LiveInterval]: the intervals, sorted by their start
+        """
+        self.visit_statement(body)
+        self.extend_over_loops()
+        for interval in self.intervals.values():
+            interval.crosses_call = interval.name in self.read_with_call or \
+                any(interval.start < call < interval.end
+                    for call in self.calls)
+        return sorted(self.intervals.values(),
+                      key=lambda interval: interval.start)
+
+
+def allocate_intervals(intervals):
+    """Assign registers to live intervals with a linear scan.
+
+    If no register is free, the interval with the lowest weight is left on
+    the stack.
+
+    Args:
+        intervals (List[LiveInterval]): the intervals, sorted by their start
+    """
+    active = []
+    for interval in intervals:
+        for other in list(active):
+            if other.end < interval.start:
+                active.remove(other)
+        used_registers = [other.register for other in active]
+        free_registers = [register for register in ALLOCATABLE_REGISTERS
+                          if register not in used_registers and
+                          interval.can_use(register)]
+        if free_registers:
+            interval.register = free_registers[0]
+        else:
+            victims = [other for other in active
+                       if interval.can_use(other.register)]
+            if not victims:
+                continue
+            victim = min(victims, key=lambda other: other.weight)
+            if victim.weight >= interval.weight:
+                continue
+            interval.register = victim.register
+            victim.register = None
+            active.remove(victim)
+        active.append(interval)
+
+
+def get_declared_variables(statement, declarations):
+    """Get the local variables declared in a statement.
+
+    Args:
+        statement (Statement): the statement
+        declarations (List[VariableDeclaration]): the list to add the
+            declarations to
+    """
+    if isinstance(statement, VariableDeclaration):
+        declarations.append(statement)
+    elif isinstance(statement, CompoundStatement):
+        for inner_statement in statement.statement_sequence:
+            get_declared_variables(inner_statement, declarations)
+    elif isinstance(statement, IfStatement):
+        get_declared_variables(statement.if_statement, declarations)
+        if statement.else_statement:
+            get_declared_variables(statement.else_statement, declarations)
+    elif isinstance(statement, WhileStatement):
+        get_declared_variables(statement.body_statement, declarations)
+
+
+def get_function_variables(function_definition):
+    """Get the arguments and the local variables of a function.
+
+    Args:
+        function_definition (FunctionDefinition): the function
+
+    Returns:
+        List[tuple]: (name, type name, has a value when the function
+            starts) for every variable
+    """
+    function_declaration = function_definition.statement_sequence[0]
+    body = function_definition.statement_sequence[1]
+    variables = []
+    for argument in function_declaration.argument_list:
+        if isinstance(argument, FunctionArgument):
+            if argument.identifier == 'void':
+                continue
+            variables.append((argument.identifier, argument.type_decl.name,
+                              True))
+        elif isinstance(argument, VariableDeclaration):
+            variables.append((argument.name, argument.variable_type.name,
+                              True))
+    declarations = []
+    get_declared_variables(body, declarations)
+    for declaration in declarations:
+        # a variable without initializer starts at 0, like on the stack
+        variables.append((declaration.name, declaration.variable_type.name,
+                          declaration.initializer is None))
+    return variables
+
+
+def get_integer_variables(variables):
+    """Get the integer variables that can be told apart by their name.
+
+    Args:
+        variables (List[tuple]): the variables of a function, from
+            get_function_variables
+
+    Returns:
+        List[tuple]: (name, has a value when the function starts) for
+            every variable that fits in a general purpose register
+    """
+    names = [name for name, _, _ in variables]
+    # the variables are looked up by name, so a name declared twice can
+    # not be told apart
+    return [(name, has_start_value)
+            for name, type_name, has_start_value in variables
+            if type_name in REGISTER_TYPES and names.count(name) == 1]
+
+
+def allocate_function_registers(function_definition):
+    """Choose the local variables and arguments of a function to keep in a
+    register.
+
+    Args:
+        function_definition (FunctionDefinition): the function
+
+    Returns:
+        dict: the name of the variable -> the register
+    """
+    body = function_definition.statement_sequence[1]
+    candidates = get_integer_variables(
+        get_function_variables(function_definition))
+    builder = LiveIntervalBuilder([name for name, has_start_value
+                                   in candidates if has_start_value])
+    for name, has_start_value in candidates:
+        if not has_start_value:
+            builder.add_candidate(name)
+    intervals = builder.build(body)
+    allocate_intervals(intervals)
+    return {interval.name: interval.register for interval in intervals
+            if interval.register is not None}
+
+
+def allocate_registers(root_node):
+    """Keep the most used local variables of all the functions in registers.
+
+    Args:
+        root_node (AstNode): the root node of the ast
+    """
+    for statement in root_node.statement_sequence:
+        if isinstance(statement, FunctionDefinition) and \
+                len(statement.statement_sequence) > 1:
+            statement.register_assignment = \
+                allocate_function_registers(statement)
@@ -5,24 +5,297 @@
 from __future__ import print_function
 
 import argparse
+import concurrent.futures
+import io
 import os
 import sys
+import tempfile
 
 from pcc import metadata
 from pcc.AST.ast import Ast
+from pcc.AST.constant_folding import fold_constants
+from pcc.client import get_default_socket_path
 from pcc.compiler.compiler import Compiler
+from pcc.compiler.linker import link
+from pcc.compiler.object_cache import get_object_cache
+from pcc.compiler.loop_optimization import optimize_loops
+from pcc.compiler.register_allocator import allocate_registers
+from pcc.preprocessor.include_resolver import IncludeResolver
 from pcc.preprocessor.preprocess import Preprocessor
+from pcc.server import redirect_output, serve
 
 
-def main(argv):
-    """Start the program.
+def compile_translation_unit(input_file, arguments, object_file_name=None):
+    """Preprocess, parse and compile one input file.
 
     Args:
-        argv ([str]): command-line arguments
+        input_file (str): the file to compile
+        arguments (argparse.Namespace): the parsed command-line arguments
+        object_file_name (str, optional): the object file to write for the
+            linker, None to write the one of the -c option
 
     Returns:
         int: error code, 0 if successful
     """
+    write_object_file = arguments.c or object_file_name is not None
+    output_file_name = object_file_name
+    if output_file_name is None:
+        output_file_name = os.path.basename(input_file)
+        output_file_name = os.path.splitext(output_file_name)[0] + '.o'
+        output_file_name = os.path.join(arguments.output_directory,
+                                        output_file_name)
+        if arguments.o:
+            output_file_name = arguments.o
+    include_dirs = arguments.I
+    with open(input_file, 'r') as fileToRead:
+        input_file_as_string = fileToRead.read()
+    include_resolver = IncludeResolver(include_dirs,
+                                       arguments.current_directory)
+    preprocessor = Preprocessor(input_file, input_file_as_string, include_dirs,
+                                include_resolver=include_resolver)
+    preprocessor.preprocess()
+    preprocess_file_string = preprocessor.processed_file
+    if arguments.E:
+        # only perform the preprocessor step
+        print(preprocess_file_string, end='')
+        return 0
+    object_cache = get_object_cache()
+    if object_cache is not None and write_object_file and \
+            not arguments.fdump_tree:
+        return compile_with_object_cache(
+            object_cache, input_file, preprocess_file_string,
+            output_file_name, arguments)
+    ast = Ast(preprocess_file_string, input_file)
+    result = ast.run_ast()
+    if result != 0:
+        return result
+    if arguments.fdump_tree:
+        print(ast.__str__(), end='')
+        return 0
+    compiler = create_compiler(input_file, ast, arguments)
+    compiler.compile()
+    if write_object_file:
+        compiler.write_object_file_to_file(output_file_name)
+        return 0
+    return 0
+
+
+def create_compiler(input_file, ast, arguments):
+    """Create the compiler for a parsed file.
+
+    The optimizations of the AST for the optimization level are done
+    first.
+
+    Args:
+        input_file (str): the file to compile
+        ast (Ast): the parsed file
+        arguments (argparse.Namespace): the parsed command-line arguments
+
+    Returns:
+        Compiler: the compiler
+    """
+    if arguments.O >= 1:
+        fold_constants(ast.root_node)
+        optimize_loops(ast.root_node)
+        allocate_registers(ast.root_node)
+    return Compiler(input_file, ast.root_node,
+                    get_code_generation_options(arguments))
+
+
+def get_code_generation_options(arguments):
+    """Get the command-line options that change the generated code.
+
+    Args:
+        arguments (argparse.Namespace): the parsed command-line arguments
+
+    Returns:
+        dict: the options, by name
+    """
+    return {'optimization_level': arguments.O}
+
+
+def compile_with_object_cache(object_cache, input_file, processed_file,
+                              output_file_name, arguments):
+    """Compile a preprocessed file to an object file, unless it is cached.
+
+    The diagnostics of the compilation are cached with the object file, to
+    print them again when the object file is taken from the cache.
+
+    Args:
+        object_cache (ObjectCache): the cache of the object files
+        input_file (str): the file to compile
+        processed_file (str): the preprocessed input file
+        output_file_name (str): the name of the object file
+        arguments (argparse.Namespace): the parsed command-line arguments
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    key = object_cache.get_key(processed_file, input_file,
+                               get_code_generation_options(arguments))
+    cached = object_cache.load(key)
+    if cached is None:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with redirect_output(stdout, stderr):
+            ast = Ast(processed_file, input_file)
+            result = ast.run_ast()
+            if result == 0:
+                compiler = create_compiler(input_file, ast, arguments)
+                compiler.compile()
+                object_file = compiler.object_file.to_binary_array()
+        print(stdout.getvalue(), end='')
+        print(stderr.getvalue(), end='', file=sys.stderr)
+        if result != 0:
+            return result
+        object_cache.store(key, object_file, stdout.getvalue(),
+                           stderr.getvalue())
+    else:
+        object_file, cached_stdout, cached_stderr = cached
+        print(cached_stdout, end='')
+        print(cached_stderr, end='', file=sys.stderr)
+    with open(output_file_name, 'wb') as file:
+        file.write(object_file)
+    return 0
+
+
+def compile_translation_unit_in_worker(input_file, arguments,
+                                       object_file_name=None):
+    """Compile one input file, capturing its diagnostics.
+
+    The diagnostics of files compiled in parallel would be interleaved,
+    so they are returned to be printed in the order of the input files.
+
+    Args:
+        input_file (str): the file to compile
+        arguments (argparse.Namespace): the parsed command-line arguments
+        object_file_name (str, optional): the object file to write for the
+            linker, None to write the one of the -c option
+
+    Returns:
+        Tuple[int, str, str]: the error code, the standard output and the
+            standard error of the compilation
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with redirect_output(stdout, stderr):
+        result = compile_translation_unit(input_file, arguments,
+                                          object_file_name)
+    return result, stdout.getvalue(), stderr.getvalue()
+
+
+def compile_translation_units(arguments, input_files=None,
+                              object_file_names=None):
+    """Compile all the input files, in parallel if requested.
+
+    Every input file is compiled, also after an error in an earlier one.
+
+    Args:
+        arguments (argparse.Namespace): the parsed command-line arguments
+        input_files (List[str], optional): the files to compile, None for
+            all the input files
+        object_file_names (dict, optional): the object file to write for
+            the linker, by input file
+
+    Returns:
+        int: the first non zero error code, 0 if all files are successful
+    """
+    if input_files is None:
+        input_files = arguments.filesToProcess
+    object_file_names = object_file_names or {}
+    results = []
+    if arguments.j <= 1 or len(input_files) <= 1:
+        for input_file in input_files:
+            results.append(compile_translation_unit(
+                input_file, arguments, object_file_names.get(input_file)))
+    else:
+        number_of_workers = min(arguments.j, len(input_files))
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_workers) as executor:
+            futures = [executor.submit(compile_translation_unit_in_worker,
+                                       input_file, arguments,
+                                       object_file_names.get(input_file))
+                       for input_file in input_files]
+            for future in futures:
+                result, stdout, stderr = future.result()
+                print(stdout, end='')
+                print(stderr, end='', file=sys.stderr)
+                results.append(result)
+    for result in results:
+        if result != 0:
+            return result
+    return 0
+
+
+def is_object_file(input_file):
+    """Check if an input file is an object file to link.
+
+    Args:
+        input_file (str): the name of the input file
+
+    Returns:
+        bool: True if the file has the extension of an object file
+    """
+    return os.path.splitext(input_file)[1] == '.o'
+
+
+def link_translation_units(arguments):
+    """Compile the source files to temporary object files and link them,
+    with the object files of the input, to an executable file.
+
+    Args:
+        arguments (argparse.Namespace): the parsed command-line arguments
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    output_file_name = arguments.o or \
+        os.path.join(arguments.output_directory, 'a.out')
+    source_files = [input_file for input_file in arguments.filesToProcess
+                    if not is_object_file(input_file)]
+    with tempfile.TemporaryDirectory(prefix='pcc') as object_directory:
+        object_file_names = {
+            input_file: os.path.join(object_directory, '%d.o' % i)
+            for i, input_file in enumerate(source_files)}
+        result = compile_translation_units(arguments, source_files,
+                                           object_file_names)
+        if result != 0:
+            return result
+        object_files = [object_file_names.get(input_file, input_file)
+                        for input_file in arguments.filesToProcess]
+        return link(object_files, output_file_name)
+
+
+def build(arguments):
+    """Compile the input files, and link them unless only the preprocessor,
+    the dump of the AST or the compilation is requested.
+
+    Args:
+        arguments (argparse.Namespace): the parsed command-line arguments
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    if arguments.c or arguments.E or arguments.fdump_tree:
+        return compile_translation_units(arguments)
+    return link_translation_units(arguments)
+
+
+def parse_arguments(argv, working_directory=None):
+    """Parse the command-line arguments.
+
+    Args:
+        argv ([str]): command-line arguments
+        working_directory (str, optional): the directory the relative paths
+            are relative to, None for the current directory
+
+    Returns:
+        argparse.Namespace: the parsed arguments
+
+    Raises:
+        SystemExit: the arguments are not valid, or only the help or the
+            version is requested
+    """
     author_strings = []
     for name, email in zip(metadata.authors, metadata.emails):
         author_strings.append('Author: {0} <{1}>'.format(name, email))
@@ -44,7 +317,8 @@ URL: <{url}>
         description=metadata.description,
         epilog=epilog)
     arg_parser.add_argument(
-        "filesToProcess")
+        "filesToProcess",
+        nargs='*')
     arg_parser.add_argument(
         '-V', '--version',
         action='version',
@@ -63,48 +337,133 @@ URL: <{url}>
         action='store_true')
     arg_parser.add_argument(
         '-c',
-        help='compile, no link',
+        help='compile, no link, without it the input files and the object '
+             'files are linked to a static executable without libraries',
         action='store_true')
     arg_parser.add_argument(
         '-o',
         type=str,
         help='output file name',
         action='store')
+    arg_parser.add_argument(
+        '-O',
+        type=int,
+        default=0,
+        choices=[0, 1],
+        help='optimization level, 1 folds the constant expressions, '
+             'rotates the loops and hoists their invariant expressions, '
+             'keeps the local variables in registers and runs the peephole '
+             'optimizer',
+        action='store')
+    arg_parser.add_argument(
+        '-j',
+        type=int,
+        default=1,
+        help='number of files to compile in parallel',
+        action='store')
+    arg_parser.add_argument(
+        '--server',
+        help='run a compile server for pcc_client',
+        action='store_true')
+    arg_parser.add_argument(
+        '--socket',
+        type=str,
+        help='the socket of the compile server, by default '
+             '$PCC_SERVER_SOCKET or a socket in the temporary directory',
+        action='store')
+    arg_parser.add_argument(
+        '--cache-stats',
+        help='print the statistics of the object cache in '
+             '$PCC_OBJECT_CACHE_DIR',
+        action='store_true')
     # ignore the name of the program
-    arguments = arg_parser.parse_args(args=argv[1:])
-    input_file = arguments.filesToProcess
-    include_dirs = arguments.I
+    arguments = arg_parser.parse_intermixed_args(args=argv[1:])
+    if arguments.server:
+        if working_directory is not None:
+            arg_parser.error('--server can not be used by a client')
+        return arguments
+    if arguments.cache_stats and not arguments.filesToProcess:
+        return arguments
+    if not arguments.filesToProcess:
+        arg_parser.error('no input files')
+    if arguments.o and (arguments.c or arguments.E) and \
+            len(arguments.filesToProcess) > 1:
+        arg_parser.error('-o can only be used with a single input file')
 
-    output_file_name = os.path.basename(input_file)
-    output_file_name = os.path.splitext(output_file_name)[0] + '.o'
-    if arguments.o:
-        output_file_name = arguments.o
-    if arguments.I:
-        include_dirs = arguments.I
-    with open(input_file, 'r') as fileToRead:
-        input_file_as_string = fileToRead.read()
-    preprocessor = Preprocessor(input_file, input_file_as_string, include_dirs)
-    preprocessor.preprocess()
-    preprocess_file_string = preprocessor.processed_file
-    if arguments.E:
-        # only perform the preprocessor step
-        print(preprocess_file_string, end='')
-        return 0
-    ast = Ast(preprocess_file_string, input_file)
-    result = ast.run_ast()
-    if result != 0:
-        return result
-    if arguments.fdump_tree:
-        print(ast.__str__(), end='')
-        return 0
-    compiler = Compiler(input_file, ast.root_node)
-    compiler.compile()
-    if arguments.c:
-        compiler.write_object_file_to_file(output_file_name)
-        return 0
+    arguments.output_directory = ''
+    arguments.current_directory = ''
+    if working_directory is not None:
+        # the server does not run in the directory of the client, the
+        # includes are searched in the directory of the client as its
+        # current directory
+        arguments.output_directory = working_directory
+        arguments.current_directory = working_directory
+        arguments.filesToProcess = [
+            os.path.join(working_directory, input_file)
+            for input_file in arguments.filesToProcess]
+        include_dirs = [os.path.join(working_directory, include_dir)
+                        for include_dir in arguments.I or []]
+        setattr(arguments, 'I', include_dirs)
+        if arguments.o:
+            arguments.o = os.path.join(working_directory, arguments.o)
+    return arguments
+
+
+def print_cache_statistics():
+    """Print the statistics of the object cache.
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    object_cache = get_object_cache()
+    if object_cache is None:
+        print('the object cache is not used, set PCC_OBJECT_CACHE_DIR',
+              file=sys.stderr)
+        return 1
+    statistics = object_cache.get_statistics()
+    print('cache directory  %s' % object_cache.cache_directory)
+    print('hits             %d' % statistics['hits'])
+    print('misses           %d' % statistics['misses'])
+    print('object files     %d' % statistics['entries'])
+    print('cache size       %d bytes' % statistics['size'])
+    print('max cache size   %d bytes' % object_cache.max_size)
     return 0
 
 
+def compile_request(argv, working_directory):
+    """Compile a request of a client of the compile server.
+
+    Args:
+        argv ([str]): command-line arguments of the client
+        working_directory (str): the current directory of the client
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    arguments = parse_arguments(argv, working_directory)
+    if arguments.cache_stats:
+        return print_cache_statistics()
+    return build(arguments)
+
+
+def main(argv):
+    """Start the program.
+
+    Args:
+        argv ([str]): command-line arguments
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    arguments = parse_arguments(argv)
+    if arguments.server:
+        socket_path = arguments.socket or get_default_socket_path()
+        return serve(socket_path, compile_request)
+    if arguments.cache_stats:
+        return print_cache_statistics()
+    return build(arguments)
+
+
 def entry_point():
     """Zero-argument entry point for use with setuptools/distribute.
 
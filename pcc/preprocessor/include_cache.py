@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+
+from pcc.utils.atomic_file import atomic_write
+from .tokenizer import read_physical_lines
+
+# the environment variable with the directory of the on disk cache
+INCLUDE_CACHE_DIR_VARIABLE = 'PCC_INCLUDE_CACHE_DIR'
+
+
+class IncludeCache:
+
+    def __init__(self, cache_directory=None):
+        """Create a cache for the contents of included files.
+
+        Args:
+            cache_directory (str, optional): the directory to store the
+                cache on disk, None to only keep it in memory
+        """
+        self.cache_directory = cache_directory
+        # resolved path -> (stat signature, physical lines)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_signature(path):
+        """Get the stat signature of a file.
+
+        Args:
+            path (str): the path of the file
+
+        Returns:
+            List[int]: the modification time and the size of the file
+        """
+        stat_result = os.stat(path)
+        return [stat_result.st_mtime_ns, stat_result.st_size]
+
+    def get_lines(self, file_name):
+        """Get the lines of a file, with the trigraphs replaced.
+
+        The lines are read again if the modification time or the size
+        of the file changed since they were cached.
+
+        Args:
+            file_name (str): the name of the file
+
+        Returns:
+            Tuple[str]: the lines of the file, including the new lines
+        """
+        path = os.path.abspath(file_name)
+        signature = self.get_signature(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        lines = self.load_from_disk(path, signature)
+        if lines is None:
+            with open(path, 'r') as file_to_read:
+                lines = tuple(read_physical_lines(file_to_read.read()))
+            self.store_on_disk(path, signature, lines)
+        self.entries[path] = (signature, lines)
+        return lines
+
+    def get_disk_path(self, path):
+        """Get the location of the cached lines of a file on disk.
+
+        Args:
+            path (str): the resolved path of the file
+
+        Returns:
+            str: the path of the cache entry, None without a cache directory
+        """
+        if self.cache_directory is None:
+            return None
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_directory, digest + '.json')
+
+    def load_from_disk(self, path, signature):
+        """Load the lines of a file from the on disk cache.
+
+        Args:
+            path (str): the resolved path of the file
+            signature (List[int]): the current stat signature of the file
+
+        Returns:
+            Tuple[str]: the lines, None if they are not cached or outdated
+        """
+        disk_path = self.get_disk_path(path)
+        if disk_path is None:
+            return None
+        try:
+            with open(disk_path, 'r') as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if entry.get('path') != path or entry.get('signature') != signature:
+            return None
+        return tuple(entry['lines'])
+
+    def store_on_disk(self, path, signature, lines):
+        """Store the lines of a file in the on disk cache.
+
+        A failure to write the cache is not an error, the file is read
+        again next time.
+
+        Args:
+            path (str): the resolved path of the file
+            signature (List[int]): the stat signature of the file
+            lines (Tuple[str]): the lines of the file
+        """
+        disk_path = self.get_disk_path(path)
+        if disk_path is None:
+            return
+        entry = {'path': path, 'signature': signature, 'lines': lines}
+        try:
+            with atomic_write(disk_path) as cache_file:
+                json.dump(entry, cache_file)
+        except OSError:
+            pass
+
+
+_include_cache = None
+
+
+def get_include_cache():
+    """Get the include cache shared by the whole process.
+
+    The cache is also stored on disk if the PCC_INCLUDE_CACHE_DIR
+    environment variable is set.
+
+    Returns:
+        IncludeCache: the shared cache
+    """
+    global _include_cache
+    if _include_cache is None:
+        _include_cache = IncludeCache(
+            os.environ.get(INCLUDE_CACHE_DIR_VARIABLE))
+    return _include_cache
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+
+class IncludeResolver:
+
+    def __init__(self, include_dirs, current_directory=''):
+        """Create a resolver for the file names of include directives.
+
+        The directories are searched in order and the search stops at the
+        first directory containing the file. A file included with quotes
+        is first searched next to the file including it. The current
+        directory is searched after the include directories.
+
+        Args:
+            include_dirs (List[str]): the include directories, from the -I
+                                      command line arguments
+            current_directory (str, optional): the directory searched as
+                                               the current directory, the
+                                               empty path for the one of
+                                               the process
+        """
+        self.search_dirs = list(include_dirs or [])
+        self.search_dirs.append(current_directory)
+        # directory -> the names in the directory, None if it does not exist
+        self.directory_listings = {}
+        # (file name, including directory) -> resolved path or None
+        self.resolved_paths = {}
+
+    def get_directory_listing(self, directory):
+        """Get the names in a directory, listing it only once.
+
+        Args:
+            directory (str): the directory
+
+        Returns:
+            frozenset: the names in the directory, None if the directory can
+                       not be read
+        """
+        if directory not in self.directory_listings:
+            try:
+                listing = frozenset(os.listdir(directory or os.curdir))
+            except OSError:
+                listing = None
+            self.directory_listings[directory] = listing
+        return self.directory_listings[directory]
+
+    def find_in_directory(self, directory, file_name):
+        """Check if a directory contains a file.
+
+        Args:
+            directory (str): the directory to look in
+            file_name (str): the relative name of the file
+
+        Returns:
+            str: the path of the file, None if it is not in the directory
+        """
+        listing = self.get_directory_listing(directory)
+        first_component = file_name.split('/', 1)[0]
+        if listing is None or first_component not in listing:
+            return None
+        path = os.path.join(directory, file_name)
+        if first_component != file_name and not os.path.isfile(path):
+            # the file is in a sub directory that was not listed
+            return None
+        return path
+
+    def resolve(self, file_name, is_quoted, including_file):
+        """Find the file to include.
+
+        Args:
+            file_name (str): the file name of the include directive
+            is_quoted (bool): True for #include "file", False for
+                              #include <file>
+            including_file (str): the name of the file with the directive
+
+        Returns:
+            str: the path of the file to include, None if it is not found
+        """
+        including_dir = None
+        if is_quoted:
+            including_dir = os.path.dirname(including_file)
+        key = (file_name, including_dir)
+        if key not in self.resolved_paths:
+            self.resolved_paths[key] = self.search(file_name, including_dir)
+        return self.resolved_paths[key]
+
+    def search(self, file_name, including_dir):
+        """Search the include directories for the file.
+
+        Args:
+            file_name (str): the file name of the include directive
+            including_dir (str): the directory of the including file, None
+                                 to only search the include directories
+
+        Returns:
+            str: the path of the file, None if it is not found
+        """
+        if os.path.isabs(file_name):
+            return file_name if os.path.isfile(file_name) else None
+        search_dirs = self.search_dirs
+        if including_dir is not None:
+            search_dirs = [including_dir] + search_dirs
+        for directory in search_dirs:
+            path = self.find_in_directory(directory, file_name)
+            if path is not None:
+                return path
+        return None
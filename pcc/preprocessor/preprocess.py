@@ -2,12 +2,16 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import enum
 import os.path
 import re
 
-import pcc.utils.stringParsing
 import pcc.utils.warning
 from .ConstantExpression import ConstantExpression
+from .include_cache import get_include_cache
+from .include_resolver import IncludeResolver
+from .tokenizer import IDENTIFIER_REGEX, PPTokenType, read_physical_lines, \
+    strip_whitespace, stringize, tokenize, tokens_to_string
 
 
 class MacroObject:
@@ -17,12 +21,30 @@ class MacroObject:
 
         Args:
             identifier (str): The name of the macro
-            argument_list (List[str], optional): the list of macro arguments
+            argument_list (List[str], optional): the list of macro arguments,
+                                                 None for an object like
+                                                 macro
             token_sequence (str): the tokens to replace the identifier
         """
         self.identifier = identifier
         self.token_sequence = token_sequence
         self.argument_list = argument_list
+        self.replacement_tokens = tokenize(token_sequence)
+        self.parameter_indexes = {}
+        if argument_list:
+            for index, argument in enumerate(argument_list):
+                if argument == '...':
+                    argument = '__VA_ARGS__'
+                self.parameter_indexes[argument] = index
+
+    def __eq__(self, other):
+        return isinstance(other, MacroObject) and \
+            self.identifier == other.identifier and \
+            self.argument_list == other.argument_list and \
+            self.token_sequence == other.token_sequence
+
+    def __hash__(self):
+        return hash(self.identifier)
 
     def get_number_of_arguments(self):
         """Get the number of arguments of the macro
@@ -30,8 +52,26 @@ class MacroObject:
         Returns:
             int: the number of arguments
         """
+        if self.argument_list is None:
+            return 0
         return len(self.argument_list)
 
+    def is_function_like(self):
+        """Check if the macro takes arguments between parenthesis.
+
+        Returns:
+            bool: True for a function like macro
+        """
+        return self.argument_list is not None
+
+    def is_variadic(self):
+        """Check if the macro takes a variable number of arguments.
+
+        Returns:
+            bool: True if the last argument is '...'
+        """
+        return bool(self.argument_list) and self.argument_list[-1] == '...'
+
     def get_identifier(self):
         """Get the macro identifier
 
@@ -48,353 +88,782 @@ class MacroObject:
         """
         return self.token_sequence
 
-    def fill_macro_in(self, arguments):
+    def get_parameter(self, tokens, index):
+        """Get the parameter number of the first token after the whitespace.
+
+        Args:
+            tokens (List[PPToken]): the replacement tokens
+            index (int): the index to start looking
+
+        Returns:
+            (int, int): the index of the token and the parameter number,
+                        the parameter number is None if the token is not a
+                        parameter
+        """
+        while index < len(tokens) and tokens[index].is_whitespace():
+            index += 1
+        if index == len(tokens) or \
+                tokens[index].token_type != PPTokenType.identifier:
+            return index, None
+        return index, self.parameter_indexes.get(tokens[index].text)
+
+    def fill_macro_in(self, arguments, expand):
         """Return the macro substitution with the supplied arguments
 
+        K&R A 12.3, the arguments are macro expanded before they are
+        substituted, except for the operands of # and ##.
+
         Args:
-            arguments (List[str]): the arguments for the macro
+            arguments (List[List[PPToken]]): the arguments for the macro
+            expand (Callable[[List[PPToken]], List[PPToken]]): expands the
+                macros in an argument
 
         Returns:
-            str: the filled in macro
+            List[PPToken]: the filled in macro
         """
-        macro_string = self.token_sequence
-        for i in range(len(self.argument_list)):
-            macro_string = macro_string.replace(self.argument_list[i],
-                                                arguments[i])
+        tokens = self.replacement_tokens
+        expanded_arguments = {}
+        filled_in = []
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token.is_punctuator('#') and self.is_function_like():
+                operand_index, parameter = self.get_parameter(tokens,
+                                                              index + 1)
+                if parameter is not None:
+                    filled_in.append(stringize(arguments[parameter]))
+                    index = operand_index + 1
+                    continue
+            if token.is_punctuator('##') or token.is_punctuator('%:%:'):
+                operand_index, parameter = self.get_parameter(tokens,
+                                                              index + 1)
+                if parameter is not None:
+                    right_hand = arguments[parameter]
+                else:
+                    right_hand = tokens[operand_index:operand_index + 1]
+                self.paste_tokens(filled_in, strip_whitespace(right_hand))
+                index = operand_index + 1
+                continue
+            parameter = None
+            if token.token_type == PPTokenType.identifier:
+                parameter = self.parameter_indexes.get(token.text)
+            if parameter is None:
+                filled_in.append(token)
+            elif self.is_followed_by_paste(tokens, index + 1):
+                filled_in.extend(arguments[parameter])
+            else:
+                if parameter not in expanded_arguments:
+                    expanded_arguments[parameter] = \
+                        expand(arguments[parameter])
+                filled_in.extend(expanded_arguments[parameter])
+            index += 1
+        return filled_in
 
-        return macro_string
+    @staticmethod
+    def is_followed_by_paste(tokens, index):
+        """Check if the next token after the whitespace is the ## operator.
 
+        Args:
+            tokens (List[PPToken]): the replacement tokens
+            index (int): the index to start looking
 
-class Preprocessor:
+        Returns:
+            bool: True if the next token is ##
+        """
+        while index < len(tokens) and tokens[index].is_whitespace():
+            index += 1
+        return index < len(tokens) and \
+            (tokens[index].is_punctuator('##') or
+             tokens[index].is_punctuator('%:%:'))
 
-    def preprocessor_warning(self, message):
-        """Generate a warning to the user for a line of source code
+    @staticmethod
+    def paste_tokens(filled_in, right_hand):
+        """Concatenate the last token with the first token of the right hand.
 
         Args:
-            message (str): the waring message
+            filled_in (List[PPToken]): the tokens before the ## operator,
+                                       the result is added to this list
+            right_hand (List[PPToken]): the tokens after the ## operator
         """
-        pcc.utils.warning.warning(self.original_input_file_name,
-                                  self.source_line_count, message)
+        while filled_in and filled_in[-1].is_whitespace():
+            filled_in.pop()
+        if not filled_in or not right_hand:
+            filled_in.extend(right_hand)
+            return
+        left_hand = filled_in.pop()
+        filled_in.extend(tokenize(left_hand.text + right_hand[0].text,
+                                  left_hand.line_number))
+        filled_in.extend(right_hand[1:])
 
-    def preprocessor_error(self, message):
-        """Generate an error to the user for a line of source code
+
+_INCLUDE_REGEX = re.compile(r'"(.*)"|<(.*)>', re.DOTALL)
+
+# the directives that have to be seen in skipped groups as well
+CONDITIONAL_DIRECTIVES = frozenset(['if', 'ifdef', 'ifndef', 'elif', 'else',
+                                    'endif'])
+MAXIMUM_INCLUDE_DEPTH = 200
+
+
+class LogicalLine:
+
+    def __init__(self, text, line_number, spliced_lines):
+        """Create a logical source line.
 
         Args:
-            message (str): the warning message
+            text (str): the text of the line, including the new line
+            line_number (int): the number of the first physical line
+            spliced_lines (int): the number of physical lines that were
+                                 spliced onto the first one
         """
-        pcc.utils.warning.error(self.original_input_file_name,
-                                self.source_line_count, message)
+        self.text = text
+        self.line_number = line_number
+        self.spliced_lines = spliced_lines
+        self._tokens = None
 
-    @staticmethod
-    def string_to_list_with_new_lines(source_string):
-        """Convert to a list, keeping new lines.
+    def merge(self, next_line):
+        """Append the next logical line to this one.
 
         Args:
-            source_string (str): the string to convert
+            next_line (LogicalLine): the line following this line
+        """
+        self.text += next_line.text
+        self.spliced_lines += next_line.spliced_lines
+        self._tokens = None
+
+    def get_tokens(self):
+        """Get the preprocessing tokens of the line.
+
+        The line is only tokenized when the tokens are needed.
 
         Returns:
-            List[str]: the list of strings
+            List[PPToken]: the tokens of the line
         """
-        source_file_list = source_string.split('\n')
-        for i in range(len(source_file_list) - 1):
-            source_file_list[i] += '\n'
-        return source_file_list
+        if self._tokens is None:
+            self._tokens = tokenize(self.text, self.line_number)
+        return self._tokens
 
-    def replace_substring_on_current_line(self, old, new):
-        """Replace the substring on the current line by the new substring
+    def is_directive(self):
+        """Check if the line can be a preprocessing directive.
+
+        Returns:
+            bool: False if the line is certainly not a directive
+        """
+        return self.text.lstrip(' \t\v\f').startswith(('#', '%:', '/*'))
+
+    def get_continuation_lines(self):
+        """Get the number of physical lines after the first one.
+
+        Returns:
+            int: the number of physical lines consumed by this line
+                 after the first one
+        """
+        return self.spliced_lines + self.text[:-1].count('\n')
+
+
+class ConditionalBranch:
+
+    def __init__(self, enclosing_active, is_active):
+        """Create the state of a #if group.
 
         Args:
-            old (str): the substring to replace
-            new (str): the new substring
+            enclosing_active (bool): True if the code around the group is
+                                     active
+            is_active (bool): True if the current branch of the group is
+                              active
         """
-        self.list_of_code_lines[self.line_count] = \
-            self.list_of_code_lines[self.line_count].replace(old, new)
+        self.enclosing_active = enclosing_active
+        self.is_active = is_active
+        self.is_taken = is_active or not enclosing_active
+        self.has_else = False
+
+
+class GuardState(enum.Enum):
+    before_guard = 0
+    in_guard = 1
+    after_guard = 2
+    no_guard = 3
+
 
-    def __init__(self, input_file, input_file_string, include_dirs):
+class IncludeGuardDetector:
+
+    def __init__(self):
+        """Create a detector for the include guard of a file.
+
+        A file has an include guard if all its code is inside a
+        '#ifndef X' group without #elif or #else. Once X is defined,
+        including the file again only produces the lines outside the group.
+        """
+        self.state = GuardState.before_guard
+        self.macro = None
+        self.skipped_output = []
+
+    def add_line(self, logical_line, directive, depth, output):
+        """Look at the next processed line of the file.
+
+        Args:
+            logical_line (LogicalLine): the line
+            directive ((str, List[PPToken])): the directive of the line,
+                                              None if it is not a directive
+            depth (int): the number of open conditional groups after the line
+            output (str): the output of the line
+        """
+        if self.state == GuardState.no_guard:
+            return
+        name = directive[0] if directive is not None else None
+        if self.state == GuardState.in_guard:
+            if depth == 1 and name in ('elif', 'else'):
+                self.state = GuardState.no_guard
+            elif depth == 0:
+                # the #endif of the guard, its own output disappears
+                # when the group is skipped
+                self.state = GuardState.after_guard
+                self.skipped_output.append(
+                    '\n' * logical_line.get_continuation_lines())
+            return
+
+        if directive is None and all(token.is_whitespace()
+                                     for token in logical_line.get_tokens()):
+            self.skipped_output.append(output)
+        elif self.state == GuardState.before_guard and name == 'ifndef' \
+                and depth == 1:
+            arguments = strip_whitespace(directive[1])
+            self.state = GuardState.in_guard
+            self.macro = tokens_to_string(arguments[:1])
+            # a skipped #ifndef leaves a new line
+            self.skipped_output.append('\n')
+        else:
+            self.state = GuardState.no_guard
+
+    def get_guard(self):
+        """Get the include guard of the file.
+
+        Returns:
+            (str, str): the guard macro and the output of the file when the
+                        macro is defined, None if the file has no guard
+        """
+        if self.state != GuardState.after_guard:
+            return None
+        return self.macro, ''.join(self.skipped_output)
+
+
+class Preprocessor:
+
+    def preprocessor_warning(self, message):
+        """Generate a warning to the user for a line of source code
+
+        Args:
+            message (str): the waring message
+        """
+        pcc.utils.warning.warning(self.file_name, self.line_number, message)
+
+    def preprocessor_error(self, message):
+        """Generate an error to the user for a line of source code
+
+        Args:
+            message (str): the warning message
+        """
+        pcc.utils.warning.error(self.file_name, self.line_number, message)
+
+    def __init__(self, input_file, input_file_string, include_dirs,
+                 include_cache=None, include_resolver=None):
         """Create a preprocessor object.
 
         Args:
             input_file (str): the name of the file to preprocess
             input_file_string (str): the contents of the file to preprocess
             include_dirs (List[str]): the list of files to include if requested
+            include_cache (IncludeCache, optional): the cache for the
+                contents of the included files, by default the cache
+                shared by the whole process
+            include_resolver (IncludeResolver, optional): the resolver for
+                the files to include, by default a new resolver for the
+                include directories
         """
         self.original_input_file_name = input_file
         self.original_input_file = copy.copy(input_file_string)
         self.processed_file = ''
         self.tokens = dict()
         self.include_dirs = include_dirs
-        self.list_of_code_lines = []
-        self.line_count = 0
-        self.source_line_count = 1
-        self.trigraphs = {
-            '??=': '#',
-            '??/': '\\',
-            '??\'': '^',
-            '??(': '[',
-            '??)': ']',
-            '??!': '|',
-            '??<': '{',
-            '??>': '}',
-            '??-': '~'
+        self.file_name = input_file
+        self.line_number = 1
+        self.conditional_stack = []
+        self.include_depth = 0
+        self.include_guard = IncludeGuardDetector()
+        # resolved path -> (guard macro, output when the macro is defined)
+        self.include_guards = {}
+        self.once_only_files = set()
+        if include_cache is None:
+            include_cache = get_include_cache()
+        self.include_cache = include_cache
+        if include_resolver is None:
+            include_resolver = IncludeResolver(include_dirs)
+        self.include_resolver = include_resolver
+        self.directives = {
+            'define': self.define_macro,
+            'undef': self.undefine_macro,
+            'include': self.include_file,
+            'if': self.conditional_if,
+            'ifdef': self.conditional_ifdef,
+            'ifndef': self.conditional_ifndef,
+            'elif': self.conditional_elif,
+            'else': self.conditional_else,
+            'endif': self.conditional_endif,
+            'error': self.generate_error,
+            'pragma': self.pragma,
         }
 
-    def run_trigraph_replacement(self):
-        """Replace all trigraphs on the current line.
-
-        """
-        for key in self.trigraphs.keys():
-            self.replace_substring_on_current_line(key, self.trigraphs[key])
-
-    def line_splicing(self):
-        """Merge spliced lines.
-
-        """
-        backslash_and_newline = '\\\n'
-        current_line = self.list_of_code_lines[self.line_count]
-        while backslash_and_newline in current_line:
-            tmp = self.list_of_code_lines[self.line_count]. \
-                replace(backslash_and_newline, '')
-
-            self.list_of_code_lines[self.line_count] = \
-                tmp + self.list_of_code_lines[self.line_count + 1]
-            self.list_of_code_lines[self.line_count + 1] = '\n'
-            self.source_line_count += 1
-            current_line = self.list_of_code_lines[self.line_count]
-
-    def include_files(self):
-        if '#include' in self.list_of_code_lines[self.line_count]:
-            # regex DOTALL dot also matches newline,
-            # .*? any sequence of chars optional
-            string_to_match = r'\s*?#include.*?\"(.*)\".*?'
-            current_line = self.list_of_code_lines[self.line_count]
-            match_flags = re.M | re.I | re.MULTILINE | re.DOTALL
-            match_obj_quotes = re.match(string_to_match,
-                                        current_line,
-                                        match_flags)
-            string_to_match = r'\s*?#include.*?<(.*)>.*?'
-            current_line = self.list_of_code_lines[self.line_count]
-            match_flags = re.M | re.I | re.MULTILINE | re.DOTALL
-            match_obj_less_than = re.match(string_to_match,
-                                           current_line,
-                                           match_flags)
-            if match_obj_quotes:
-                self.fill_in_include(match_obj_quotes)
-            elif match_obj_less_than:
-                self.fill_in_include(match_obj_less_than)
-            else:
-                # no match, nothing to do
-                self.preprocessor_warning('could not parse include statement')
-                pass
-
-    def fill_in_include(self, match_obj):
-        """Replace the current line with the contents of the match object
-
-        Args:
-            match_obj (Match): the match object containing the filename of
-                               the include
-        """
-        # there is an include in the file
-        # get the filename from the match
-        filename = match_obj.group(1)
-        # add the current directory to the include dirs
-        dirs_to_search = list(os.getcwd())
-        if self.include_dirs:
-            dirs_to_search.extend(self.include_dirs)
-        is_file_found = False
-        for dir_to_search in dirs_to_search:
-            file_with_dir = os.path.join(dir_to_search, filename)
-            if os.path.isfile(file_with_dir):
-                # the file to include exists
-                with open(file_with_dir, 'r') as fileToInclude:
-                    self.replace_include_with_content_of_file(fileToInclude)
-                    is_file_found = True
-        if is_file_found is False:
+    @staticmethod
+    def splice_lines(physical_lines):
+        """Merge the lines ending in a backslash with the next line.
+
+        K&R A 12.2
+
+        Args:
+            physical_lines (Iterable[str]): the lines of the source
+
+        Yields:
+            LogicalLine: the next logical line
+        """
+        line_number = 1
+        pending = []
+        for physical_line in physical_lines:
+            if physical_line.endswith('\\\n'):
+                pending.append(physical_line[:-2])
+                continue
+            pending.append(physical_line)
+            yield LogicalLine(''.join(pending), line_number, len(pending) - 1)
+            line_number += len(pending)
+            pending = []
+        if pending:
+            # the source ends in a backslash and a new line,
+            # so the last spliced line is empty
+            yield LogicalLine(''.join(pending), line_number, len(pending))
+
+    @staticmethod
+    def tokenize_lines(logical_lines):
+        """Split the logical lines in preprocessing tokens.
+
+        K&R A 12.3, a comment that is not closed on its line
+        continues on the next one, these lines are merged.
+
+        Args:
+            logical_lines (Iterable[LogicalLine]): the logical lines
+
+        Yields:
+            LogicalLine: the next line, comments are never split over lines
+        """
+        pending = None
+        for logical_line in logical_lines:
+            if pending is not None:
+                pending.merge(logical_line)
+                logical_line = pending
+                pending = None
+            # only a line containing the start of a comment has to be
+            # tokenized to know if the comment continues on the next line
+            if '/*' in logical_line.text and \
+                    logical_line.get_tokens()[-1].is_unterminated_comment():
+                pending = logical_line
+                continue
+            yield logical_line
+        if pending is not None:
+            yield pending
+
+    @staticmethod
+    def get_directive(logical_line):
+        """Get the directive of a line.
+
+        Args:
+            logical_line (LogicalLine): the line to check
+
+        Returns:
+            (str, List[PPToken]): the name of the directive and the tokens
+                                  following it, None if the line is not a
+                                  directive
+        """
+        if not logical_line.is_directive():
+            return None
+        tokens = logical_line.get_tokens()
+        index = 0
+        while index < len(tokens) and tokens[index].is_whitespace():
+            index += 1
+        if index == len(tokens) or not (tokens[index].is_punctuator('#') or
+                                        tokens[index].is_punctuator('%:')):
+            return None
+        index += 1
+        while index < len(tokens) and tokens[index].is_whitespace():
+            index += 1
+        if index < len(tokens) and \
+                tokens[index].token_type == PPTokenType.identifier:
+            return tokens[index].text, tokens[index + 1:]
+        return '', tokens[index:]
+
+    def is_active(self):
+        """Check if the code at the current position is compiled.
+
+        Returns:
+            bool: False if the current code is skipped by a conditional
+        """
+        return not self.conditional_stack or \
+            self.conditional_stack[-1].is_active
+
+    def process_lines(self, logical_lines):
+        """Execute the directives and expand the macros.
+
+        K&R A 12.3 - A 12.7
+
+        Args:
+            logical_lines (Iterable[LogicalLine]): the logical lines
+
+        Yields:
+            str: the processed source code
+        """
+        for logical_line in logical_lines:
+            self.line_number = logical_line.line_number
+            directive = self.get_directive(logical_line)
+            output = self.process_line(logical_line, directive)
+            self.include_guard.add_line(logical_line, directive,
+                                        len(self.conditional_stack), output)
+            yield output
+
+    def process_line(self, logical_line, directive):
+        """Execute the directive or expand the macros of a line.
+
+        Args:
+            logical_line (LogicalLine): the line
+            directive ((str, List[PPToken])): the directive of the line,
+                                              None if it is not a directive
+
+        Returns:
+            str: the processed line
+        """
+        if directive is None or directive[0] not in self.directives:
+            # source code or a directive that is passed on
+            if self.is_active():
+                return self.expand_line(logical_line) + \
+                    '\n' * logical_line.spliced_lines
+            return ''
+
+        name, arguments = directive
+        if name not in CONDITIONAL_DIRECTIVES and not self.is_active():
+            return ''
+        replacement = self.directives[name](arguments)
+        if replacement is None:
+            # the directive is kept in the output
+            return logical_line.text + '\n' * logical_line.spliced_lines
+        if self.is_active():
+            replacement += '\n' * logical_line.get_continuation_lines()
+        return replacement
+
+    def preprocess_source(self, physical_lines):
+        """Run all the translation phases of the preprocessor on the source.
+
+        Args:
+            physical_lines (Iterable[str]): the lines of the source code,
+                                            with the trigraphs replaced
+
+        Yields:
+            str: the processed source code
+        """
+        logical_lines = self.splice_lines(physical_lines)
+        tokenized_lines = self.tokenize_lines(logical_lines)
+        yield from self.process_lines(tokenized_lines)
+        if self.conditional_stack:
+            self.preprocessor_error('could not find closing #endif')
+
+    def preprocess_included_file(self, file_name):
+        """Preprocess an included file.
+
+        The conditional state belongs to a single file, the macros are
+        shared with the including file.
+
+        Args:
+            file_name (str): the name of the included file
+
+        Returns:
+            str: the processed contents of the included file
+        """
+        path = os.path.abspath(file_name)
+        if path in self.once_only_files:
+            # the same as including an empty file
+            return '\n'
+        include_guard = self.include_guards.get(path)
+        if include_guard is not None and include_guard[0] in self.tokens:
+            # the file does not have to be read again
+            return include_guard[1]
+        if self.include_depth >= MAXIMUM_INCLUDE_DEPTH:
+            self.preprocessor_error('#include nested too deeply')
+            return ''
+        physical_lines = list(self.include_cache.get_lines(path))
+        # the last line of the included file always gets a new line
+        if physical_lines and not physical_lines[-1].endswith('\n'):
+            physical_lines[-1] += '\n'
+        else:
+            physical_lines.append('\n')
+
+        saved_state = (self.file_name, self.line_number,
+                       self.conditional_stack, self.include_guard)
+        self.file_name = file_name
+        self.conditional_stack = []
+        self.include_guard = IncludeGuardDetector()
+        self.include_depth += 1
+        processed = ''.join(self.preprocess_source(physical_lines))
+        self.include_depth -= 1
+        include_guard = self.include_guard.get_guard()
+        if include_guard is not None:
+            self.include_guards[path] = include_guard
+        self.file_name, self.line_number, self.conditional_stack, \
+            self.include_guard = saved_state
+        return processed
+
+    def include_file(self, arguments):
+        """Replace the include directive with the contents of the file.
+
+        K&R A 12.4
+
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: the processed contents of the included file, None if the
+                 file could not be included
+        """
+        include_string = tokens_to_string(strip_whitespace(arguments))
+        match_obj = _INCLUDE_REGEX.match(include_string)
+        if not match_obj:
+            # the file name can be the result of a macro
+            include_string = tokens_to_string(
+                strip_whitespace(self.expand_macros(arguments)))
+            match_obj = _INCLUDE_REGEX.match(include_string)
+        if not match_obj:
+            self.preprocessor_warning('could not parse include statement')
+            return None
+        is_quoted = match_obj.group(1) is not None
+        filename = match_obj.group(1) if is_quoted else match_obj.group(2)
+        return self.fill_in_include(filename, is_quoted)
+
+    def fill_in_include(self, filename, is_quoted):
+        """Get the processed contents of the file to include.
+
+        Args:
+            filename (str): the file name of the include
+            is_quoted (bool): True if the file name is between quotes
+
+        Returns:
+            str: the processed contents of the file, None if the file
+                 is not found
+        """
+        file_with_dir = self.include_resolver.resolve(filename, is_quoted,
+                                                      self.file_name)
+        if file_with_dir is None:
             # error file does not exist
             self.preprocessor_error('file to include <%s> not found' %
                                     filename)
+            return None
+        return self.preprocess_included_file(file_with_dir)
 
-    def replace_include_with_content_of_file(self, file_to_include):
-        """Replace the include with the contents of the file
-
-        Args:
-            file_to_include (file): the file handle of the include file
-        """
-        included_file = file_to_include.read()
-        included_file = included_file.replace('\r', '')
-        included_file_as_list = \
-            self.string_to_list_with_new_lines(included_file)
-        included_file_as_list[-1] += '\n'
-        self.list_of_code_lines.pop(self.line_count)
-        self.list_of_code_lines[self.line_count:self.line_count] = \
-            included_file_as_list
-
-    def remove_tokens(self):
-        """Remove the tokens from the macro list for the matching undef.
-
-        Returns:
-            int: the number of source lines that are consumed
-        """
-        line_popped = False
-        if '#undef' in self.list_of_code_lines[self.line_count]:
-            match_obj = re.match(r'.*?#undef (.*)',
-                                 self.list_of_code_lines[self.line_count],
-                                 re.M | re.I | re.DOTALL)
-            if match_obj:
-                # remove all spaces and only look at the first element
-                token_to_remove = match_obj.group(1).split()[0]
-                if token_to_remove in self.tokens.keys():
-                    self.tokens.pop(token_to_remove, None)
-                    # remove the line of the undef statement
-                    self.list_of_code_lines[self.line_count] = '\n'
-                    self.source_line_count += 1
-                    line_popped = True
-                else:
-                    self.preprocessor_error('token <%s> does not exist' %
-                                            token_to_remove)
-        return line_popped
+    def define_macro(self, arguments):
+        """Add a macro to the macro list.
 
-    def macro_definition_and_expansion(self):
-        """Add tokens to the macro list if found and expand macro's
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
 
+        Returns:
+            str: the new line replacing the directive
         """
-        # loop until there are no more lines removed from the list
-        while True:
-            line_popped = self.add_tokens()
-            if line_popped is True:
-                continue
-            line_popped = self.remove_tokens()
-            # if tokens are removed go back to to find new ones
-            if line_popped is True:
-                continue
-            self.replace_tokens()
-            break
+        arguments = strip_whitespace(arguments)
+        if not arguments or \
+                arguments[0].token_type != PPTokenType.identifier:
+            self.preprocessor_error('macro names must be identifiers')
+            return '\n'
+        identifier = arguments[0].text
+        replacement = arguments[1:]
+        argument_list = None
+        # a function like macro has the parenthesis directly after the name
+        if replacement and replacement[0].is_punctuator('('):
+            argument_list = []
+            closing_index = 1
+            while closing_index < len(replacement) and \
+                    not replacement[closing_index].is_punctuator(')'):
+                token = replacement[closing_index]
+                if token.token_type == PPTokenType.identifier or \
+                        token.is_punctuator('...'):
+                    argument_list.append(token.text)
+                closing_index += 1
+            if closing_index == len(replacement):
+                self.preprocessor_error('missing ) in macro parameter list')
+                return '\n'
+            replacement = replacement[closing_index + 1:]
+        token_sequence = tokens_to_string(strip_whitespace(replacement))
+
+        obj = MacroObject(identifier, argument_list, token_sequence)
+        if identifier in self.tokens.keys():
+            # an identical redefinition is allowed
+            if self.tokens[identifier] != obj:
+                self.preprocessor_error('Macro already defined')
+        else:
+            self.tokens[identifier] = obj
+        return '\n'
+
+    def undefine_macro(self, arguments):
+        """Remove the macro from the macro list.
 
-    def is_conditional_compilation_flag_on_current_line(self):
-        """Check if there is a conditional compilation flag in the current line
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
 
         Returns:
-            bool: True if the a condition compilation flag is
-                  on the current line
+            str: the new line replacing the directive
         """
-        conditional_compilation_lines = ['#ifdef', '#ifndef', '#if ']
-        for line_to_exclude in conditional_compilation_lines:
-            if line_to_exclude in self.list_of_code_lines[self.line_count]:
-                return True
-        return False
+        arguments = strip_whitespace(arguments)
+        token_to_remove = tokens_to_string(arguments[:1])
+        if token_to_remove in self.tokens.keys():
+            self.tokens.pop(token_to_remove, None)
+        else:
+            self.preprocessor_error('token <%s> does not exist' %
+                                    token_to_remove)
+        return '\n'
+
+    def expand_line(self, logical_line):
+        """Expand the macros on a line.
 
-    def replace_tokens(self):
-        """Replace the macro tokens on the current line.
+        Args:
+            logical_line (LogicalLine): the line of source code
 
+        Returns:
+            str: the line with the macros expanded
         """
-        tokens_left = True
-        while tokens_left and not \
-                self.is_conditional_compilation_flag_on_current_line():
-            tokens_left = False
-            for token in self.tokens.keys():
-                tokens_left = self.replace_token_if_found(token)
+        # only tokenize the line if one of its identifiers is a macro
+        if self.tokens.keys().isdisjoint(
+                IDENTIFIER_REGEX.findall(logical_line.text)):
+            return logical_line.text
+        return tokens_to_string(self.expand_macros(logical_line.get_tokens()))
 
-    def replace_token_if_found(self, token):
-        """Replace macro tokens if found
+    def expand_macros(self, tokens):
+        """Expand the macros in the tokens.
+
+        K&R A 12.3, every identifier is looked up once in the macro table.
+        The hide set of a token holds the macros it was produced by,
+        so a macro is never expanded again inside its own expansion.
 
         Args:
-            token (str): the identifier of the token
+            tokens (List[PPToken]): the tokens to expand
 
         Returns:
-            bool: True if there are
+            List[PPToken]: the expanded tokens
         """
-        tokens_left = False
-        if token in self.list_of_code_lines[self.line_count]:
-            obj = self.tokens[token]
-            if obj.get_number_of_arguments() == 0:
-                token_sequence = obj.get_token_sequence()
-                self.replace_substring_on_current_line(token, token_sequence)
+        expanded = []
+        # the tokens to scan are kept in reverse order, so the result of
+        # an expansion can be pushed back to be rescanned
+        pending = tokens[::-1]
+        while pending:
+            token = pending.pop()
+            macro = None
+            if token.token_type == PPTokenType.identifier and \
+                    token.text not in token.hide_set:
+                macro = self.tokens.get(token.text)
+            if macro is None:
+                expanded.append(token)
+                continue
+            if macro.is_function_like():
+                invocation = self.collect_macro_arguments(macro, pending)
+                if invocation is None:
+                    expanded.append(token)
+                    continue
+                arguments, closing_parenthesis = invocation
+                hide_set = token.hide_set & closing_parenthesis.hide_set
             else:
-                current_line = self.list_of_code_lines[self.line_count]
-                start_index = current_line.find(token)
-                argument_string = pcc.utils.stringParsing. \
-                    extract_text_for_enclosed_parenthesis(current_line,
-                                                          start_index)
-                if argument_string.count(',') > 0:
-                    args = argument_string.split(',')
-                else:
-                    args = list(argument_string)
-                macro_string = obj.fill_macro_in(args)
-                string_to_replace = token + '(' + argument_string + ')'
-                self.replace_substring_on_current_line(string_to_replace,
-                                                       macro_string)
-            tokens_left = True
-        return tokens_left
-
-    def add_tokens(self):
-        """Add macro tokens to the list if found
-
-        Returns:
-            bool: True if a token macro found and added to the list
-        """
-        line_popped = False
-        while '#define' in self.list_of_code_lines[self.line_count]:
-            match_obj = re.match(r'.*?#define (.*)',
-                                 self.list_of_code_lines[self.line_count],
-                                 re.M | re.I | re.DOTALL)
-            if match_obj:
-                list_of_tokens = match_obj.group(1).split()
-                token = list_of_tokens[0]
-                if '(' in token:
-                    start_index = 0
-                    extracted_string = pcc.utils.stringParsing. \
-                        extract_text_for_enclosed_parenthesis(token,
-                                                              start_index)
-                    number_of_arguments = extracted_string.count(',') + 1
-                    if number_of_arguments >= 1:
-                        argument_list = extracted_string.split(',')
-                    else:
-                        argument_list = list(extracted_string)
-                    identifier = token.split('(')[0]
-                else:
-                    identifier = token
-                    argument_list = []
-
-                if len(list_of_tokens) > 1:
-                    # find the start of the sequence part of the Macro,
-                    # by finding all occurrences for the substring
-                    # 'list_of_tokens[1]' in the complete match object
-                    # (this retains spacing information)
-                    original_string = match_obj.group(1)
-                    start_of_sequence_string = list_of_tokens[1]
-                    starts = [match.start() for match in re.finditer(
-                        re.escape(start_of_sequence_string), original_string)]
-                    start_of_sequence = starts[-1]
-                    token_sequence = original_string[start_of_sequence:]
-                    token_sequence = token_sequence.replace('\n', '')
-                else:
-                    token_sequence = ''
-                obj = MacroObject(identifier, argument_list, token_sequence)
-                if identifier in self.tokens.keys():
-                    self.preprocessor_error('Macro already defined')
-                else:
-                    self.tokens[identifier] = obj
-                # clear the line that contained the define
-                self.list_of_code_lines[self.line_count] = '\n'
-                self.source_line_count += 1
-                line_popped = True
-        return line_popped
-
-    def error_generation(self):
+                arguments = []
+                hide_set = token.hide_set
+            hide_set = hide_set | frozenset([token.text])
+            replacement = macro.fill_macro_in(arguments, self.expand_macros)
+            pending.extend(replacement_token.add_to_hide_set(hide_set)
+                           for replacement_token in reversed(replacement))
+        return expanded
+
+    def collect_macro_arguments(self, macro, pending):
+        """Remove the arguments of a function like macro from the tokens.
+
+        Args:
+            macro (MacroObject): the macro that is invoked
+            pending (List[PPToken]): the tokens after the macro name,
+                                     in reverse order
+
+        Returns:
+            (List[List[PPToken]], PPToken): the arguments and the closing
+                parenthesis, None if the macro is not invoked
+        """
+        index = len(pending) - 1
+        while index >= 0 and pending[index].is_whitespace():
+            index -= 1
+        if index < 0 or not pending[index].is_punctuator('('):
+            # the name of a function like macro without arguments
+            # is not expanded
+            return None
+        number_of_arguments = macro.get_number_of_arguments()
+        arguments = [[]]
+        nesting = 0
+        index -= 1
+        while index >= 0:
+            token = pending[index]
+            index -= 1
+            if token.is_punctuator('('):
+                nesting += 1
+            elif token.is_punctuator(')'):
+                if nesting == 0:
+                    break
+                nesting -= 1
+            elif token.is_punctuator(',') and nesting == 0 and \
+                    not (macro.is_variadic() and
+                         len(arguments) == number_of_arguments):
+                arguments.append([])
+                continue
+            arguments[-1].append(token)
+        else:
+            # no closing parenthesis on this line
+            return None
+
+        arguments = [strip_whitespace(argument) for argument in arguments]
+        if number_of_arguments == 0 and arguments == [[]]:
+            arguments = []
+        if macro.is_variadic() and \
+                len(arguments) == number_of_arguments - 1:
+            arguments.append([])
+        if len(arguments) != number_of_arguments:
+            self.preprocessor_error(
+                'macro "%s" requires %d arguments, but %d given' %
+                (macro.get_identifier(), number_of_arguments, len(arguments)))
+            return None
+        del pending[index + 1:]
+        return arguments, token
+
+    def generate_error(self, arguments):
         """Generated the preprocessor error message
 
+        K&R A 12.7
+
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: the error directive is removed from the output
+        """
+        message = tokens_to_string(arguments).rstrip('\n')
+        self.preprocessor_error(message)
+        return ''
+
+    def pragma(self, arguments):
+        """Process a #pragma directive.
+
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: a new line for '#pragma once', None for the other pragmas,
+                 they are passed on to the compiler
         """
-        if '#error' in self.list_of_code_lines[self.line_count]:
-            current_line = self.list_of_code_lines[self.line_count]
-            match_obj = re.match(r'.*?#error(.*)',
-                                 current_line,
-                                 re.M | re.I | re.DOTALL)
-            if match_obj:
-                message = ''
-                if match_obj.group(1):
-                    message = match_obj.group(1)
-                self.preprocessor_error(message)
-                self.list_of_code_lines.pop(self.line_count)
-                self.source_line_count += 1
+        if tokens_to_string(strip_whitespace(arguments)) != 'once':
+            return None
+        self.once_only_files.add(os.path.abspath(self.file_name))
+        return '\n'
 
     @staticmethod
     def evaluate_constant_expression(expression_string):
@@ -410,219 +879,138 @@ class Preprocessor:
         evaluation = expression.evaluate()
         return evaluation
 
-    def condition_compilation(self):
-        """Replace the preprocessor if.
-
-        """
-        if '#if' in self.list_of_code_lines[self.line_count]:
-            if_line = self.list_of_code_lines[self.line_count]
-            part_is_active = self.check_if_branch_is_active(if_line)
-            finished = False
-            number_of_nested_conditions = 0
-            current_index = self.line_count + 1
-            # add an empty line instead of the #if line
-            code_to_include = ['\n']
-            current_index, finished = \
-                self.add_active_branch(code_to_include, current_index,
-                                       finished, if_line,
-                                       number_of_nested_conditions,
-                                       part_is_active)
-            if finished is False:
-                message = 'could not find closing #endif'
-                self.preprocessor_error(message)
-
-            del self.list_of_code_lines[self.line_count: current_index]
-            self.list_of_code_lines[self.line_count:self.line_count] = \
-                code_to_include
-
-    def add_active_branch(self, code_to_include, current_index, finished,
-                          if_line, number_of_nested_conditions,
-                          part_is_active):
-        """Add the active branch of the source code
-
-        Args:
-            code_to_include (List[str]): the code to include
-            current_index (int): the current line of source code
-            finished (bool): True if finished
-            if_line (str): the line with the if condition
-            number_of_nested_conditions (int): the number of nested conditions
-            part_is_active (bool): True if this part is active
-
-        Returns:
-            (int, bool): the new line number and if the parsing is finished
-        """
-        while finished is False and \
-                current_index < len(self.list_of_code_lines):
-            if '#endif' in self.list_of_code_lines[current_index]:
-                finished, number_of_nested_conditions = \
-                    self.process_endif(finished, number_of_nested_conditions,
-                                       current_index)
-
-            elif '#if' in self.list_of_code_lines[current_index]:
-                number_of_nested_conditions += 1
-            elif number_of_nested_conditions > 0:
-                # add all in the nested part
-                pass
-            elif '#elif' in self.list_of_code_lines[current_index]:
-                # if the part was active, add it
-                # if the part was not active and  became active, do not
-                #   add it
-                # else it was not active so not add it
-                # TODO not correct
-                part_is_active = self.check_if_elif_is_active(if_line,
-                                                              part_is_active)
-            elif '#else' in self.list_of_code_lines[current_index]:
-                # if the part was active, add it
-                # if the part was not active and  became active, do not
-                #   add it
-                # else it was not active so not add it
-                part_is_active = self.is_else_part_active(part_is_active)
-                self.list_of_code_lines[current_index] = '\n'
-            else:
-                pass
+    def push_conditional(self, condition):
+        """Start a new conditional group.
 
-            self.parse_line(code_to_include, current_index, part_is_active)
+        K&R A 12.5
 
-            current_index += 1
-        return current_index, finished
+        Args:
+            condition (Callable[[], bool]): evaluates the condition of the
+                                            first branch
 
-    def process_endif(self, finished, number_of_nested_conditions,
-                      current_index):
-        """Process a line containing an endif.
+        Returns:
+            str: a new line if the directive is in active code
+        """
+        if not self.is_active():
+            # the group is skipped entirely, do not evaluate the condition
+            self.conditional_stack.append(ConditionalBranch(False, False))
+            return ''
+        self.conditional_stack.append(ConditionalBranch(True, condition()))
+        return '\n'
+
+    def conditional_if(self, arguments):
+        """Process a #if directive.
 
         Args:
-            finished (bool): True if finished
-            number_of_nested_conditions (int): the number of nested conditions
-            current_index (int): the current line number
+            arguments (List[PPToken]): the tokens after the directive
 
         Returns:
-            (bool, int): the finished condition and the number of nested
-                         conditions
+            str: a new line if the directive is in active code
         """
-        if number_of_nested_conditions == 0:
-            finished = True
-            self.list_of_code_lines[current_index] = '\n'
-        else:
-            number_of_nested_conditions -= 1
-        return finished, number_of_nested_conditions
+        return self.push_conditional(
+            lambda: self.evaluate_constant_expression(
+                tokens_to_string(arguments)))
 
-    def parse_line(self, code_to_include, current_index, part_is_active):
-        """Parse the line.
+    def conditional_ifdef(self, arguments):
+        """Process a #ifdef directive.
 
         Args:
-            code_to_include (List[str]): the list of code to include
-            current_index (int): the current line of code
-            part_is_active (bool): True if this part is active
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: a new line if the directive is in active code
         """
-        if part_is_active is True:
-            code_to_include.append(self.list_of_code_lines[current_index])
-        else:
-            pass
+        identifier = tokens_to_string(strip_whitespace(arguments)[:1])
+        return self.push_conditional(lambda: identifier in self.tokens)
 
-    @staticmethod
-    def is_else_part_active(part_is_active):
-        """Return if the else part is active knowing the if part is active
+    def conditional_ifndef(self, arguments):
+        """Process a #ifndef directive.
 
         Args:
-            part_is_active (bool): True if the if part is active
+            arguments (List[PPToken]): the tokens after the directive
 
         Returns:
-            bool: True if the else part, else None
+            str: a new line if the directive is in active code
         """
-        if part_is_active is False:
-            part_is_active = True
-        elif part_is_active is True:
-            part_is_active = None
-        return part_is_active
+        identifier = tokens_to_string(strip_whitespace(arguments)[:1])
+        return self.push_conditional(lambda: identifier not in self.tokens)
 
-    def check_if_elif_is_active(self, if_line, part_is_active):
-        """Check if the elif is active
+    def get_current_conditional(self, directive):
+        """Get the innermost conditional group.
 
         Args:
-            if_line (str): the line with the condition
-            part_is_active (bool): if the if part is active
+            directive (str): the directive that needs the group
 
         Returns:
-            bool: True if the else part is active
+            ConditionalBranch: the group, None if there is no group
         """
-        if part_is_active is True:
-            part_is_active = None
-        elif part_is_active is False:
-            expression = if_line.split('#elif ')[1]
-            part_is_active = self.evaluate_constant_expression(expression)
-        return part_is_active
+        if not self.conditional_stack:
+            self.preprocessor_error('#%s without #if' % directive)
+            return None
+        branch = self.conditional_stack[-1]
+        if branch.has_else:
+            self.preprocessor_error('#%s after #else' % directive)
+        return branch
 
-    def check_if_branch_is_active(self, if_line):
-        """check the branches of the conditional compilation
+    def conditional_elif(self, arguments):
+        """Process a #elif directive.
 
         Args:
-            if_line (str): the line with the condition
+            arguments (List[PPToken]): the tokens after the directive
 
         Returns:
-            bool: True if the if branch is active
+            str: a new line if the new branch is active
         """
-        if '#ifdef' in if_line:
-            identifier = if_line.split('#ifdef')[1]
-            identifier = ''.join(identifier.split())
+        branch = self.get_current_conditional('elif')
+        if branch is None:
+            return ''
+        if branch.is_taken:
+            branch.is_active = False
+        else:
+            branch.is_active = self.evaluate_constant_expression(
+                tokens_to_string(arguments))
+            branch.is_taken = branch.is_active
+        return '\n' if branch.is_active else ''
 
-            if identifier in self.tokens.keys():
-                part_is_active = True
-            else:
-                part_is_active = False
-        elif '#ifndef' in if_line:
-            identifier = if_line.split('#ifndef')[1]
-            identifier = ''.join(identifier.split())
-            if identifier not in self.tokens.keys():
-                part_is_active = True
-            else:
-                part_is_active = False
+    def conditional_else(self, arguments):
+        """Process a #else directive.
 
-        else:
-            expression = if_line.split('#if ')[1]
-            part_is_active = \
-                self.evaluate_constant_expression(expression)
-        return part_is_active
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: a new line if the else branch is active
+        """
+        branch = self.get_current_conditional('else')
+        if branch is None:
+            return ''
+        branch.has_else = True
+        branch.is_active = not branch.is_taken
+        branch.is_taken = True
+        return '\n' if branch.is_active else ''
+
+    def conditional_endif(self, arguments):
+        """Process a #endif directive.
+
+        Args:
+            arguments (List[PPToken]): the tokens after the directive
+
+        Returns:
+            str: a new line if the closed branch was active
+        """
+        if not self.conditional_stack:
+            self.preprocessor_error('#endif without #if')
+            return ''
+        branch = self.conditional_stack.pop()
+        return '\n' if branch.is_active else ''
 
     def preprocess(self):
         """Run the preprocessor.
 
         """
-        source_file = copy.copy(self.original_input_file)
-        # Remove all carriage returns if present in the file
-        source_file = source_file.replace('\r', '')
-        # split the source file in lines of code
-        # but do not remove the '\n' char
-        list_of_code = self.string_to_list_with_new_lines(source_file)
-        self.list_of_code_lines = copy.copy(list_of_code)
-
-        self.line_count = 0
-        self.source_line_count = 1
-        while self.line_count < len(self.list_of_code_lines):
-            # K&R A 12.1
-            self.run_trigraph_replacement()
-            self.line_count += 1
-            self.source_line_count += 1
-
-        self.line_count = 0
-        self.source_line_count = 1
-        while self.line_count < len(self.list_of_code_lines):
-            # K&R A 12.2
-            self.line_splicing()
-            self.line_count += 1
-            self.source_line_count += 1
-
-        self.line_count = 0
-        self.source_line_count = 1
-        while self.line_count < len(self.list_of_code_lines):
-            # K&R A 12.3
-            self.macro_definition_and_expansion()
-            # K&R A 12.4
-            self.include_files()
-            # K&R A 12.5
-            self.condition_compilation()
-            # K&R A 12.7
-            self.error_generation()
-            self.line_count += 1
-            self.source_line_count += 1
-
-        self.processed_file = ''.join(self.list_of_code_lines)
+        self.file_name = self.original_input_file_name
+        self.line_number = 1
+        self.conditional_stack = []
+        self.include_guard = IncludeGuardDetector()
+        self.processed_file = ''.join(self.preprocess_source(
+            read_physical_lines(self.original_input_file)))
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import enum
+import re
+
+
+# K&R A 12.1
+TRIGRAPHS = {
+    '??=': '#',
+    '??/': '\\',
+    '??\'': '^',
+    '??(': '[',
+    '??)': ']',
+    '??!': '|',
+    '??<': '{',
+    '??>': '}',
+    '??-': '~'
+}
+
+_TRIGRAPH_REGEX = re.compile(r'\?\?[=/\'()!<>\-]')
+_PHYSICAL_LINE_REGEX = re.compile(r'[^\n]*\n|[^\n]+')
+
+
+def read_physical_lines(source):
+    """Split the source in lines and replace the trigraphs.
+
+    K&R A 12.1
+
+    Args:
+        source (str): the source code
+
+    Yields:
+        str: the next line, including its new line if present
+    """
+    # Remove all carriage returns if present in the file
+    source = source.replace('\r', '')
+    for match in _PHYSICAL_LINE_REGEX.finditer(source):
+        yield _TRIGRAPH_REGEX.sub(
+            lambda trigraph: TRIGRAPHS[trigraph.group()], match.group())
+
+
+class PPTokenType(enum.Enum):
+    whitespace = 0
+    newline = 1
+    comment = 2
+    identifier = 3
+    number = 4
+    character_constant = 5
+    string_literal = 6
+    punctuator = 7
+    other = 8
+
+
+# K&R A 12.3, the longest punctuators have to be listed first
+_PUNCTUATORS = [
+    '%:%:', '...', '<<=', '>>=',
+    '->', '++', '--', '<<', '>>', '<=', '>=', '==', '!=', '&&', '||',
+    '*=', '/=', '%=', '+=', '-=', '&=', '^=', '|=', '##',
+    '<:', ':>', '<%', '%>', '%:',
+    '[', ']', '(', ')', '{', '}', '.', '&', '*', '+', '-', '~', '!', '/',
+    '%', '<', '>', '^', '|', '?', ':', ';', '=', ',', '#'
+]
+
+# one alternative per token type, the order of the alternatives matters:
+# comments before the '/' punctuator, prefixed literals before identifiers
+# and pp-numbers before the '.' punctuator
+_PP_TOKEN_PATTERNS = [
+    (PPTokenType.whitespace, r'[ \t\v\f]+'),
+    (PPTokenType.newline, r'\n'),
+    (PPTokenType.comment, r'//[^\n]*|/\*.*?\*/|/\*.*'),
+    (PPTokenType.character_constant, r"(?:u8|[LuU])?'(?:\\.|[^\\'\n])*'?"),
+    (PPTokenType.string_literal, r'(?:u8|[LuU])?"(?:\\.|[^\\"\n])*"?'),
+    (PPTokenType.identifier, r'[A-Za-z_]\w*'),
+    (PPTokenType.number, r'\.?\d(?:[eEpP][+-]|[\w.])*'),
+    (PPTokenType.punctuator,
+     '|'.join(re.escape(punctuator) for punctuator in _PUNCTUATORS)),
+    (PPTokenType.other, r'.'),
+]
+
+IDENTIFIER_REGEX = re.compile(r'[A-Za-z_]\w*')
+
+_PP_TOKEN_REGEX = re.compile(
+    '|'.join('(?P<%s>%s)' % (token_type.name, pattern)
+             for token_type, pattern in _PP_TOKEN_PATTERNS),
+    re.DOTALL)
+
+
+EMPTY_HIDE_SET = frozenset()
+
+
+class PPToken:
+
+    __slots__ = ('token_type', 'text', 'line_number', 'hide_set')
+
+    def __init__(self, token_type, text, line_number,
+                 hide_set=EMPTY_HIDE_SET):
+        """Create a preprocessing token.
+
+        Args:
+            token_type (PPTokenType): the type of the token
+            text (str): the source text of the token
+            line_number (int): the source line the token starts on
+            hide_set (frozenset): the names of the macros that may not be
+                                  expanded again for this token
+        """
+        self.token_type = token_type
+        self.text = text
+        self.line_number = line_number
+        self.hide_set = hide_set
+
+    def __eq__(self, other):
+        return isinstance(other, PPToken) and \
+            self.token_type == other.token_type and \
+            self.text == other.text
+
+    def __hash__(self):
+        return hash((self.token_type, self.text))
+
+    def __repr__(self):
+        return 'PPToken(%s, %r, %d)' % (self.token_type.name, self.text,
+                                        self.line_number)
+
+    def add_to_hide_set(self, hide_set):
+        """Get a copy of the token with a larger hide set.
+
+        Args:
+            hide_set (frozenset): the macro names to add to the hide set
+
+        Returns:
+            PPToken: the new token
+        """
+        return PPToken(self.token_type, self.text, self.line_number,
+                       self.hide_set | hide_set)
+
+    def is_whitespace(self):
+        """Check if the token only separates other tokens.
+
+        Comments are replaced by whitespace in translation phase 3,
+        so they count as whitespace as well.
+
+        Returns:
+            bool: True if the token is whitespace, a comment or a newline
+        """
+        return self.token_type in (PPTokenType.whitespace,
+                                   PPTokenType.comment,
+                                   PPTokenType.newline)
+
+    def is_punctuator(self, text):
+        """Check if the token is the given punctuator.
+
+        Args:
+            text (str): the punctuator to compare against
+
+        Returns:
+            bool: True if the token is this punctuator
+        """
+        return self.token_type == PPTokenType.punctuator and \
+            self.text == text
+
+    def is_unterminated_comment(self):
+        """Check if the token is a block comment without its closing '*/'.
+
+        Returns:
+            bool: True if the comment continues on the next line
+        """
+        return self.token_type == PPTokenType.comment and \
+            self.text.startswith('/*') and \
+            (len(self.text) < 4 or not self.text.endswith('*/'))
+
+
+def tokenize(source, line_number=1):
+    """Split the source in preprocessing tokens.
+
+    Every character of the source is part of exactly one token, so joining
+    the text of the tokens gives back the original source.
+
+    Args:
+        source (str): the source to tokenize
+        line_number (int): the line number of the first character
+
+    Returns:
+        List[PPToken]: the preprocessing tokens
+    """
+    tokens = []
+    for match in _PP_TOKEN_REGEX.finditer(source):
+        text = match.group()
+        tokens.append(PPToken(PPTokenType[match.lastgroup], text,
+                              line_number))
+        line_number += text.count('\n')
+    return tokens
+
+
+def tokens_to_string(tokens):
+    """Convert the tokens back to source code.
+
+    Args:
+        tokens (List[PPToken]): the tokens to convert
+
+    Returns:
+        str: the source code
+    """
+    return ''.join(token.text for token in tokens)
+
+
+def strip_whitespace(tokens):
+    """Remove the leading and trailing whitespace tokens.
+
+    Args:
+        tokens (List[PPToken]): the tokens to strip
+
+    Returns:
+        List[PPToken]: the tokens without surrounding whitespace
+    """
+    start = 0
+    end = len(tokens)
+    while start < end and tokens[start].is_whitespace():
+        start += 1
+    while end > start and tokens[end - 1].is_whitespace():
+        end -= 1
+    return tokens[start:end]
+
+
+def stringize(tokens):
+    """Convert the tokens to a string literal, as done by the # operator.
+
+    K&R A 12.3, whitespace between the tokens becomes a single space and
+    the quotes and backslashes of string and character literals are escaped.
+
+    Args:
+        tokens (List[PPToken]): the tokens to convert
+
+    Returns:
+        PPToken: the string literal
+    """
+    parts = []
+    separate = False
+    for token in strip_whitespace(tokens):
+        if token.is_whitespace():
+            separate = True
+            continue
+        if separate:
+            parts.append(' ')
+            separate = False
+        if token.token_type in (PPTokenType.string_literal,
+                                PPTokenType.character_constant):
+            parts.append(token.text.replace('\\', '\\\\').replace('"', '\\"'))
+        else:
+            parts.append(token.text)
+    line_number = tokens[0].line_number if tokens else 0
+    return PPToken(PPTokenType.string_literal, '"%s"' % ''.join(parts),
+                   line_number)
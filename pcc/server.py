@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Compile server, started with pcc --server.
+
+The server keeps the modules of the compiler and the include cache loaded
+between compilations. The thin client in pcc.client sends it the
+command-line arguments of a compilation over a Unix socket, every request
+is compiled in its own thread.
+"""
+
+from __future__ import print_function
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+
+class ThreadLocalStream:
+    """A text stream that forwards to the stream of the current thread."""
+
+    def __init__(self, default_stream):
+        """Create a stream that writes to a different stream per thread.
+
+        sys.stdout and sys.stderr are shared by all the threads, so they
+        are replaced by this stream to keep the output of the requests
+        apart.
+
+        Args:
+            default_stream (io.TextIOBase): the stream of the threads that
+                do not redirect their output
+        """
+        self.default_stream = default_stream
+        self.local = threading.local()
+
+    def get_stream(self):
+        """Get the stream of the current thread.
+
+        Returns:
+            io.TextIOBase: the stream to write to
+        """
+        return getattr(self.local, 'stream', self.default_stream)
+
+    @contextlib.contextmanager
+    def redirect(self, stream):
+        """Redirect the output of the current thread.
+
+        Args:
+            stream (io.TextIOBase): the stream to write to
+
+        Yields:
+            io.TextIOBase: the stream
+        """
+        self.local.stream = stream
+        try:
+            yield stream
+        finally:
+            del self.local.stream
+
+    def write(self, text):
+        """Write to the stream of the current thread.
+
+        Args:
+            text (str): the text to write
+
+        Returns:
+            int: the number of characters written
+        """
+        return self.get_stream().write(text)
+
+    def flush(self):
+        """Flush the stream of the current thread."""
+        self.get_stream().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.get_stream(), name)
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    """Handler of a connection of a client, that compiles one request."""
+
+    def handle(self):
+        """Compile one request and send back its output.
+
+        The request is a line with a JSON object, with the command-line
+        arguments in 'argv' and the working directory of the client in
+        'cwd'. The response is a line with a JSON object, with the error
+        code in 'result' and the output in 'stdout' and 'stderr'.
+        """
+        line = self.rfile.readline()
+        if not line:
+            return
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with self.server.stdout.redirect(stdout), \
+                self.server.stderr.redirect(stderr):
+            try:
+                request = json.loads(line.decode('utf-8'))
+                result = self.server.compile_function(request['argv'],
+                                                      request['cwd'])
+            except SystemExit as exception:
+                result = get_exit_code(exception)
+            except Exception:
+                traceback.print_exc()
+                result = 1
+        response = {'result': result,
+                    'stdout': stdout.getvalue(),
+                    'stderr': stderr.getvalue()}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class CompileServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    """Server that compiles every request of a client in its own thread."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, compile_function):
+        """Create a server listening on a Unix socket.
+
+        sys.stdout and sys.stderr are replaced until the server is closed,
+        so that every request gets its own output.
+
+        Args:
+            socket_path (str): the path of the socket
+            compile_function (Callable[[List[str], str], int]): compiles
+                the command-line arguments of a request, relative to the
+                working directory of the client, and returns the error code
+        """
+        self.compile_function = compile_function
+        super().__init__(socket_path, CompileRequestHandler)
+        self.stdout = ThreadLocalStream(sys.stdout)
+        self.stderr = ThreadLocalStream(sys.stderr)
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+
+    def server_close(self):
+        """Stop listening, remove the socket and restore the streams."""
+        super().server_close()
+        sys.stdout = self.stdout.default_stream
+        sys.stderr = self.stderr.default_stream
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+@contextlib.contextmanager
+def redirect_output(stdout, stderr):
+    """Redirect the output of the current thread.
+
+    In the compile server only the output of the current request is
+    redirected, elsewhere sys.stdout and sys.stderr are replaced.
+
+    Args:
+        stdout (io.TextIOBase): the stream for the standard output
+        stderr (io.TextIOBase): the stream for the standard error
+
+    Yields:
+        None
+    """
+    if isinstance(sys.stdout, ThreadLocalStream) and \
+            isinstance(sys.stderr, ThreadLocalStream):
+        with sys.stdout.redirect(stdout), sys.stderr.redirect(stderr):
+            yield
+    else:
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            yield
+
+
+def get_exit_code(exception):
+    """Get the error code of a SystemExit, like the interpreter does.
+
+    Args:
+        exception (SystemExit): the exception
+
+    Returns:
+        int: the error code
+    """
+    if exception.code is None:
+        return 0
+    if isinstance(exception.code, int):
+        return exception.code
+    print(exception.code, file=sys.stderr)
+    return 1
+
+
+def is_server_running(socket_path):
+    """Check if a server is listening on a socket.
+
+    Args:
+        socket_path (str): the path of the socket
+
+    Returns:
+        bool: True if a connection can be made
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def stop_server(signal_number, frame):
+    """Stop the server on SIGTERM, like on a keyboard interrupt.
+
+    Args:
+        signal_number (int): the received signal
+        frame (frame): the interrupted stack frame
+    """
+    raise KeyboardInterrupt
+
+
+def serve(socket_path, compile_function):
+    """Run the compile server until it is interrupted or terminated.
+
+    Args:
+        socket_path (str): the path of the socket
+        compile_function (Callable[[List[str], str], int]): compiles the
+            command-line arguments of a request, relative to the working
+            directory of the client, and returns the error code
+
+    Returns:
+        int: error code, 0 if successful
+    """
+    if os.path.exists(socket_path):
+        if is_server_running(socket_path):
+            print('a server is already listening on %s' % socket_path,
+                  file=sys.stderr)
+            return 1
+        # left behind by a server that did not stop cleanly
+        os.remove(socket_path)
+    server = CompileServer(socket_path, compile_function)
+    signal.signal(signal.SIGTERM, stop_server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
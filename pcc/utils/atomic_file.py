@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import os
+import tempfile
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w'):
+    """Write a file that replaces the file at the path at once.
+
+    The content is written to a file with a unique name in the same
+    directory, the threads of the compile server and other processes might
+    write the same path while others are reading it. The directory is
+    created if it does not exist.
+
+    Args:
+        path (str): the path of the file
+        mode (str, optional): the mode to open the file with, 'w' or 'wb'
+
+    Yields:
+        io.IOBase: the opened temporary file
+
+    Raises:
+        OSError: if the file can not be written, the temporary file is
+            removed
+    """
+    directory = os.path.dirname(path) or os.curdir
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp',
+                                                       dir=directory)
+    try:
+        with os.fdopen(file_descriptor, mode) as temporary_file:
+            yield temporary_file
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
@@ -296,7 +296,8 @@ setup_dict = dict(
     zip_safe=False,  # don't use eggs
     entry_points={
         'console_scripts': [
-            'pcc_cli = pcc.main:entry_point'
+            'pcc_cli = pcc.main:entry_point',
+            'pcc_client = pcc.client:entry_point'
         ],
     }
 )
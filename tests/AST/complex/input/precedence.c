@@ -0,0 +1,11 @@
+void foo(void);
+
+void foo(void)
+{
+    int p = 1;
+    int q = 2;
+    int c = p + q * 2 - 1;
+    int d = (p - q) * (q + 3);
+    int e = p < q && !q || p == 1 & q;
+    c = ~p ^ q | 4 / p;
+}
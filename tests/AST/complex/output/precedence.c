@@ -0,0 +1,72 @@
+FileAST: 
+  Decl: foo, [], [], []
+    FuncDecl: 
+      ParamList: 
+        Typename: None, []
+          TypeDecl: None, []
+            IdentifierType: ['void']
+      TypeDecl: foo, []
+        IdentifierType: ['void']
+  FuncDef: 
+    Decl: foo, [], [], []
+      FuncDecl: 
+        ParamList: 
+          Typename: None, []
+            TypeDecl: None, []
+              IdentifierType: ['void']
+        TypeDecl: foo, []
+          IdentifierType: ['void']
+    Compound: 
+      Decl: p, [], [], []
+        TypeDecl: p, []
+          IdentifierType: ['int']
+        Constant: int, 1
+      Decl: q, [], [], []
+        TypeDecl: q, []
+          IdentifierType: ['int']
+        Constant: int, 2
+      Decl: c, [], [], []
+        TypeDecl: c, []
+          IdentifierType: ['int']
+        BinaryOp: -
+          BinaryOp: +
+            ID: p
+            BinaryOp: *
+              ID: q
+              Constant: int, 2
+          Constant: int, 1
+      Decl: d, [], [], []
+        TypeDecl: d, []
+          IdentifierType: ['int']
+        BinaryOp: *
+          BinaryOp: -
+            ID: p
+            ID: q
+          BinaryOp: +
+            ID: q
+            Constant: int, 3
+      Decl: e, [], [], []
+        TypeDecl: e, []
+          IdentifierType: ['int']
+        BinaryOp: ||
+          BinaryOp: &&
+            BinaryOp: <
+              ID: p
+              ID: q
+            UnaryOp: !
+              ID: q
+          BinaryOp: &
+            BinaryOp: ==
+              ID: p
+              Constant: int, 1
+            ID: q
+      Assignment: =
+        ID: c
+        BinaryOp: |
+          BinaryOp: ^
+            UnaryOp: ~
+              ID: p
+            ID: q
+          BinaryOp: /
+            Constant: int, 4
+            ID: p
@@ -0,0 +1,10 @@
+int foo(int i)
+{
+    int j = i;
+    return j;
+}
+int bar(void);
+int bar(void)
+{
+    return foo(1);
+}
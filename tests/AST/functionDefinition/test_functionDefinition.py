@@ -18,7 +18,8 @@ files_to_test = [
     'void_int_arg.c',
     'void_double_arg.c',
     'void_char_arg.c',
-    'void_int_char_args.c'
+    'void_int_char_args.c',
+    'no_declaration.c',
 ]
 
 
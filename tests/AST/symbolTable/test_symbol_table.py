@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from pcc.AST.ast import Ast
+
+
+class TestSymbolTable(object):
+
+    @staticmethod
+    def parse(source_code):
+        ast = Ast(source_code, 'test.c')
+        ast.run_ast()
+        return ast
+
+    def test_global_symbols(self):
+        ast = self.parse('extern int i;\nint i;\nint foo(void);\n')
+        variable = ast.root_node.get_global_symbol('i')
+        function = ast.root_node.get_global_symbol('foo')
+        # the first declaration is kept
+        assert variable is ast.root_node.statement_sequence[0]
+        assert variable.is_extern
+        assert function is ast.root_node.statement_sequence[2]
+        assert ast.root_node.get_global_symbol('bar') is None
+
+    def test_local_symbols_leave_scope(self):
+        ast = self.parse('int foo(int i)\n{\n    int j = i;\n'
+                         '    return j;\n}\n')
+        assert ast.get_variable_definition_from_id('i') is None
+        assert ast.get_variable_definition_from_id('j') is None
+        assert ast.is_function_declared('foo') is not None
+        compound = ast.root_node.statement_sequence[0].statement_sequence[1]
+        initializer = compound.statement_sequence[0].initializer
+        assert initializer.name == 'i'
+
+    def test_shadowed_symbol(self):
+        ast = self.parse('int c;\nint foo(void);\nvoid bar(void)\n{\n'
+                         '    int foo = 2;\n    c = foo;\n}\n')
+        compound = ast.root_node.statement_sequence[2].statement_sequence[1]
+        assignment = compound.statement_sequence[1]
+        # the local variable hides the function
+        assert assignment.initializer_exp.name == 'foo'
+        assert ast.is_function_declared('foo') is not None
+
+    def test_recursive_call_without_prototype(self):
+        ast = self.parse('int f(int n)\n{\n    return n * f(n - 1);\n}\n')
+        definition = ast.root_node.statement_sequence[0]
+        declaration = definition.statement_sequence[0]
+        compound = definition.statement_sequence[1]
+        call = compound.statement_sequence[0].expression.operand_2
+        # the definition is visible in its own body
+        assert call.get_global_symbol('f') is declaration
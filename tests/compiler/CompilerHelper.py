@@ -44,7 +44,7 @@ def generate_compiler_outputs(files_to_test, folder_path):
 class CompilerHelper(object):
 
     def execute_test(self, input_file, helper_file, output_file, capsys,
-                     path_of_files):
+                     path_of_files, extra_arguments=None):
         """Execute the tests for the preprocessor.
 
         Args:
@@ -53,6 +53,7 @@ class CompilerHelper(object):
             output_file (str): the output file of the test
             capsys (method): the capsys fixture from pytest
             path_of_files (str): the path of the
+            extra_arguments (List[str], optional): more arguments for pcc
         """
         input_path = 'input'
         output_path = 'output'
@@ -69,6 +70,7 @@ class CompilerHelper(object):
         argsv = list(['progname'])
         argsv.append('-c')
         argsv.append('-o' + str(pcc_output_file_path))
+        argsv.extend(extra_arguments or [])
         argsv.append(input_file_with_path)
         main(argsv)
         out, err = capsys.readouterr()
@@ -115,6 +117,37 @@ class CompilerHelper(object):
         os.remove(pcc_output_file_path)
         os.remove(gcc_exe)
 
+    def execute_linked_test(self, input_files, exit_code, capsys,
+                            path_of_files, extra_arguments=None):
+        """Execute the test of a program linked by pcc, without gcc.
+
+        The program has no library, the result of its main is checked as
+        its exit code.
+
+        Args:
+            input_files (List[str]): the source files of the program
+            exit_code (int): the expected exit code
+            capsys (method): the capsys fixture from pytest
+            path_of_files (str): the path of the input folder
+            extra_arguments (List[str], optional): more arguments for pcc
+        """
+        executable_path = join(path_of_files, 'test.exe')
+        argsv = ['progname', '-o' + executable_path]
+        argsv.extend(extra_arguments or [])
+        argsv.extend(join(path_of_files, 'input', input_file)
+                     for input_file in input_files)
+        assert main(argsv) == 0
+        out, err = capsys.readouterr()
+        assert out == ''
+        # there should be no error
+        assert err == ''
+
+        response = subprocess.run([executable_path], stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE)
+        assert response.returncode == exit_code, response.stderr
+
+        os.remove(executable_path)
+
     @staticmethod
     def extract_file_contents(output_file_with_path):
         with open(output_file_with_path, 'r') as fileToRead:
@@ -0,0 +1,85 @@
+from pcc.AST.ast import Ast
+from pcc.AST.compiled_object import CompiledObject, CompiledObjectType
+from pcc.compiler.compiled_object_cache import CompiledObjectCache
+from pcc.compiler.compiler import Compiler
+from pcc.compiler.relocation_object import RelocationObject
+
+SOURCE = '''int global = 1;
+
+int first(int a)
+{
+    return a + global;
+}
+
+int second(int b)
+{
+    return b * 2;
+}
+'''
+
+
+def compile_source(source, compiled_object_cache, options=None):
+    ast = Ast(source, 'file.c')
+    assert ast.run_ast() == 0
+    compiler = Compiler('file.c', ast.root_node, options,
+                        compiled_object_cache)
+    compiler.compile()
+    return compiler.object_file.to_binary_array()
+
+
+class TestCompiledObjectCache(object):
+
+    def test_only_changed_function_is_compiled(self):
+        compiled_object_cache = CompiledObjectCache()
+        compile_source(SOURCE, compiled_object_cache)
+        assert compiled_object_cache.misses == 3
+
+        changed_source = SOURCE.replace('b * 2', 'b * 3')
+        object_file = compile_source(changed_source, compiled_object_cache)
+        assert compiled_object_cache.hits == 2
+        assert compiled_object_cache.misses == 4
+        assert object_file == compile_source(changed_source,
+                                             CompiledObjectCache())
+
+    def test_changed_declaration_compiles_again(self):
+        compiled_object_cache = CompiledObjectCache()
+        compile_source(SOURCE, compiled_object_cache)
+        changed_source = SOURCE.replace('int global = 1', 'char global = 1')
+        object_file = compile_source(changed_source, compiled_object_cache)
+        assert compiled_object_cache.hits == 0
+        assert object_file == compile_source(changed_source,
+                                             CompiledObjectCache())
+
+    def test_options_are_part_of_the_fingerprint(self):
+        compiled_object_cache = CompiledObjectCache()
+        compile_source(SOURCE, compiled_object_cache)
+        compile_source(SOURCE, compiled_object_cache, {'O': 1})
+        assert compiled_object_cache.hits == 0
+
+    def test_cached_object_is_a_copy(self):
+        compiled_object_cache = CompiledObjectCache()
+        relocation_object = RelocationObject('global', 3,
+                                             CompiledObjectType.data, -4)
+        compiled_object = CompiledObject('f', 7, bytearray(7),
+                                         CompiledObjectType.code,
+                                         [relocation_object])
+        compiled_object_cache.put('f', compiled_object)
+        relocation_object.offset += 10
+
+        cached_object = compiled_object_cache.get('f')
+        assert cached_object.relocation_objects[0].offset == 3
+        cached_object.relocation_objects[0].offset += 10
+        assert compiled_object_cache.get('f').relocation_objects[0].offset \
+            == 3
+
+    def test_least_recently_used_is_dropped(self):
+        compiled_object_cache = CompiledObjectCache(max_entries=2)
+        for name in ['first', 'second']:
+            compiled_object_cache.put(name, CompiledObject(
+                name, 0, bytearray(), CompiledObjectType.code, []))
+        assert compiled_object_cache.get('first') is not None
+        compiled_object_cache.put('third', CompiledObject(
+            'third', 0, bytearray(), CompiledObjectType.code, []))
+        assert compiled_object_cache.get('second') is None
+        assert compiled_object_cache.get('first') is not None
+        assert compiled_object_cache.get('third') is not None
@@ -0,0 +1,13 @@
+int foo(void);
+
+int foo(void)
+{
+    int a = 4 * 5 + 3;
+    int b = a * 8;
+    int c = b + 0;
+    int d = c * 1 - 0;
+    int e = (10 - 4) / 4;
+    int f = 7 == 7;
+    int g = ~0;
+    return d + e + f + g;
+}
@@ -0,0 +1,24 @@
+int foo(void);
+
+int total = 0;
+
+int foo(void)
+{
+    if (0)
+    {
+        total = 1;
+    }
+    if (2 > 1)
+        total = 5;
+    else
+        total = 6;
+    if (1 && 0)
+        total = 8;
+    while (0)
+    {
+        total = 100;
+    }
+    while (1 - 1)
+        total = 7;
+    return total;
+}
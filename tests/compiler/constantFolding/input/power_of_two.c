@@ -0,0 +1,11 @@
+int foo(void);
+
+int foo(void)
+{
+    int a = -3;
+    int b = a * 16;
+    int c = 1024 * a;
+    int d = a + 1;
+    int e = 2 * d;
+    return b + c + e;
+}
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+from os.path import abspath, dirname
+
+import pytest
+
+import tests.generateOutputsDecorator
+from pcc.AST.ast import Ast
+from pcc.AST.bitwise_operators.shift_left import ShiftLeft
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.AST.constant_folding import fold_constants
+from tests.compiler.CompilerHelper import CompilerHelper, \
+    generate_compiler_outputs
+
+generate_outputs = tests.generateOutputsDecorator.generate_outputs
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+files_to_test = [
+    ('arithmetic.c', 'intHelper.c', 'arithmetic.out'),
+    ('power_of_two.c', 'intHelper.c', 'power_of_two.out'),
+    ('branches.c', 'intHelper.c', 'branches.out'),
+]
+
+
+@generate_outputs
+def generate_compiler_test_outputs():
+    path_of_this_file = abspath(dirname(__file__))
+    generate_compiler_outputs(files_to_test, path_of_this_file)
+
+
+def fold_function_body(source):
+    ast = Ast(source, 'file.c')
+    assert ast.run_ast() == 0
+    fold_constants(ast.root_node)
+    function_definition = ast.root_node.statement_sequence[-1]
+    return function_definition.statement_sequence[1].statement_sequence
+
+
+class TestConstantFolding(CompilerHelper):
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_constant_folding(self, file_to_test, helper, output_file,
+                              capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_without_folding(self, file_to_test, helper, output_file,
+                             capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file)
+
+    def test_constant_is_folded(self):
+        statements = fold_function_body(
+            'int f(void)\n{\n    return (1 + 2) * 3 - 10 / 4;\n}\n')
+        expression = statements[0].expression
+        assert isinstance(expression, ConstantExpression)
+        assert expression.exp_value == '7'
+
+    def test_multiplication_becomes_shift(self):
+        statements = fold_function_body(
+            'int f(int a)\n{\n    return a * 1 * 8;\n}\n')
+        expression = statements[0].expression
+        assert isinstance(expression, ShiftLeft)
+        assert expression.amount == 3
+
+    def test_overflow_wraps_around(self):
+        statements = fold_function_body(
+            'int f(void)\n{\n    return 65536 * 65536 + 2147483647 + 1;\n}\n')
+        assert statements[0].expression.exp_value == '-2147483648'
+
+    def test_division_by_zero_is_not_folded(self):
+        statements = fold_function_body(
+            'int f(void)\n{\n    return 1 / 0;\n}\n')
+        assert not isinstance(statements[0].expression, ConstantExpression)
+
+    def test_dead_branches_are_removed(self):
+        statements = fold_function_body(
+            'int f(int a)\n{\n    if (0)\n        a = 1;\n'
+            '    while (2 < 1)\n        a = 2;\n'
+            '    if (1)\n        a = 3;\n    else\n        a = 4;\n'
+            '    return a;\n}\n')
+        assert len(statements) == 2
+        assert statements[0].initializer_exp.exp_value == '3'
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from pcc.AST.ast import Ast
+from pcc.compiler.compiler import Compiler
+from pcc.compiler.elf_reader import ElfReader
+from pcc.compiler.object_file_to_rst_table import parse
+
+SOURCE = '''int global = 1;
+
+int add(int a)
+{
+    return a + global;
+}
+
+int main()
+{
+    return add(2);
+}
+'''
+
+
+@pytest.fixture
+def object_file_name(tmp_path):
+    ast = Ast(SOURCE, 'file.c')
+    assert ast.run_ast() == 0
+    compiler = Compiler('file.c', ast.root_node, None)
+    compiler.compile()
+    object_file = tmp_path / 'file.o'
+    object_file.write_bytes(compiler.object_file.to_binary_array())
+    return str(object_file)
+
+
+class TestElfReader(object):
+
+    def test_sections(self, object_file_name):
+        with ElfReader.open(object_file_name) as reader:
+            names = [section.name for section in reader.sections]
+            assert names[:3] == ['', '.text', '.data']
+            data = reader.get_section('.data')
+            with reader.get_section_data(data) as content:
+                assert content == b'\x01\x00\x00\x00'
+            assert reader.get_section('.rela.text') is None
+
+    def test_symbols(self, object_file_name):
+        with ElfReader.open(object_file_name) as reader:
+            symbol_table = reader.get_section('.symtab')
+            symbols = {reader.get_symbol_name(symbol_table, symbol): symbol
+                       for symbol in reader.iter_symbols()}
+            assert symbols['global'].st_shndx == \
+                reader.get_section_index('.data')
+            assert symbols['main'].st_shndx == \
+                reader.get_section_index('.text')
+            assert 'file.c' in symbols
+
+    def test_relocations(self, object_file_name):
+        with ElfReader.open(object_file_name) as reader:
+            symbol_table = reader.get_section('.symtab')
+            symbols = list(reader.iter_symbols(symbol_table))
+            relocations = list(reader.iter_relocations(
+                reader.get_section('.text.rela')))
+            names = [reader.get_symbol_name(symbol_table,
+                                            symbols[entry.info >> 32])
+                     for entry in relocations]
+            assert names == ['global', 'add']
+            assert all(entry.addend < 0 for entry in relocations)
+
+    def test_no_elf_file(self, tmp_path):
+        with pytest.raises(ValueError):
+            ElfReader(b'#!/bin/sh\n' * 10)
+        empty_file = tmp_path / 'empty.o'
+        empty_file.write_bytes(b'')
+        with pytest.raises(ValueError):
+            ElfReader.open(str(empty_file))
+
+    def test_rst_table(self, object_file_name, capsys):
+        parse(object_file_name)
+        out, _ = capsys.readouterr()
+        assert 'section_name .symtab, type SHT_SYMTAB' in out
+        assert 'main (index ' in out
+        assert 'relocatable entry at offset' in out
@@ -0,0 +1,14 @@
+extern int external_integer;
+
+int factorial(int n)
+{
+    if (n < 2)
+        return 1;
+    return n * factorial(n - 1);
+}
+
+int foo(void)
+{
+    external_integer = factorial(4);
+    return factorial(5);
+}
@@ -17,6 +17,7 @@ files_to_test = [
     ('simpleFunctionCall.c', 'int_helper.c', 'simpleFunctionCall.out'),
     ('functionCallIntArg.c', 'int_helper.c', 'functionCallIntArg.out'),
     ('helloWorld.c', 'int_helper.c', 'helloWorld.out'),
+    ('recursiveFunctionCall.c', 'int_helper.c', 'recursiveFunctionCall.out'),
 ]
 
 
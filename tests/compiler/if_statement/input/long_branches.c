@@ -0,0 +1,44 @@
+int foo(void);
+
+int foo(void)
+{
+    int i = 0;
+    int j = 0;
+    if(j)
+    {
+        i = i + 1;
+        i = i + 2;
+        i = i + 3;
+        i = i + 4;
+        i = i + 5;
+        i = i + 6;
+        i = i + 7;
+        i = i + 8;
+        i = i + 9;
+        i = i + 10;
+        i = i + 11;
+        i = i + 12;
+        i = i + 13;
+        i = i + 14;
+        i = i + 15;
+    }
+    else
+    {
+        i = i - 1;
+        i = i - 2;
+        i = i - 3;
+        i = i - 4;
+        i = i - 5;
+        i = i - 6;
+        i = i - 7;
+        i = i - 8;
+        i = i - 9;
+        i = i - 10;
+        i = i - 11;
+        i = i - 12;
+        i = i - 13;
+        i = i - 14;
+        i = i - 15;
+    }
+    return i;
+}
@@ -22,6 +22,7 @@ files_to_test = [
     ('constant_false_else.c', 'intHelper.c', 'constant_false_else.out'),
     ('variable_true_else.c', 'intHelper.c', 'variable_true_else.out'),
     ('variable_false_else.c', 'intHelper.c', 'variable_false_else.out'),
+    ('long_branches.c', 'intHelper.c', 'long_branches.out'),
 ]
 
 
@@ -38,3 +39,9 @@ class TestIf(CompilerHelper):
         path_of_this_file = abspath(dirname(__file__))
         self.execute_test(file_to_test, helper, output_file, capsys,
                           path_of_this_file)
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_if_optimized(self, file_to_test, helper, output_file, capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
@@ -0,0 +1,70 @@
+import pytest
+
+from pcc.AST.compiled_object import CompiledObjectType
+from pcc.compiler.assembler_x64 import X64Assembler
+from pcc.compiler.instruction_buffer import InstructionBuffer
+from pcc.compiler.relocation_object import RelocationObject
+
+
+class TestInstructionBuffer(object):
+
+    def test_short_jumps(self):
+        instructions = InstructionBuffer(X64Assembler())
+        start = instructions.create_label('start')
+        end = instructions.create_label('end')
+        instructions.place_label(start)
+        instructions.je(end)
+        instructions.append(bytearray(b'\x90' * 3))
+        instructions.jmp(start)
+        instructions.place_label(end)
+
+        value, relocation_objects = instructions.resolve()
+        assert value == bytearray(b'\x74\x05' + b'\x90' * 3 + b'\xeb\xf9')
+        assert relocation_objects == []
+
+    def test_near_jump(self):
+        instructions = InstructionBuffer(X64Assembler())
+        end = instructions.create_label('end')
+        instructions.jne(end)
+        instructions.append(bytearray(128))
+        instructions.place_label(end)
+
+        value, _ = instructions.resolve()
+        assert value[:6] == bytearray(b'\x0f\x85\x80\x00\x00\x00')
+        assert len(value) == 6 + 128
+
+    def test_growing_jump_moves_other_jumps(self):
+        instructions = InstructionBuffer(X64Assembler())
+        first = instructions.create_label('first')
+        second = instructions.create_label('second')
+        instructions.jmp(first)
+        instructions.append(bytearray(124))
+        # the second jump only fits in 2 bytes for the first jump to be
+        # short, but it needs 5
+        instructions.jmp(second)
+        instructions.place_label(first)
+        instructions.append(bytearray(200))
+        instructions.place_label(second)
+
+        value, _ = instructions.resolve()
+        assert value[:5] == bytearray(b'\xe9\x81\x00\x00\x00')
+        assert value[129:134] == bytearray(b'\xe9\xc8\x00\x00\x00')
+
+    def test_relocation_objects_are_moved(self):
+        instructions = InstructionBuffer(X64Assembler())
+        end = instructions.create_label('end')
+        instructions.je(end)
+        relocation_object = RelocationObject('global', 2,
+                                             CompiledObjectType.data, -4)
+        instructions.append(bytearray(6), [relocation_object])
+        instructions.place_label(end)
+
+        _, relocation_objects = instructions.resolve()
+        assert relocation_objects == [relocation_object]
+        assert relocation_object.offset == 4
+
+    def test_label_not_placed(self):
+        instructions = InstructionBuffer(X64Assembler())
+        instructions.jmp(instructions.create_label('nowhere'))
+        with pytest.raises(ValueError):
+            instructions.resolve()
@@ -0,0 +1,7 @@
+extern int external_integer;
+
+int set_external(int value)
+{
+    external_integer = value;
+    return 0;
+}
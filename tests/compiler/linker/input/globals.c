@@ -0,0 +1,11 @@
+int first;
+int second;
+char third;
+
+int main()
+{
+    first = 1;
+    second = 2;
+    third = 3;
+    return first * 100 + second * 10 + third;
+}
@@ -0,0 +1,10 @@
+int add(int a, int b);
+
+int base = 40;
+int counter;
+
+int main()
+{
+    counter = add(base, 1);
+    return counter + 1;
+}
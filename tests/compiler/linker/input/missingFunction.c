@@ -0,0 +1,6 @@
+int missing(void);
+
+int main()
+{
+    return missing();
+}
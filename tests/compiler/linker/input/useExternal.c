@@ -0,0 +1,9 @@
+int set_external(int value);
+
+int external_integer = 1;
+
+int main()
+{
+    set_external(7);
+    return external_integer * 3;
+}
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import subprocess
+from os.path import abspath, dirname, join
+
+import pytest
+
+from pcc.main import main
+from tests.compiler.CompilerHelper import CompilerHelper
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+# the source files of a program and the exit code, the result of its main
+files_to_test = [
+    (['main.c', 'add.c'], 42),
+    (['globals.c'], 123),
+    (['useExternal.c', 'external.c'], 21),
+]
+
+
+def get_input_path(input_file):
+    return join(abspath(dirname(__file__)), 'input', input_file)
+
+
+class TestLinker(CompilerHelper):
+
+    @parametrize('input_files,exit_code', files_to_test)
+    def test_linker(self, input_files, exit_code, capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_linked_test(input_files, exit_code, capsys,
+                                 path_of_this_file)
+
+    @parametrize('input_files,exit_code', files_to_test)
+    def test_with_optimization(self, input_files, exit_code, capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_linked_test(input_files, exit_code, capsys,
+                                 path_of_this_file, ['-O1', '-j', '2'])
+
+    def test_link_object_files(self, tmp_path, capsys):
+        add_object = str(tmp_path / 'add.o')
+        assert main(['progname', '-c', '-o', add_object,
+                     get_input_path('add.c')]) == 0
+        executable = str(tmp_path / 'a.out')
+        assert main(['progname', '-o', executable, get_input_path('main.c'),
+                     add_object]) == 0
+        out, err = capsys.readouterr()
+        assert out == ''
+        assert err == ''
+        assert subprocess.run([executable]).returncode == 42
+
+    def test_undefined_reference(self, tmp_path, capsys):
+        executable = tmp_path / 'a.out'
+        assert main(['progname', '-o', str(executable),
+                     get_input_path('external.c')]) == 1
+        _, err = capsys.readouterr()
+        assert 'undefined reference to external_integer' in err
+        assert 'undefined reference to main' in err
+        assert not executable.exists()
+
+    def test_undefined_function(self, tmp_path, capsys):
+        executable = tmp_path / 'a.out'
+        assert main(['progname', '-o', str(executable),
+                     get_input_path('missingFunction.c')]) == 1
+        _, err = capsys.readouterr()
+        assert 'undefined reference to missing' in err
+        assert not executable.exists()
+
+    def test_missing_object_file(self, tmp_path, capsys):
+        executable = tmp_path / 'a.out'
+        missing_object = str(tmp_path / 'missing.o')
+        assert main(['progname', '-o', str(executable),
+                     get_input_path('main.c'), missing_object]) == 1
+        _, err = capsys.readouterr()
+        assert missing_object in err
+        assert 'No such file or directory' in err
+        assert not executable.exists()
+
+    def test_multiple_definition(self, tmp_path, capsys):
+        executable = tmp_path / 'a.out'
+        assert main(['progname', '-o', str(executable),
+                     get_input_path('main.c'), get_input_path('add.c'),
+                     get_input_path('add.c')]) == 1
+        _, err = capsys.readouterr()
+        assert 'multiple definition of add' in err
+        assert not executable.exists()
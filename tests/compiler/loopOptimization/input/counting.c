@@ -0,0 +1,19 @@
+int foo(void)
+{
+    int n = 3000;
+    int scale = 7;
+    int offset = 11;
+    int total = 0;
+    int i = 0;
+    while (i < n)
+    {
+        int j = 0;
+        while (j < n / 2 + 1)
+        {
+            total = total + j * scale + (offset - scale) * 3;
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    return total;
+}
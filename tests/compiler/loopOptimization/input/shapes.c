@@ -0,0 +1,26 @@
+int g(int x)
+{
+    return x + 1;
+}
+
+int foo(void)
+{
+    int a = 5;
+    int b = 9;
+    int k = 0;
+    int s = 0;
+    while (k < 10)
+    {
+        if (a * b > 40)
+            s = s + (a - b) * 2;
+        else
+            s = s - 1;
+        s = s + g(a * b) + k / 3;
+        k = k + 1;
+    }
+    while (k < a + b)
+        k = k + 2;
+    while (k > 100)
+        k = k - 1;
+    return s * 1000 + k;
+}
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from os.path import abspath, dirname
+
+import pytest
+
+import tests.generateOutputsDecorator
+from pcc.AST.ast import Ast
+from pcc.AST.variables.variable_declaration import VariableDeclaration
+from pcc.AST.variables.variable_reference import VariableReference
+from pcc.compiler.loop_optimization import optimize_loops
+from tests.compiler.CompilerHelper import CompilerHelper, \
+    generate_compiler_outputs
+
+generate_outputs = tests.generateOutputsDecorator.generate_outputs
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+files_to_test = [
+    ('counting.c', 'intHelper.c', 'counting.out'),
+    ('shapes.c', 'intHelper.c', 'shapes.out'),
+]
+
+
+@generate_outputs
+def generate_compiler_test_outputs():
+    path_of_this_file = abspath(dirname(__file__))
+    generate_compiler_outputs(files_to_test, path_of_this_file)
+
+
+def optimize_function_body(source):
+    ast = Ast(source, 'file.c')
+    assert ast.run_ast() == 0
+    optimize_loops(ast.root_node)
+    function_definition = ast.root_node.statement_sequence[-1]
+    return function_definition.statement_sequence[1].statement_sequence
+
+
+class TestLoopOptimization(CompilerHelper):
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_loop_optimization(self, file_to_test, helper, output_file,
+                               capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_without_optimization(self, file_to_test, helper, output_file,
+                                  capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file)
+
+    def test_invariant_is_hoisted(self):
+        statements = optimize_function_body(
+            'int f(int n)\n{\n    int i = 0;\n'
+            '    while (i < n * 2)\n        i = i + 1;\n    return i;\n}\n')
+        declaration, loop = statements[1:3]
+        assert isinstance(declaration, VariableDeclaration)
+        assert declaration.initializer.operator == '*'
+        assert isinstance(loop.condition.operand_2, VariableReference)
+        assert loop.condition.operand_2.name == declaration.name
+        assert loop.is_rotated
+
+    def test_changed_variable_is_not_hoisted(self):
+        statements = optimize_function_body(
+            'int f(int n)\n{\n    int i = 0;\n'
+            '    while (i < n * 2)\n        n = n - 1;\n    return i;\n}\n')
+        loop = statements[1]
+        assert loop.condition.operand_2.operator == '*'
+
+    def test_division_by_variable_is_not_hoisted(self):
+        statements = optimize_function_body(
+            'int f(int n, int d)\n{\n    int i = 0;\n'
+            '    while (i < n / d)\n        i = i + 1;\n    return i;\n}\n')
+        loop = statements[1]
+        assert loop.condition.operand_2.operator == '/'
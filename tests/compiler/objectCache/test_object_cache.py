@@ -0,0 +1,104 @@
+import concurrent.futures
+import os
+from os.path import dirname, join
+
+from pcc.compiler.object_cache import OBJECT_CACHE_DIR_VARIABLE, ObjectCache
+from pcc.main import main
+
+
+class TestObjectCache(object):
+
+    def test_second_compilation_is_cached(self, tmp_path, monkeypatch,
+                                          capsys):
+        cache_directory = tmp_path / 'cache'
+        monkeypatch.setenv(OBJECT_CACHE_DIR_VARIABLE, str(cache_directory))
+        input_file = join(dirname(dirname(__file__)), 'returnStatement',
+                          'input', 'returnInt.c')
+        first_object = tmp_path / 'first.o'
+        second_object = tmp_path / 'second.o'
+        uncached_object = tmp_path / 'uncached.o'
+
+        assert main(['progname', '-c', '-o', str(first_object),
+                     input_file]) == 0
+        assert main(['progname', '-c', '-o', str(second_object),
+                     input_file]) == 0
+        monkeypatch.delenv(OBJECT_CACHE_DIR_VARIABLE)
+        assert main(['progname', '-c', '-o', str(uncached_object),
+                     input_file]) == 0
+        assert first_object.read_bytes() == uncached_object.read_bytes()
+        assert second_object.read_bytes() == uncached_object.read_bytes()
+
+        statistics = ObjectCache(str(cache_directory)).get_statistics()
+        assert statistics['hits'] == 1
+        assert statistics['misses'] == 1
+        assert statistics['entries'] == 1
+        out, err = capsys.readouterr()
+        assert out == ''
+        assert err == ''
+
+    def test_statistics(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv(OBJECT_CACHE_DIR_VARIABLE, str(tmp_path))
+        assert main(['progname', '--cache-stats']) == 0
+        out, err = capsys.readouterr()
+        assert 'hits             0\n' in out
+        assert err == ''
+
+    def test_diagnostics_are_cached(self, tmp_path):
+        object_cache = ObjectCache(str(tmp_path))
+        assert object_cache.load('key') is None
+        object_cache.store('key', b'\x7fELF\n', 'warning\n', 'error\n')
+        assert object_cache.load('key') == (b'\x7fELF\n', 'warning\n',
+                                            'error\n')
+        assert object_cache.hits == 1
+        assert object_cache.misses == 1
+
+    def test_concurrent_stores(self, tmp_path):
+        object_cache = ObjectCache(str(tmp_path))
+        object_files = [bytes([index]) * 1000 for index in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            for object_file in object_files:
+                executor.submit(object_cache.store, 'key', object_file, '',
+                                '')
+        object_file, _, _ = object_cache.load('key')
+        assert object_file in object_files
+        assert not [name for name in os.listdir(str(tmp_path))
+                    if name.endswith('.tmp')]
+
+    def test_entry_removed_while_listing(self, tmp_path, monkeypatch):
+        object_cache = ObjectCache(str(tmp_path))
+        object_cache.store('first', b'first', '', '')
+        object_cache.store('second', b'second', '', '')
+        scandir = os.scandir
+
+        def scandir_and_evict(path):
+            entries = list(scandir(path))
+            # another process evicts an entry after it is listed
+            os.remove(object_cache.get_entry_path('first'))
+            return entries
+
+        monkeypatch.setattr(os, 'scandir', scandir_and_evict)
+        assert object_cache.get_statistics()['entries'] == 1
+
+    def test_key(self):
+        key = ObjectCache.get_key('int a;\n', 'a.c', {})
+        assert key == ObjectCache.get_key('int a;\n', 'dir/a.c', {})
+        assert key != ObjectCache.get_key('int b;\n', 'a.c', {})
+        # the name of the file is stored in the object file
+        assert key != ObjectCache.get_key('int a;\n', 'b.c', {})
+        assert key != ObjectCache.get_key('int a;\n', 'a.c', {'O': 1})
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        object_cache = ObjectCache(str(tmp_path), max_size=150)
+        object_file = bytes(30)
+        object_cache.store('first', object_file, '', '')
+        object_cache.store('second', object_file, '', '')
+        os.utime(object_cache.get_entry_path('first'), ns=(1, 1))
+        os.utime(object_cache.get_entry_path('second'), ns=(2, 2))
+        # using the first entry makes the second one the least recent
+        assert object_cache.load('first') is not None
+        object_cache.store('third', object_file, '', '')
+
+        assert object_cache.load('first') is not None
+        assert object_cache.load('second') is None
+        assert object_cache.load('third') is not None
+        assert object_cache.get_statistics()['entries'] == 2
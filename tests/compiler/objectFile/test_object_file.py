@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from pcc.AST.compiled_object import CompiledObjectType
+from pcc.compiler.objectFile import ELF_HEADER, EntryTable, ObjectFile, \
+    RelocationTableEntry, RelocationType, SECTION_HEADER, StringTable, \
+    Symbol, SymbolBinding, SymbolTableEntry, SymbolType
+from pcc.compiler.relocation_object import RelocationObject
+
+
+def function_symbol(name, relocation_objects=None):
+    return Symbol(name, bytearray(b'\xc3'), 1, CompiledObjectType.code,
+                  relocation_objects or [])
+
+
+class TestObjectFile(object):
+
+    def test_string_is_added_once(self):
+        string_table = StringTable()
+        offset = string_table.add('main')
+        assert string_table.add('main') == offset
+        assert string_table.table == bytearray(b'main\0')
+
+    def test_suffix_is_merged(self):
+        string_table = StringTable()
+        string_table.add('')
+        offset = string_table.add('value')
+        assert string_table.add('lue') == offset + 2
+        assert string_table.add('') == 0
+        assert string_table.table == bytearray(b'\0value\0')
+
+    def test_suffix_of_non_ascii_string(self):
+        string_table = StringTable()
+        offset = string_table.add('\u00e9.c')
+        assert string_table.add('.c') == offset + 2
+        assert string_table.add('c') == offset + 3
+        assert string_table.table == bytearray(b'\xc3\xa9.c\0')
+
+    def test_symbol_is_updated(self):
+        object_file = ObjectFile('file.c')
+        object_file.add_symbol(Symbol('f', bytearray(), 0,
+                                      CompiledObjectType.code, []))
+        number_of_symbols = len(object_file.symbol_table)
+        object_file.add_symbol(function_symbol('f'))
+        assert len(object_file.symbol_table) == number_of_symbols
+        entry = object_file.symbol_table[object_file.symbol_indexes['f']]
+        assert object_file.get_name_at_offset_of_string_table(
+            entry.st_name) == 'f'
+        assert entry.st_size == 1
+
+    def test_relocation_references_symbol_index(self):
+        object_file = ObjectFile('file.c')
+        object_file.add_symbol(function_symbol('callee'))
+        call = RelocationObject('callee', 0, CompiledObjectType.code, -4)
+        object_file.add_symbol(function_symbol('caller', [call]))
+        relocation, = object_file.text_rela_table
+        assert relocation.info >> 32 == object_file.symbol_indexes['callee']
+        assert relocation.offset == 1
+
+    def test_recursive_function_references_itself(self):
+        object_file = ObjectFile('file.c')
+        call = RelocationObject('recursive', 0, CompiledObjectType.code, -4)
+        object_file.add_symbol(function_symbol('recursive', [call]))
+        relocation, = object_file.text_rela_table
+        index = object_file.symbol_indexes['recursive']
+        assert relocation.info >> 32 == index
+        entry = object_file.symbol_table[index]
+        assert object_file.get_name_at_offset_of_string_table(
+            entry.st_name) == 'recursive'
+        assert entry.st_size == 1
+
+    def test_missing_symbol_is_not_relocated(self, capsys):
+        object_file = ObjectFile('file.c')
+        call = RelocationObject('missing', 0, CompiledObjectType.code, -4)
+        object_file.add_symbol(function_symbol('caller', [call]))
+        assert len(object_file.text_rela_table) == 0
+        assert 'Could not find the referenced symbol missing' in \
+            capsys.readouterr().err
+
+    def test_negative_addend(self):
+        entry = RelocationTableEntry(1, 4, -4)
+        assert entry.to_binary_array() == bytearray(
+            b'\x01' + bytes(7) + b'\x04' + bytes(7) + b'\xfc' + b'\xff' * 7)
+
+    def test_relocation_info(self):
+        entry = RelocationTableEntry.for_symbol(
+            1, 3, RelocationType.R_X86_64_PLT32, -4)
+        assert entry.info == 3 << 32 | 4
+        with pytest.raises(ValueError):
+            RelocationTableEntry.for_symbol(
+                1, -1, RelocationType.R_X86_64_PLT32, -4)
+        with pytest.raises(ValueError):
+            RelocationTableEntry.for_symbol(
+                1, 1 << 32, RelocationType.R_X86_64_PLT32, -4)
+
+    def test_invalid_symbol_index_is_reported(self, capsys):
+        object_file = ObjectFile('file.c')
+        object_file.symbol_indexes['callee'] = 1 << 32
+        call = RelocationObject('callee', 0, CompiledObjectType.code, -4)
+        object_file.add_symbol(function_symbol('caller', [call]))
+        assert len(object_file.text_rela_table) == 0
+        assert 'invalid symbol index' in capsys.readouterr().err
+
+    def test_entry_table_layout(self):
+        entries = [
+            SymbolTableEntry(1, SymbolType.STT_FUNC, SymbolBinding.STB_GLOBAL,
+                             section_index=1, symbol_size=12,
+                             offset_in_section=8),
+            SymbolTableEntry(7, SymbolType.STT_NOTYPE, SymbolBinding.STB_WEAK,
+                             section_index=0, symbol_size=0),
+        ]
+        table = EntryTable(SymbolTableEntry, entries)
+        assert table.tobytes() == entries[0].to_binary_array() + \
+            entries[1].to_binary_array()
+        assert table[1].to_binary_array() == entries[1].to_binary_array()
+
+    def test_entry_table_update(self):
+        table = EntryTable(RelocationTableEntry)
+        table.append(RelocationTableEntry(1, 4, -4))
+        entry = table[0]
+        entry.addend = -8
+        assert table[0].addend == -4
+        table[0] = entry
+        assert len(table) == 1
+        assert table[-1].addend == -8
+
+    def test_layout(self):
+        object_file = ObjectFile('file.c')
+        object_file.add_symbol(function_symbol('main'))
+        byte_array = object_file.to_binary_array()
+        header = ELF_HEADER.unpack_from(byte_array)
+        section_header_offset, number_of_sections = header[6], header[12]
+        assert header[0][:4] == b'\x7fELF'
+        assert len(byte_array) == section_header_offset + \
+            number_of_sections * SECTION_HEADER.size
+        for i, section in enumerate(object_file.sections):
+            fields = SECTION_HEADER.unpack_from(
+                byte_array, section_header_offset + i * SECTION_HEADER.size)
+            offset, size = fields[4], fields[5]
+            assert byte_array[offset:offset + size] == section.section_content
+
+    def test_uninitialized_variables_do_not_overlap(self):
+        object_file = ObjectFile('file.c')
+        for name in ('first', 'second'):
+            object_file.add_symbol(Symbol(name, bytearray(), 4,
+                                          CompiledObjectType.data, []))
+        first = object_file.symbol_table[object_file.symbol_indexes['first']]
+        second = object_file.symbol_table[
+            object_file.symbol_indexes['second']]
+        assert (first.st_value, second.st_value) == (0, 4)
+        object_file.to_binary_array()
+        assert object_file.get_section('.bss').size == 8
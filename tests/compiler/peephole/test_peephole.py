@@ -0,0 +1,82 @@
+import pytest
+
+from pcc.AST.compiled_object import CompiledObjectType
+from pcc.compiler.assembler_x64 import X64Assembler
+from pcc.compiler.peephole import DecodeError, decode, optimize
+from pcc.compiler.relocation_object import RelocationObject
+
+
+def optimize_code(code, relocation_objects=None):
+    return optimize(bytearray(code), relocation_objects or [],
+                    X64Assembler())
+
+
+class TestPeephole(object):
+
+    def test_nop_is_removed(self):
+        # push rbp; mov rbp, rsp; nop; ret
+        value, _ = optimize_code(b'\x55\x48\x89\xe5\x90\xc3')
+        assert value == bytearray(b'\x55\x48\x89\xe5\xc3')
+
+    def test_self_move_is_removed(self):
+        # mov rax, rax; ret
+        value, _ = optimize_code(b'\x48\x89\xc0\xc3')
+        assert value == bytearray(b'\xc3')
+
+    def test_reload_is_removed(self):
+        # mov [rbp-4], eax; mov eax, [rbp-4]; ret
+        value, _ = optimize_code(b'\x89\x45\xfc\x8b\x45\xfc\xc3')
+        assert value == bytearray(b'\x89\x45\xfc\xc3')
+
+    def test_load_of_other_slot_is_kept(self):
+        # mov [rbp-4], eax; mov eax, [rbp-8]; ret
+        code = b'\x89\x45\xfc\x8b\x45\xf8\xc3'
+        value, _ = optimize_code(code)
+        assert value == bytearray(code)
+
+    def test_compare_to_zero_register_becomes_test(self):
+        # mov ecx, 0; cmp eax, ecx; je end; mov eax, 1; end: ret
+        value, _ = optimize_code(b'\xb9\x00\x00\x00\x00\x39\xc8\x74\x05'
+                                 b'\xb8\x01\x00\x00\x00\xc3')
+        assert value == bytearray(b'\x85\xc0\x74\x05'
+                                  b'\xb8\x01\x00\x00\x00\xc3')
+
+    def test_live_zero_register_is_kept(self):
+        # mov ecx, 0; cmp eax, ecx; mov eax, ecx; ret
+        value, _ = optimize_code(b'\xb9\x00\x00\x00\x00\x39\xc8\x89\xc8\xc3')
+        assert value == bytearray(b'\xb9\x00\x00\x00\x00\x85\xc0\x89\xc8\xc3')
+
+    def test_compare_to_zero_becomes_test(self):
+        # cmp eax, 0; ret
+        value, _ = optimize_code(b'\x81\xf8\x00\x00\x00\x00\xc3')
+        assert value == bytearray(b'\x85\xc0\xc3')
+
+    def test_jumps_are_moved(self):
+        # jmp end; nop; nop; end: ret
+        value, _ = optimize_code(b'\xe9\x02\x00\x00\x00\x90\x90\xc3')
+        assert value == bytearray(b'\xeb\x00\xc3')
+
+    def test_relocation_objects_are_moved(self):
+        relocation_object = RelocationObject('global', 3,
+                                             CompiledObjectType.data, -4)
+        # nop; mov eax, [rip + global]; ret
+        value, relocation_objects = optimize_code(
+            b'\x90\x8b\x05\x00\x00\x00\x00\xc3', [relocation_object])
+        assert value == bytearray(b'\x8b\x05\x00\x00\x00\x00\xc3')
+        assert relocation_objects == [relocation_object]
+        assert relocation_object.offset == 2
+
+    def test_register_read_by_lea_is_kept(self):
+        # mov ecx, 0; cmp eax, ecx; lea eax, [rcx + rcx * 2]; ret
+        value, _ = optimize_code(b'\xb9\x00\x00\x00\x00\x39\xc8'
+                                 b'\x8d\x04\x49\xc3')
+        assert value == bytearray(b'\xb9\x00\x00\x00\x00\x85\xc0'
+                                  b'\x8d\x04\x49\xc3')
+
+    def test_unknown_code_is_not_changed(self):
+        # nop; ud2; ret
+        code = bytearray(b'\x90\x0f\x0b\xc3')
+        with pytest.raises(DecodeError):
+            decode(code, [])
+        value, _ = optimize_code(code)
+        assert value == code
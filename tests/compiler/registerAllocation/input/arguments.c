@@ -0,0 +1,29 @@
+int foo(void);
+int weigh(int a, int b, int c, int d, int e, int f);
+
+int weigh(int a, int b, int c, int d, int e, int f)
+{
+    int total = a;
+    total = total * 10 + b;
+    total = total * 10 + c;
+    total = total * 10 + d;
+    total = total * 10 + e;
+    total = total * 10 + f;
+    return total;
+}
+
+int foo(void)
+{
+    int i = 0;
+    int sum = 0;
+    int result;
+    while (i < 3)
+    {
+        result = weigh(i, 1, 2, 3, 4, 5);
+        sum = sum + result;
+        i = i + 1;
+    }
+    result = weigh(i, 0, 0, 0, 0, 1);
+    result = result + sum;
+    return result;
+}
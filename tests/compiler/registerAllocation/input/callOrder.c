@@ -0,0 +1,16 @@
+int foo(void);
+int h(int x);
+
+int h(int x)
+{
+    int y = x + 100;
+    return y;
+}
+
+int foo(void)
+{
+    int j = 1;
+    int t = j * 3;
+    int s = t + (h(j) * (h(j) + h(j)));
+    return s;
+}
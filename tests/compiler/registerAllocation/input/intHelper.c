@@ -0,0 +1,11 @@
+
+#include <stdio.h>
+
+int foo(void);
+
+int main(void)
+{
+    int i = foo();
+    printf("done %d\n", i);
+    return 0;
+}
\ No newline at end of file
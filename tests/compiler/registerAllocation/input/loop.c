@@ -0,0 +1,24 @@
+int foo(void);
+
+int foo(void)
+{
+    int i = 0;
+    int sum = 0;
+    int odd = 0;
+    int even;
+    char c = 1;
+    while (i < 100)
+    {
+        sum = sum + i;
+        if (i - i / 2 * 2)
+            odd = odd + 1;
+        else
+            even = even + 1;
+        c = c + c;
+        i = i + 1;
+    }
+    sum = sum - odd;
+    sum = sum - even;
+    sum = sum + c;
+    return sum;
+}
@@ -0,0 +1,28 @@
+int foo(void);
+
+int foo(void)
+{
+    int a = 1;
+    int b = 2;
+    int c = 3;
+    int d = 4;
+    int e = 5;
+    int f = 6;
+    int g = 7;
+    int h = 8;
+    int i = 0;
+    while (i < 10)
+    {
+        h = h + a;
+        g = g + b;
+        i = i + 1;
+    }
+    a = a + b;
+    a = a + c;
+    a = a + d;
+    a = a + e;
+    a = a + f;
+    a = a + g;
+    a = a + h;
+    return a;
+}
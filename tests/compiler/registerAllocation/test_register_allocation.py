@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+from os.path import abspath, dirname
+
+import pytest
+
+import tests.generateOutputsDecorator
+from pcc.AST.ast import Ast
+from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.register_allocator import CALLEE_SAVED_REGISTERS, \
+    allocate_registers
+from tests.compiler.CompilerHelper import CompilerHelper, \
+    generate_compiler_outputs
+
+generate_outputs = tests.generateOutputsDecorator.generate_outputs
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+files_to_test = [
+    ('loop.c', 'intHelper.c', 'loop.out'),
+    ('spill.c', 'intHelper.c', 'spill.out'),
+    ('arguments.c', 'intHelper.c', 'arguments.out'),
+    ('callOrder.c', 'intHelper.c', 'callOrder.out'),
+]
+
+
+@generate_outputs
+def generate_compiler_test_outputs():
+    path_of_this_file = abspath(dirname(__file__))
+    generate_compiler_outputs(files_to_test, path_of_this_file)
+
+
+def allocate_function_registers(source):
+    ast = Ast(source, 'file.c')
+    assert ast.run_ast() == 0
+    allocate_registers(ast.root_node)
+    function_definition = ast.root_node.statement_sequence[-1]
+    return function_definition.register_assignment
+
+
+class TestRegisterAllocation(CompilerHelper):
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_register_allocation(self, file_to_test, helper, output_file,
+                                 capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_without_allocation(self, file_to_test, helper, output_file,
+                                capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file)
+
+    def test_arguments_and_locals_get_registers(self):
+        registers = allocate_function_registers(
+            'int f(int a, int b)\n{\n    int c = a + b;\n    return c;\n}\n')
+        assert set(registers) == {'a', 'b', 'c'}
+        assert registers['a'] == ProcessorRegister.general_purpose_10
+        assert registers['b'] == ProcessorRegister.general_purpose_11
+        # a and b are not used after c is set, so c reuses a register
+        assert registers['c'] == ProcessorRegister.general_purpose_10
+
+    def test_variable_over_call_is_callee_saved(self):
+        registers = allocate_function_registers(
+            'int g(void);\nint f(void)\n{\n    int a = 1;\n'
+            '    int b = g();\n    a = a + b;\n    return a;\n}\n')
+        assert registers['a'] in CALLEE_SAVED_REGISTERS
+        assert registers['b'] not in CALLEE_SAVED_REGISTERS
+
+    def test_variable_read_with_call_is_callee_saved(self):
+        # the call is evaluated before t, which is read first in the code
+        registers = allocate_function_registers(
+            'int g(int x);\nint f(void)\n{\n    int t = 3;\n'
+            '    int s = t + (g(1) * (g(1) + g(1)));\n    return s;\n}\n')
+        assert registers['t'] in CALLEE_SAVED_REGISTERS
+
+    def test_variable_set_before_loop_lives_in_loop(self):
+        registers = allocate_function_registers(
+            'int f(void)\n{\n    int i = 0;\n    int j = 0;\n'
+            '    while (i < 10)\n    {\n        j = i;\n        i = i + 1;\n'
+            '    }\n    return j;\n}\n')
+        assert registers['i'] != registers['j']
+
+    def test_loop_variables_are_kept_when_spilling(self):
+        declarations = ''.join(f'    int v{index} = {index};\n'
+                               for index in range(8))
+        registers = allocate_function_registers(
+            'int f(void)\n{\n' + declarations +
+            '    while (v7 < 10)\n        v7 = v7 + v6;\n'
+            '    v0 = v0 + v1;\n    v0 = v0 + v2;\n    v0 = v0 + v3;\n'
+            '    v0 = v0 + v4;\n    v0 = v0 + v5;\n    v0 = v0 + v6;\n'
+            '    return v0 + v7;\n}\n')
+        assert len(registers) == 7
+        assert 'v6' in registers
+        assert 'v7' in registers
+
+    def test_only_unique_integer_variables(self):
+        registers = allocate_function_registers(
+            'int f(void)\n{\n    float x = 1.0;\n    int a = 1;\n'
+            '    if (a)\n    {\n        int a = 2;\n        x = x + a;\n'
+            '    }\n    return a;\n}\n')
+        assert registers == {}
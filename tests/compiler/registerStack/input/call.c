@@ -0,0 +1,19 @@
+int square(int x)
+{
+    return x * x;
+}
+
+int add(int x, int y)
+{
+    return x + y;
+}
+
+int foo(void)
+{
+    int a = 2;
+    int b = 3;
+    int c = a + square(b);
+    int d = (a + b) * square(a + b);
+    int e = add(square(a), square(b)) + add(a, add(b, c));
+    return c + d * 100 + e * 10000;
+}
@@ -0,0 +1,11 @@
+int foo(void)
+{
+    int a = 100;
+    int b = 7;
+    int c = 3;
+    int d = 2;
+    int e = (a / b) / (c - d);
+    int f = (a + b) / ((c + d) / d);
+    int g = a / (b / (c / d));
+    return e + f * 10 + g * 100;
+}
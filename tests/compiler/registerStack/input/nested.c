@@ -0,0 +1,12 @@
+int foo(void)
+{
+    int a = 3;
+    int b = 5;
+    int c = 7;
+    int d = 11;
+    int e = (a + b) * (c + d);
+    int f = ((a + b) * (c - d)) - ((a - c) * (b + d));
+    int g = (((a + b) * (c + d)) + ((a * b) + (c * d))) *
+            (((a - b) + (c - d)) + ((a + c) * (b - d)));
+    return e + f + g;
+}
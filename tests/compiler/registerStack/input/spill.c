@@ -0,0 +1,15 @@
+int foo(void)
+{
+    int a = 1;
+    int b = 2;
+    int c = 3;
+    int d = 5;
+    int e = 7;
+    int f = (((((d + b) * (e - c)) + ((a + d) * (b - e))) - (((c - a) + (d * b))
+        - ((e - c) + (a * d)))) + ((((b + e) * (c - a)) - ((d + b) * (e -
+        c))) + (((a - d) + (b * e)) + ((c - a) + (d * b))))) - (((((e - c) +
+        (a * d)) - ((b - e) + (c * a))) + (((d * b) - (e + c)) + ((a * d) -
+        (b + e)))) - ((((c - a) + (d * b)) + ((e - c) + (a * d))) - (((b *
+        e) - (c + a)) - ((d * b) - (e + c)))));
+    return f;
+}
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+from os.path import abspath, dirname
+
+import pytest
+
+import tests.generateOutputsDecorator
+from pcc.AST.arithmetic_operators.addition import Addition
+from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.register_stack import RegisterStack
+from pcc.AST.variables.variable_reference import VariableReference
+from pcc.compiler.assembler import ProcessorRegister
+from pcc.compiler.assembler_x64 import X64Assembler
+from tests.compiler.CompilerHelper import CompilerHelper, \
+    generate_compiler_outputs
+
+generate_outputs = tests.generateOutputsDecorator.generate_outputs
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+files_to_test = [
+    ('nested.c', 'intHelper.c', 'nested.out'),
+    ('division.c', 'intHelper.c', 'division.out'),
+    ('call.c', 'intHelper.c', 'call.out'),
+    ('spill.c', 'intHelper.c', 'spill.out'),
+]
+
+REGISTERS = [ProcessorRegister.accumulator, ProcessorRegister.counter]
+
+
+@generate_outputs
+def generate_compiler_test_outputs():
+    path_of_this_file = abspath(dirname(__file__))
+    generate_compiler_outputs(files_to_test, path_of_this_file)
+
+
+class TestRegisterStack(CompilerHelper):
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_register_stack(self, file_to_test, helper, output_file, capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file)
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_with_register_allocation(self, file_to_test, helper,
+                                      output_file, capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
+
+    def test_free_register_is_taken(self):
+        register_stack = RegisterStack(REGISTERS)
+        register_stack.use(ProcessorRegister.accumulator)
+        register, code = register_stack.take(ProcessorRegister.accumulator,
+                                             X64Assembler())
+        assert register == ProcessorRegister.counter
+        assert code == bytearray()
+        assert register_stack.give_back(X64Assembler()) == bytearray()
+        assert not register_stack.is_used(ProcessorRegister.counter)
+
+    def test_register_in_use_is_pushed(self):
+        assembler = X64Assembler()
+        register_stack = RegisterStack(REGISTERS)
+        register_stack.use(ProcessorRegister.accumulator)
+        register_stack.take(ProcessorRegister.accumulator, assembler)
+        register, code = register_stack.take(ProcessorRegister.counter,
+                                             assembler)
+        assert register == ProcessorRegister.accumulator
+        assert code == assembler.push_to_stack(register)
+        assert register_stack.pushed_registers == 1
+        assert register_stack.give_back(assembler) == \
+            assembler.pop_from_stack(register)
+        assert register_stack.pushed_registers == 0
+        assert register_stack.is_used(ProcessorRegister.accumulator)
+
+    def test_saved_registers_leave_out_the_result(self):
+        register_stack = RegisterStack(REGISTERS)
+        register_stack.use(ProcessorRegister.accumulator)
+        register_stack.use(ProcessorRegister.data)
+        register_stack.use(ProcessorRegister.single_scalar_0)
+        assert register_stack.get_saved_registers(
+            ProcessorRegister.accumulator) == [ProcessorRegister.data]
+
+    def test_register_need(self):
+        def variable(name):
+            return VariableReference(1, name)
+
+        left = Addition(1, variable('a'), variable('b'))
+        right = Addition(1, variable('c'), variable('d'))
+        assert left.get_register_need() == 2
+        assert Multiplication(0, left, right).get_register_need() == 3
+        assert Multiplication(0, left, variable('c')).get_register_need() == 2
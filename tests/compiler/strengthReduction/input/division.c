@@ -0,0 +1,17 @@
+int check(int n)
+{
+    int s = 0;
+    s = s + n / 2 + n / 3 + n / 4 + n / 5 + n / 6 + n / 7;
+    s = s + n / 10 + n / 16 + n / 100 + n / 641 + n / 1000000;
+    s = s + n / -1 + n / -3 + n / -8 + n / 1 + n / 2147483647;
+    return s;
+}
+
+int foo(void)
+{
+    int s = 0;
+    s = s + check(0) + check(1) + check(-1) + check(7) + check(-7);
+    s = s + check(123456789) + check(-123456789) + check(2147483647);
+    s = s + check(-2147483647) + check(999) + check(-1000);
+    return s;
+}
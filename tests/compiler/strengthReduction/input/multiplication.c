@@ -0,0 +1,10 @@
+int foo(void)
+{
+    int a = 1234567;
+    int b = -98765;
+    int s = 0;
+    s = s + a * 2 + b * 3 + a * 5 + b * 9 + a * 10 + b * 24;
+    s = s + 72 * a + 7 * b + a * -1 + b * -6 + a * 0 + b * 1;
+    s = s + (a + b) * 40 + a * 1024;
+    return s;
+}
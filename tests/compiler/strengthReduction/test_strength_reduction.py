@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from os.path import abspath, dirname
+
+import pytest
+
+import tests.generateOutputsDecorator
+from pcc.AST.arithmetic_operators.division import Division, \
+    get_division_magic
+from pcc.AST.arithmetic_operators.multiplication import Multiplication
+from pcc.AST.constant_expression import ConstantExpression
+from pcc.compiler.assembler import ProcessorRegister, ShiftMode
+from pcc.compiler.assembler_x64 import X64Assembler
+from tests.compiler.CompilerHelper import CompilerHelper, \
+    generate_compiler_outputs
+
+generate_outputs = tests.generateOutputsDecorator.generate_outputs
+
+# The parametrize function is generated, so it does not work to import
+parametrize = pytest.mark.parametrize
+
+files_to_test = [
+    ('multiplication.c', 'intHelper.c', 'multiplication.out'),
+    ('division.c', 'intHelper.c', 'division.out'),
+]
+
+
+@generate_outputs
+def generate_compiler_test_outputs():
+    path_of_this_file = abspath(dirname(__file__))
+    generate_compiler_outputs(files_to_test, path_of_this_file)
+
+
+def constant(value):
+    return ConstantExpression('int', str(value), 1)
+
+
+class TestStrengthReduction(CompilerHelper):
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_strength_reduction(self, file_to_test, helper, output_file,
+                                capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file)
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_with_optimization(self, file_to_test, helper, output_file,
+                               capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
+
+    @parametrize('divisor,magic,shift', [
+        (3, 0x55555556, 0),
+        (7, 0x92492493, 2),
+        (10, 0x66666667, 2),
+    ])
+    def test_division_magic(self, divisor, magic, shift):
+        assert get_division_magic(divisor) == (magic, shift)
+
+    def test_multiplication_by_lea_factor(self):
+        assembler = X64Assembler()
+        register = ProcessorRegister.counter
+        value, _ = Multiplication(0, constant(7), constant(10)) \
+            .load_result_to_reg(register, assembler)
+        assert value == assembler.copy_value_to_reg(7, register) + \
+            assembler.lea(register, register, 4, register) + \
+            assembler.shift(register, ShiftMode.left_arithmetic, 1)
+
+    def test_multiplication_by_other_constant(self):
+        assembler = X64Assembler()
+        register = ProcessorRegister.counter
+        value, _ = Multiplication(0, constant(7), constant(11)) \
+            .load_result_to_reg(register, assembler)
+        assert value == assembler.copy_value_to_reg(7, register) + \
+            assembler.mul_value(11, register, register)
+
+    def test_division_by_constant_does_not_use_idiv(self):
+        assembler = X64Assembler()
+        register = ProcessorRegister.counter
+        value, _ = Division(0, constant(100), constant(7)) \
+            .load_result_to_reg(register, assembler)
+        assert assembler.div(ProcessorRegister.integer_argument_0,
+                             register) not in value
+        assert assembler.movsxd(register, register) in value
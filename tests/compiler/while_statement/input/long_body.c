@@ -0,0 +1,24 @@
+int foo(void);
+
+int total = 0;
+
+int foo(void)
+{
+    int i = 10;
+    while(i)
+    {
+        i = i - 1;
+        total = total + 1;
+        total = total + 2;
+        total = total + 3;
+        total = total + 4;
+        total = total + 5;
+        total = total + 6;
+        total = total + 7;
+        total = total + 8;
+        total = total + 9;
+        total = total + 10;
+        total = total + 11;
+    }
+    return total;
+}
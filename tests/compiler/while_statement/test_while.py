@@ -15,6 +15,7 @@ parametrize = pytest.mark.parametrize
 
 files_to_test = [
     ('while.c', 'intHelper.c', 'while.out'),
+    ('long_body.c', 'intHelper.c', 'long_body.out'),
 ]
 
 
@@ -31,3 +32,10 @@ class TestWhile(CompilerHelper):
         path_of_this_file = abspath(dirname(__file__))
         self.execute_test(file_to_test, helper, output_file, capsys,
                           path_of_this_file)
+
+    @parametrize('file_to_test,helper,output_file', files_to_test)
+    def test_while_optimized(self, file_to_test, helper, output_file,
+                             capsys):
+        path_of_this_file = abspath(dirname(__file__))
+        self.execute_test(file_to_test, helper, output_file, capsys,
+                          path_of_this_file, ['-O1'])
@@ -0,0 +1,7 @@
+int start;
+#if 0
+#elif 1
+int one;
+#else
+int none;
+#endif
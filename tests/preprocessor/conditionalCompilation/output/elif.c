@@ -0,0 +1,4 @@
+int start;
+
+
+int one;
@@ -17,7 +17,8 @@ files_to_test = [
     'nested.c',
     'simple.c',
     'constantExpression_0.c',
-    'else.c',
+    'else.c',
+    'elif.c',
     # 'nested_else.c'
 ]
 
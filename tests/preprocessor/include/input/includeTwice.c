@@ -0,0 +1,5 @@
+#include "guarded.h"
+#include "guarded.h"
+#include "once.h"
+#include "once.h"
+int end;
@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
+import os
 from os.path import abspath, dirname
 
 # The parametrize function is generated, so it does not work to import
 import pytest
 
 import tests.generateOutputsDecorator
+from pcc.main import main
+from pcc.preprocessor.include_cache import IncludeCache
+from pcc.preprocessor.preprocess import Preprocessor
 from tests.preprocessor.preprocessorhelper import \
     generate_preprocessor_outputs, PreprocessorHelper
 
@@ -44,3 +49,105 @@ class TestInclude(PreprocessorHelper):
         path_of_this_file = abspath(dirname(__file__))
         include_dirs = ['-Itests/preprocessor/include/input']
         self.execute_test(file_to_test, capsys, path_of_this_file, include_dirs)
+
+    def test_include_changed_file(self, tmp_path, capsys):
+        """Check that a header is read again after it changed.
+
+        Args:
+            tmp_path (Path): the temporary directory fixture from pytest
+            capsys (method): the capsys fixture from pytest
+        """
+        header = tmp_path / 'changing.h'
+        source = tmp_path / 'changing.c'
+        source.write_text('#include "changing.h"\nint end;\n')
+        arguments = ['progname', '-E', '-I%s' % tmp_path, str(source)]
+
+        header.write_text('int first;')
+        main(arguments)
+        out, err = capsys.readouterr()
+        assert out == 'int first;\nint end;\n'
+        assert err == ''
+
+        header.write_text('int second_version;')
+        main(arguments)
+        out, err = capsys.readouterr()
+        assert out == 'int second_version;\nint end;\n'
+        assert err == ''
+
+    def test_include_cache_on_disk(self, tmp_path):
+        """Check that the lines of a header are shared through the disk.
+
+        Args:
+            tmp_path (Path): the temporary directory fixture from pytest
+        """
+        header = tmp_path / 'cached.h'
+        header.write_text('??=define CACHED 1\r\nint cached;\n')
+        cache_directory = str(tmp_path / 'cache')
+
+        first_cache = IncludeCache(cache_directory)
+        lines = first_cache.get_lines(str(header))
+        assert lines == ('#define CACHED 1\n', 'int cached;\n')
+        assert len(os.listdir(cache_directory)) == 1
+
+        second_cache = IncludeCache(cache_directory)
+        assert second_cache.get_lines(str(header)) == lines
+        assert second_cache.get_lines(str(header)) == lines
+        assert second_cache.hits == 1
+
+    def test_include_cache_concurrent_stores(self, tmp_path):
+        """Check that threads store the lines of a header on disk at once.
+
+        Args:
+            tmp_path (Path): the temporary directory fixture from pytest
+        """
+        header = tmp_path / 'cached.h'
+        header.write_text('int cached;\n')
+        cache_directory = str(tmp_path / 'cache')
+        caches = [IncludeCache(cache_directory) for _ in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(len(caches)) as executor:
+            for include_cache in caches:
+                executor.submit(include_cache.get_lines, str(header))
+        assert len(os.listdir(cache_directory)) == 1
+        assert IncludeCache(cache_directory).get_lines(str(header)) == \
+            ('int cached;\n',)
+
+    def test_include_only_once(self):
+        """Check that guarded headers are not read again.
+
+        """
+        path_of_this_file = abspath(dirname(__file__))
+        input_path = os.path.join(path_of_this_file, 'input')
+        input_file = os.path.join(input_path, 'includeTwice.c')
+        with open(input_file, 'r') as file_to_read:
+            source = file_to_read.read()
+        include_cache = IncludeCache()
+        preprocessor = Preprocessor(input_file, source, [input_path],
+                                    include_cache)
+        preprocessor.preprocess()
+        assert preprocessor.processed_file == \
+            '\n\nint guarded;\n\n\n\nint once;\n\nint end;\n'
+        # both headers are only read the first time
+        assert include_cache.misses == 2
+        assert include_cache.hits == 0
+
+    def test_include_first_directory(self, tmp_path, capsys):
+        """Check that only the first header found is included.
+
+        Args:
+            tmp_path (Path): the temporary directory fixture from pytest
+            capsys (method): the capsys fixture from pytest
+        """
+        first_dir = tmp_path / 'first'
+        second_dir = tmp_path / 'second'
+        first_dir.mkdir()
+        second_dir.mkdir()
+        (first_dir / 'both.h').write_text('int first;')
+        (second_dir / 'both.h').write_text('int second;')
+        source = tmp_path / 'both.c'
+        source.write_text('#include <both.h>\nint end;\n')
+
+        main(['progname', '-E', '-I%s' % first_dir, '-I%s' % second_dir,
+              str(source)])
+        out, err = capsys.readouterr()
+        assert out == 'int first;\nint end;\n'
+        assert err == ''
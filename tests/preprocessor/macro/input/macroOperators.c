@@ -0,0 +1,5 @@
+
+#define NAME(prefix, number) prefix ## number
+#define STRING(x) #x
+int NAME(variable_, 1) = 2;
+char *s = STRING(NAME);
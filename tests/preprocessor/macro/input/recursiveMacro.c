@@ -0,0 +1,5 @@
+
+#define ONE 1
+#define SELF SELF + ONE
+#define INC(x) (x + ONE)
+int ONE_TWO = INC(SELF);
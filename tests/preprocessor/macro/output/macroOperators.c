@@ -0,0 +1,5 @@
+
+
+
+int variable_1 = 2;
+char *s = "NAME";
@@ -0,0 +1,5 @@
+
+
+
+
+int ONE_TWO = (SELF + 1 + 1);
@@ -16,7 +16,9 @@ files_to_test = [
     'macroDefinition.c',
     'multipleDefines.c',
     'oneDefine.c',
-    'undef.c'
+    'undef.c',
+    'recursiveMacro.c',
+    'macroOperators.c'
 ]
 
 
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from os.path import dirname, join
+
 # The parametrize function is generated, so it does not work to import
 import pytest
 from pytest import raises
@@ -35,3 +37,50 @@ class TestMain(object):
             format(metadata.project, metadata.version)
         # Should exit with zero return code.
         assert exc_info.value.code == 0
+
+    @parametrize('jobs', ['1', '2'])
+    def test_multiple_files_in_input_order(self, jobs, capsys):
+        folder = join(dirname(__file__), 'AST', 'complex')
+        files = ['precedence.c', 'factorial.c']
+        input_files = [join(folder, 'input', file) for file in files]
+        assert main(['progname', '-fdump_tree', '-j', jobs] +
+                    input_files) == 0
+        out, err = capsys.readouterr()
+        expected = ''
+        for file in files:
+            with open(join(folder, 'output', file)) as output_file:
+                expected += output_file.read()
+        assert out == expected
+        assert err == ''
+
+    def test_multiple_object_files(self, tmpdir, monkeypatch, capsys):
+        folder = join(dirname(__file__), 'compiler', 'returnStatement',
+                      'input')
+        files = ['returnInt.c', 'returnChar.c']
+        input_files = [join(folder, file) for file in files]
+        monkeypatch.chdir(tmpdir)
+        assert main(['progname', '-c', '-j', '2'] + input_files) == 0
+        out, err = capsys.readouterr()
+        assert out == ''
+        assert err == ''
+        assert tmpdir.join('returnInt.o').check(file=True)
+        assert tmpdir.join('returnChar.o').check(file=True)
+
+    def test_files_after_options(self, tmpdir, monkeypatch, capsys):
+        folder = join(dirname(__file__), 'compiler', 'returnStatement',
+                      'input')
+        monkeypatch.chdir(tmpdir)
+        assert main(['progname', '-c', join(folder, 'returnInt.c'),
+                     '-O', '1', join(folder, 'returnChar.c')]) == 0
+        out, err = capsys.readouterr()
+        assert out == ''
+        assert err == ''
+        assert tmpdir.join('returnInt.o').check(file=True)
+        assert tmpdir.join('returnChar.o').check(file=True)
+
+    def test_output_file_with_multiple_files(self, capsys):
+        with raises(SystemExit) as exc_info:
+            main(['progname', '-c', '-o', 'out.o', 'a.c', 'b.c'])
+        out, err = capsys.readouterr()
+        assert '-o can only be used with a single input file' in err
+        assert exc_info.value.code == 2
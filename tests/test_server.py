@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import concurrent.futures
+import contextlib
+import threading
+from os.path import dirname, join
+
+import pytest
+
+from pcc.client import send_request
+from pcc.main import compile_request
+from pcc.server import CompileServer
+
+parametrize = pytest.mark.parametrize
+
+
+@contextlib.contextmanager
+def running_server(tmpdir):
+    # the server replaces sys.stdout, so it must run inside the test and
+    # not in a fixture, pytest replaces sys.stdout again before the test
+    server = CompileServer(str(tmpdir.join('pcc.sock')), compile_request)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class TestServer(object):
+
+    def test_relative_to_client_directory(self, tmpdir):
+        folder = join(dirname(__file__), 'AST', 'complex')
+        with running_server(tmpdir) as socket_path:
+            response = send_request(
+                socket_path,
+                ['progname', '-fdump_tree', 'input/precedence.c'], folder)
+        with open(join(folder, 'output', 'precedence.c')) as output_file:
+            expected = output_file.read()
+        assert response == {'result': 0, 'stdout': expected, 'stderr': ''}
+
+    def test_concurrent_requests(self, tmpdir):
+        folder = join(dirname(__file__), 'AST', 'complex')
+        files = ['precedence.c', 'factorial.c'] * 4
+        with running_server(tmpdir) as socket_path, \
+                concurrent.futures.ThreadPoolExecutor(len(files)) as executor:
+            futures = [executor.submit(send_request, socket_path,
+                                       ['progname', '-fdump_tree',
+                                        join('input', file)], folder)
+                       for file in files]
+            responses = [future.result() for future in futures]
+        for file, response in zip(files, responses):
+            with open(join(folder, 'output', file)) as output_file:
+                expected = output_file.read()
+            assert response == {'result': 0, 'stdout': expected,
+                                'stderr': ''}
+
+    @parametrize('argv, result, message', [
+        (['progname', '--help'], 0, 'usage'),
+        (['progname'], 2, 'no input files'),
+        (['progname', '--server'], 2, '--server can not be used'),
+    ])
+    def test_exit(self, tmpdir, argv, result, message):
+        with running_server(tmpdir) as socket_path:
+            response = send_request(socket_path, argv, str(tmpdir))
+        assert response['result'] == result
+        assert message in response['stdout'] + response['stderr']
+
+    def test_include_from_client_directory(self, tmpdir, monkeypatch):
+        client = tmpdir.mkdir('client')
+        client.join('client.h').write('int from_client;\n')
+        client.mkdir('src').join('main.c').write(
+            '#include "client.h"\n#include "server.h"\n')
+        server = tmpdir.mkdir('server')
+        server.join('server.h').write('int from_server;\n')
+        monkeypatch.chdir(server)
+        with running_server(tmpdir) as socket_path:
+            response = send_request(socket_path,
+                                    ['progname', '-E', 'src/main.c'],
+                                    str(client))
+        assert 'int from_client;' in response['stdout']
+        assert 'from_server' not in response['stdout']
+        assert 'server.h' in response['stderr']
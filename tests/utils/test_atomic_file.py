@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import os
+
+from pytest import raises
+
+from pcc.utils.atomic_file import atomic_write
+
+
+class TestAtomicFile(object):
+
+    def test_file_is_replaced(self, tmp_path):
+        path = str(tmp_path / 'directory' / 'file')
+        with atomic_write(path) as file:
+            file.write('first')
+        with atomic_write(path, 'wb') as file:
+            file.write(b'second')
+        with open(path) as file:
+            assert file.read() == 'second'
+        assert os.listdir(str(tmp_path / 'directory')) == ['file']
+
+    def test_failed_write_keeps_the_file(self, tmp_path):
+        path = str(tmp_path / 'file')
+        with atomic_write(path) as file:
+            file.write('first')
+        with raises(OSError):
+            with atomic_write(path) as file:
+                file.write('second')
+                raise OSError
+        with open(path) as file:
+            assert file.read() == 'first'
+        assert os.listdir(str(tmp_path)) == ['file']